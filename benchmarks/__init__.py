@@ -0,0 +1 @@
+"""대시보드 성능 측정용 합성 데이터 생성기와 벤치마크"""
@@ -0,0 +1,149 @@
+"""시작 시간 벤치마크 - 모듈 import, 기본 데이터셋 적재(CSV/스냅샷), 첫 화면 렌더링
+
+각 항목은 새 프로세스에서 측정한다 (import 캐시가 없는 서버 시작과 같은 조건).
+합성 CSV를 임시 디렉터리에 기본 CSV 이름으로 만들고 그 디렉터리에서 대시보드를 실행한다.
+
+사용 예:
+    python -m benchmarks.bench_cold_start --rows 100k
+    python -m benchmarks.bench_cold_start --rows 1m --check    # 예산 초과 시 종료 코드 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from benchmarks.generate_data import generate_transactions, parse_rows, write_dataset
+from kpi_engine import DEFAULT_CSV_PATH, SNAPSHOT_DIR_ENV, load_csv_snapshot
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "kpi_test_copy.py")
+# 시작 시간 예산 (초)
+DEFAULT_BUDGETS = {"import": 1.5, "snapshot": 1.0, "first_render": 15.0}
+
+# 자식 프로세스에서 실행 - 측정 결과를 JSON 한 줄로 출력
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+mode = sys.argv[1]
+result = {}
+if mode == "import":
+    import kpi_test_copy
+    result["seconds"] = time.perf_counter() - started
+    result["plotly_express_loaded"] = "plotly.express" in sys.modules
+elif mode in ("csv", "snapshot"):
+    from kpi_engine import DEFAULT_CSV_PATH, add_date_columns, load_csv_file
+    from kpi_engine import load_csv_snapshot
+    started = time.perf_counter()
+    if mode == "csv":
+        df = add_date_columns(load_csv_file(DEFAULT_CSV_PATH))
+    else:
+        df = load_csv_snapshot(DEFAULT_CSV_PATH)
+    result["seconds"] = time.perf_counter() - started
+    result["rows"] = len(df)
+elif mode == "first_render":
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(sys.argv[2], default_timeout=600).run()
+    result["seconds"] = time.perf_counter() - started
+    result["exceptions"] = len(app.exception)
+print(json.dumps(result))
+"""
+
+
+def run_child(mode, workdir, env):
+    """새 프로세스에서 항목 하나를 측정한 결과 dict"""
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, mode, APP_PATH],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시작 시간 벤치마크")
+    parser.add_argument("--rows", default="100k", help="행 수 또는 100k/1m/10m")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 경로")
+    for name, seconds in DEFAULT_BUDGETS.items():
+        parser.add_argument(
+            f"--budget-{name.replace('_', '-')}",
+            type=float,
+            default=seconds,
+            help=f"{name} 예산(초, 기본 {seconds})",
+        )
+    parser.add_argument("--check", action="store_true", help="예산 초과 시 종료 코드 1")
+    args = parser.parse_args()
+
+    n_rows = parse_rows(args.rows)
+    with tempfile.TemporaryDirectory() as workdir:
+        write_dataset(
+            generate_transactions(n_rows, seed=args.seed),
+            os.path.join(workdir, DEFAULT_CSV_PATH),
+        )
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [REPO_ROOT] + [p for p in [env.get("PYTHONPATH")] if p]
+        )
+        env[SNAPSHOT_DIR_ENV] = os.path.join(workdir, ".kpi_snapshots")
+        # 스냅샷은 측정 전에 한 번 생성 (배포 시 사전 점검 단계에 해당)
+        os.environ[SNAPSHOT_DIR_ENV] = env[SNAPSHOT_DIR_ENV]
+        load_csv_snapshot(os.path.join(workdir, DEFAULT_CSV_PATH))
+
+        results = {}
+        for mode in ["import", "csv", "snapshot", "first_render"]:
+            runs = [run_child(mode, workdir, env) for _ in range(args.repeat)]
+            timings = [run["seconds"] for run in runs]
+            results[mode] = {
+                "median_s": round(statistics.median(timings), 4),
+                "min_s": round(min(timings), 4),
+                "runs": len(timings),
+                **{key: value for key, value in runs[-1].items() if key != "seconds"},
+            }
+
+    budgets = {name: getattr(args, f"budget_{name}") for name in DEFAULT_BUDGETS}
+    print(f"{n_rows:,}행, Python {platform.python_version()}, pandas {pd.__version__}")
+    over_budget = []
+    for mode, summary in results.items():
+        budget = budgets.get(mode)
+        status = ""
+        if budget is not None:
+            within = summary["median_s"] <= budget
+            status = f"  (예산 {budget:.1f}초 {'이내' if within else '초과'})"
+            if not within:
+                over_budget.append(mode)
+        print(f"  {mode:<14} {summary['median_s'] * 1000:>10.1f} ms{status}")
+    speedup = results["csv"]["median_s"] / max(results["snapshot"]["median_s"], 1e-9)
+    print(f"  스냅샷 적재: CSV 대비 x{speedup:.1f}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "rows": n_rows,
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+            },
+            "budgets_s": budgets,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.check and over_budget:
+        print(f"예산 초과: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""대시보드 주요 경로 벤치마크 - 결과를 JSON으로 기록하고 기준선과 비교
+
+사용 예:
+    python -m benchmarks.bench_hot_paths --sizes 100k,1m --output results.json
+    python -m benchmarks.bench_hot_paths --sizes 100k --save-baseline
+    python -m benchmarks.bench_hot_paths --sizes 100k --check   # 회귀 시 종료 코드 1
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import kpi_aggregations
+import kpi_cache
+import kpi_engine
+from benchmarks.generate_data import generate_transactions, parse_rows, size_label
+from kpi_engine import (
+    DETAIL_COLUMNS,
+    add_date_columns,
+    compute_change_pct,
+    compute_diversification_tables,
+    compute_flow_tables,
+    compute_sales_summary,
+    default_filter_args,
+    diversification_group_column,
+    drilldown_positions,
+    filter_data,
+    frame_copy_totals,
+    get_sorted_positions,
+    materialize_detail_page,
+    process_data,
+    select_top_groups,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# 기준선 대비 허용 비율과, 잡음으로 보는 최소 절대 차이(초)
+DEFAULT_TOLERANCE = 0.25
+MIN_DELTA_SECONDS = 0.005
+
+
+def _clear_derived_cache():
+    """파생 구조/부분집합 프레임 캐시를 비워 매 반복이 캐시 적중 없이 측정되도록 함"""
+    with kpi_cache._derived_store_lock:
+        kpi_cache._derived_store.clear()
+        kpi_cache._frame_store.clear()
+        kpi_cache._dataset_store.clear()
+
+
+def time_stage(func, repeat, setup=None, clear_cache=True):
+    """func를 repeat번 실행한 (초 단위 측정값 목록, 마지막 결과)
+
+    setup()의 반환값이 func의 인자로 전달되며 setup 시간은 측정하지 않는다.
+    clear_cache=False면 캐시가 채워진 상태(재실행)를 측정한다.
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        if clear_cache:
+            _clear_derived_cache()
+        gc.collect()
+        started = time.perf_counter()
+        result = func(arg) if setup is not None else func()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def _summary(timings, rows, **extra):
+    return {
+        "median_s": round(statistics.median(timings), 6),
+        "min_s": round(min(timings), 6),
+        "repeat": len(timings),
+        "rows": int(rows),
+        **extra,
+    }
+
+
+def _simulate_rerun(df, filter_args, 기준선택="year_month"):
+    """한 번의 대시보드 재실행에서 데이터셋 행을 복사하는 경로 (필터, 요약, 상위 N)"""
+    filtered = filter_data(df, *filter_args)
+    compute_sales_summary(filtered, 기준선택)
+    for group_col in ("품목", "판매자", "구매자"):
+        select_top_groups(filtered, group_col, 20)
+    return filtered
+
+
+def _bench_rerun(df, filter_args, repeat):
+    """첫 실행(캐시 없음)과 같은 조건의 재실행에서 시간과 프레임 복사 횟수"""
+    out = {}
+    for stage, clear_cache in [("rerun/cold", True), ("rerun/steady", False)]:
+        if not clear_cache:
+            _simulate_rerun(df, filter_args)  # 캐시 채우기
+        before = frame_copy_totals()["copies"]
+        timings, _ = time_stage(
+            lambda: _simulate_rerun(df, filter_args), repeat, clear_cache=clear_cache
+        )
+        copies = (frame_copy_totals()["copies"] - before) / repeat
+        out[stage] = _summary(timings, len(df), frame_copies_per_run=copies)
+    return out
+
+
+def _typical_filters(df):
+    """일반적인 조회 조건: 최근 1년, 청과, 벼/찰벼 제외, 위탁판매자"""
+    end = df["확정일자"].max().date()
+    start = (df["확정일자"].max() - pd.Timedelta(days=365)).date()
+    return ((start, end), "청과", True, "전체", "전체", "위탁판매자", "전체", "전체", "전체")
+
+
+def _month_filters(df):
+    """한 달 조회 조건: 마지막 달, 청과, 벼/찰벼 제외"""
+    end = df["확정일자"].max()
+    start = end.replace(day=1)
+    return (
+        (start.date(), end.date()),
+        "청과",
+        True,
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+    )
+
+
+def _select_rows(df, filter_args):
+    """filter_data의 행 선택 단계만 (조회 프레임 캐시 없이)"""
+    date_range, 구분, exclude_rice, 부류, 품목, *others = filter_args
+    selections = dict(
+        zip(["seller_type", "seller_dtl_type", "buyer_type", "trade_type"], others)
+    )
+    return kpi_engine.filter_positions(
+        df, date_range, exclude_rice, 구분=구분, 부류=부류, 품목=품목, **selections
+    )
+
+
+def _multi_select_filters(df):
+    """다중 선택 조건: 청과+양곡, 처음 나온 품목 5개"""
+    items = tuple(df["품목"].dropna().unique()[:5])
+    return (
+        default_filter_args(df)[0],
+        ("청과", "양곡"),
+        False,
+        "전체",
+        items,
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+    )
+
+
+def run_size(n_rows, repeat, seed):
+    """한 데이터 크기에 대한 단계별 측정 결과 {단계: 요약}"""
+    raw = generate_transactions(n_rows, seed=seed)
+    results = {}
+
+    # 전처리 (입력 프레임을 변경하므로 매 반복 사본 사용)
+    timings, processed = time_stage(process_data, repeat, setup=raw.copy)
+    results["process_data"] = _summary(timings, len(raw))
+    del raw
+
+    timings, dated = time_stage(lambda: add_date_columns(processed), repeat)
+    results["add_date_columns"] = _summary(timings, len(dated))
+
+    full_args = default_filter_args(dated)
+    timings, full = time_stage(lambda: filter_data(dated, *full_args), repeat)
+    results["filter_data/all"] = _summary(timings, len(full))
+
+    typical_args = _typical_filters(dated)
+    timings, typical = time_stage(lambda: filter_data(dated, *typical_args), repeat)
+    results["filter_data/typical"] = _summary(timings, len(typical))
+
+    multi_args = _multi_select_filters(dated)
+    timings, multi = time_stage(lambda: filter_data(dated, *multi_args), repeat)
+    results["filter_data/multi"] = _summary(timings, len(multi))
+    results.update(_bench_rerun(dated, typical_args, repeat))
+
+    # 한 달 조회: 기간 파티션에서 해당 월의 행만 비교
+    # (파티션과 컬럼 코드는 데이터셋별로 한 번 생성되므로 측정 전에 준비)
+    month_args = _month_filters(dated)
+    _select_rows(dated, month_args)
+    timings, month = time_stage(
+        lambda: _select_rows(dated, month_args), repeat, clear_cache=False
+    )
+    results["filter_rows/month"] = _summary(timings, len(month))
+
+    # 거래흐름 집계 (표, 합계, 비율, 증감률 포함)
+    for 기준선택, group_col in [
+        ("year_month", "품목"),
+        ("year_week", "판매자세부구분"),
+        ("year_month", "판매자"),
+    ]:
+        timings, _ = time_stage(
+            lambda: compute_flow_tables(full, 기준선택, group_col), repeat
+        )
+        results[f"flow/{기준선택}×{group_col}"] = _summary(timings, len(full))
+
+    div_col = diversification_group_column(full)
+    timings, _ = time_stage(
+        lambda: compute_diversification_tables(full, "year_month", div_col), repeat
+    )
+    results[f"diversification/year_month×{div_col}"] = _summary(timings, len(full))
+
+    # 증감률 표 단독 (가장 큰 피벗: 주 × 판매자)
+    pivot = compute_flow_tables(full, "year_week", "판매자")["pivot_amount"]
+    timings, _ = time_stage(lambda: compute_change_pct(pivot), repeat)
+    results["change_pct/year_week×판매자"] = _summary(timings, pivot.size)
+
+    # 드릴다운: 인덱스 생성 → 가장 큰 셀 선택 → 정렬 → 첫 페이지 추출
+    results.update(_bench_drilldown(full, repeat))
+    return results
+
+
+def _bench_drilldown(df, repeat):
+    기준선택, group_col = "year_month", "품목"
+
+    def index_only():
+        return kpi_aggregations._build_drilldown_index(df, 기준선택, group_col)
+
+    timings, index = time_stage(index_only, repeat)
+    out = {f"drilldown/index {기준선택}×{group_col}": _summary(timings, len(df))}
+
+    # 가장 행이 많은 셀
+    sizes = np.diff(index["offsets"][:-1])
+    cell = int(np.argmax(sizes))
+    periods = {code: period for period, code in index["period_codes"].items()}
+    groups = {code: group for group, code in index["group_codes"].items()}
+    selection = (
+        기준선택,
+        periods[cell // index["n_groups"]],
+        group_col,
+        groups[cell % index["n_groups"]],
+    )
+
+    def select_and_page():
+        positions = drilldown_positions(
+            kpi_engine.get_drilldown_index(df, 기준선택, group_col),
+            selection[1],
+            selection[3],
+        )
+        ordered = get_sorted_positions(
+            df, positions, "구매확정금액(원)", False, selection
+        )
+        return materialize_detail_page(df, ordered[:100], DETAIL_COLUMNS)
+
+    timings, _ = time_stage(select_and_page, repeat)
+    out["drilldown/select+sort+page"] = _summary(timings, int(sizes.max()))
+    return out
+
+
+def run(sizes, repeat, seed):
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    for n_rows in sizes:
+        label = size_label(n_rows)
+        print(f"[{label}] {n_rows:,}행 측정 중...", flush=True)
+        report["results"][label] = run_size(n_rows, repeat, seed)
+        for stage, summary in report["results"][label].items():
+            copies = summary.get("frame_copies_per_run")
+            note = "" if copies is None else f"  (프레임 복사 {copies:g}회/실행)"
+            print(f"  {stage:<45} {summary['median_s'] * 1000:>10.1f} ms{note}")
+    return report
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """기준선 대비 회귀 목록 [(크기, 단계, 기준 중앙값, 현재 중앙값, 비율)]"""
+    regressions = []
+    for label, stages in report["results"].items():
+        base_stages = baseline.get("results", {}).get(label, {})
+        for stage, summary in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            current, previous = summary["median_s"], base["median_s"]
+            ratio = current / previous if previous > 0 else float("inf")
+            if ratio > 1 + tolerance and current - previous > MIN_DELTA_SECONDS:
+                regressions.append((label, stage, previous, current, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 주요 경로 벤치마크")
+    parser.add_argument("--sizes", default="100k", help="쉼표 구분 (예: 100k,1m,10m)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="측정 결과 JSON 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준선 JSON 경로")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="측정 결과를 기준선으로 저장"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="기준선 대비 회귀가 있으면 종료 코드 1"
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    sizes = [parse_rows(size) for size in args.sizes.split(",") if size.strip()]
+    report = run(sizes, args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"기준선 저장: {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"기준선 파일이 없습니다: {args.baseline}")
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for label, stage, previous, current, ratio in regressions:
+            print(
+                f"회귀 [{label}] {stage}: {previous * 1000:.1f} ms → "
+                f"{current * 1000:.1f} ms (x{ratio:.2f})"
+            )
+        if regressions:
+            return 1
+        print(f"회귀 없음 (허용 +{args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""섹션 병렬 계산 벤치마크 - 작업 스레드 수별 compute_dashboard_sections 경과 시간
+
+사용 예:
+    python -m benchmarks.bench_parallel_sections --rows 1m --workers 1,2,4,8
+    python -m benchmarks.bench_parallel_sections --rows 100k --output parallel.json
+
+1개 스레드(순차 실행) 대비 속도 향상을 출력한다. 코어가 하나뿐인 환경에서는 향상이 없다.
+"""
+
+import argparse
+import json
+import os
+import platform
+
+import pandas as pd
+
+from benchmarks.bench_hot_paths import _summary, time_stage
+from benchmarks.generate_data import generate_transactions, parse_rows
+from kpi_engine import (
+    MOVER_DIMENSIONS,
+    add_date_columns,
+    compute_dashboard_sections,
+    default_filter_args,
+    filter_data,
+    process_data,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="섹션 병렬 계산 벤치마크")
+    parser.add_argument("--rows", default="1m", help="행 수 또는 100k/1m/10m")
+    parser.add_argument("--workers", default="1,2,4,8", help="쉼표 구분 작업 스레드 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--period", default="year_month", help="기준선택")
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--output", help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    n_rows = parse_rows(args.rows)
+    df = add_date_columns(process_data(generate_transactions(n_rows, seed=args.seed)))
+    filtered = filter_data(df, *default_filter_args(df))
+
+    results = {}
+    for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+        timings, _ = time_stage(
+            lambda: compute_dashboard_sections(
+                filtered,
+                args.period,
+                top_n=args.top_n,
+                mover_dim=MOVER_DIMENSIONS[0],
+                workers=workers,
+            ),
+            args.repeat,
+        )
+        results[workers] = _summary(timings, len(filtered), workers=workers)
+
+    base = results[min(results)]["median_s"]
+    print(f"{n_rows:,}행, CPU {os.cpu_count()}개, 기준선택 {args.period}")
+    for workers, summary in results.items():
+        speedup = base / summary["median_s"] if summary["median_s"] > 0 else 0
+        summary["speedup"] = round(speedup, 3)
+        print(
+            f"  workers={workers:<3} {summary['median_s'] * 1000:>10.1f} ms"
+            f"  x{speedup:.2f}"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "rows": n_rows,
+                "cpu_count": os.cpu_count(),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "period": args.period,
+            },
+            "results": {str(workers): summary for workers, summary in results.items()},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
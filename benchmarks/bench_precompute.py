@@ -0,0 +1,90 @@
+"""적재 시 사전 계산 벤치마크 - 프로세스 수별 파생 구조 생성 시간
+
+사용 예:
+    python -m benchmarks.bench_precompute --rows 10m --processes 1,2,4,8
+    python -m benchmarks.bench_precompute --rows 1m --output precompute.json
+
+processes=1은 같은 항목을 현재 프로세스에서 순차 생성한 시간(사전 계산이 없을 때
+첫 화면과 드릴다운이 나눠 치르는 비용)이며, 나머지는 precompute_dataset 경과 시간이다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+import pandas as pd
+
+from benchmarks.bench_hot_paths import _clear_derived_cache, _summary
+from benchmarks.generate_data import generate_transactions, parse_rows
+from kpi_engine import (
+    add_date_columns,
+    default_filter_args,
+    filter_data,
+    precompute_dataset,
+    precompute_tasks,
+    process_data,
+)
+from kpi_precompute import _build_precomputed
+
+
+def build_sequential(df):
+    """사전 계산 항목을 현재 프로세스에서 차례로 생성"""
+    view = filter_data(df, *default_filter_args(df))
+    frames = {"base": df, "view": view}
+    for target, name in precompute_tasks():
+        _build_precomputed(frames[target], name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="적재 시 사전 계산 벤치마크")
+    parser.add_argument("--rows", default="1m", help="행 수 또는 100k/1m/10m")
+    parser.add_argument("--processes", default="1,2,4,8", help="쉼표 구분 프로세스 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    n_rows = parse_rows(args.rows)
+    df = add_date_columns(process_data(generate_transactions(n_rows, seed=args.seed)))
+
+    results = {}
+    for processes in [int(p) for p in args.processes.split(",") if p.strip()]:
+        timings = []
+        for _ in range(args.repeat):
+            _clear_derived_cache()
+            started = time.perf_counter()
+            if processes <= 1:
+                build_sequential(df)
+            else:
+                precompute_dataset(df, processes)
+            timings.append(time.perf_counter() - started)
+        results[processes] = _summary(timings, len(df), processes=processes)
+
+    base = results[min(results)]["median_s"]
+    print(f"{n_rows:,}행, CPU {os.cpu_count()}개, 항목 {len(precompute_tasks())}개")
+    for processes, summary in results.items():
+        speedup = base / summary["median_s"] if summary["median_s"] > 0 else 0
+        summary["speedup"] = round(speedup, 3)
+        print(
+            f"  processes={processes:<3} {summary['median_s'] * 1000:>10.1f} ms"
+            f"  x{speedup:.2f}"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "rows": n_rows,
+                "cpu_count": os.cpu_count(),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+            },
+            "results": {str(p): summary for p, summary in results.items()},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""거래데이터 합성 생성기 - 실제 CSV와 같은 스키마의 결정적(seed 고정) 데이터
+
+사용 예:
+    python -m benchmarks.generate_data --rows 1m --out 거래데이터_1m.csv
+    python -m benchmarks.generate_data --rows 100k --sellers 800 --buyers 5000 --out sample.parquet
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# 크기 프리셋 (행 수)
+SIZE_PRESETS = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# 원본 CSV 컬럼 순서
+RAW_COLUMNS = [
+    "확정일자",
+    "판매자가입일자",
+    "구매자가입일자",
+    "거래유형",
+    "거래방식",
+    "구분",
+    "부류",
+    "품목",
+    "판매자",
+    "구매자",
+    "판매자구분",
+    "구매자구분",
+    "주문수량",
+    "주문물량",
+    "주문단가(원)",
+    "주문금액(원)",
+    "구매확정수량",
+    "구매확정물량",
+    "구매확정단가(원)",
+    "구매확정금액(원)",
+]
+
+# 구분 → 부류 → (품목, kg당 기준단가(원), 포장단위(kg))
+ITEM_CATALOG = {
+    "청과": {
+        "과일": [
+            ("사과", 4500, 10),
+            ("배", 4000, 15),
+            ("감귤", 3000, 10),
+            ("포도", 7000, 4),
+            ("복숭아", 6000, 4.5),
+            ("딸기", 12000, 2),
+            ("참외", 5000, 10),
+            ("수박", 2000, 8),
+        ],
+        "채소": [
+            ("배추", 900, 10),
+            ("무", 800, 18),
+            ("양파", 1200, 20),
+            ("대파", 2500, 10),
+            ("마늘", 7000, 10),
+            ("고추", 9000, 10),
+            ("오이", 2500, 10),
+            ("감자", 2000, 20),
+        ],
+    },
+    "양곡": {
+        "미곡": [("쌀", 2800, 20), ("벼", 1800, 40), ("찰벼", 2100, 40)],
+        "잡곡": [("찹쌀", 3500, 20), ("보리", 2200, 20), ("콩", 6000, 20)],
+    },
+    "축산": {
+        "육류": [("한우", 45000, 10), ("돈육", 12000, 10), ("닭", 5000, 10)],
+        "알류": [("조란", 3500, 10), ("메추리알", 6000, 5)],
+    },
+    "수산": {
+        "선어": [("고등어", 6000, 10), ("갈치", 15000, 5), ("오징어", 12000, 8)],
+        "패류": [("굴", 10000, 5), ("전복", 40000, 2)],
+        "해조류": [("김", 20000, 2), ("미역", 8000, 5)],
+    },
+}
+
+# 구분별 거래 비중
+DIVISION_WEIGHTS = {"청과": 0.55, "양곡": 0.15, "축산": 0.15, "수산": 0.15}
+
+REGIONS = [
+    "서울", "부산", "대구", "인천", "광주", "대전", "울산", "수원", "청주", "전주",
+    "나주", "안동", "제주", "서귀포", "김해", "순천", "여수", "목포", "강릉", "춘천",
+    "원주", "충주", "상주", "영천", "논산", "홍성", "해남", "고흥", "완도", "통영",
+    "거제", "포항", "경주", "의성", "성주", "고창", "익산", "당진", "이천", "여주",
+]  # fmt: skip
+
+# 판매자 유형: (이름 형식, 구분, 판매자구분)
+SELLER_KINDS = [
+    ("{region}농협", "청과", "위탁판매자"),
+    ("{region}원예농업협동조합", "청과", "위탁판매자"),
+    ("(주){region}청과", "청과", "위탁판매자"),
+    ("{region}영농조합법인", "청과", "직접판매자"),
+    ("{region}농협", "양곡", "위탁판매자"),
+    ("{region}양곡(주)", "양곡", "위탁판매자"),
+    ("{region}미곡처리장", "양곡", "직접판매자"),
+    ("{region}축산(주)", "축산", "직접판매자"),
+    ("{region}축산농협", "축산", "위탁판매자"),
+    ("{region}수협", "수산", "위탁판매자"),
+    ("{region}수산(주)", "수산", "위탁판매자"),
+    ("{region}수산상사", "수산", "매수판매자"),
+    ("{region}어업회사법인", "수산", "직접판매자"),
+]
+
+# 구매자 유형: (이름 형식, 구매자구분)
+BUYER_KINDS = [
+    ("{region}식자재마트", "식자재"),
+    ("{region}푸드", "식자재"),
+    ("{region}하나로마트", "소매"),
+    ("{region}마트", "소매"),
+    ("{region}청과상회", "소매"),
+    ("{region}급식", "단체급식"),
+    ("{region}식품(주)", "가공"),
+]
+
+# 거래유형 코드와 비중 (process_data의 거래유형보정 매핑 대상)
+TRADE_TYPE_CODES = [1, 2, 3, 4, 5, 9]
+TRADE_TYPE_WEIGHTS = [0.35, 0.2, 0.2, 0.1, 0.1, 0.05]
+
+TRADE_METHODS = ["정가거래", "간편거래", "입찰거래", "발주거래", "기획전", "특화상품"]
+TRADE_METHOD_WEIGHTS = [0.4, 0.15, 0.2, 0.15, 0.05, 0.05]
+
+
+def parse_rows(value):
+    """'100k', '1m', '10m' 프리셋 또는 정수 문자열을 행 수로 변환"""
+    key = str(value).lower()
+    if key in SIZE_PRESETS:
+        return SIZE_PRESETS[key]
+    return int(key.replace("_", ""))
+
+
+def size_label(n_rows):
+    for label, rows in SIZE_PRESETS.items():
+        if rows == n_rows:
+            return label
+    return str(n_rows)
+
+
+def _zipf_weights(n, skew):
+    """순위 r의 가중치 1 / r^skew (상위 몇 개가 거래를 주도하는 분포)"""
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** skew
+    return weights / weights.sum()
+
+
+def _numbered(names, n):
+    """기본 이름 목록을 n개로 확장 (부족하면 '이름2', '이름3' ...)"""
+    out = []
+    rounds = 0
+    while len(out) < n:
+        suffix = "" if rounds == 0 else str(rounds + 1)
+        out.extend(name + suffix for name in names)
+        rounds += 1
+    return out[:n]
+
+
+def _item_table(n_items):
+    """품목 표 (구분, 부류, 품목, 기준단가, 포장단위) - n_items 지정 시 품종 번호로 확장/축소"""
+    base = [
+        (구분, 부류, 품목, price, unit)
+        for 구분, classes in ITEM_CATALOG.items()
+        for 부류, items in classes.items()
+        for 품목, price, unit in items
+    ]
+    if n_items is None:
+        return pd.DataFrame(base, columns=["구분", "부류", "품목", "단가", "포장"])
+
+    # 품종 번호는 원래 품목명 뒤에 붙여 '돈육', '닭', '조란' 등 분류 규칙이 유지되도록 함
+    rows = []
+    for i in range(n_items):
+        구분, 부류, 품목, price, unit = base[i % len(base)]
+        variant = i // len(base)
+        rows.append(
+            (구분, 부류, 품목 if variant == 0 else f"{품목}{variant + 1}호", price, unit)
+        )
+    return pd.DataFrame(rows, columns=["구분", "부류", "품목", "단가", "포장"])
+
+
+def _seller_table(n_sellers, rng, start):
+    kinds = [SELLER_KINDS[i % len(SELLER_KINDS)] for i in range(n_sellers)]
+    names = _dedupe(
+        [
+            kind[0].format(region=REGIONS[(i // len(SELLER_KINDS)) % len(REGIONS)])
+            for i, kind in enumerate(kinds)
+        ]
+    )
+    joined = start - pd.to_timedelta(rng.integers(30, 2000, n_sellers), unit="D")
+    return pd.DataFrame(
+        {
+            "판매자": names,
+            "구분": [kind[1] for kind in kinds],
+            "판매자구분": [kind[2] for kind in kinds],
+            "판매자가입일자": joined.strftime("%Y-%m-%d"),
+        }
+    )
+
+
+def _buyer_table(n_buyers, rng, start):
+    names = _dedupe(
+        [
+            BUYER_KINDS[i % len(BUYER_KINDS)][0].format(
+                region=REGIONS[(i // len(BUYER_KINDS)) % len(REGIONS)]
+            )
+            for i in range(n_buyers)
+        ]
+    )
+    joined = start - pd.to_timedelta(rng.integers(0, 1500, n_buyers), unit="D")
+    return pd.DataFrame(
+        {
+            "구매자": names,
+            "구매자구분": [BUYER_KINDS[i % len(BUYER_KINDS)][1] for i in range(n_buyers)],
+            "구매자가입일자": joined.strftime("%Y-%m-%d"),
+        }
+    )
+
+
+def _dedupe(names):
+    """같은 이름이 반복되면 지점 번호를 붙여 고유하게 만듦"""
+    seen = {}
+    out = []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        out.append(name if count == 0 else f"{name}{count + 1}지점")
+    return out
+
+
+def _take(values, codes):
+    """코드 배열로 문자열 풀을 참조 (같은 문자열 객체를 공유하여 메모리 절약)"""
+    return np.asarray(values, dtype=object).take(codes)
+
+
+def generate_transactions(
+    n_rows,
+    seed=0,
+    n_items=None,
+    n_sellers=400,
+    n_buyers=3000,
+    start_date="2023-01-01",
+    n_days=900,
+    skew=1.1,
+):
+    """실제 CSV와 같은 컬럼/표기의 원본(전처리 전) 거래 DataFrame 생성
+
+    같은 인자와 seed는 항상 같은 데이터를 만든다. 판매자는 구분과 판매자구분이
+    고정되어 있고 품목은 판매자의 구분 안에서만 선택된다.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start_date)
+
+    items = _item_table(n_items)
+    sellers = _seller_table(n_sellers, rng, start)
+    buyers = _buyer_table(n_buyers, rng, start)
+
+    # 판매자 선택: 구분 비중 × 구분 내 인기도(Zipf)
+    seller_weights = np.zeros(len(sellers))
+    for 구분, share in DIVISION_WEIGHTS.items():
+        members = np.flatnonzero(sellers["구분"].to_numpy() == 구분)
+        if len(members):
+            seller_weights[members] = share * _zipf_weights(len(members), skew)
+    seller_weights /= seller_weights.sum()
+    seller_codes = rng.choice(len(sellers), size=n_rows, p=seller_weights)
+    row_division = sellers["구분"].to_numpy().take(seller_codes)
+
+    # 품목 선택: 판매자 구분에 속한 품목 중 인기도(Zipf) 기준
+    item_codes = np.empty(n_rows, dtype=np.int64)
+    item_division = items["구분"].to_numpy()
+    for 구분 in DIVISION_WEIGHTS:
+        rows = np.flatnonzero(row_division == 구분)
+        members = np.flatnonzero(item_division == 구분)
+        if len(rows) == 0:
+            continue
+        picks = rng.choice(len(members), size=len(rows), p=_zipf_weights(len(members), skew))
+        item_codes[rows] = members[picks]
+
+    buyer_codes = rng.choice(len(buyers), size=n_rows, p=_zipf_weights(len(buyers), skew))
+
+    # 확정일자: 기간 후반으로 갈수록 거래가 늘어나는 추세
+    day_weights = np.linspace(1.0, 1.6, n_days)
+    day_codes = rng.choice(n_days, size=n_rows, p=day_weights / day_weights.sum())
+    day_strings = (start + pd.to_timedelta(np.arange(n_days), unit="D")).strftime(
+        "%Y-%m-%d"
+    )
+
+    # 수치 컬럼: 포장단위 × 수량, 기준단가 ± 변동, 일부 거래는 확정 수량이 주문보다 적음
+    unit_kg = items["포장"].to_numpy(dtype=np.float64).take(item_codes)
+    base_price = items["단가"].to_numpy(dtype=np.float64).take(item_codes)
+    order_qty = np.maximum(1, rng.lognormal(mean=3.0, sigma=1.0, size=n_rows)).astype(np.int64)
+    order_volume = np.round(order_qty * unit_kg).astype(np.int64)
+    order_unit_price = np.round(
+        base_price * unit_kg * rng.normal(1.0, 0.15, n_rows).clip(0.5, 1.8), -1
+    ).astype(np.int64)
+    order_amount = order_qty * order_unit_price
+
+    shortfall = rng.random(n_rows) < 0.05
+    confirmed_qty = np.where(
+        shortfall, np.maximum(1, (order_qty * rng.uniform(0.5, 1.0, n_rows)).astype(np.int64)), order_qty
+    )
+    confirmed_volume = np.round(confirmed_qty * unit_kg).astype(np.int64)
+    confirmed_amount = confirmed_qty * order_unit_price
+
+    df = pd.DataFrame(
+        {
+            "확정일자": _take(day_strings, day_codes),
+            "판매자가입일자": _take(sellers["판매자가입일자"], seller_codes),
+            "구매자가입일자": _take(buyers["구매자가입일자"], buyer_codes),
+            "거래유형": np.asarray(TRADE_TYPE_CODES).take(
+                rng.choice(len(TRADE_TYPE_CODES), size=n_rows, p=TRADE_TYPE_WEIGHTS)
+            ),
+            "거래방식": _take(
+                TRADE_METHODS,
+                rng.choice(len(TRADE_METHODS), size=n_rows, p=TRADE_METHOD_WEIGHTS),
+            ),
+            "구분": _take(items["구분"], item_codes),
+            "부류": _take(items["부류"], item_codes),
+            "품목": _take(items["품목"], item_codes),
+            "판매자": _take(sellers["판매자"], seller_codes),
+            "구매자": _take(buyers["구매자"], buyer_codes),
+            "판매자구분": _take(sellers["판매자구분"], seller_codes),
+            "구매자구분": _take(buyers["구매자구분"], buyer_codes),
+            "주문수량": order_qty,
+            "주문물량": order_volume,
+            "주문단가(원)": order_unit_price,
+            "주문금액(원)": order_amount,
+            "구매확정수량": confirmed_qty,
+            "구매확정물량": confirmed_volume,
+            "구매확정단가(원)": order_unit_price,
+            "구매확정금액(원)": confirmed_amount,
+        },
+        columns=RAW_COLUMNS,
+    )
+    return df
+
+
+def write_dataset(df, path, chunk_rows=500_000):
+    """CSV(cp949, 실제 파일과 동일) 또는 Parquet으로 저장 - CSV는 청크 단위로 기록"""
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+        return
+    with open(path, "w", encoding="cp949", newline="") as f:
+        for start in range(0, len(df), chunk_rows):
+            df.iloc[start : start + chunk_rows].to_csv(
+                f, index=False, header=(start == 0)
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 거래데이터 생성")
+    parser.add_argument("--rows", default="100k", help="행 수 또는 100k/1m/10m")
+    parser.add_argument("--out", required=True, help="출력 경로 (.csv 또는 .parquet)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--items", type=int, default=None, help="품목 수 (기본: 카탈로그 전체)")
+    parser.add_argument("--sellers", type=int, default=400, help="판매자 수")
+    parser.add_argument("--buyers", type=int, default=3000, help="구매자 수")
+    parser.add_argument("--days", type=int, default=900, help="확정일자 기간(일)")
+    parser.add_argument("--start-date", default="2023-01-01")
+    args = parser.parse_args()
+
+    df = generate_transactions(
+        parse_rows(args.rows),
+        seed=args.seed,
+        n_items=args.items,
+        n_sellers=args.sellers,
+        n_buyers=args.buyers,
+        start_date=args.start_date,
+        n_days=args.days,
+    )
+    write_dataset(df, args.out)
+    print(f"{len(df):,}행 → {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""성능 계측 로그(JSON lines) 분석 - 단계별 p50/p95 시간과 최대 할당량
+
+사용 예:
+    python -m benchmarks.profile_report kpi_profile.jsonl
+    python -m benchmarks.profile_report kpi_profile.jsonl --last 200 --csv report.csv
+"""
+
+import argparse
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+
+def load_profile_log(path, last=None, include_incomplete=False):
+    """로그를 단계 단위 DataFrame으로 변환 (run_id, stage, wall_ms, peak_mb, rows_in)"""
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not include_incomplete:
+        records = [record for record in records if record.get("completed", True)]
+    if last:
+        records = records[-last:]
+
+    rows = []
+    for record in records:
+        rows.append(
+            {
+                "run_id": record["run_id"],
+                "stage": "(전체 실행)",
+                "wall_ms": record["total_s"] * 1000,
+                "peak_mb": np.nan,
+                "rows_in": np.nan,
+                "frame_copies": record.get("frame_copies", np.nan),
+            }
+        )
+        for stage in record["stages"]:
+            rows.append(
+                {
+                    "run_id": record["run_id"],
+                    "stage": stage_family(stage["name"]),
+                    "wall_ms": stage.get("wall_s", 0.0) * 1000,
+                    "peak_mb": stage.get("peak_bytes", 0) / 1_048_576,
+                    "rows_in": stage.get("rows_in"),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def stage_family(name):
+    """선택 값이 들어간 드릴다운 구간 이름을 그룹 단위로 묶음
+
+    예: 'drilldown[품목 2024-05 사과]' → 'drilldown[품목]'
+    """
+    match = re.match(r"drilldown\[(\S+)", name)
+    if match:
+        return f"drilldown[{match.group(1)}]"
+    return name
+
+
+def _p95_ignoring_nan(values):
+    return np.nanpercentile(values, 95) if values.notna().any() else np.nan
+
+
+def summarize(stages):
+    """단계별 호출 수, 실행당 합계 기준 p50/p95/최대 시간과 p95 할당량"""
+    per_run = (
+        stages.groupby(["stage", "run_id"], sort=False)
+        .agg(wall_ms=("wall_ms", "sum"), peak_mb=("peak_mb", "max"))
+        .reset_index()
+    )
+    summary = per_run.groupby("stage", sort=False).agg(
+        runs=("run_id", "nunique"),
+        p50_ms=("wall_ms", "median"),
+        p95_ms=("wall_ms", lambda x: np.percentile(x, 95)),
+        max_ms=("wall_ms", "max"),
+        p95_peak_mb=("peak_mb", _p95_ignoring_nan),
+    )
+    # 실행당 프레임 복사 횟수 (전체 실행 행에만 기록됨)
+    copies = stages.dropna(subset=["frame_copies"])
+    if not copies.empty:
+        summary["p50_frame_copies"] = np.nan
+        summary.loc["(전체 실행)", "p50_frame_copies"] = copies["frame_copies"].median()
+    return summary.sort_values("p95_ms", ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="성능 계측 로그 분석")
+    parser.add_argument("log", help="KPI_PROFILE_LOG 경로 (기본 kpi_profile.jsonl)")
+    parser.add_argument("--last", type=int, help="최근 N개 실행만 분석")
+    parser.add_argument(
+        "--include-incomplete", action="store_true", help="중단된 실행도 포함"
+    )
+    parser.add_argument("--csv", help="요약 결과를 CSV로 저장")
+    args = parser.parse_args()
+
+    stages = load_profile_log(args.log, args.last, args.include_incomplete)
+    if stages.empty:
+        print("분석할 실행 기록이 없습니다.")
+        return
+    summary = summarize(stages)
+    with pd.option_context("display.width", 160, "display.max_rows", 200):
+        print(summary.round(1).to_string())
+    if args.csv:
+        summary.to_csv(args.csv, encoding="utf-8-sig")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,942 @@
+"""집계 - KPI, 거래 흐름 표, 드릴다운, 증감 상위 항목과 대시보드 섹션 병렬 계산"""
+
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from kpi_cache import cached_derived, cached_frame
+from kpi_filters import derive_frame, take_rows
+from kpi_preprocess import full_period_index
+from kpi_profiling import _profile_run
+from kpi_sketches import HLL_DIMENSIONS, approx_distinct_counts, range_totals
+
+# ================= KPI =================
+# 전체 누계 KPI 스냅샷 - 고유 개수는 값 집합으로 유지하여 증분 갱신 가능
+KPI_DISTINCT_COLUMNS = ["품목", "판매자", "구매자"]
+
+
+def build_kpi_snapshot(df):
+    return {
+        "total_amount": float(df["구매확정금액(원)"].sum()),
+        "total_orders": len(df),
+        "distinct": {
+            col: frozenset(df[col].dropna().unique())
+            for col in KPI_DISTINCT_COLUMNS
+            if col in df.columns
+        },
+    }
+
+
+def update_kpi_snapshot(snapshot, new_rows):
+    """추가된 행만 반영한 새 스냅샷 (기존 스냅샷은 변경하지 않음)"""
+    added = build_kpi_snapshot(new_rows)
+    return {
+        "total_amount": snapshot["total_amount"] + added["total_amount"],
+        "total_orders": snapshot["total_orders"] + added["total_orders"],
+        "distinct": {
+            col: snapshot["distinct"].get(col, frozenset())
+            | added["distinct"].get(col, frozenset())
+            for col in set(snapshot["distinct"]) | set(added["distinct"])
+        },
+    }
+
+
+def get_kpi_snapshot(df):
+    return cached_derived(df, ("kpi_snapshot",), build_kpi_snapshot)
+
+
+def compute_overall_kpis(df, approx=False):
+    """전체 누계 KPI - 합계/건수는 스냅샷, 고유 개수는 스냅샷 집합 또는 HLL 근사"""
+    snapshot = get_kpi_snapshot(df)
+    if approx:
+        distinct = approx_distinct_counts(df)
+    else:
+        distinct = {col: len(values) for col, values in snapshot["distinct"].items()}
+    return {
+        "total_amount": snapshot["total_amount"],
+        "total_orders": snapshot["total_orders"],
+        "distinct": distinct,
+    }
+
+
+def project_year_end(total_amt, min_date, max_date):
+    """(일평균, 연말 예상 거래액) - 일평균 × 올해 12월31일까지 남은 일수를 더함"""
+    days = (max_date - min_date).days + 1
+    daily_avg = total_amt / days if days > 0 else 0
+    end_of_year = datetime(max_date.year, 12, 31)
+    days_left = (end_of_year - max_date).days
+    days_left = max(days_left, 0)  # 음수 방지
+    return daily_avg, total_amt + (daily_avg * days_left)
+
+
+def compute_period_kpis(df, base_df=None, approx=False):
+    """조회 기간 KPI - 근사 모드에서는 base_df(전체 데이터)의 스케치를 필터 조건으로 병합"""
+    # 같은 조회 조건의 재실행/다른 세션은 캐시된 결과 사용
+    return cached_derived(
+        df,
+        ("period_kpis", approx and base_df is not None),
+        lambda frame: _build_period_kpis(frame, base_df, approx),
+    )
+
+
+def base_filters(df, base_df):
+    """df가 base_df(데이터셋)의 filter_data 결과이면 그 조건 dict, 아니면 None
+
+    조건이 있으면 합계/고유 개수를 행 대신 데이터셋의 누적합/스케치에서 구할 수 있다.
+    """
+    if base_df is None or df.attrs.get("derived", False):
+        return None
+    return df.attrs.get("filters")
+
+
+def _build_period_kpis(df, base_df, approx):
+    kpis = {
+        "total_amount": None,
+        "total_orders": len(df),
+        "daily_avg": None,
+        "expected_amount": None,
+        "top_product": None,
+        "approx": False,
+    }
+    filters = base_filters(df, base_df)
+    if filters is not None:
+        # 조회 기간 합계/기간/품목별 금액은 일별 누적합에서 (행을 읽지 않음)
+        totals = range_totals(base_df, filters)
+        kpis["total_amount"] = totals["amount"]
+        min_date, max_date = totals["min_date"], totals["max_date"]
+        item_amounts = totals["item_amounts"]
+    else:
+        kpis["total_amount"] = df["구매확정금액(원)"].sum()
+        min_date, max_date = df["확정일자"].min(), df["확정일자"].max()
+        item_amounts = df.groupby("품목")["구매확정금액(원)"].sum()
+    if not df.empty:
+        kpis["daily_avg"], kpis["expected_amount"] = project_year_end(
+            kpis["total_amount"], min_date, max_date
+        )
+        kpis["top_product"] = item_amounts.idxmax()
+
+    if approx and filters is not None:
+        kpis["distinct"] = approx_distinct_counts(base_df, filters)
+        kpis["approx"] = True
+    else:
+        kpis["distinct"] = {
+            col: df[col].nunique() for col in HLL_DIMENSIONS if col in df.columns
+        }
+    return kpis
+
+
+def compute_sales_summary(df, 기준선택, base_df=None):
+    """최빈 연도의 매출 합계/연말 예상과 마지막 기간의 구분별 매출·전기대비 증감률
+
+    df가 base_df의 조회 결과이면 연도별 건수와 합계는 일별 누적합에서 구한다.
+    """
+    filters = base_filters(df, base_df)
+    if filters is not None:
+        year, year_totals = _busiest_year_totals(base_df, filters)
+    else:
+        year, year_totals = df["확정일자"].dt.year.mode()[0], None
+    year_df = cached_frame(
+        df,
+        ("year", year),
+        lambda frame: derive_frame(
+            take_rows(
+                frame, np.flatnonzero((frame["확정일자"].dt.year == year).to_numpy())
+            ),
+            "year",
+            year,
+        ),
+    )
+
+    if year_totals is not None:
+        total_amt = year_totals["amount"]
+        min_date, max_date = year_totals["min_date"], year_totals["max_date"]
+    else:
+        total_amt = year_df["구매확정금액(원)"].sum()
+        min_date, max_date = year_df["확정일자"].min(), year_df["확정일자"].max()
+    _, expected_amt = project_year_end(total_amt, min_date, max_date)
+
+    # 기준선택별 구분별 매출액 및 전기대비 증감률
+    pivot = (
+        year_df.groupby([기준선택, "구분"])["구매확정금액(원)"]
+        .sum()
+        .unstack()
+        .fillna(0)
+    )
+    pct_df = pivot.pct_change().fillna(0) * 100
+    last_idx = pivot.index[-1]
+    return {
+        "year": year,
+        "year_df": year_df,
+        "total_amount": total_amt,
+        "expected_amount": expected_amt,
+        "last_row": pivot.loc[last_idx],
+        "last_pct": pct_df.loc[last_idx],
+    }
+
+
+def _busiest_year_totals(base_df, filters):
+    """(조건에 맞는 행이 가장 많은 연도, 그 연도의 range_totals) - 동률이면 이른 연도"""
+    totals = range_totals(base_df, filters)
+    date_range = filters.get("date_range", ())
+    best = None
+    for year in range(totals["min_date"].year, totals["max_date"].year + 1):
+        # 조회 기간과 해당 연도의 교집합
+        start, end = pd.Timestamp(year, 1, 1), pd.Timestamp(year, 12, 31)
+        if len(date_range) == 2:
+            start = max(start, pd.Timestamp(date_range[0]))
+            end = min(end, pd.Timestamp(date_range[1]))
+        year_totals = range_totals(base_df, filters, (start, end))
+        if best is None or year_totals["count"] > best[1]["count"]:
+            best = (year, year_totals)
+    return best
+
+
+# ================= 거래 흐름 집계 =================
+def _build_group_totals(df, group_col):
+    """그룹별 거래금액 합계 (내림차순)"""
+    return df.groupby(group_col)["구매확정금액(원)"].sum().sort_values(ascending=False)
+
+
+def rank_groups(df, group_col, top_n=None):
+    """거래금액 내림차순 그룹 목록 (top_n 지정 시 상위 N개)"""
+    totals = cached_derived(
+        df,
+        ("group_totals", group_col),
+        lambda frame: _build_group_totals(frame, group_col),
+    )
+    if top_n is not None:
+        totals = totals.head(top_n)
+    return totals.index.tolist()
+
+
+def select_top_groups(df, group_col, top_n=None):
+    """(흐름 분석 대상 프레임, 그룹 순서) - top_n 지정 시 상위 N개 그룹의 행만 사용"""
+    if top_n is None:
+        # 전체 그룹을 거래금액 기준 내림차순으로 정렬
+        return df, rank_groups(df, group_col)
+    try:
+        n = int(top_n)
+    except Exception:
+        n = 10
+    group_order = rank_groups(df, group_col, n)
+    top_df = cached_frame(
+        df,
+        ("top_groups", group_col, tuple(group_order)),
+        lambda frame: derive_frame(
+            take_rows(frame, np.flatnonzero(frame[group_col].isin(group_order))),
+            group_col,
+            tuple(group_order),
+        ),
+    )
+    return top_df, group_order
+
+
+def _add_totals(pivot, show_row_total=True, show_col_total=True):
+    """피벗에 합계 열(그룹 합)과 합계 행(기간 합)을 붙인 (피벗, 합계 포함 표) 반환"""
+    total_row = pd.DataFrame(pivot.sum(axis=0)).T
+    total_row.index = ["합계"]
+    if show_col_total:
+        pivot["합계"] = pivot.sum(axis=1)
+        total_row["합계"] = total_row.sum(axis=1)
+    if show_row_total:
+        return pivot, pd.concat([pivot, total_row])
+    return pivot, pivot.copy()
+
+
+def compute_row_pct(pivot_with_total, show_col_total=True):
+    """행 비율(%) - 합계 열을 제외한 그룹 비중, 합계 열은 100"""
+    pivot_for_pct = pivot_with_total
+    if show_col_total and "합계" in pivot_for_pct.columns:
+        pivot_for_pct = pivot_for_pct.drop("합계", axis=1)
+
+    row_sum = pivot_for_pct.sum(axis=1)
+    row_pct = pivot_for_pct.div(row_sum, axis=0) * 100
+    if show_col_total:
+        row_pct["합계"] = 100.0
+    return row_pct.round(1)
+
+
+def compute_change_pct(pivot, show_col_total=True):
+    """직전 기간 대비 증감률(%) - 이전 값이 0이면 현재 값이 0일 때 0%, 아니면 100%
+
+    첫 기간은 NaN, 합계 열은 행별 증감률 평균(NaN 제외).
+    """
+    pivot_cols = (
+        [col for col in pivot.columns if col != "합계"]
+        if show_col_total
+        else list(pivot.columns)
+    )
+    values = pivot[pivot_cols].to_numpy(dtype=np.float64)
+    prev_vals = values[:-1]
+    curr_vals = values[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(
+            prev_vals != 0,
+            (curr_vals - prev_vals) / prev_vals * 100,
+            np.where(curr_vals == 0, 0.0, 100.0),
+        )
+    change = pd.DataFrame(
+        np.vstack([np.full((1, len(pivot_cols)), np.nan), pct]),
+        index=pivot.index,
+        columns=pivot_cols,
+    )
+    if show_col_total:
+        change["합계"] = change.mean(axis=1, skipna=True)
+    return change.reindex(columns=pivot.columns)
+
+
+# 추세선: 이동평균 기간 수와 기준선택별 기간 단위
+TREND_WINDOWS = [4, 13]
+PERIOD_UNITS = {
+    "year": "년",
+    "year_quarter": "분기",
+    "year_month": "개월",
+    "year_week": "주",
+}
+TREND_YTD_LABEL = "연누계"
+
+
+def compute_trend_lines(pivot, 기준선택, windows=TREND_WINDOWS):
+    """기간 × 그룹 피벗의 그룹별 이동평균과 연누계 (합계 열 제외)
+
+    기간 방향 누적합 C에서 이동평균 = (C[t] - C[t-w]) / w, 연누계 = C[t] - C[해당 연도 시작]
+    으로 계산하므로 O(기간 × 그룹)이다. 거래가 없는 기간은 0으로 채워 달력 기간 w개의
+    평균을 내며 앞쪽 w-1 기간은 NaN, 연누계는 기준선택이 year이면 생략.
+    반환: {선 이름: 피벗과 같은 모양의 DataFrame}
+    """
+    groups = [col for col in pivot.columns if col != "합계"]
+    calendar = pivot[groups].reindex(
+        full_period_index(pivot.index, 기준선택), fill_value=0
+    )
+    values = calendar.to_numpy(dtype=np.float64)
+    cumulative = np.zeros((len(values) + 1, len(groups)))
+    np.cumsum(values, axis=0, out=cumulative[1:])
+
+    lines = {}
+    unit = PERIOD_UNITS.get(기준선택, "기간")
+    for window in windows:
+        averaged = np.full(values.shape, np.nan)
+        if len(values) >= window:
+            window_sums = cumulative[window:] - cumulative[:-window]
+            averaged[window - 1 :] = window_sums / window
+        lines[f"{window}{unit} 이동평균"] = averaged
+    if 기준선택 != "year":
+        # 기간 표기의 앞 4자리가 연도 (2024-Q1, 2024-05, 2024-21)
+        years = calendar.index.astype(str).str[:4].to_numpy()
+        _, starts, codes = np.unique(years, return_index=True, return_inverse=True)
+        lines[TREND_YTD_LABEL] = cumulative[1:] - cumulative[starts[codes]]
+    # 피벗에 있는 기간만 반환
+    return {
+        name: pd.DataFrame(line, index=calendar.index, columns=groups).reindex(
+            pivot.index
+        )
+        for name, line in lines.items()
+    }
+
+
+def _pivot_flow(flow, 기준선택, group_col, value_col, col_order, dtype=float):
+    return (
+        flow.pivot(index=기준선택, columns=group_col, values=value_col)
+        .fillna(0)
+        .astype(dtype)
+        .reindex(columns=col_order)
+    )
+
+
+def compute_flow_tables(
+    df, 기준선택, group_col, col_order=None, show_row_total=True, show_col_total=True
+):
+    """기간 × 그룹 금액/물량 피벗, 합계, 행 비율, 증감률, 그래프용 집계"""
+    if 기준선택 not in df.columns:
+        기준선택 = "year_month"
+    # 최소 2개 이상의 기간이 있어야 증감률 계산 가능
+    return build_flow_tables(
+        aggregate_flow(df, 기준선택, group_col),
+        기준선택,
+        group_col,
+        col_order,
+        show_row_total,
+        show_col_total,
+        has_change=df[기준선택].nunique() >= 2,
+    )
+
+
+def aggregate_flow(df, 기준선택, group_col):
+    """기간 × 그룹별 구매확정금액/물량 합계 (DuckDB 백엔드는 같은 결과를 SQL로 생성)"""
+    return (
+        df.groupby([기준선택, group_col])
+        .agg({"구매확정금액(원)": "sum", "구매확정물량": "sum"})
+        .reset_index()
+    )
+
+
+def build_flow_tables(
+    flow,
+    기준선택,
+    group_col,
+    col_order=None,
+    show_row_total=True,
+    show_col_total=True,
+    has_change=True,
+):
+    """기간 × 그룹 집계(aggregate_flow 결과)로 피벗, 합계, 행 비율, 증감률, 그래프용 집계 생성"""
+    flow["구매확정금액(백만원)"] = flow["구매확정금액(원)"] / 1_000_000
+    flow["구매확정물량(톤)"] = flow["구매확정물량"] / 1_000  # kg -> 톤 변환
+
+    # year_week인 경우 시간순 정렬 (YYYY-WW 형태)
+    if 기준선택 == "year_week":
+        flow = flow.sort_values(기준선택)
+
+    # 입력된 col_order가 없는 경우 거래금액 합계로 내림차순 정렬
+    if col_order is None or len(col_order) == 0:
+        col_order = (
+            flow.groupby(group_col)["구매확정금액(백만원)"]
+            .sum()
+            .sort_values(ascending=False)
+            .index.tolist()
+        )
+
+    # 카테고리컬 데이터로 변환하여 순서 지정
+    flow[group_col] = pd.Categorical(
+        flow[group_col], categories=col_order, ordered=True
+    )
+
+    pivot_amount, pivot_amount_with_total = _add_totals(
+        _pivot_flow(flow, 기준선택, group_col, "구매확정금액(백만원)", col_order),
+        show_row_total,
+        show_col_total,
+    )
+    pivot_volume, pivot_volume_with_total = _add_totals(
+        _pivot_flow(flow, 기준선택, group_col, "구매확정물량(톤)", col_order),
+        show_row_total,
+        show_col_total,
+    )
+
+    return {
+        "기준선택": 기준선택,
+        "flow": flow,
+        "pivot_amount": pivot_amount,
+        "pivot_volume": pivot_volume,
+        "pivot_amount_with_total": pivot_amount_with_total,
+        "pivot_volume_with_total": pivot_volume_with_total,
+        "row_pct_amount": compute_row_pct(pivot_amount_with_total, show_col_total),
+        "row_pct_volume": compute_row_pct(pivot_volume_with_total, show_col_total),
+        "change_amount": (
+            compute_change_pct(pivot_amount, show_col_total) if has_change else None
+        ),
+        "change_volume": (
+            compute_change_pct(pivot_volume, show_col_total) if has_change else None
+        ),
+        # 추세선은 표와 함께 캐시 (그래프에서 켜고 꺼도 다시 집계하지 않음)
+        "trend_amount": compute_trend_lines(pivot_amount, 기준선택),
+        "trend_volume": compute_trend_lines(pivot_volume, 기준선택),
+        "total_amount_by_period": (
+            flow.groupby(기준선택)["구매확정금액(백만원)"].sum().reset_index()
+        ),
+        "total_volume_by_period": (
+            flow.groupby(기준선택)["구매확정물량(톤)"].sum().reset_index()
+        ),
+    }
+
+
+def diversification_group_column(df):
+    """거래다양화 분석 기준 컬럼 (거래방식보정 → 거래유형보정 → 거래유형 순)"""
+    for col in ["거래방식보정", "거래유형보정", "거래유형"]:
+        if col in df.columns:
+            return col
+    return None
+
+
+def compute_diversification_tables(df, 기준선택, group_col):
+    """거래방식별 금액/물량/건수 피벗(합계 포함)과 요약 통계"""
+    if 기준선택 not in df.columns:
+        기준선택 = "year_month"
+
+    # 구매확정금액, 구매확정물량, 거래건수 모두 집계
+    flow = (
+        df.groupby([기준선택, group_col])
+        .agg(
+            {
+                "구매확정금액(원)": "sum",
+                "구매확정물량": "sum",
+                "확정일자": "count",  # 거래건수
+            }
+        )
+        .reset_index()
+    )
+
+    # 컬럼명 변경 및 단위 변환
+    flow["구매확정금액(백만원)"] = flow["구매확정금액(원)"] / 1_000_000
+    flow["구매확정물량(톤)"] = flow["구매확정물량"] / 1_000
+    flow["거래건수"] = flow["확정일자"]
+
+    # year_week인 경우 시간순 정렬
+    if 기준선택 == "year_week":
+        flow = flow.sort_values(기준선택)
+
+    # 거래방식 순서 정렬 (거래금액 기준 내림차순)
+    col_order = (
+        flow.groupby(group_col)["구매확정금액(백만원)"]
+        .sum()
+        .sort_values(ascending=False)
+        .index.tolist()
+    )
+    flow[group_col] = pd.Categorical(
+        flow[group_col], categories=col_order, ordered=True
+    )
+
+    pivot_amount, pivot_amount_with_total = _add_totals(
+        _pivot_flow(flow, 기준선택, group_col, "구매확정금액(백만원)", col_order)
+    )
+    pivot_volume, pivot_volume_with_total = _add_totals(
+        _pivot_flow(flow, 기준선택, group_col, "구매확정물량(톤)", col_order)
+    )
+    pivot_count, pivot_count_with_total = _add_totals(
+        _pivot_flow(flow, 기준선택, group_col, "거래건수", col_order, dtype=int)
+    )
+
+    # 전체 기간 합계 및 비중
+    summary_stats = (
+        flow.groupby(group_col, observed=False)
+        .agg(
+            {
+                "구매확정금액(백만원)": "sum",
+                "구매확정물량(톤)": "sum",
+                "거래건수": "sum",
+            }
+        )
+        .reset_index()
+    )
+    for value_col, pct_col in [
+        ("구매확정금액(백만원)", "금액비중(%)"),
+        ("구매확정물량(톤)", "물량비중(%)"),
+        ("거래건수", "건수비중(%)"),
+    ]:
+        summary_stats[pct_col] = (
+            summary_stats[value_col] / summary_stats[value_col].sum() * 100
+        ).round(1)
+    summary_stats = summary_stats.sort_values("구매확정금액(백만원)", ascending=False)
+
+    return {
+        "기준선택": 기준선택,
+        "flow": flow,
+        "pivot_amount_with_total": pivot_amount_with_total,
+        "pivot_volume_with_total": pivot_volume_with_total,
+        "pivot_count_with_total": pivot_count_with_total,
+        "summary_stats": summary_stats,
+        "trend_amount": compute_trend_lines(pivot_amount, 기준선택),
+        "trend_volume": compute_trend_lines(pivot_volume, 기준선택),
+        "trend_count": compute_trend_lines(pivot_count, 기준선택),
+    }
+
+
+# ================= 드릴다운 =================
+# (기간, 그룹) → 행 위치 인덱스 생성
+def _build_drilldown_index(df, 기준선택, group_col):
+    """기간·그룹 셀별 행 위치를 하나의 정렬 배열에 연속 구간으로 저장"""
+    period_codes, periods = pd.factorize(df[기준선택])
+    group_codes, groups = pd.factorize(df[group_col])
+    n_groups = len(groups)
+    n_cells = len(periods) * n_groups
+
+    # 셀 번호 = 기간코드 * 그룹수 + 그룹코드 (결측은 마지막 셀로 모아 제외)
+    cell = period_codes.astype(np.int64) * n_groups + group_codes
+    cell[(period_codes < 0) | (group_codes < 0)] = n_cells
+
+    # 안정 정렬이므로 셀 내부는 원래 행 순서 유지
+    order = np.argsort(cell, kind="stable")
+    offsets = np.zeros(n_cells + 2, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(cell, minlength=n_cells + 1))
+
+    return {
+        "period_codes": {period: code for code, period in enumerate(periods)},
+        "group_codes": {group: code for code, group in enumerate(groups)},
+        "n_groups": n_groups,
+        "order": order,
+        "offsets": offsets,
+    }
+
+
+def get_drilldown_index(df, 기준선택, group_col):
+    return cached_derived(
+        df,
+        ("drilldown_index", 기준선택, group_col),
+        lambda frame: _build_drilldown_index(frame, 기준선택, group_col),
+    )
+
+
+def drilldown_positions(index, selected_period, selected_group=None):
+    """선택된 기간(및 그룹)의 행 위치 배열 - 그룹 미지정 시 기간 전체"""
+    period_code = index["period_codes"].get(selected_period)
+    if period_code is None:
+        return index["order"][:0]
+
+    n_groups = index["n_groups"]
+    if selected_group is None:
+        start = period_code * n_groups
+        end = start + n_groups
+    else:
+        group_code = index["group_codes"].get(selected_group)
+        if group_code is None:
+            return index["order"][:0]
+        start = period_code * n_groups + group_code
+        end = start + 1
+    return index["order"][index["offsets"][start] : index["offsets"][end]]
+
+
+# 세부 거래내역 표시/정렬 컬럼
+DETAIL_COLUMNS = [
+    "확정일자",
+    "구분",
+    "부류",
+    "품목",
+    "판매자",
+    "구매자",
+    "판매자구분",
+    "구매자구분",
+    "거래유형보정",
+    "구매확정물량",
+    "구매확정금액(원)",
+]
+DETAIL_SORT_COLUMNS = ["확정일자", "구매확정금액(원)", "구매확정물량"]
+
+
+def get_sorted_positions(df, positions, sort_col, ascending, selection):
+    """선택 조건의 행 위치를 sort_col 기준으로 정렬한 배열 (조건별 캐시)"""
+
+    def build(frame):
+        values = frame[sort_col].iloc[positions].reset_index(drop=True)
+        order = values.sort_values(
+            ascending=ascending, kind="stable", na_position="last"
+        ).index.to_numpy()
+        return positions[order]
+
+    return cached_derived(
+        df, ("detail_sort",) + tuple(selection) + (sort_col, ascending), build
+    )
+
+
+def drilldown_frame(df, positions):
+    """선택 셀의 행만, 요약/상세 표시에 필요한 컬럼만 추출 (전체 컬럼 복사 없음)"""
+    columns = [col for col in DETAIL_COLUMNS if col in df.columns]
+    return df.iloc[positions, df.columns.get_indexer(columns)]
+
+
+def materialize_detail_page(df, page_positions, columns):
+    """페이지에 해당하는 행만 추출하고 파생 컬럼(백만원/톤)을 계산"""
+    page_data = df.iloc[page_positions, df.columns.get_indexer(columns)]
+
+    # 금액과 물량 포맷팅
+    if "구매확정금액(원)" in page_data.columns:
+        page_data["구매확정금액(백만원)"] = (
+            page_data["구매확정금액(원)"] / 1_000_000
+        ).round(0)
+    if "구매확정물량" in page_data.columns:
+        page_data["구매확정물량(톤)"] = (page_data["구매확정물량"] / 1_000).round(0)
+    return page_data
+
+
+def summarize_counterparties(df, keys):
+    """keys(판매자/구매자 등)별 거래유형 목록, 금액·물량(백만원/톤), 건수 - 금액 내림차순"""
+    summary = (
+        df.groupby(keys)
+        .agg(
+            {
+                "거래유형보정": lambda x: ", ".join(
+                    sorted(x.unique())
+                ),  # 거래유형들을 합쳐서 표시
+                "구매확정금액(원)": "sum",
+                "구매확정물량": "sum",
+                "확정일자": "count",  # 거래 건수
+            }
+        )
+        .reset_index()
+        .rename(columns={"확정일자": "총거래건수"})
+    )
+
+    # 단위 변환
+    summary["구매확정금액(백만원)"] = (summary["구매확정금액(원)"] / 1_000_000).round(2)
+    summary["구매확정물량(톤)"] = (summary["구매확정물량"] / 1_000).round(2)
+
+    # 거래금액 기준 내림차순 정렬
+    return summary.sort_values("구매확정금액(백만원)", ascending=False)
+
+
+# ================= 증감 상위 항목 (movers) =================
+MOVER_DIMENSIONS = ["품목", "판매자", "구매자", "부류", "판매자세부구분"]
+
+
+def _top_k_positions(values, k, largest=True):
+    """부분 선택(argpartition) 후 선택된 k개만 정렬"""
+    if len(values) == 0:
+        return np.array([], dtype=np.int64)
+    keys = -values if largest else values
+    k = min(k, len(values))
+    candidates = np.argpartition(keys, k - 1)[:k]
+    return candidates[np.argsort(keys[candidates], kind="stable")]
+
+
+def _build_movers(df, 기준선택, dim, k):
+    amounts = df["구매확정금액(원)"].to_numpy(dtype=np.float64)
+    dim_codes, dim_values = pd.factorize(df[dim])
+    valid = dim_codes >= 0
+
+    # 전체 기간 합계 상위 k
+    totals = np.bincount(
+        dim_codes[valid], weights=amounts[valid], minlength=len(dim_values)
+    )
+    top_idx = _top_k_positions(totals, k)
+    top = pd.DataFrame({dim: dim_values[top_idx], "구매확정금액(원)": totals[top_idx]})
+    top["구매확정금액(백만원)"] = (top["구매확정금액(원)"] / 1_000_000).round(0)
+
+    result = {"top": top, "increase": None, "decrease": None, "periods": None}
+
+    period_codes, periods = pd.factorize(df[기준선택], sort=True)
+    if len(periods) < 2:
+        return result
+
+    # 마지막 두 기간만 차원별로 집계 (직전 기간 = 0열, 현재 기간 = 1열)
+    last_two = valid & (period_codes >= len(periods) - 2)
+    is_curr = (period_codes[last_two] == len(periods) - 1).astype(np.int64)
+    sums = np.bincount(
+        dim_codes[last_two] * 2 + is_curr,
+        weights=amounts[last_two],
+        minlength=len(dim_values) * 2,
+    ).reshape(-1, 2)
+
+    # 두 기간 중 한 번이라도 거래가 있는 항목 (outer join과 동일)
+    present = np.bincount(dim_codes[last_two], minlength=len(dim_values)) > 0
+    prev_amt = sums[present, 0]
+    curr_amt = sums[present, 1]
+    delta = curr_amt - prev_amt
+    growth = np.divide(
+        delta * 100,
+        prev_amt,
+        out=np.zeros_like(delta),
+        where=prev_amt != 0,
+    )
+
+    movers = pd.DataFrame(
+        {
+            dim: dim_values[present],
+            "구매확정금액(원)_curr": curr_amt,
+            "구매확정금액(원)_prev": prev_amt,
+            "증감금액(원)": delta,
+            "증감률(%)": np.round(growth, 1),
+            "증감금액(백만원)": np.round(delta / 1_000_000, 0),
+            "매출액(백만원)": np.round(curr_amt / 1_000_000, 0),
+        }
+    )
+    result["increase"] = movers.iloc[_top_k_positions(delta, k)].reset_index(drop=True)
+    result["decrease"] = movers.iloc[
+        _top_k_positions(delta, k, largest=False)
+    ].reset_index(drop=True)
+    result["periods"] = (periods[-2], periods[-1])
+    return result
+
+
+def compute_movers(df, 기준선택, dim, k=10):
+    """기간 × dim 집계로 상위 거래 및 직전 기간 대비 증가/감소 상위 k개 (필터 상태별 캐시)"""
+    return cached_derived(
+        df,
+        ("movers", 기준선택, dim, k),
+        lambda frame: _build_movers(frame, 기준선택, dim, k),
+    )
+
+
+# ================= 섹션 병렬 계산 =================
+# 작업 스레드 수 (KPI_MAX_WORKERS, 1이면 순차 실행)
+MAX_WORKERS_ENV = "KPI_MAX_WORKERS"
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# 통계 탭의 거래 흐름 섹션: (그룹 컬럼, 고정 컬럼 순서 또는 None, 상위 N 적용 여부)
+FLOW_SECTIONS = [
+    ("구분", ["청과", "축산", "양곡", "수산"], False),
+    ("판매자구분", None, False),
+    ("판매자세부구분", None, False),
+    ("거래유형보정", None, False),
+    ("품목", None, True),
+    ("판매자", None, True),
+    ("구매자", None, True),
+]
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def configured_workers():
+    try:
+        return max(1, int(os.environ.get(MAX_WORKERS_ENV, DEFAULT_MAX_WORKERS)))
+    except ValueError:
+        return DEFAULT_MAX_WORKERS
+
+
+def _get_executor(workers):
+    """작업 수별 스레드 풀 (재실행 간 재사용)"""
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="kpi-section"
+            )
+        return _executors[workers]
+
+
+def run_parallel(tasks, workers=None):
+    """{이름: 인자 없는 함수}를 스레드 풀에서 실행하여 {이름: 결과}를 입력 순서대로 반환
+
+    집계(groupby/NumPy 축약)는 GIL을 놓으므로 독립 섹션을 동시에 계산할 수 있다.
+    작업 중 예외는 입력 순서상 처음 실패한 작업의 것이 그대로 전달된다.
+    """
+    workers = configured_workers() if workers is None else workers
+    timings = {}
+
+    def timed(name, func):
+        started = time.perf_counter()
+        try:
+            return func()
+        finally:
+            timings[name] = time.perf_counter() - started
+
+    if workers <= 1 or len(tasks) <= 1:
+        results = {name: timed(name, func) for name, func in tasks.items()}
+    else:
+        executor = _get_executor(workers)
+        futures = {
+            name: executor.submit(timed, name, func) for name, func in tasks.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+    _record_task_timings(tasks, timings)
+    return results
+
+
+def _record_task_timings(names, timings):
+    """계측 중이면 작업별 시간을 현재 구간의 하위 항목으로 기록 (메모리는 전역이라 제외)"""
+    run = _profile_run.get()
+    if run is None:
+        return
+    depth = len(run["_stack"])
+    for name in names:
+        run["stages"].append(
+            {
+                "name": f"task[{name}]",
+                "depth": depth,
+                "rows_in": None,
+                "rows_out": None,
+                "wall_s": round(timings.get(name, 0.0), 6),
+                "peak_bytes": 0,
+            }
+        )
+
+
+def compute_flow_section(
+    df,
+    기준선택,
+    group_col,
+    order=None,
+    use_top_n=False,
+    top_n=None,
+    show_row_total=True,
+    show_col_total=True,
+):
+    """흐름 섹션 하나의 (대상 프레임, 컬럼 순서, 표) - 상위 N 섹션은 해당 그룹 행만 사용"""
+    if use_top_n:
+        frame, col_order = select_top_groups(df, group_col, top_n)
+    else:
+        frame = df
+        col_order = order
+        if col_order is None:
+            col_order = sorted(df[group_col].dropna().unique())
+    return {
+        "df": frame,
+        "col_order": col_order,
+        "tables": compute_flow_tables(
+            frame, 기준선택, group_col, col_order, show_row_total, show_col_total
+        ),
+    }
+
+
+def compute_summary_section(df, 기준선택, mover_dim, k=10, base_df=None):
+    """요약 블록: 매출 요약 + 증감 상위 항목"""
+    summary = compute_sales_summary(df, 기준선택, base_df)
+    summary["movers"] = compute_movers(summary["year_df"], 기준선택, mover_dim, k=k)
+    return summary
+
+
+def compute_dashboard_sections(
+    df,
+    기준선택,
+    top_n=None,
+    show_row_total=True,
+    show_col_total=True,
+    mover_dim=None,
+    workers=None,
+    base_df=None,
+):
+    """요약/통계 탭의 독립 집계를 동시에 계산 - 화면은 결과를 받아 순서대로 그린다
+
+    반환: {그룹 컬럼: 흐름 섹션, "diversification": 표 또는 None, "summary": 요약 또는 None}
+    mover_dim이 None이면(조회 데이터 없음) 요약은 계산하지 않는다.
+    base_df(df를 조회한 데이터셋)를 주면 요약의 합계는 일별 누적합에서 구한다.
+    결과는 (조회 조건, 표시 옵션)별로 캐시되며 화면은 읽기만 한다.
+    """
+    return cached_derived(
+        df,
+        (
+            "dashboard_sections",
+            기준선택,
+            top_n,
+            show_row_total,
+            show_col_total,
+            mover_dim,
+        ),
+        lambda frame: _build_dashboard_sections(
+            frame,
+            기준선택,
+            top_n,
+            show_row_total,
+            show_col_total,
+            mover_dim,
+            workers,
+            base_df,
+        ),
+    )
+
+
+def _build_dashboard_sections(
+    df, 기준선택, top_n, show_row_total, show_col_total, mover_dim, workers, base_df
+):
+    tasks = {
+        group_col: functools.partial(
+            compute_flow_section,
+            df,
+            기준선택,
+            group_col,
+            order,
+            use_top_n,
+            top_n,
+            show_row_total,
+            show_col_total,
+        )
+        for group_col, order, use_top_n in FLOW_SECTIONS
+    }
+    div_col = diversification_group_column(df)
+    if div_col is not None:
+        tasks["diversification"] = functools.partial(
+            compute_diversification_tables, df, 기준선택, div_col
+        )
+    if mover_dim is not None:
+        tasks["summary"] = functools.partial(
+            compute_summary_section, df, 기준선택, mover_dim, base_df=base_df
+        )
+
+    sections = run_parallel(tasks, workers)
+    sections.setdefault("diversification", None)
+    sections.setdefault("summary", None)
+    return sections
@@ -0,0 +1,138 @@
+"""파생 구조 캐시 - 데이터셋 버전과 필터 상태를 키로 프로세스 전체에서 공유
+
+인덱스, 사전 집계, 부분집합 프레임을 재실행/세션 간에 다시 만들지 않도록 보관한다.
+필터별 항목은 LRU, 데이터셋 단위 구조는 데이터셋이 제거될 때까지 유지한다.
+"""
+
+import threading
+from collections import OrderedDict
+
+# ================= 파생 구조 캐시 =================
+# 프로세스 전체에서 공유되는 LRU 저장소 (모듈은 재실행 간 유지됨)
+_DERIVED_STORE_MAX_ENTRIES = 64
+_derived_store = OrderedDict()
+_derived_store_lock = threading.Lock()
+
+# 데이터셋 단위 구조 - 필터 전 데이터셋에서 한 번 만드는 구조는 필터별 항목(행 위치,
+# 정렬 순서, 섹션)과 LRU를 공유하면 조회 조건이 몇 번 바뀌는 동안 밀려나므로 버전별
+# 저장소에 따로 보관하고, 데이터셋이 제거될 때(_purge_derived)만 삭제한다.
+DATASET_STRUCTURES = frozenset(
+    [
+        "kpi_snapshot",
+        "daily_prefix",
+        "month_partitions",
+        "category_codes",
+        "dimension_index",
+        "hll_cube",
+        "stratified_sample",
+    ]
+)
+_dataset_store = {}  # 데이터셋 버전 → {(이름, 프레임 키): 값}
+
+
+def _is_dataset_structure(name, key):
+    """필터 전 데이터셋(필터 상태 없음)의 데이터셋 단위 구조인지"""
+    return name[0] in DATASET_STRUCTURES and not key[1]
+
+
+_MISSING = object()
+
+
+def _lookup(name, key, default=_MISSING):
+    """저장된 값 (없으면 default) - 잠금 안에서 호출"""
+    if _is_dataset_structure(name, key):
+        return _dataset_store.get(key[0], {}).get((name, key), default)
+    if (name, key) in _derived_store:
+        _derived_store.move_to_end((name, key))
+        return _derived_store[(name, key)]
+    return default
+
+
+def cached_derived(df, name, builder):
+    """프레임 키와 이름으로 파생 구조를 캐시하여 반환 (없으면 builder(df)로 생성)"""
+    key = frame_key(df)
+    if key is None:
+        return builder(df)
+
+    with _derived_store_lock:
+        value = _lookup(name, key)
+    if value is not _MISSING:
+        return value
+
+    value = builder(df)
+    store_derived(df, name, value)
+    return value
+
+
+def peek_derived(df, name):
+    """캐시된 파생 구조 (없으면 None - 생성하지 않음)"""
+    key = frame_key(df)
+    if key is None:
+        return None
+    with _derived_store_lock:
+        return _lookup(name, key, None)
+
+
+def store_derived(df, name, value):
+    """이미 계산된 파생 구조를 저장 (증분 갱신 결과를 새 버전에 등록할 때 사용)"""
+    key = frame_key(df)
+    if key is None:
+        return
+    with _derived_store_lock:
+        if _is_dataset_structure(name, key):
+            _dataset_store.setdefault(key[0], {})[(name, key)] = value
+            return
+        _derived_store[(name, key)] = value
+        _derived_store.move_to_end((name, key))
+        while len(_derived_store) > _DERIVED_STORE_MAX_ENTRIES:
+            _derived_store.popitem(last=False)
+
+
+# 부분집합 프레임 LRU - 필터 조건 하나당 최대 5개(필터, 연도, 상위 N×3), 읽기 전용으로 공유
+_FRAME_STORE_MAX_ENTRIES = 16
+_frame_store = OrderedDict()
+
+
+def cached_frame(df, name, builder):
+    """필터/상위 N/연도 부분집합 프레임을 캐시하여 재실행 간 복사를 없앰"""
+    key = frame_key(df)
+    if key is None:
+        return builder(df)
+
+    with _derived_store_lock:
+        if (name, key) in _frame_store:
+            _frame_store.move_to_end((name, key))
+            return _frame_store[(name, key)]
+
+    frame = builder(df)
+    with _derived_store_lock:
+        _frame_store[(name, key)] = frame
+        _frame_store.move_to_end((name, key))
+        while len(_frame_store) > _FRAME_STORE_MAX_ENTRIES:
+            _frame_store.popitem(last=False)
+    return frame
+
+
+def _purge_derived(version):
+    """버전이 같은 파생 구조와 부분집합 프레임을 모두 제거 (데이터셋이 제거될 때)
+
+    데이터셋에서 만든 파생 버전(예: 층화 표본 "버전:sample")도 함께 제거한다.
+    """
+
+    def matches(other):
+        return other == version or str(other).startswith(f"{version}:")
+
+    with _derived_store_lock:
+        for store in (_derived_store, _frame_store):
+            for key in [key for key in store if matches(key[1][0])]:
+                del store[key]
+        for other in [other for other in _dataset_store if matches(other)]:
+            del _dataset_store[other]
+
+
+# 프레임 식별 키: (데이터셋 버전, 필터 상태, 행 수) - 버전이 없으면 캐시하지 않음
+def frame_key(df):
+    version = df.attrs.get("dataset_version")
+    if version is None:
+        return None
+    return (version, df.attrs.get("filter_key", ()), len(df))
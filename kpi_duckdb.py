@@ -0,0 +1,156 @@
+"""DuckDB 조회 백엔드 - 전처리된 Parquet 데이터셋을 메모리에 올리지 않고 SQL로 필터/집계
+
+KPI_BACKEND=duckdb, KPI_PARQUET_PATH=<경로>로 설정하면 대시보드의 데이터 소스에
+"Parquet (DuckDB)"가 추가된다. 조건에 맞는 행과 집계 결과만 Arrow로 받아오며,
+결과는 kpi_engine의 pandas 경로와 같은 형태다 (parity 명령으로 확인).
+
+사용 예:
+    python -m kpi_duckdb build 거래데이터.csv 거래데이터.parquet
+    python -m kpi_duckdb parity 거래데이터.parquet
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+import pandas as pd
+
+from kpi_engine import (
+    DataLoadError,
+    add_date_columns,
+    file_dataset_id,
+    iter_frame_chunks,
+    load_csv_file,
+)
+from kpi_sql import SQLBackend, load_processed, quote_identifier, report_parity
+
+PARQUET_PATH_ENV = "KPI_PARQUET_PATH"
+# Parquet row group 크기 - DuckDB가 확정일자 최소/최대로 row group을 건너뛸 수 있는 단위
+PARQUET_ROW_GROUP_ROWS = 100_000
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(path=None):
+    """Parquet 파일별 백엔드 (프로세스 공유, 파일이 바뀌면 새로 연결)"""
+    path = path or os.environ.get(PARQUET_PATH_ENV)
+    if not path:
+        raise DataLoadError(f"{PARQUET_PATH_ENV}에 Parquet 파일 경로를 지정해주세요.")
+    dataset_id = file_dataset_id(path)
+    with _backends_lock:
+        if dataset_id not in _backends:
+            _backends[dataset_id] = DuckDBBackend(path, dataset_id)
+        return _backends[dataset_id]
+
+
+# ================= Parquet 데이터셋 생성 =================
+def write_processed_parquet(df, path, row_group_rows=PARQUET_ROW_GROUP_ROWS):
+    """전처리 + 날짜 컬럼이 추가된 데이터셋을 원래 행 순서대로 Parquet으로 기록"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_frame_chunks(df, row_group_rows):
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+    return path
+
+
+class DuckDBBackend(SQLBackend):
+    """Parquet 뷰(trades)에 대한 쿼리 - 결과는 Arrow 테이블로 받아 변환"""
+
+    # read_parquet의 파일 내 행 번호 = 원본 행 순서
+    row_order = "file_row_number"
+
+    def __init__(self, path, dataset_id):
+        try:
+            import duckdb
+        except ImportError:
+            raise DataLoadError(
+                "DuckDB 백엔드를 사용하려면 duckdb 패키지가 필요합니다. "
+                "pip install duckdb 로 설치해주세요."
+            )
+        self.path = path
+        self._connection = duckdb.connect()
+        # (CREATE VIEW는 파라미터를 받지 않으므로 경로를 문자열 리터럴로 넣음)
+        literal = "'" + os.path.abspath(path).replace("'", "''") + "'"
+        self._connection.execute(
+            "CREATE VIEW trades AS SELECT * "
+            f"FROM read_parquet({literal}, file_row_number = true)"
+        )
+        described = self._query("DESCRIBE trades").to_pylist()
+        super().__init__(
+            dataset_id,
+            {
+                row["column_name"]: row["column_type"]
+                for row in described
+                if row["column_name"] != self.row_order
+            },
+        )
+
+    def _query(self, sql, params=None):
+        """쿼리 결과 Arrow 테이블"""
+        # 커서는 연결을 복제하므로 여러 세션(스레드)에서 동시에 사용 가능
+        cursor = self._connection.cursor()
+        try:
+            result = cursor.execute(sql, params or [])
+            # duckdb 1.4 이상은 to_arrow_table, 이전 버전은 fetch_arrow_table
+            fetch = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+            return fetch()
+        finally:
+            cursor.close()
+
+    def _fetch(self, sql, params=None):
+        frame = self._query(sql, params).to_pandas()
+        # DuckDB는 타임스탬프를 마이크로초 단위로 돌려주므로 pandas 경로와 같은 ns로 맞춤
+        for col in frame.columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[col]):
+                frame[col] = frame[col].astype("datetime64[ns]")
+        return frame
+
+    def _sum_expr(self, column):
+        """정수는 BIGINT 합계, 실수는 보정 합계(fsum) - pandas 합계와 같은 타입/값"""
+        col = quote_identifier(column)
+        if self.column_types.get(column) in ("DOUBLE", "FLOAT"):
+            return f"coalesce(fsum({col}), 0)"
+        return f"CAST(coalesce(sum({col}), 0) AS BIGINT)"
+
+    def filter_arrow(self, filter_args, columns=None):
+        """조건에 맞는 행 Arrow 테이블 (원래 순서, columns 지정 시 해당 컬럼만 읽음)"""
+        return self._query(*self.filter_sql(filter_args, columns))
+
+    def drilldown_arrow(self, *args, **kwargs):
+        """선택 셀의 정렬된 페이지 Arrow 테이블 (인자는 drilldown_sql과 같음)"""
+        return self._query(*self.drilldown_sql(*args, **kwargs))
+
+
+# ================= 명령행 =================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DuckDB 조회 백엔드")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="CSV를 전처리하여 Parquet 데이터셋 생성")
+    build.add_argument("source", help="원본 CSV 경로")
+    build.add_argument("output", help="Parquet 경로")
+    build.add_argument("--row-group-rows", type=int, default=PARQUET_ROW_GROUP_ROWS)
+    parity = commands.add_parser("parity", help="pandas 경로와 결과 비교")
+    parity.add_argument("parquet", help="build로 만든 Parquet 경로")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            df = add_date_columns(load_csv_file(args.source))
+            write_processed_parquet(df, args.output, args.row_group_rows)
+            print(f"{len(df):,}행 → {args.output}")
+            return 0
+        return report_parity(load_processed(args.parquet), get_backend(args.parquet))
+    except DataLoadError as e:
+        print(str(e))
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""거래 KPI 계산 엔진 - Streamlit 없이 import 가능한 수집/필터/집계/드릴다운 API
+
+대시보드(kpi_test_copy.py)는 이 모듈의 결과(DataFrame, 배열)를 화면에 그리기만 한다.
+구현은 단계별 모듈에 있고 이 모듈은 공개 API를 한곳에서 다시 내보낸다.
+    kpi_ingest        데이터 로드, 증분 적재, 데이터셋 레지스트리, DB 비동기 적재
+    kpi_preprocess    전처리, 기간 컬럼
+    kpi_filters       기간 파티션, 필터, 사이드바 선택지
+    kpi_cache         파생 구조/부분집합 프레임 캐시
+    kpi_sketches      근사 고유 개수(HyperLogLog), 일별 누적합
+    kpi_aggregations  KPI, 거래 흐름, 드릴다운, 증감 상위 항목, 섹션 병렬 계산
+    kpi_preview       층화 표본 미리보기
+    kpi_precompute    적재 시 사전 계산, 캐시 예열
+    kpi_export        데이터 내보내기
+    kpi_profiling     성능 계측
+"""
+
+from kpi_aggregations import (  # noqa: F401
+    DEFAULT_MAX_WORKERS,
+    DETAIL_COLUMNS,
+    DETAIL_SORT_COLUMNS,
+    FLOW_SECTIONS,
+    KPI_DISTINCT_COLUMNS,
+    MAX_WORKERS_ENV,
+    MOVER_DIMENSIONS,
+    PERIOD_UNITS,
+    TREND_WINDOWS,
+    TREND_YTD_LABEL,
+    aggregate_flow,
+    base_filters,
+    build_flow_tables,
+    build_kpi_snapshot,
+    compute_change_pct,
+    compute_dashboard_sections,
+    compute_diversification_tables,
+    compute_flow_section,
+    compute_flow_tables,
+    compute_movers,
+    compute_overall_kpis,
+    compute_period_kpis,
+    compute_row_pct,
+    compute_sales_summary,
+    compute_summary_section,
+    compute_trend_lines,
+    configured_workers,
+    diversification_group_column,
+    drilldown_frame,
+    drilldown_positions,
+    get_drilldown_index,
+    get_kpi_snapshot,
+    get_sorted_positions,
+    materialize_detail_page,
+    project_year_end,
+    rank_groups,
+    run_parallel,
+    select_top_groups,
+    summarize_counterparties,
+    update_kpi_snapshot,
+)
+from kpi_cache import (  # noqa: F401
+    cached_derived,
+    cached_frame,
+    frame_key,
+    peek_derived,
+    store_derived,
+)
+from kpi_export import (  # noqa: F401
+    DEFAULT_EXPORT_DIR,
+    DEFAULT_EXPORT_MAX_MB,
+    DEFAULT_EXPORT_TTL_S,
+    EXPORT_CHUNK_ROWS,
+    EXPORT_DIR_ENV,
+    EXPORT_FORMATS,
+    EXPORT_MAX_MB_ENV,
+    EXPORT_TTL_ENV,
+    XLSX_MAX_ROWS,
+    ExportError,
+    export_chunks_to_file,
+    export_dir,
+    export_max_bytes,
+    export_ttl,
+    iter_frame_chunks,
+    iter_position_chunks,
+    new_export_path,
+    prune_export_dir,
+    start_export_cleanup,
+)
+from kpi_filters import (  # noqa: F401
+    DIMENSION_HIERARCHIES,
+    FILTER_COLUMNS,
+    PARTITION_COLUMN,
+    RICE_ITEMS,
+    build_dimension_index,
+    category_mask,
+    date_range_positions,
+    derive_frame,
+    dimension_options,
+    filter_cell_mask,
+    filter_data,
+    filter_positions,
+    filter_state,
+    get_dimension_index,
+    get_month_partitions,
+    normalize_selection,
+    partition_rows,
+    selection_values,
+    take_rows,
+)
+from kpi_ingest import (  # noqa: F401
+    CSV_ENCODINGS,
+    CSV_WATCH_INTERVAL_ENV,
+    CSV_WATCH_LOG_INTERVAL,
+    DB_FETCH_CHUNK_ROWS,
+    DEFAULT_CSV_PATH,
+    DEFAULT_CSV_WATCH_INTERVAL,
+    DEFAULT_SNAPSHOT_DIR,
+    SNAPSHOT_DIR_ENV,
+    DataLoadError,
+    DatasetLease,
+    DbLoadJob,
+    acquire_dataset,
+    append_csv_tail,
+    cancel_db_query,
+    connect_db,
+    csv_watch_error,
+    csv_watch_interval,
+    dataset_registry_stats,
+    file_dataset_id,
+    get_dataset,
+    load_csv_file,
+    load_csv_snapshot,
+    load_db,
+    load_uploaded_file,
+    query_dataset_id,
+    read_csv_any_encoding,
+    snapshot_path,
+    start_db_load,
+    upload_dataset_id,
+    watch_csv,
+)
+from kpi_precompute import (  # noqa: F401
+    DEFAULT_PRECOMPUTE_PROCESSES,
+    DEFAULT_TOP_N,
+    PRECOMPUTE_MIN_ROWS,
+    PRECOMPUTE_PROCESSES_ENV,
+    WARMUP_PERIODS,
+    default_filter_args,
+    precompute_dataset,
+    precompute_processes,
+    precompute_tasks,
+    warm_up_dataset,
+    warm_up_view,
+)
+from kpi_preprocess import (  # noqa: F401
+    PERIOD_COLUMNS,
+    add_date_columns,
+    dataset_version,
+    full_period_index,
+    period_labels,
+    process_data,
+)
+from kpi_preview import (  # noqa: F401
+    CONFIDENCE_Z,
+    DEFAULT_PREVIEW_MIN_ROWS,
+    PREVIEW_MIN_ROWS_ENV,
+    SAMPLE_FRACTION,
+    SAMPLE_MIN_PER_STRATUM,
+    SAMPLE_SEED,
+    SAMPLE_STRATA,
+    SAMPLE_STRATUM_COLUMN,
+    compute_preview,
+    estimate_totals,
+    get_stratified_sample,
+    preview_min_rows,
+    start_exact_view,
+    stratum_sums,
+)
+from kpi_profiling import (  # noqa: F401
+    DEFAULT_PROFILE_LOG,
+    PROFILE_ENV,
+    PROFILE_LOG_ENV,
+    finish_profile_run,
+    frame_copy_totals,
+    note_frame_copy,
+    profile_env_enabled,
+    profile_log_path,
+    profile_stage,
+    profiled,
+    start_profile_run,
+)
+from kpi_sketches import (  # noqa: F401
+    DAILY_PREFIX_MEASURES,
+    HLL_CELL_COLUMNS,
+    HLL_DIMENSIONS,
+    HLL_ERROR_PCT,
+    HLL_PRECISION,
+    HLL_REGISTERS,
+    approx_distinct_counts,
+    get_daily_prefix,
+    range_totals,
+)
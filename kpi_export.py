@@ -0,0 +1,264 @@
+"""데이터 내보내기 - 필터 결과를 청크 단위로 CSV/Excel/Parquet 파일에 기록"""
+
+import os
+import tempfile
+import threading
+import time
+
+
+# 내보내기 오류 - 메시지는 화면에 그대로 표시
+class ExportError(Exception):
+    pass
+
+
+# ================= 데이터 내보내기 =================
+# 청크 크기 - 내보내기 중 메모리는 한 청크 분량으로 제한
+EXPORT_CHUNK_ROWS = 50_000
+# 파일 크기 상한(MB) - st.download_button은 재실행마다 파일 전체를 메모리로 읽으므로
+# 이보다 큰 파일은 만들지 않는다 (KPI_EXPORT_MAX_MB, 0 이하이면 제한 없음)
+EXPORT_MAX_MB_ENV = "KPI_EXPORT_MAX_MB"
+DEFAULT_EXPORT_MAX_MB = 200
+
+# Excel 시트당 최대 행 수 (머리글 포함)
+XLSX_MAX_ROWS = 1_048_576
+
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "Excel": (
+        ".xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+}
+
+
+# 생성 파일 디렉터리 - 프로세스/세션이 공유하는 임시 디렉터리 (KPI_EXPORT_DIR로 변경)
+EXPORT_DIR_ENV = "KPI_EXPORT_DIR"
+DEFAULT_EXPORT_DIR = os.path.join(tempfile.gettempdir(), "kpi_dashboard_exports")
+# 보관 시간(초) - 지난 파일은 새 파일을 만들 때와 정리 스레드가 삭제 (KPI_EXPORT_TTL_S)
+EXPORT_TTL_ENV = "KPI_EXPORT_TTL_S"
+DEFAULT_EXPORT_TTL_S = 3600.0
+
+_export_cleaners = {}
+_export_cleaners_lock = threading.Lock()
+
+
+def export_dir():
+    return os.environ.get(EXPORT_DIR_ENV) or DEFAULT_EXPORT_DIR
+
+
+def export_ttl():
+    try:
+        return float(os.environ.get(EXPORT_TTL_ENV, DEFAULT_EXPORT_TTL_S))
+    except ValueError:
+        return DEFAULT_EXPORT_TTL_S
+
+
+def prune_export_dir(directory=None, ttl=None):
+    """보관 시간이 지난 내보내기 파일을 삭제하고 삭제한 파일 수 반환"""
+    directory = directory or export_dir()
+    ttl = export_ttl() if ttl is None else ttl
+    cutoff = time.time() - ttl
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            continue  # 다른 프로세스가 먼저 삭제한 경우 등
+    return removed
+
+
+def new_export_path(suffix, directory=None):
+    """새 내보내기 파일 경로 - 만들기 전에 보관 시간이 지난 파일을 정리"""
+    directory = directory or export_dir()
+    os.makedirs(directory, exist_ok=True)
+    prune_export_dir(directory)
+    handle, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    os.close(handle)
+    return path
+
+
+def start_export_cleanup(directory=None):
+    """시작 시 남아 있는 오래된 파일을 지우고 이후 보관 시간의 절반마다 정리
+
+    디렉터리마다 프로세스에서 한 번만 스레드를 시작한다.
+    """
+    directory = os.path.abspath(directory or export_dir())
+    with _export_cleaners_lock:
+        if directory in _export_cleaners:
+            return
+        thread = threading.Thread(
+            target=_export_cleanup_loop,
+            args=(directory,),
+            name="kpi-export-cleanup",
+            daemon=True,
+        )
+        _export_cleaners[directory] = thread
+    thread.start()
+
+
+def _export_cleanup_loop(directory):
+    while True:
+        prune_export_dir(directory)
+        time.sleep(max(export_ttl() / 2, 60))
+
+
+def export_max_bytes():
+    """내보내기 파일 크기 상한(바이트) - 제한이 없으면 None"""
+    try:
+        limit = float(os.environ.get(EXPORT_MAX_MB_ENV, DEFAULT_EXPORT_MAX_MB))
+    except ValueError:
+        limit = DEFAULT_EXPORT_MAX_MB
+    return int(limit * 1024 * 1024) if limit > 0 else None
+
+
+def iter_position_chunks(positions, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(positions), chunk_rows):
+        yield positions[start : start + chunk_rows]
+
+
+def iter_frame_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS, index_label=None):
+    """프레임을 행 구간 단위로 나누어 반환 (index_label 지정 시 인덱스를 컬럼으로 포함)"""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        if index_label is not None:
+            chunk = chunk.rename_axis(index_label).reset_index()
+        yield chunk
+
+
+def _write_csv_chunks(chunks, fileobj):
+    first = True
+    for chunk in chunks:
+        # BOM은 첫 청크에만 (엑셀에서 한글 깨짐 방지)
+        text = chunk.to_csv(index=False, header=first)
+        fileobj.write(text.encode("utf-8-sig" if first else "utf-8"))
+        first = False
+
+
+def _parquet_schema(chunk, schema_frame=None):
+    """Parquet 스키마 - 컬럼 타입은 schema_frame(전체 프레임)에서 정함
+
+    첫 청크만으로 정하면 첫 청크에서 모두 결측인 object 컬럼이 null 타입이 되어 이후
+    청크를 기록할 수 없다. schema_frame에 없는 컬럼(청크에서 계산한 파생 컬럼)은 청크에서 정한다.
+    """
+    import pyarrow as pa
+
+    inferred = pa.Schema.from_pandas(chunk, preserve_index=False)
+    if schema_frame is None:
+        return inferred
+    frame_schema = pa.Schema.from_pandas(schema_frame, preserve_index=False)
+    return pa.schema(
+        [
+            (
+                frame_schema.field(field.name)
+                if field.name in frame_schema.names
+                else field
+            )
+            for field in inferred
+        ],
+        metadata=inferred.metadata,
+    )
+
+
+def _write_parquet_chunks(chunks, fileobj, schema_frame=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(fileobj, _parquet_schema(chunk, schema_frame))
+            table = pa.Table.from_pandas(
+                chunk, schema=writer.schema, preserve_index=False
+            )
+            # 청크마다 row group 하나씩 기록
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_xlsx_chunks(chunks, fileobj, max_rows=XLSX_MAX_ROWS):
+    """시트 행 수 상한을 넘는 행은 다음 시트(data_2, data_3, ...)에 머리글과 함께 이어 기록"""
+    from openpyxl import Workbook
+
+    # write-only 모드: 행을 즉시 임시 파일로 내보내므로 시트 전체를 메모리에 두지 않음
+    workbook = Workbook(write_only=True)
+    sheets = []
+    header = None
+    sheet_rows = max_rows
+    for chunk in chunks:
+        if header is None:
+            header = [str(col) for col in chunk.columns]
+        for row in (
+            chunk.astype(object)
+            .where(chunk.notna(), None)
+            .itertuples(index=False, name=None)
+        ):
+            if sheet_rows >= max_rows:
+                name = "data" if not sheets else f"data_{len(sheets) + 1}"
+                sheets.append(workbook.create_sheet(name))
+                sheets[-1].append(header)
+                sheet_rows = 1
+            sheets[-1].append(list(row))
+            sheet_rows += 1
+    if not sheets:
+        # 행이 없으면 머리글만 있는 시트
+        sheet = workbook.create_sheet("data")
+        if header is not None:
+            sheet.append(header)
+    workbook.save(fileobj)
+
+
+_EXPORT_WRITERS = {
+    "CSV": _write_csv_chunks,
+    "Parquet": _write_parquet_chunks,
+    "Excel": _write_xlsx_chunks,
+}
+
+
+def _capped_chunks(chunks, fileobj, max_bytes):
+    """청크를 넘길 때마다 기록된 크기를 확인 (CSV/Parquet는 상한을 넘는 즉시 중단)"""
+    for chunk in chunks:
+        if fileobj.tell() > max_bytes:
+            raise ExportError(_too_large_message(max_bytes))
+        yield chunk
+
+
+def _too_large_message(max_bytes):
+    return (
+        f"내보낼 파일이 크기 상한({max_bytes / 1024 / 1024:g}MB)을 넘습니다. "
+        "조회 조건을 좁혀 다시 생성해주세요."
+    )
+
+
+def export_chunks_to_file(
+    chunks, export_format, path, max_bytes=None, schema_frame=None
+):
+    """청크 이터레이터를 지정 형식의 파일로 스트리밍 기록
+
+    max_bytes를 넘으면 파일을 지우고 ExportError (Excel은 저장 시점에 한 번에 기록되므로
+    저장 후 확인). schema_frame: 청크를 잘라낸 전체 프레임 (Parquet 컬럼 타입 결정용).
+    """
+    try:
+        with open(path, "wb") as fileobj:
+            if max_bytes is not None:
+                chunks = _capped_chunks(chunks, fileobj, max_bytes)
+            if export_format == "Parquet":
+                _write_parquet_chunks(chunks, fileobj, schema_frame)
+            else:
+                _EXPORT_WRITERS[export_format](chunks, fileobj)
+        if max_bytes is not None and os.path.getsize(path) > max_bytes:
+            raise ExportError(_too_large_message(max_bytes))
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return path
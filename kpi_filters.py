@@ -0,0 +1,370 @@
+"""필터 - 사이드바 조건을 행 위치/부분집합 프레임으로 변환
+
+조회 기간은 year_month 파티션으로 좁히고, 범주 조건은 범주 코드 조회표로 비교한다.
+사이드바 선택지(상위 → 하위 계층)도 여기서 만든다.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from kpi_cache import cached_derived, cached_frame, frame_key
+from kpi_profiling import note_frame_copy, profiled
+
+
+# ================= 기간 파티션 (year_month) =================
+# 행 위치를 year_month별로 묶고 파티션별 확정일시 최소/최대를 기록한다. 조회 기간과
+# 겹치는 파티션의 행만 조건을 비교하고, 기간에 완전히 포함된 파티션은 날짜 비교도
+# 생략한다. 데이터는 원래 행 순서 그대로 두므로 조회 결과(행 순서 포함)는 같다.
+PARTITION_COLUMN = "year_month"
+
+
+def _build_month_partitions(df):
+    """year_month별 행 위치(원래 순서)와 확정일시 최소/최대
+
+    반환: {"labels": 파티션 이름(시간순), "offsets": positions 안의 파티션별 구간 경계,
+           "positions": 파티션 순서로 모은 행 위치, "min_ts"/"max_ts": 파티션별 확정일시,
+           "unassigned": 파티션이 없는 행 수(확정일자 결측)}
+    """
+    codes, uniques = _category_codes(df, PARTITION_COLUMN)
+    # 파티션 번호 = 시간순 순위 ("YYYY-MM" 문자열 순서), 결측(-1)은 마지막 번호
+    order = pd.Index(uniques).argsort()
+    rank = np.empty(len(uniques) + 1, dtype=np.int64)
+    rank[order] = np.arange(len(uniques))
+    rank[-1] = len(uniques)
+    partition = rank[codes]
+    sizes = np.bincount(partition, minlength=len(uniques) + 1)
+    offsets = np.concatenate([[0], np.cumsum(sizes[:-1])])
+    positions = np.argsort(partition, kind="stable")[: offsets[-1]]
+
+    dates = df["확정일자"].to_numpy()[positions]
+    starts = offsets[:-1]
+    empty = dates[:0]
+    return {
+        "labels": np.asarray(uniques, dtype=object)[order],
+        "offsets": offsets,
+        "positions": positions,
+        "min_ts": np.minimum.reduceat(dates, starts) if len(starts) else empty,
+        "max_ts": np.maximum.reduceat(dates, starts) if len(starts) else empty,
+        "unassigned": int(sizes[-1]),
+    }
+
+
+def get_month_partitions(df):
+    """데이터셋별 기간 파티션 (한 번 생성하여 캐시)"""
+    return cached_derived(df, ("month_partitions",), _build_month_partitions)
+
+
+def partition_rows(partitions, i):
+    """i번째 파티션의 행 위치 (원래 순서)"""
+    offsets = partitions["offsets"]
+    return partitions["positions"][offsets[i] : offsets[i + 1]]
+
+
+def date_range_positions(df, start_date, end_date):
+    """조회 기간(시작일 00:00 이상, 종료일 다음날 00:00 미만) 행 위치 - 모든 행이면 None
+
+    버전이 있는 데이터셋은 기간과 겹치는 파티션만 읽고, 버전이 없는 프레임(파티션을
+    매번 만들게 되는 경우)이나 year_month가 없는 프레임은 전체 행을 비교한다.
+    """
+    start = pd.Timestamp(start_date).to_datetime64()
+    end = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_datetime64()
+    if frame_key(df) is None or PARTITION_COLUMN not in df.columns:
+        dates = df["확정일자"].to_numpy()
+        return np.flatnonzero((dates >= start) & (dates < end))
+
+    partitions = get_month_partitions(df)
+    min_ts, max_ts = partitions["min_ts"], partitions["max_ts"]
+    overlapping = np.flatnonzero((max_ts >= start) & (min_ts < end))
+    inside = (min_ts[overlapping] >= start) & (max_ts[overlapping] < end)
+    covers_all = len(overlapping) == len(min_ts) and not partitions["unassigned"]
+    if covers_all and inside.all():
+        return None
+
+    dates = df["확정일자"].to_numpy()
+    chunks = []
+    for i, whole in zip(overlapping, inside):
+        rows = partition_rows(partitions, i)
+        if not whole:
+            # 기간 경계에 걸친 파티션만 날짜 비교
+            rows = rows[(dates[rows] >= start) & (dates[rows] < end)]
+        chunks.append(rows)
+    if not chunks:
+        return np.empty(0, dtype=np.int64)
+    # 파티션을 합친 뒤 원래 행 순서로
+    return np.sort(np.concatenate(chunks))
+
+
+# ================= 필터 =================
+# 사이드바 선택값 → 비교 컬럼 (전체는 조건 없음)
+FILTER_COLUMNS = [
+    ("구분", "구분"),
+    ("부류", "부류"),
+    ("품목", "품목"),
+    ("seller_type", "판매자구분"),
+    ("seller_dtl_type", "판매자세부구분"),
+    ("buyer_type", "구매자구분"),
+    ("trade_type", "거래유형보정"),
+]
+# "벼,찰벼 품목 제외"에서 제외하는 품목
+RICE_ITEMS = ["벼", "찰벼"]
+
+
+def selection_values(value):
+    """사이드바 선택값 → 선택된 값 tuple (전체 또는 빈 선택이면 None)
+
+    선택값은 "전체", 값 하나, 또는 여러 값의 list/tuple (다중 선택)이다.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value) or None
+    if value == "전체":
+        return None
+    return (value,)
+
+
+def normalize_selection(value):
+    """캐시 키에 쓰는 선택값 - 다중 선택은 tuple, 빈 선택은 "전체" """
+    values = selection_values(value)
+    if values is None:
+        return "전체"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return values
+    return value
+
+
+def _category_codes(df, column):
+    """컬럼의 정수 코드와 코드별 값 (결측은 -1) - 데이터셋별로 한 번 생성"""
+    codes = cached_derived(df, ("category_codes",), lambda frame: {})
+    if column not in codes:
+        codes[column] = pd.factorize(df[column])
+    return codes[column]
+
+
+def category_mask(df, column, values, rows=None):
+    """column 값이 values 중 하나인 행 마스크 (선택 수와 무관하게 행 수에 비례)
+
+    선택된 값의 코드에 True를 표시한 조회표(LUT)를 행별 코드로 인덱싱한다.
+    마지막 칸은 결측(-1) 자리로 항상 False. rows를 주면 그 행 위치들의 마스크.
+    """
+    codes, uniques = _category_codes(df, column)
+    lut = np.zeros(len(uniques) + 1, dtype=bool)
+    selected = pd.Index(uniques).get_indexer(pd.Index(list(values)))
+    lut[selected[selected >= 0]] = True
+    return lut[codes] if rows is None else lut[codes[rows]]
+
+
+def filter_positions(df, date_range, exclude_rice, **selections):
+    """조건을 하나의 마스크로 결합하여 선택된 행 위치 배열 반환 (중간 사본 없음)
+
+    조회 기간은 기간 파티션으로 먼저 후보 행을 좁히고, 나머지 조건은 후보 행에서만 비교한다.
+    """
+    # 날짜 필터 (시작일 00:00 이상, 종료일 다음날 00:00 미만 = 날짜 단위 비교와 동일)
+    rows = date_range_positions(df, *date_range) if len(date_range) == 2 else None
+    mask = np.ones(len(df) if rows is None else len(rows), dtype=bool)
+    # 벼,찰벼 품목 제외 (품목 결측 행은 유지)
+    if exclude_rice:
+        mask &= ~category_mask(df, "품목", RICE_ITEMS, rows)
+    # 사이드바 조건: 선택된 값 중 하나 (다중 선택은 OR, 컬럼 사이는 AND)
+    for arg, column in FILTER_COLUMNS:
+        values = selection_values(selections.get(arg, "전체"))
+        if values is not None:
+            mask &= category_mask(df, column, values, rows)
+    return np.flatnonzero(mask) if rows is None else rows[mask]
+
+
+def filter_cell_mask(cells, filters):
+    """집계 셀(필터 컬럼 값 조합) 중 조건(filter_state의 dict)에 맞는 셀 - 날짜 조건 제외"""
+    mask = np.ones(len(cells), dtype=bool)
+    for _, column in FILTER_COLUMNS:
+        values = selection_values(filters.get(column, "전체"))
+        if values is not None and column in cells.columns:
+            mask &= cells[column].isin(values).to_numpy()
+    if filters.get("exclude_rice") and "품목" in cells.columns:
+        mask &= ~cells["품목"].isin(RICE_ITEMS).to_numpy()
+    return mask
+
+
+@profiled("filter_data")
+def filter_data(
+    df,
+    date_range,
+    구분,
+    exclude_rice,
+    부류,
+    품목,
+    seller_type,
+    seller_dtl_type,
+    buyer_type,
+    trade_type,
+):
+    filter_key, filters = filter_state(
+        date_range,
+        구분,
+        exclude_rice,
+        부류,
+        품목,
+        seller_type,
+        seller_dtl_type,
+        buyer_type,
+        trade_type,
+    )
+
+    def build(frame):
+        # 행 위치는 (데이터셋 버전, 조건)별로 캐시되어 세션 간 공유됨
+        positions = cached_derived(
+            frame,
+            ("filter_positions",) + filter_key,
+            lambda base: filter_positions(
+                base,
+                date_range,
+                exclude_rice,
+                구분=구분,
+                부류=부류,
+                품목=품목,
+                seller_type=seller_type,
+                seller_dtl_type=seller_dtl_type,
+                buyer_type=buyer_type,
+                trade_type=trade_type,
+            ),
+        )
+        filtered_df = take_rows(frame, positions)
+        # 필터 상태 기록 (파생 구조 캐시 키, 근사 집계 조건)
+        filtered_df.attrs["filters"] = filters
+        filtered_df.attrs["filter_key"] = filter_key
+        return filtered_df
+
+    # 같은 조건의 재실행/다른 세션은 같은 (읽기 전용) 프레임을 사용
+    return cached_frame(df, ("filtered",) + filter_key, build)
+
+
+def filter_state(
+    date_range,
+    구분,
+    exclude_rice,
+    부류,
+    품목,
+    seller_type,
+    seller_dtl_type,
+    buyer_type,
+    trade_type,
+):
+    """(캐시 키, 필터 조건 dict) - 조회 결과 프레임의 attrs에 기록하는 필터 상태"""
+    # 다중 선택(list)은 tuple로 - 같은 선택은 같은 캐시 키
+    구분, 부류, 품목 = map(normalize_selection, (구분, 부류, 품목))
+    seller_type, seller_dtl_type, buyer_type, trade_type = map(
+        normalize_selection, (seller_type, seller_dtl_type, buyer_type, trade_type)
+    )
+    filter_key = (
+        tuple(date_range),
+        구분,
+        exclude_rice,
+        부류,
+        품목,
+        seller_type,
+        seller_dtl_type,
+        buyer_type,
+        trade_type,
+    )
+    filters = {
+        "date_range": tuple(date_range),
+        "구분": 구분,
+        "exclude_rice": exclude_rice,
+        "부류": 부류,
+        "품목": 품목,
+        "판매자구분": seller_type,
+        "판매자세부구분": seller_dtl_type,
+        "구매자구분": buyer_type,
+        "거래유형보정": trade_type,
+    }
+    return filter_key, filters
+
+
+def take_rows(df, positions):
+    """선택된 행 프레임 - 전체 행이면 데이터를 공유하는 얕은 사본, 아니면 해당 행만 복사"""
+    if len(positions) == len(df):
+        return df.copy(deep=False)
+    note_frame_copy(len(positions))
+    return df.take(positions)
+
+
+# 부분집합 프레임에 파생 조건을 기록 (부모의 필터 상태 + 추가 조건)
+def derive_frame(sub_df, *key_parts):
+    sub_df.attrs["filter_key"] = sub_df.attrs.get("filter_key", ()) + (key_parts,)
+    sub_df.attrs["derived"] = True
+    return sub_df
+
+
+# ================= 사이드바 선택지 (차원 사전) =================
+# 상위 → 하위 선택지 계층: 상위 값을 고르면 하위에는 함께 나타나는 값만 표시
+DIMENSION_HIERARCHIES = [
+    ["구분", "부류", "품목"],
+    ["판매자구분", "판매자세부구분"],
+]
+
+
+def build_dimension_index(values, hierarchy_rows):
+    """선택지 사전 - values: {컬럼: 고유값 목록}, hierarchy_rows: 계층별 고유 조합 프레임
+
+    두 입력 모두 원본에서 처음 나온 순서여야 한다. 상위 컬럼의 모든 선택 조합
+    (값 또는 전체=None)별로 하위 값 목록을 미리 만들어 조회는 dict 한 번이다.
+    """
+    parents = {}
+    cascade = {}
+    for rows in hierarchy_rows:
+        columns = list(rows.columns)
+        for depth in range(1, len(columns)):
+            child, ancestors = columns[depth], columns[:depth]
+            parents[child] = ancestors
+            options = {}
+            for pattern in range(1, 1 << depth):
+                chosen = [col for i, col in enumerate(ancestors) if pattern >> i & 1]
+                pairs = rows[chosen + [child]].dropna().drop_duplicates()
+                for row in pairs.itertuples(index=False):
+                    key = tuple(
+                        row[chosen.index(col)] if col in chosen else None
+                        for col in ancestors
+                    )
+                    options.setdefault(key, []).append(row[-1])
+            cascade[child] = options
+    return {"values": values, "parents": parents, "cascade": cascade}
+
+
+def _build_frame_dimension_index(df):
+    values = {
+        column: df[column].dropna().unique().tolist()
+        for _, column in FILTER_COLUMNS
+        if column in df.columns
+    }
+    hierarchy_rows = [
+        df[columns].drop_duplicates()
+        for columns in DIMENSION_HIERARCHIES
+        if all(col in df.columns for col in columns)
+    ]
+    return build_dimension_index(values, hierarchy_rows)
+
+
+def get_dimension_index(df):
+    """데이터셋별 선택지 사전 (한 번 생성하여 캐시)"""
+    return cached_derived(df, ("dimension_index",), _build_frame_dimension_index)
+
+
+def dimension_options(index, column, selections=None, exclude_rice=False):
+    """현재 상위 선택(selections: {컬럼: 선택값})에서 존재하는 column 값 목록
+
+    상위 컬럼을 여러 값 선택하면 각 조합의 하위 값을 합친다 (처음 나온 순서 유지).
+    """
+    selections = selections or {}
+    options = index["values"].get(column, [])
+    ancestors = index["parents"].get(column)
+    if ancestors:
+        chosen = [selection_values(selections.get(col, "전체")) for col in ancestors]
+        if any(values is not None for values in chosen):
+            cascade = index["cascade"][column]
+            present = set()
+            for key in itertools.product(*(values or (None,) for values in chosen)):
+                present.update(cascade.get(key, []))
+            options = [value for value in options if value in present]
+    if exclude_rice and column == "품목":
+        options = [value for value in options if value not in RICE_ITEMS]
+    return options
@@ -0,0 +1,731 @@
+"""데이터 적재 - CSV/업로드/DB 로드, 추가만 되는 CSV의 증분 병합, 데이터셋 레지스트리
+
+데이터셋은 프로세스 전체에서 공유하는 읽기 전용 프레임이며 세션은 id(임대)만 보관한다.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from kpi_aggregations import update_kpi_snapshot
+from kpi_cache import _purge_derived, peek_derived, store_derived
+from kpi_precompute import precompute_dataset
+from kpi_preprocess import add_date_columns, process_data
+from kpi_profiling import note_frame_copy, profiled
+from kpi_sketches import _build_daily_prefix
+
+logger = logging.getLogger(__name__)
+
+# 데이터 로드 오류 - 메시지는 화면에 그대로 표시
+class DataLoadError(Exception):
+    pass
+
+
+# ================= 데이터 로드 =================
+CSV_ENCODINGS = ["cp949", "utf-8", "euc-kr", "utf-8-sig", "latin1"]
+DEFAULT_CSV_PATH = "거래데이터_sample.csv"
+
+
+def read_csv_any_encoding(source):
+    """지원 인코딩을 차례로 시도하여 (DataFrame, 인코딩) 반환"""
+    for encoding in CSV_ENCODINGS:
+        try:
+            # 파일 객체는 포인터를 처음으로 되돌림
+            if hasattr(source, "seek"):
+                source.seek(0)
+            return pd.read_csv(source, encoding=encoding), encoding
+        except UnicodeDecodeError:
+            continue
+        except FileNotFoundError:
+            raise
+        except Exception:
+            continue
+    raise DataLoadError(
+        "지원하는 인코딩으로 파일을 읽을 수 없습니다. 파일 인코딩을 확인해주세요."
+    )
+
+
+@profiled("load_csv_file")
+def load_csv_file(path=DEFAULT_CSV_PATH):
+    try:
+        df, _ = read_csv_any_encoding(path)
+    except FileNotFoundError:
+        raise DataLoadError(f"{path} 파일을 찾을 수 없습니다.")
+    return process_data(df)
+
+
+# 기본 CSV의 전처리 결과 스냅샷 (pickle) - 시작 시 CSV 해석/전처리 대신 읽음
+SNAPSHOT_DIR_ENV = "KPI_SNAPSHOT_DIR"
+DEFAULT_SNAPSHOT_DIR = ".kpi_snapshots"
+
+
+def snapshot_path(path):
+    """원본 파일별 스냅샷 경로 - 파일 이름에 원본 id가 들어가므로 원본이 바뀌면 새 경로"""
+    snapshot_dir = os.environ.get(SNAPSHOT_DIR_ENV, DEFAULT_SNAPSHOT_DIR)
+    source_key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    dataset_key = file_dataset_id(path).split(":", 1)[1]
+    return os.path.join(snapshot_dir, f"{source_key}-{dataset_key}.pkl")
+
+
+@profiled("load_csv_snapshot")
+def load_csv_snapshot(path=DEFAULT_CSV_PATH):
+    """전처리와 날짜 컬럼까지 끝난 데이터셋 - 스냅샷이 있으면 CSV 대신 읽음
+
+    스냅샷이 없으면 직전 데이터셋(메모리 또는 이전 스냅샷)에 추가된 행만 병합하고,
+    추가가 아니면(파일을 다시 씀) CSV 전체를 처리한다. 결과는 새 스냅샷으로 기록한다.
+    스냅샷 디렉터리는 이 프로세스가 쓰는 로컬 캐시이며, 쓰기 실패는 무시한다.
+    """
+    snapshot = snapshot_path(path)
+    try:
+        df = pd.read_pickle(snapshot)
+    except Exception:
+        df = None
+    if df is None:
+        base = _previous_csv_dataset(path, snapshot)
+        if base is not None:
+            df = append_csv_tail(base, path)
+        if df is None:
+            df = _load_csv_full(path)
+        _write_snapshot(df, snapshot)
+    _csv_latest[os.path.abspath(path)] = weakref.ref(df)
+    return df
+
+
+def _write_snapshot(df, snapshot):
+    snapshot_dir, name = os.path.split(snapshot)
+    temp_path = f"{snapshot}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(snapshot_dir or ".", exist_ok=True)
+        df.to_pickle(temp_path)
+        os.replace(temp_path, snapshot)
+        # 같은 원본의 이전 스냅샷 정리
+        for other in _source_snapshots(snapshot):
+            if other != snapshot:
+                os.remove(other)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _source_snapshots(snapshot):
+    """같은 원본 파일의 스냅샷 경로 목록 (작성 중인 임시 파일 제외)"""
+    snapshot_dir, name = os.path.split(snapshot)
+    prefix = name.split("-", 1)[0] + "-"
+    try:
+        names = os.listdir(snapshot_dir or ".")
+    except OSError:
+        return []
+    return [
+        os.path.join(snapshot_dir, other)
+        for other in names
+        if other.startswith(prefix) and other.endswith(".pkl")
+    ]
+
+
+# ================= 기본 CSV 증분 적재 =================
+# 추가만 되는 CSV: 이미 읽은 앞부분(바이트 오프셋, 체크섬)이 그대로면 뒤에 붙은 행만 전처리해 병합
+# 적재 상태는 데이터셋 attrs["ingest"]에 두어 스냅샷과 함께 저장된다.
+_csv_latest = {}  # 원본 절대 경로 → 마지막으로 만든 데이터셋 (weakref)
+
+
+def _read_source_bytes(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        raise DataLoadError(f"{path} 파일을 찾을 수 없습니다.")
+
+
+def _load_csv_full(path):
+    """CSV 전체를 처리하고 적재 상태(읽은 바이트 수, 체크섬, 인코딩, 원본 dtype)를 기록"""
+    data = _read_source_bytes(path)
+    raw, encoding = read_csv_any_encoding(io.BytesIO(data))
+    ingest = {
+        "offset": len(data),
+        "sha1": hashlib.sha1(data).hexdigest(),
+        "complete": data.endswith(b"\n"),
+        "encoding": encoding,
+        "header_end": data.find(b"\n") + 1,
+        "raw_dtypes": {col: str(dtype) for col, dtype in raw.dtypes.items()},
+        "raw_rows": len(raw),
+    }
+    df = _prepare_dataset(process_data(raw))
+    df.attrs["ingest"] = ingest
+    df.attrs["dataset_version"] = _ingest_version(ingest)
+    return df
+
+
+def _ingest_version(ingest):
+    """읽은 바이트의 체크섬으로 만든 버전 - 전체 적재와 증분 병합이 같은 내용에 같은 버전"""
+    return ingest["sha1"][:16]
+
+
+def _previous_csv_dataset(path, snapshot):
+    """증분 병합의 기준 데이터셋 - 메모리에 남은 직전 데이터셋, 없으면 같은 원본의 이전 스냅샷"""
+    ref = _csv_latest.get(os.path.abspath(path))
+    base = ref() if ref is not None else None
+    if base is not None:
+        return base
+    # 서버 재시작 후 파일에 행이 추가된 경우
+    for other in _source_snapshots(snapshot):
+        try:
+            return pd.read_pickle(other)
+        except Exception:
+            continue
+    return None
+
+
+@profiled("append_csv_tail")
+def append_csv_tail(base, path):
+    """base 이후 파일 끝에 추가된 행만 전처리하여 병합한 새 데이터셋
+
+    이미 읽은 앞부분이 바뀌었거나(다시 쓰기, 잘림) 추가된 행의 형식이 달라
+    전체 처리 결과와 같아질 수 없으면 None (호출자가 전체를 다시 처리).
+    """
+    ingest = base.attrs.get("ingest")
+    if ingest is None:
+        return None
+    data = _read_source_bytes(path)
+    offset = ingest["offset"]
+    digest = hashlib.sha1(memoryview(data)[:offset])
+    if len(data) < offset or digest.hexdigest() != ingest["sha1"]:
+        return None
+    tail = data[offset:]
+    if not ingest["complete"] and tail:
+        # 줄바꿈 없이 끝난 마지막 행에 이어 썼으면 그 행이 바뀐 것
+        if not tail.startswith((b"\n", b"\r\n")):
+            return None
+        tail = tail[tail.find(b"\n") + 1 :]
+    digest.update(memoryview(data)[offset:])
+    updated = dict(
+        ingest,
+        offset=len(data),
+        sha1=digest.hexdigest(),
+        complete=data.endswith(b"\n"),
+    )
+
+    added = None
+    if tail.strip():
+        try:
+            raw = pd.read_csv(
+                io.BytesIO(data[: ingest["header_end"]] + tail),
+                encoding=ingest["encoding"],
+                dtype=ingest["raw_dtypes"],
+            )
+        except Exception:
+            return None
+        if list(raw.columns) != list(ingest["raw_dtypes"]):
+            return None
+        updated["raw_rows"] = ingest["raw_rows"] + len(raw)
+        if not raw.empty:
+            # 전체 처리와 같은 인덱스 (원본 행 번호, 결측 행 제외)
+            raw.index = pd.RangeIndex(ingest["raw_rows"], updated["raw_rows"])
+            added = _prepare_dataset(process_data(raw))
+    if added is None or added.empty:
+        # 새 행 없음 (빈 줄만 추가 등) - 같은 데이터를 공유하고 적재 상태만 갱신
+        merged = base.copy(deep=False)
+        merged.attrs = dict(
+            base.attrs, ingest=updated, dataset_version=_ingest_version(updated)
+        )
+        # 행이 같으므로 이전 버전의 KPI 스냅샷과 일별 누적합을 그대로 등록
+        for name in [("kpi_snapshot",), ("daily_prefix",)]:
+            value = peek_derived(base, name)
+            if value is not None:
+                store_derived(merged, name, value)
+        return merged
+    if list(added.columns) != list(base.columns) or not added.dtypes.equals(base.dtypes):
+        return None
+
+    merged = pd.concat([base, added])
+    note_frame_copy(len(merged))
+    # 버전은 이어서 계산한 파일 체크섬으로 만듦 (전체를 다시 해시하지 않음)
+    merged.attrs = {
+        "dataset_version": _ingest_version(updated),
+        "prepared": True,
+        "ingest": updated,
+    }
+
+    # 전체 KPI 스냅샷은 추가분만 반영하여 새 버전에 등록
+    snapshot = peek_derived(base, ("kpi_snapshot",))
+    if snapshot is not None:
+        store_derived(merged, ("kpi_snapshot",), update_kpi_snapshot(snapshot, added))
+    # 일별 누적합은 행이 늘어난 월 파티션만 다시 집계 (마감된 달은 이전 버전의 집계 재사용)
+    prefix = peek_derived(base, ("daily_prefix",))
+    if prefix is not None:
+        store_derived(merged, ("daily_prefix",), _build_daily_prefix(merged, prefix))
+    return merged
+
+
+@profiled("load_uploaded_file")
+def load_uploaded_file(fileobj, file_name):
+    """업로드 파일(CSV/Excel)을 읽어 (전처리된 DataFrame, CSV 인코딩 또는 None) 반환"""
+    if file_name.endswith(".csv"):
+        df, encoding = read_csv_any_encoding(fileobj)
+    elif file_name.endswith((".xlsx", ".xls")):
+        df, encoding = pd.read_excel(fileobj), None
+    else:
+        raise DataLoadError(
+            "지원하지 않는 파일 형식입니다. CSV 또는 Excel 파일을 업로드해주세요."
+        )
+    return process_data(df), encoding
+
+
+def connect_db(db_type, connection_params):
+    if db_type == "SQLite":
+        return sqlite3.connect(connection_params["db_path"])
+    elif db_type == "MySQL":
+        try:
+            import mysql.connector
+        except ImportError:
+            raise DataLoadError(
+                "MySQL 연결을 위해 mysql-connector-python 패키지를 설치해주세요."
+            )
+        return mysql.connector.connect(**connection_params)
+    elif db_type == "PostgreSQL":
+        try:
+            import psycopg2
+        except ImportError:
+            raise DataLoadError(
+                "PostgreSQL 연결을 위해 psycopg2-binary 패키지를 설치해주세요."
+            )
+        return psycopg2.connect(**connection_params)
+    raise DataLoadError("지원하지 않는 데이터베이스 유형입니다.")
+
+
+@profiled("load_db")
+def load_db(db_type, connection_params, query):
+    conn = connect_db(db_type, connection_params)
+    try:
+        df = pd.read_sql_query(query, conn)
+    finally:
+        conn.close()
+    return process_data(df)
+
+
+def cancel_db_query(db_type, conn, connection_params):
+    """실행 중인 쿼리를 서버에서 중단 (다른 스레드에서 호출, 실패해도 무시)"""
+    try:
+        if db_type == "SQLite":
+            conn.interrupt()
+        elif db_type == "PostgreSQL":
+            conn.cancel()
+        elif db_type == "MySQL":
+            # mysql-connector는 취소 API가 없으므로 별도 연결로 KILL QUERY 실행
+            killer = connect_db(db_type, connection_params)
+            try:
+                killer.cursor().execute(f"KILL QUERY {int(conn.connection_id)}")
+            finally:
+                killer.close()
+    except Exception:
+        pass
+
+
+# ================= 데이터셋 레지스트리 =================
+# 프로세스 전체에서 공유하는 읽기 전용 데이터셋 - 세션은 id(임대)만 보관
+_datasets = {}
+_pinned_datasets = {}
+_datasets_lock = threading.Lock()
+_dataset_build_locks = {}
+
+
+def file_dataset_id(path):
+    """파일 경로 + 수정시각 + 크기 기반 id (파일이 바뀌면 새 id)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise DataLoadError(f"{path} 파일을 찾을 수 없습니다.")
+    key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return "file:" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def upload_dataset_id(data, file_name):
+    """업로드 파일 내용(바이트) 해시 기반 id - 같은 파일은 세션이 달라도 같은 id"""
+    digest = hashlib.sha1(data)
+    digest.update(os.path.splitext(file_name)[1].lower().encode("utf-8"))
+    return "upload:" + digest.hexdigest()[:16]
+
+
+def query_dataset_id(db_type, connection_params, query):
+    """DB 종류, 접속 정보(비밀번호 제외), 정규화된 쿼리 기반 id"""
+    params = sorted(
+        (key, str(value))
+        for key, value in connection_params.items()
+        if key != "password"
+    )
+    normalized_query = " ".join(query.split())
+    key = json.dumps([db_type, params, normalized_query], ensure_ascii=False)
+    return "db:" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class DatasetLease:
+    """세션이 보관하는 데이터셋 임대 - 객체가 사라지면(세션 종료, 교체) 참조 수 감소"""
+
+    def __init__(self, dataset_id):
+        self.dataset_id = dataset_id
+        self._finalizer = weakref.finalize(self, _release_dataset, dataset_id)
+
+    def release(self):
+        self._finalizer()
+
+
+def _prepare_dataset(df):
+    """레지스트리에 올릴 최종 형태 (전처리 + 날짜 컬럼, 이후 변경하지 않음)"""
+    if df.attrs.get("prepared"):
+        # 스냅샷에서 읽은 데이터셋은 날짜 컬럼이 이미 있음
+        return df
+    df = add_date_columns(df)
+    df.attrs["prepared"] = True
+    return df
+
+
+def acquire_dataset(dataset_id, builder, pin=None, refresh=False):
+    """공유 데이터셋 임대 반환 - 없거나 refresh면 builder()로 생성하여 등록
+
+    pin: 슬롯 이름(예: "default")을 주면 참조가 없어도 유지하며, 같은 슬롯의
+    이전 데이터셋은 고정이 해제된다.
+    """
+    with _datasets_lock:
+        build_lock = _dataset_build_locks.setdefault(dataset_id, threading.Lock())
+
+    # 같은 데이터셋을 여러 세션이 동시에 요청해도 한 번만 생성
+    with build_lock:
+        with _datasets_lock:
+            entry = _datasets.get(dataset_id)
+            if entry is not None and not refresh:
+                # 존재 확인과 참조 증가를 같은 잠금 안에서 처리 (제거와 경합 방지)
+                entry["refs"] += 1
+        if entry is None or refresh:
+            df = _prepare_dataset(builder())
+            with _datasets_lock:
+                entry = _datasets.setdefault(dataset_id, {"refs": 0, "pinned": False})
+                previous = entry.get("df")
+                entry["df"] = df
+                entry["loaded_at"] = datetime.now().isoformat(timespec="seconds")
+                entry["refs"] += 1
+            # 새로 읽은 내용이 달라졌을 때만 이전 버전의 파생 구조 제거
+            old_version = None if previous is None else previous.attrs.get("dataset_version")
+            if old_version is not None and old_version != df.attrs.get("dataset_version"):
+                _purge_derived(old_version)
+            # 첫 화면/드릴다운 파생 구조를 병렬로 미리 생성 (다른 세션은 생성이 끝날 때까지 대기)
+            precomputed = precompute_dataset(df)
+            with _datasets_lock:
+                entry["precompute_s"] = (
+                    None if precomputed is None else precomputed["seconds"]
+                )
+
+    unpinned = None
+    with _datasets_lock:
+        if pin is not None and _pinned_datasets.get(pin) != dataset_id:
+            unpinned = _pinned_datasets.get(pin)
+            _pinned_datasets[pin] = dataset_id
+            entry["pinned"] = True
+            if unpinned in _datasets:
+                _datasets[unpinned]["pinned"] = False
+    lease = DatasetLease(dataset_id)
+    if unpinned is not None:
+        _evict_if_unused(unpinned)
+    return lease
+
+
+def get_dataset(dataset_id):
+    """등록된 공유 DataFrame (없으면 None) - 읽기 전용으로 사용"""
+    with _datasets_lock:
+        entry = _datasets.get(dataset_id)
+        return None if entry is None else entry["df"]
+
+
+def _release_dataset(dataset_id):
+    with _datasets_lock:
+        entry = _datasets.get(dataset_id)
+        if entry is None:
+            return
+        entry["refs"] -= 1
+    _evict_if_unused(dataset_id)
+
+
+def _evict_if_unused(dataset_id):
+    """참조가 없고 고정되지 않은 데이터셋과 그 파생 구조를 제거"""
+    with _datasets_lock:
+        entry = _datasets.get(dataset_id)
+        if entry is None or entry["refs"] > 0 or entry["pinned"]:
+            return
+        del _datasets[dataset_id]
+        _dataset_build_locks.pop(dataset_id, None)
+        version = entry["df"].attrs.get("dataset_version")
+        # 다른 id로 같은 내용이 등록되어 있으면 파생 구조는 유지
+        shared = any(
+            other["df"].attrs.get("dataset_version") == version
+            for other in _datasets.values()
+        )
+    if not shared:
+        _purge_derived(version)
+
+
+def dataset_registry_stats():
+    """등록된 데이터셋 목록 (id, 행 수, 참조 수, 고정 여부, 메모리 MB)"""
+    with _datasets_lock:
+        entries = list(_datasets.items())
+    return [
+        {
+            "dataset_id": dataset_id,
+            "rows": len(entry["df"]),
+            "refs": entry["refs"],
+            "pinned": entry["pinned"],
+            "memory_mb": entry["df"].memory_usage(deep=False).sum() / 1_048_576,
+            "loaded_at": entry["loaded_at"],
+            "precompute_s": entry.get("precompute_s"),
+        }
+        for dataset_id, entry in entries
+    ]
+
+
+# 기본 CSV 감시 - 파일이 바뀌면 요청을 기다리지 않고 백그라운드에서 새 데이터셋 등록
+CSV_WATCH_INTERVAL_ENV = "KPI_CSV_WATCH_INTERVAL"
+DEFAULT_CSV_WATCH_INTERVAL = 5.0
+
+# 감시 오류 로그 간격(초) - 같은 오류가 계속되면 이 간격마다 한 번만 기록
+CSV_WATCH_LOG_INTERVAL = 300.0
+
+_csv_watchers = {}
+_csv_watchers_lock = threading.Lock()
+# 원본 절대 경로 → 마지막 감시 오류 (다음 성공 시 제거)
+_csv_watch_errors = {}
+
+
+def csv_watch_interval():
+    try:
+        return float(os.environ.get(CSV_WATCH_INTERVAL_ENV, DEFAULT_CSV_WATCH_INTERVAL))
+    except ValueError:
+        return DEFAULT_CSV_WATCH_INTERVAL
+
+
+def watch_csv(path, pin, interval=None):
+    """path가 바뀌면 load_csv_snapshot(추가분만 병합)으로 만든 데이터셋을 pin 슬롯에 등록
+
+    같은 경로는 프로세스에서 한 번만 감시하며, interval(초)이 0 이하이면 감시하지 않는다
+    (그 경우 다음 요청에서 같은 방식으로 적재).
+    """
+    interval = csv_watch_interval() if interval is None else interval
+    key = os.path.abspath(path)
+    with _csv_watchers_lock:
+        if interval <= 0 or key in _csv_watchers:
+            return
+        thread = threading.Thread(
+            target=_watch_csv_loop,
+            args=(path, pin, interval),
+            name="kpi-csv-watch",
+            daemon=True,
+        )
+        _csv_watchers[key] = thread
+    thread.start()
+
+
+def _watch_csv_loop(path, pin, interval):
+    key = os.path.abspath(path)
+    logged_at = None
+    while True:
+        time.sleep(interval)
+        try:
+            dataset_id = file_dataset_id(path)
+            if get_dataset(dataset_id) is None:
+                # 고정 슬롯이 데이터셋을 유지하므로 임대는 바로 반환
+                acquire_dataset(
+                    dataset_id, lambda: load_csv_snapshot(path), pin=pin
+                ).release()
+        except Exception as e:
+            # 파일 교체 중 등 일시적인 오류일 수 있음 - 기록하고 다음 주기에 다시 시도
+            error = f"{type(e).__name__}: {e}"
+            with _csv_watchers_lock:
+                previous = _csv_watch_errors.get(key)
+                failures = previous["failures"] + 1 if previous else 1
+                _csv_watch_errors[key] = {
+                    "path": path,
+                    "error": error,
+                    "failures": failures,
+                    "at": datetime.now().isoformat(timespec="seconds"),
+                }
+            now = time.monotonic()
+            changed = previous is None or previous["error"] != error
+            if changed or now - logged_at >= CSV_WATCH_LOG_INTERVAL:
+                logger.warning(
+                    "CSV 감시 실패 (%s, 연속 %d회)", path, failures, exc_info=True
+                )
+                logged_at = now
+        else:
+            with _csv_watchers_lock:
+                if _csv_watch_errors.pop(key, None) is not None:
+                    logger.info("CSV 감시 복구 (%s)", path)
+            logged_at = None
+
+
+def csv_watch_error(path):
+    """path 감시의 마지막 오류 {path, error, failures, at} - 정상이면 None"""
+    with _csv_watchers_lock:
+        error = _csv_watch_errors.get(os.path.abspath(path))
+    return dict(error) if error else None
+
+
+# ================= DB 비동기 적재 =================
+# 조회 결과를 청크 단위로 받아 진행 상황을 갱신하고, 완료되면 레지스트리에 등록
+DB_FETCH_CHUNK_ROWS = 50_000
+_db_load_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kpi-db-load")
+
+
+def _query_chunks(db_type, conn, query, chunk_rows=None):
+    """조회 결과를 chunk_rows행씩 DataFrame으로 반환 (결과 전체를 받기 전에 첫 청크부터)
+
+    psycopg2의 기본 커서는 결과 전체를 클라이언트로 받은 뒤에야 fetchmany가 반환하므로
+    PostgreSQL은 이름 있는(서버 측) 커서로 청크만큼씩 받는다.
+    """
+    chunk_rows = DB_FETCH_CHUNK_ROWS if chunk_rows is None else chunk_rows
+    if db_type == "PostgreSQL":
+        cursor = conn.cursor(name="kpi_db_load")
+        cursor.itersize = chunk_rows
+    else:
+        cursor = conn.cursor()
+    try:
+        cursor.execute(query)
+        # 서버 측 커서는 첫 fetch 이후에 컬럼 정보가 채워지므로 먼저 받음
+        rows = cursor.fetchmany(chunk_rows)
+        if cursor.description is None:
+            raise DataLoadError("행을 반환하는 조회(SELECT) 쿼리를 입력해주세요.")
+        columns = [column[0] for column in cursor.description]
+        # 결과가 없어도 컬럼이 있는 빈 프레임 하나를 반환 (read_sql_query와 동일)
+        yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        while rows:
+            rows = cursor.fetchmany(chunk_rows)
+            if rows:
+                yield pd.DataFrame.from_records(
+                    rows, columns=columns, coerce_float=True
+                )
+    finally:
+        cursor.close()
+
+
+class DbLoadJob:
+    """백그라운드 DB 적재 작업 - 화면은 progress()를 주기적으로 읽고 완료 시 lease로 교체
+
+    상태: running(조회 중) → processing(전처리/등록) → done | cancelled | failed
+    """
+
+    def __init__(self, db_type, connection_params, query):
+        self.db_type = db_type
+        self.connection_params = connection_params
+        self.query = query
+        self.dataset_id = query_dataset_id(db_type, connection_params, query)
+        self.lease = None
+        self._lock = threading.Lock()
+        self._status = "running"
+        self._rows = 0
+        self._chunks = 0
+        self._error = None
+        self._conn = None
+        self._cancel_requested = False
+        self._started = time.perf_counter()
+        self._elapsed = None
+
+    def progress(self):
+        """{status, rows, chunks, elapsed_s, error} 스냅샷"""
+        with self._lock:
+            elapsed = self._elapsed
+            if elapsed is None:
+                elapsed = time.perf_counter() - self._started
+            return {
+                "status": self._status,
+                "rows": self._rows,
+                "chunks": self._chunks,
+                "elapsed_s": elapsed,
+                "error": self._error,
+            }
+
+    @property
+    def finished(self):
+        with self._lock:
+            return self._status in ("done", "cancelled", "failed")
+
+    def cancel(self):
+        """조회 중이면 서버 쿼리를 중단 (전처리 단계에 들어간 뒤에는 완료까지 진행)"""
+        with self._lock:
+            if self._status != "running":
+                return False
+            self._cancel_requested = True
+            conn = self._conn
+        if conn is not None:
+            cancel_db_query(self.db_type, conn, self.connection_params)
+        return True
+
+    def _finish(self, status, error=None):
+        with self._lock:
+            self._status = status
+            self._error = error
+            self._elapsed = time.perf_counter() - self._started
+
+    def _cancelled(self):
+        with self._lock:
+            return self._cancel_requested
+
+    def _fetch(self):
+        conn = connect_db(self.db_type, self.connection_params)
+        with self._lock:
+            self._conn = conn
+        if self._cancelled():
+            conn.close()
+            return None
+        chunks = []
+        results = _query_chunks(self.db_type, conn, self.query)
+        try:
+            for chunk in results:
+                if self._cancelled():
+                    return None
+                chunks.append(chunk)
+                with self._lock:
+                    self._rows += len(chunk)
+                    self._chunks += 1
+        finally:
+            # 커서는 연결을 닫기 전에 닫음 (중단된 경우 포함)
+            results.close()
+            with self._lock:
+                self._conn = None
+            conn.close()
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    def run(self):
+        try:
+            raw = self._fetch()
+            if raw is None or self._cancelled():
+                self._finish("cancelled")
+                return
+            with self._lock:
+                self._status = "processing"
+            # 새 데이터는 완성된 뒤에만 레지스트리에 올라가므로 화면은 이전 데이터셋을 유지
+            self.lease = acquire_dataset(
+                self.dataset_id, lambda: process_data(raw), refresh=True
+            )
+            self._finish("done")
+        except DataLoadError as e:
+            self._finish("failed", str(e))
+        except Exception as e:
+            if self._cancelled():
+                # 서버 중단으로 발생한 조회 오류
+                self._finish("cancelled")
+            else:
+                self._finish("failed", f"데이터베이스 연결 중 오류가 발생했습니다: {e}")
+
+
+def start_db_load(db_type, connection_params, query):
+    """DB 적재를 백그라운드 스레드에서 시작하고 작업 객체를 반환"""
+    job = DbLoadJob(db_type, connection_params, query)
+    _db_load_executor.submit(job.run)
+    return job
@@ -0,0 +1,276 @@
+"""적재 시 사전 계산과 캐시 예열 - 첫 조회 전에 기본 조건의 파생 구조를 미리 만든다"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from kpi_aggregations import (
+    FLOW_SECTIONS,
+    MOVER_DIMENSIONS,
+    _build_drilldown_index,
+    _build_group_totals,
+    _record_task_timings,
+    build_kpi_snapshot,
+    compute_dashboard_sections,
+    compute_overall_kpis,
+    compute_period_kpis,
+    get_drilldown_index,
+)
+from kpi_cache import frame_key, peek_derived, store_derived
+from kpi_filters import filter_data
+from kpi_preview import get_stratified_sample, preview_min_rows
+from kpi_profiling import profiled
+from kpi_sketches import _build_daily_prefix
+
+# ================= 적재 시 사전 계산 =================
+# 데이터셋을 올린 직후 첫 화면과 드릴다운에 필요한 파생 구조를 프로세스 풀에서 미리 생성
+# KPI_PRECOMPUTE_PROCESSES: 프로세스 수 (1 이하이면 사전 계산 없이 필요할 때 생성)
+PRECOMPUTE_PROCESSES_ENV = "KPI_PRECOMPUTE_PROCESSES"
+DEFAULT_PRECOMPUTE_PROCESSES = min(8, os.cpu_count() or 1)
+# 프로세스 생성 비용보다 작은 데이터셋은 사전 계산하지 않음
+PRECOMPUTE_MIN_ROWS = 200_000
+
+# 자식 프로세스가 Arrow IPC 파일에서 읽은 프레임 {"base": 데이터셋, "view": 기본 조회 프레임}
+_precompute_frames = {}
+# 동시에 하나의 사전 계산만 실행 (프로세스 풀과 임시 파일을 여러 벌 만들지 않도록)
+_precompute_lock = threading.Lock()
+
+
+def precompute_processes():
+    try:
+        value = os.environ.get(PRECOMPUTE_PROCESSES_ENV, DEFAULT_PRECOMPUTE_PROCESSES)
+        return max(0, int(value))
+    except ValueError:
+        return DEFAULT_PRECOMPUTE_PROCESSES
+
+
+def default_filter_args(df, date_range=None):
+    """사이드바 기본값과 같은 filter_data 인자 (전체 기간, 모든 조건 전체)
+
+    date_range를 주면(SQL 백엔드의 date_bounds) df 대신 그 기간을 사용한다.
+    """
+    if date_range is None:
+        date_range = (df["확정일자"].min().date(), df["확정일자"].max().date())
+    return (
+        tuple(date_range),
+        "전체",
+        False,
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+    )
+
+
+def precompute_tasks():
+    """[(대상 프레임, 캐시 이름)] - 전체 KPI 스냅샷, 일별 누적합, 상위 N 순위, 드릴다운 인덱스
+
+    드릴다운 인덱스는 예열하는 기준선택(WARMUP_PERIODS)마다 만든다.
+    """
+    tasks = [("base", ("kpi_snapshot",)), ("base", ("daily_prefix",))]
+    for group_col, _, use_top_n in FLOW_SECTIONS:
+        if use_top_n:
+            # 상위 N 섹션의 드릴다운은 상위 그룹 부분집합에서 만들어지므로 순위만 준비
+            tasks.append(("view", ("group_totals", group_col)))
+        else:
+            for 기준선택 in WARMUP_PERIODS:
+                tasks.append(("view", ("drilldown_index", 기준선택, group_col)))
+    return tasks
+
+
+def _build_precomputed(df, name):
+    """캐시 이름에 해당하는 파생 구조 생성 (cached_derived의 builder와 동일)"""
+    kind = name[0]
+    if kind == "kpi_snapshot":
+        return build_kpi_snapshot(df)
+    if kind == "daily_prefix":
+        return _build_daily_prefix(df)
+    if kind == "group_totals":
+        return _build_group_totals(df, name[1])
+    if kind == "drilldown_index":
+        return _build_drilldown_index(df, name[1], name[2])
+    raise ValueError(f"사전 계산할 수 없는 항목: {name}")
+
+
+def _write_precompute_frame(df, path):
+    """데이터셋을 Arrow IPC 파일로 기록 (자식 프로세스가 메모리 매핑으로 읽음)"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _init_precompute_worker(path, view_positions):
+    """자식 프로세스 초기화 - 부모가 기록한 Arrow IPC 파일을 읽어 프레임 설정
+
+    spawn/forkserver로 시작한 새 인터프리터이므로 부모의 잠금과 캐시를 물려받지 않고,
+    버전이 없는 프레임이라 파생 구조 캐시도 사용하지 않는다.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path) as source:
+        base = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+    _precompute_frames["base"] = base
+    _precompute_frames["view"] = (
+        base if view_positions is None else base.take(view_positions)
+    )
+
+
+def _precompute_worker(target, name):
+    """자식 프로세스에서 실행 - 초기화 때 읽은 프레임으로 생성하고 결과만 반환"""
+    started = time.perf_counter()
+    value = _build_precomputed(_precompute_frames[target], name)
+    return value, time.perf_counter() - started
+
+
+def _precompute_context():
+    """fork 없이 새 인터프리터로 시작하는 컨텍스트 (forkserver 우선, 없으면 spawn)
+
+    스트림릿/serve.py는 여러 스레드가 캐시 잠금을 잡는 프로세스이므로 fork하면 잠금이
+    잡힌 상태로 복사된 자식이 멈출 수 있다.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def _precompute_label(name):
+    return " ".join(str(part) for part in name)
+
+
+@profiled("precompute_dataset")
+def precompute_dataset(df, processes=None):
+    """파생 구조를 프로세스 풀에서 병렬 생성하여 파생 구조 캐시에 등록
+
+    데이터셋은 Arrow IPC 임시 파일로 한 번 기록하고 자식 프로세스(spawn/forkserver)가
+    메모리 매핑으로 읽으며, 결과(집합, 순위, 위치 배열)만 돌려받는다. 프로세스 수가
+    1 이하이거나 pyarrow가 없으면 아무것도 하지 않는다(필요할 때 생성).
+    반환: {"tasks": 등록한 항목 수, "failed": 실패 항목 수, "seconds": 경과 시간}
+    """
+    processes = precompute_processes() if processes is None else processes
+    if processes <= 1 or len(df) < PRECOMPUTE_MIN_ROWS or frame_key(df) is None:
+        return None
+
+    started = time.perf_counter()
+    view = filter_data(df, *default_filter_args(df))
+    frames = {"base": df, "view": view}
+    # 증분 적재로 이미 등록된 항목은 제외
+    tasks = [
+        (target, name)
+        for target, name in precompute_tasks()
+        if peek_derived(frames[target], name) is None
+    ]
+    if not tasks:
+        return None
+    # 기본 조회가 전체 행이면 자식도 데이터셋을 그대로 사용
+    view_positions = None if len(view) == len(df) else df.index.get_indexer(view.index)
+    timings = {}
+    failed = 0
+    with _precompute_lock:
+        fd, path = tempfile.mkstemp(prefix="kpi_precompute_", suffix=".arrow")
+        os.close(fd)
+        try:
+            try:
+                _write_precompute_frame(df, path)
+            except Exception:
+                # pyarrow가 없거나 Arrow로 변환할 수 없는 컬럼 - 필요할 때 생성
+                return None
+            with ProcessPoolExecutor(
+                max_workers=min(processes, len(tasks)),
+                mp_context=_precompute_context(),
+                initializer=_init_precompute_worker,
+                initargs=(path, view_positions),
+            ) as executor:
+                futures = [
+                    (target, name, executor.submit(_precompute_worker, target, name))
+                    for target, name in tasks
+                ]
+                for target, name, future in futures:
+                    try:
+                        value, seconds = future.result()
+                    except Exception:
+                        # 사전 계산은 최적화일 뿐 - 실패한 항목은 필요할 때 다시 생성
+                        failed += 1
+                        continue
+                    store_derived(frames[target], name, value)
+                    timings[_precompute_label(name)] = seconds
+        finally:
+            os.remove(path)
+
+    _record_task_timings(list(timings), timings)
+    return {
+        "tasks": len(tasks) - failed,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+# ================= 캐시 예열 =================
+# 서버 시작 시 기본 조회 화면의 집계를 미리 계산 (첫 요청이 캐시에서 바로 응답)
+DEFAULT_TOP_N = 20
+# 예열할 기준선택: 사이드바 기본값(year)과 엔진 기본값(year_month)
+WARMUP_PERIODS = ["year", "year_month"]
+
+
+def warm_up_dataset(df, periods=None, top_n=DEFAULT_TOP_N, workers=None):
+    """사이드바 기본 조건의 KPI, 섹션 집계, 드릴다운 인덱스를 캐시에 생성
+
+    반환: {단계 이름: 경과 초}
+    """
+    timings = {}
+    _timed(timings, "overall_kpis", lambda: compute_overall_kpis(df))
+    # 미리보기용 층화 표본 (큰 데이터셋만, 적재 시 한 번 생성)
+    if len(df) >= preview_min_rows():
+        _timed(timings, "stratified_sample", lambda: get_stratified_sample(df))
+    view = _timed(
+        timings, "filter_data", lambda: filter_data(df, *default_filter_args(df))
+    )
+    timings.update(warm_up_view(view, df, periods, top_n, workers))
+    return timings
+
+
+def warm_up_view(view, base_df=None, periods=None, top_n=DEFAULT_TOP_N, workers=None):
+    """조회 결과 프레임의 기간 KPI와 기준선택별 섹션/드릴다운 인덱스를 캐시에 생성
+
+    SQL 백엔드는 filter_data 결과 프레임을 base_df 없이 넘긴다 (화면과 같은 캐시 키).
+    """
+    periods = WARMUP_PERIODS if periods is None else periods
+    timings = {}
+    _timed(timings, "period_kpis", lambda: compute_period_kpis(view, base_df=base_df))
+    for 기준선택 in periods:
+        sections = _timed(
+            timings,
+            f"sections[{기준선택}]",
+            lambda: compute_dashboard_sections(
+                view,
+                기준선택,
+                top_n,
+                mover_dim=MOVER_DIMENSIONS[0] if not view.empty else None,
+                workers=workers,
+                base_df=base_df,
+            ),
+        )
+        _timed(
+            timings,
+            f"drilldown_index[{기준선택}]",
+            lambda: [
+                get_drilldown_index(sections[group_col]["df"], 기준선택, group_col)
+                for group_col, _, _ in FLOW_SECTIONS
+            ],
+        )
+    return timings
+
+
+def _timed(timings, name, func):
+    started = time.perf_counter()
+    result = func()
+    timings[name] = round(time.perf_counter() - started, 3)
+    return result
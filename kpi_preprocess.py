@@ -0,0 +1,168 @@
+"""전처리 - 원본 프레임의 날짜/수치 변환, 보정 컬럼, 데이터셋 버전, 기간 컬럼"""
+
+import hashlib
+
+import pandas as pd
+
+from kpi_profiling import note_frame_copy, profiled
+
+
+# ================= 전처리 =================
+# 공통 데이터 전처리 함수
+@profiled("process_data")
+def process_data(df):
+    # 날짜 컬럼 처리
+    df["확정일자"] = pd.to_datetime(df["확정일자"], errors="coerce")
+    df["판매자가입일"] = pd.to_datetime(df["판매자가입일자"], errors="coerce")
+    df["구매자가입일"] = pd.to_datetime(df["구매자가입일자"], errors="coerce")
+    # 거래유형 보정
+    df["거래유형보정"] = df["거래유형"].map(
+        {
+            1: "1유형",
+            2: "3유형",
+            3: "2유형",
+            4: "4유형",
+            5: "4유형",
+            "": "2유형",
+            9: "2유형",
+            None: "2유형",
+        }
+    )
+
+    # 거래방식 보정
+    df["거래방식보정"] = df["거래방식"].map(
+        {
+            "정가거래": "정가거래",
+            "간편거래": "정가거래",
+            "입찰거래": "입찰거래",
+            "발주거래": "발주거래",
+            "기획전": "기획전",
+            "특화상품": "특화상품",
+        }
+    )
+
+    # 판매자세부구분
+    def 분류함수(row):
+        if (
+            row["구분"] == "청과"
+            and row["판매자구분"] == "위탁판매자"
+            and pd.notnull(row["판매자"])
+            and ("농협" in row["판매자"] or "농업협동" in row["판매자"])
+        ):
+            return "농협"
+        elif row["구분"] == "청과" and row["판매자구분"] == "위탁판매자":
+            return "도매법인"
+        elif row["구분"] == "청과" and row["판매자구분"] == "직접판매자":
+            return "직접판매자"
+        elif (
+            row["구분"] == "양곡"
+            and row["판매자구분"] == "위탁판매자"
+            and pd.notnull(row["판매자"])
+            and ("농협" in row["판매자"] or "농업협동" in row["판매자"])
+        ):
+            return "농협"
+        elif row["구분"] == "양곡" and row["판매자구분"] == "위탁판매자":
+            return "도매법인"
+        elif row["구분"] == "양곡" and row["판매자구분"] == "직접판매자":
+            return "직접판매자"
+        elif (
+            row["구분"] == "수산"
+            and row["판매자구분"] == "위탁판매자"
+            and pd.notnull(row["판매자"])
+            and ("수협" in row["판매자"] or "수업협동" in row["판매자"])
+        ):
+            return "수협"
+        elif row["구분"] == "수산" and row["판매자구분"] == "위탁판매자":
+            return "도매법인"
+        elif row["구분"] == "수산" and row["판매자구분"] == "매수판매자":
+            return "매수판매자"
+        elif row["구분"] == "수산" and row["판매자구분"] == "직접판매자":
+            return "직접판매자"
+
+        elif row["구분"] == "축산" and "돈육" in row["품목"]:
+            return "돼지고기"
+        elif row["구분"] == "축산" and "한우" in row["품목"]:
+            return "소고기"
+        elif row["구분"] == "축산" and "닭" in row["품목"]:
+            return "닭고기"
+        elif row["구분"] == "축산" and "조란" in row["품목"]:
+            return "계란"
+        elif row["구분"] == "축산" and "알" in row["품목"]:
+            return "축산가공"
+        else:
+            return row["판매자구분"]
+
+    df["판매자세부구분"] = df.apply(분류함수, axis=1)
+    # 수치형 컬럼 처리
+    numeric_columns = [
+        "주문수량",
+        "주문물량",
+        "주문단가(원)",
+        "주문금액(원)",
+        "구매확정수량",
+        "구매확정물량",
+        "구매확정단가(원)",
+        "구매확정금액(원)",
+    ]
+    for col in numeric_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # 결측값 처리 (결측 행이 있을 때만 새 프레임 생성)
+    valid = df["확정일자"].notna() & df["구매확정금액(원)"].notna()
+    if not valid.all():
+        df = df.dropna(subset=["확정일자", "구매확정금액(원)"])
+        note_frame_copy(len(df))
+    # 데이터셋 버전 (파생 구조 캐시 키)
+    df.attrs["dataset_version"] = dataset_version(df)
+    return df
+
+
+# 데이터셋 내용 기반 버전 문자열 - 동일 데이터는 재실행/세션이 달라도 같은 버전
+# 모든 컬럼을 해시 (버전이 같으면 파생 구조 캐시를 공유하므로 어느 컬럼이 달라도 다른 버전)
+def dataset_version(df):
+    hashed = pd.util.hash_pandas_object(df, index=False)
+    digest = hashlib.sha1(hashed.to_numpy().tobytes())
+    digest.update(str(list(df.columns)).encode("utf-8"))
+    digest.update(str([str(dtype) for dtype in df.dtypes]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# 날짜, 필터 컬럼 추가
+PERIOD_COLUMNS = ["year", "year_quarter", "year_month", "year_week"]
+
+
+def period_labels(dates, 기준선택):
+    """확정일시 Series의 기준선택별 기간 표기 (year는 정수 연도)"""
+    if 기준선택 == "year":
+        return dates.dt.year
+    if 기준선택 == "year_quarter":
+        return dates.dt.year.astype(str) + "-Q" + dates.dt.quarter.astype(str)
+    if 기준선택 == "year_month":
+        return dates.dt.strftime("%Y-%m")
+    # ISO 주차 표기법 사용(%Y-%V): 월~일 기준 (1주는 월요일부터 시작)
+    return dates.dt.strftime("%Y-%V")
+
+
+def full_period_index(periods, 기준선택):
+    """기간 표기의 처음부터 마지막까지 빠짐없는 기간 (거래가 없는 기간 포함, 오름차순)
+
+    각 연도의 모든 날짜를 같은 표기로 바꾸어 만들므로 add_date_columns의 표기와 같다.
+    기준선택이 기간 컬럼이 아니거나 기간이 없으면 periods를 그대로 반환한다.
+    """
+    if 기준선택 not in PERIOD_COLUMNS or len(periods) == 0:
+        return pd.Index(periods)
+    first, last = min(periods), max(periods)
+    days = pd.Series(
+        pd.date_range(f"{str(first)[:4]}-01-01", f"{str(last)[:4]}-12-31", freq="D")
+    )
+    labels = pd.Index(period_labels(days, 기준선택).unique()).sort_values()
+    return labels[(labels >= first) & (labels <= last)].union(pd.Index(periods))
+
+
+@profiled("add_date_columns")
+def add_date_columns(df):
+    """기간 컬럼을 df에 직접 추가하여 반환 (데이터셋 생성 시 한 번만 호출)"""
+    for column in PERIOD_COLUMNS:
+        df[column] = period_labels(df["확정일자"], column)
+    return df
@@ -0,0 +1,280 @@
+"""표본 미리보기 - 층화 표본으로 KPI와 거래 흐름을 먼저 추정 (정확한 값은 백그라운드 계산)"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from kpi_aggregations import (
+    FLOW_SECTIONS,
+    build_flow_tables,
+    compute_dashboard_sections,
+    compute_period_kpis,
+    project_year_end,
+)
+from kpi_cache import cached_derived
+from kpi_filters import filter_data, take_rows
+from kpi_sketches import approx_distinct_counts, range_totals
+
+
+# ================= 표본 미리보기 (층화 표본 근사) =================
+# 큰 데이터셋은 (구분, 월) 층별 무작위 표본으로 흐름 표를 먼저 추정(95% 신뢰구간 포함)하고,
+# 정확한 결과는 백그라운드에서 캐시에 생성하여 준비되면 화면이 교체한다.
+# KPI_PREVIEW_MIN_ROWS: 미리보기를 사용할 최소 데이터셋 행 수
+PREVIEW_MIN_ROWS_ENV = "KPI_PREVIEW_MIN_ROWS"
+DEFAULT_PREVIEW_MIN_ROWS = 1_000_000
+SAMPLE_STRATA = ["구분", "year_month"]
+SAMPLE_FRACTION = 0.02
+# 작은 층(예: 수산의 한 달)도 이 수만큼은 추출 (층 전체가 더 작으면 전부)
+SAMPLE_MIN_PER_STRATUM = 50
+SAMPLE_SEED = 0
+SAMPLE_STRATUM_COLUMN = "표본층"
+CONFIDENCE_Z = 1.96
+
+_exact_view_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kpi-exact")
+
+
+def preview_min_rows():
+    try:
+        return int(os.environ.get(PREVIEW_MIN_ROWS_ENV, DEFAULT_PREVIEW_MIN_ROWS))
+    except ValueError:
+        return DEFAULT_PREVIEW_MIN_ROWS
+
+
+def _build_stratified_sample(df):
+    """층별 max(최소 표본 수, 비율) 행을 무작위 추출한 표본
+
+    반환: {"frame": 표본 프레임(층 번호 컬럼 추가),
+           "population": 층별 행 수 N_h, "sizes": 층별 표본 수 n_h}
+    """
+    columns = [col for col in SAMPLE_STRATA if col in df.columns]
+    if columns:
+        strata = df.groupby(columns, dropna=False, sort=False).ngroup().to_numpy()
+    else:
+        strata = np.zeros(len(df), dtype=np.int64)
+    population = np.bincount(strata)
+    target = np.ceil(population * SAMPLE_FRACTION).astype(np.int64)
+    sizes = np.minimum(population, np.maximum(target, SAMPLE_MIN_PER_STRATUM))
+
+    # 층 안의 무작위 순위가 표본 수 미만인 행 (층 순서 → 난수 순서로 정렬)
+    order = np.lexsort((np.random.default_rng(SAMPLE_SEED).random(len(df)), strata))
+    starts = np.cumsum(population) - population
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[order] = np.arange(len(df)) - starts[strata[order]]
+    positions = np.flatnonzero(rank < sizes[strata])
+
+    frame = take_rows(df, positions)
+    frame[SAMPLE_STRATUM_COLUMN] = strata[positions]
+    # 표본은 별도 데이터셋 버전 (조회/집계 캐시가 원본과 섞이지 않도록)
+    version = df.attrs.get("dataset_version")
+    frame.attrs = {"dataset_version": f"{version}:sample"} if version else {}
+    return {"frame": frame, "population": population, "sizes": sizes}
+
+
+def get_stratified_sample(df):
+    """데이터셋별 층화 표본 (한 번 생성하여 캐시)"""
+    return cached_derived(df, ("stratified_sample",), _build_stratified_sample)
+
+
+def stratum_sums(view, keys, value_cols):
+    """표본 조회 프레임의 (keys, 층)별 값 합계와 제곱합 (추정의 충분통계량)"""
+    groups = list(keys) + [SAMPLE_STRATUM_COLUMN]
+    frame = view[groups + list(value_cols)]
+    # 조회 조건(attrs)은 추정에 필요 없으므로 집계마다 복사되지 않도록 비움
+    frame.attrs = {}
+    frame = frame.assign(**{f"{col}²": frame[col] ** 2 for col in value_cols})
+    return frame.groupby(groups, observed=True, sort=False).sum()
+
+
+def estimate_totals(sums, keys, population, sizes):
+    """stratum_sums 결과를 keys별로 모은 추정 합계와 95% 신뢰구간 반폭 → (추정, 반폭)
+
+    층화 추정: 합계 = Σ_h N_h/n_h Σ y, 분산 = Σ_h N_h² (1 - n_h/N_h) s_h² / n_h.
+    조건 밖의 표본 행은 y=0인 도메인 추정이므로 s_h²는 층 전체 표본 수 n_h로 계산한다.
+    keys가 비어 있으면 한 행짜리 결과.
+    """
+    value_cols = [col for col in sums.columns if not col.endswith("²")]
+    levels = list(keys) + [SAMPLE_STRATUM_COLUMN]
+    if levels != list(sums.index.names):
+        sums = sums.groupby(level=levels, sort=False).sum()
+    totals = sums[value_cols]
+    squares = sums[[f"{col}²" for col in value_cols]].set_axis(value_cols, axis=1)
+    strata = sums.index.get_level_values(SAMPLE_STRATUM_COLUMN).to_numpy()
+    n = sizes[strata].astype(np.float64)
+    N = population[strata].astype(np.float64)
+    spread = squares.sub(totals**2 / n[:, None], axis=0)
+    spread = spread.div(np.maximum(n - 1, 1), axis=0).clip(lower=0)
+    variance = spread.mul(N**2 * (1 - n / N) / n, axis=0)
+    estimate = totals.mul(N / n, axis=0)
+    if keys:
+        level = list(range(len(keys)))
+        estimate = estimate.groupby(level=level).sum()
+        variance = variance.groupby(level=level).sum()
+    else:
+        estimate = estimate.sum().to_frame().T
+        variance = variance.sum().to_frame().T
+    return estimate, CONFIDENCE_Z * np.sqrt(variance)
+
+
+def _ci_with_totals(pivot_with_total, group_col, cells, by_period, by_group, overall):
+    """합계 포함 피벗과 같은 모양의 신뢰구간 반폭 표 (합계 행/열은 해당 도메인 전체로 추정)"""
+    ci = cells.unstack(group_col).reindex(
+        index=pivot_with_total.index,
+        columns=[col for col in pivot_with_total.columns if col != "합계"],
+    )
+    ci = ci.fillna(0)
+    if "합계" in pivot_with_total.columns:
+        ci["합계"] = by_period.reindex(ci.index)
+    if "합계" in pivot_with_total.index:
+        total_row = by_group.reindex(ci.columns)
+        total_row["합계"] = overall
+        ci.loc["합계"] = total_row
+    return ci.reindex(columns=pivot_with_total.columns).fillna(0)
+
+
+def _preview_flow_section(
+    view,
+    sample,
+    기준선택,
+    group_col,
+    order,
+    use_top_n,
+    top_n,
+    show_row_total,
+    show_col_total,
+):
+    """흐름 섹션 하나의 표본 추정 표 (compute_flow_section과 같은 표 + 신뢰구간 표)"""
+    measures = ["구매확정금액(원)", "구매확정물량"]
+    population, sizes = sample["population"], sample["sizes"]
+    sums = stratum_sums(view, [기준선택, group_col], measures)
+    if use_top_n:
+        by_group, _ = estimate_totals(sums, [group_col], population, sizes)
+        ranked = by_group[measures[0]].sort_values(ascending=False).index.tolist()
+        col_order = ranked if top_n is None else ranked[: int(top_n)]
+        groups = sums.index.get_level_values(group_col)
+        sums = sums[groups.isin(col_order)]
+        periods = sums.index.get_level_values(기준선택).nunique()
+    else:
+        col_order = order or sorted(view[group_col].dropna().unique())
+        periods = view[기준선택].nunique()
+    flow, cells = estimate_totals(sums, [기준선택, group_col], population, sizes)
+    tables = build_flow_tables(
+        flow.reset_index(),
+        기준선택,
+        group_col,
+        col_order,
+        show_row_total,
+        show_col_total,
+        has_change=periods >= 2,
+    )
+    _, by_period = estimate_totals(sums, [기준선택], population, sizes)
+    _, by_group = estimate_totals(sums, [group_col], population, sizes)
+    _, overall = estimate_totals(sums, [], population, sizes)
+    for name, value_col, scale in [
+        ("amount", measures[0], 1_000_000),
+        ("volume", measures[1], 1_000),
+    ]:
+        tables[f"ci_{name}_with_total"] = _ci_with_totals(
+            tables[f"pivot_{name}_with_total"],
+            group_col,
+            cells[value_col] / scale,
+            by_period[value_col] / scale,
+            by_group[value_col] / scale,
+            overall[value_col].iloc[0] / scale,
+        )
+    return {"col_order": col_order, "tables": tables}
+
+
+def _build_preview_sections(view, sample, 기준선택, top_n, show_row_total, show_col_total):
+    if view.empty:
+        return {}
+    return {
+        group_col: _preview_flow_section(
+            view,
+            sample,
+            기준선택,
+            group_col,
+            order,
+            use_top_n,
+            top_n,
+            show_row_total,
+            show_col_total,
+        )
+        for group_col, order, use_top_n in FLOW_SECTIONS
+        if group_col in view.columns
+    }
+
+
+def compute_preview(df, filter_args, 기준선택, top_n, show_row_total, show_col_total):
+    """표본 기반 미리보기: 기간 KPI(누적합/스케치)와 흐름 섹션 추정 표
+
+    기간 합계는 일별 누적합으로 정확히, 고유 개수는 HLL 근사로 구하고,
+    흐름 표만 층화 표본에서 추정한다. 반환: {"kpis", "sections", "rows", "sample_rows"}
+    """
+    sample = get_stratified_sample(df)
+    view = filter_data(sample["frame"], *filter_args)
+    filters = view.attrs["filters"]
+
+    totals = range_totals(df, filters)
+    kpis = {
+        "total_amount": totals["amount"],
+        "total_orders": totals["count"],
+        "daily_avg": None,
+        "expected_amount": None,
+        "top_product": None,
+        "distinct": approx_distinct_counts(df, filters),
+        "approx": True,
+    }
+    if totals["count"]:
+        kpis["daily_avg"], kpis["expected_amount"] = project_year_end(
+            totals["amount"], totals["min_date"], totals["max_date"]
+        )
+        kpis["top_product"] = totals["item_amounts"].idxmax()
+
+    if 기준선택 not in view.columns:
+        기준선택 = "year_month"
+    sections = cached_derived(
+        view,
+        ("preview_sections", 기준선택, top_n, show_row_total, show_col_total),
+        lambda frame: _build_preview_sections(
+            frame, sample, 기준선택, top_n, show_row_total, show_col_total
+        ),
+    )
+    return {
+        "kpis": kpis,
+        "sections": sections,
+        "rows": len(view),
+        "sample_rows": len(sample["frame"]),
+    }
+
+
+def start_exact_view(
+    df,
+    filter_args,
+    기준선택,
+    top_n,
+    show_row_total,
+    show_col_total,
+    mover_dim,
+    approx=False,
+):
+    """정확한 조회 결과(조회 프레임, 기간 KPI, 섹션 집계)를 백그라운드에서 캐시에 생성 → Future
+
+    화면과 같은 인자로 계산하므로 완료 후 재실행은 캐시에서 바로 그린다.
+    """
+
+    def run():
+        view = filter_data(df, *filter_args)
+        compute_period_kpis(view, base_df=df, approx=approx)
+        compute_dashboard_sections(
+            view,
+            기준선택,
+            top_n,
+            show_row_total,
+            show_col_total,
+            mover_dim=mover_dim if not view.empty else None,
+            base_df=df,
+        )
+        return len(view)
+
+    return _exact_view_executor.submit(run)
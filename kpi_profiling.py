@@ -0,0 +1,169 @@
+"""성능 계측 - 구간별 경과 시간/행 수/메모리 최대 할당량과 프레임 복사 횟수 기록
+
+KPI_PROFILE=1 이면 대시보드가 재실행마다 계측하고, 기록은 KPI_PROFILE_LOG(JSON lines)에 남는다.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+# ================= 성능 계측 =================
+# KPI_PROFILE=1 이면 기본으로 계측, 로그는 KPI_PROFILE_LOG (JSON lines)
+PROFILE_ENV = "KPI_PROFILE"
+PROFILE_LOG_ENV = "KPI_PROFILE_LOG"
+DEFAULT_PROFILE_LOG = "kpi_profile.jsonl"
+
+# 현재 실행(rerun)의 계측 기록 - 스크립트 스레드(세션)별로 분리
+_profile_run = contextvars.ContextVar("kpi_profile_run", default=None)
+_profile_lock = threading.Lock()
+_active_profile_runs = 0
+
+
+def profile_env_enabled():
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    return value in ("1", "true", "yes", "on")
+
+
+def profile_log_path():
+    return os.environ.get(PROFILE_LOG_ENV) or DEFAULT_PROFILE_LOG
+
+
+def start_profile_run(label="rerun"):
+    """계측 실행 시작 - 이후 profile_stage 구간이 이 실행에 기록됨"""
+    global _active_profile_runs
+    with _profile_lock:
+        # tracemalloc은 프로세스 전역이므로 계측 중인 실행이 있는 동안만 켬
+        if _active_profile_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _active_profile_runs += 1
+    run = {
+        "run_id": uuid.uuid4().hex[:12],
+        "label": label,
+        "started_at": datetime.now().isoformat(timespec="milliseconds"),
+        "stages": [],
+        "frame_copies": 0,
+        "copied_rows": 0,
+        "_stack": [],
+        "_started": time.perf_counter(),
+    }
+    run["_token"] = _profile_run.set(run)
+    return run
+
+
+def finish_profile_run(run, completed=True, log_path=None):
+    """계측 실행 종료 - 기록을 JSON lines 로그에 추가하고 (밑줄 필드 제외) 반환"""
+    global _active_profile_runs
+    _profile_run.reset(run["_token"])
+    with _profile_lock:
+        _active_profile_runs -= 1
+        if _active_profile_runs == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    record = {key: value for key, value in run.items() if not key.startswith("_")}
+    record["total_s"] = round(time.perf_counter() - run["_started"], 6)
+    record["completed"] = completed
+    try:
+        with open(log_path or profile_log_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except OSError:
+        pass  # 로그 기록 실패는 화면 표시에 영향 주지 않음
+    return record
+
+
+@contextmanager
+def profile_stage(name, rows_in=None):
+    """구간의 경과 시간, 행 수, tracemalloc 최대 할당량(구간 시작 대비)을 기록
+
+    계측 실행 중이 아니면 아무것도 기록하지 않는다. 반환된 dict에 rows_out 등을 넣을 수 있다.
+    """
+    run = _profile_run.get()
+    if run is None:
+        yield {}
+        return
+
+    stack = run["_stack"]
+    stage = {"name": name, "depth": len(stack), "rows_in": rows_in, "rows_out": None}
+    run["stages"].append(stage)
+
+    # 바깥 구간의 최대값을 먼저 반영한 뒤 최대값 측정을 구간 기준으로 초기화
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]["max"] = max(stack[-1]["max"], peak)
+    tracemalloc.reset_peak()
+    frame = {"base": current, "max": current}
+    stack.append(frame)
+    started = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        stage["wall_s"] = round(time.perf_counter() - started, 6)
+        _, peak = tracemalloc.get_traced_memory()
+        frame["max"] = max(frame["max"], peak)
+        stage["peak_bytes"] = int(frame["max"] - frame["base"])
+        stack.pop()
+        if stack:
+            stack[-1]["max"] = max(stack[-1]["max"], frame["max"])
+
+
+# 프레임 복사 계측 - 데이터셋 행을 새 프레임으로 복사한 횟수/행 수 (프로세스 누계 + 실행별)
+_frame_copy_totals = {"copies": 0, "rows": 0}
+
+
+def note_frame_copy(rows):
+    with _profile_lock:
+        _frame_copy_totals["copies"] += 1
+        _frame_copy_totals["rows"] += int(rows)
+    run = _profile_run.get()
+    if run is not None:
+        run["frame_copies"] += 1
+        run["copied_rows"] += int(rows)
+
+
+def frame_copy_totals():
+    with _profile_lock:
+        return dict(_frame_copy_totals)
+
+
+def _row_count(value):
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(value)
+    return None
+
+
+def profiled(name=None):
+    """함수 호출을 profile_stage로 감싸는 데코레이터 (첫 인자/결과의 행 수 기록)
+
+    name은 문자열 또는 호출 인자를 받아 구간 이름을 만드는 함수.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profile_run.get() is None:
+                return func(*args, **kwargs)
+            if callable(name):
+                stage_name = name(*args, **kwargs)
+            else:
+                stage_name = name or func.__name__
+            rows_in = _row_count(args[0]) if args else None
+            with profile_stage(stage_name, rows_in) as stage:
+                result = func(*args, **kwargs)
+                stage["rows_out"] = _row_count(result)
+                return result
+
+        return wrapper
+
+    return decorate
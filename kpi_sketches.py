@@ -0,0 +1,324 @@
+"""요약 구조 - 전체 행을 다시 읽지 않고 답하는 근사 고유 개수와 일별 누적합
+
+HyperLogLog 레지스터와 일별 누적합은 데이터셋별로 한 번 만들어 캐시한다.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from kpi_cache import cached_derived
+from kpi_filters import (
+    FILTER_COLUMNS,
+    _category_codes,
+    filter_cell_mask,
+    get_month_partitions,
+    partition_rows,
+)
+
+# ================= 근사 고유 개수 (HyperLogLog) =================
+# 레지스터 수 m = 2^12, 표준 오차 1.04 / sqrt(m) ≈ 1.6%
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+HLL_ERROR_PCT = 104 / np.sqrt(HLL_REGISTERS)
+HLL_DIMENSIONS = ["품목", "판매자", "구매자"]
+# 스케치 셀 = (일자, 사이드바 필터 컬럼 조합)
+HLL_CELL_COLUMNS = [
+    "구분",
+    "부류",
+    "품목",
+    "판매자구분",
+    "판매자세부구분",
+    "구매자구분",
+    "거래유형보정",
+]
+
+
+def _hll_register_ranks(values):
+    """값별 (레지스터 번호, 순위) - 64비트 해시의 상위 p비트가 레지스터, 나머지의 선행 0 개수+1이 순위"""
+    hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+    registers = (hashes >> np.uint64(64 - HLL_PRECISION)).astype(np.int64)
+    # 하위 비트를 왼쪽으로 붙이고 보호 비트를 두어 순위 상한을 64-p+1로 제한
+    rest = (hashes << np.uint64(HLL_PRECISION)) | np.uint64(1 << (HLL_PRECISION - 1))
+    bit_length = np.ones(len(rest), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = rest >= np.uint64(1 << shift)
+        bit_length[high] += shift
+        rest[high] >>= np.uint64(shift)
+    ranks = (65 - bit_length).astype(np.uint8)
+    return registers, ranks
+
+
+def _hll_estimate(registers):
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = np.count_nonzero(registers == 0)
+    # 소규모 구간은 선형 계수(linear counting)로 보정 - 구간 판단도 선형 계수 추정치로
+    # 한다 (2.5m 부근에서 위 추정치는 몇 % 크게 나와 판단이 어긋남)
+    if zeros > 0:
+        linear = m * np.log(m / zeros)
+        if linear <= 2.5 * m:
+            estimate = linear
+    return int(round(estimate))
+
+
+def _build_hll_cube(df):
+    """(일자, 필터 컬럼 조합) 셀별 희소 HLL 스케치 - 셀 내 (레지스터, 최대 순위) 쌍만 저장"""
+    cell_columns = [col for col in HLL_CELL_COLUMNS if col in df.columns]
+    day = df["확정일자"].to_numpy().astype("datetime64[D]")
+    keys = pd.DataFrame({"day": day}, index=df.index)
+    for col in cell_columns:
+        keys[col] = df[col]
+    cell_ids = keys.groupby(list(keys.columns), dropna=False, sort=False).ngroup()
+    cell_ids = cell_ids.to_numpy()
+    _, first_rows = np.unique(cell_ids, return_index=True)
+    cells = keys.iloc[first_rows].reset_index(drop=True)
+
+    sketches = {}
+    for dim in HLL_DIMENSIONS:
+        if dim not in df.columns:
+            continue
+        values = df[dim].to_numpy()
+        valid = pd.notna(values)
+        registers, ranks = _hll_register_ranks(values[valid])
+        entry_keys = cell_ids[valid].astype(np.int64) * HLL_REGISTERS + registers
+        # 셀·레지스터별 최대 순위만 남김 (키 정렬 → 셀별 연속 구간)
+        merged = pd.Series(ranks).groupby(entry_keys).max()
+        entry_keys = merged.index.to_numpy()
+        entry_cells = entry_keys // HLL_REGISTERS
+        offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(entry_cells, minlength=len(cells)))
+        sketches[dim] = {
+            "registers": (entry_keys % HLL_REGISTERS).astype(np.int64),
+            "ranks": merged.to_numpy(dtype=np.uint8),
+            "offsets": offsets,
+        }
+    return {"cells": cells, "sketches": sketches}
+
+
+def _hll_cell_mask(cells, filters):
+    mask = np.ones(len(cells), dtype=bool)
+    date_range = filters.get("date_range", ())
+    if len(date_range) == 2:
+        start_date, end_date = (np.datetime64(d, "D") for d in date_range)
+        day = cells["day"].to_numpy()
+        mask &= (day >= start_date) & (day <= end_date)
+    return mask & filter_cell_mask(cells, filters)
+
+
+def approx_distinct_counts(df, filters=None):
+    """전체 데이터셋 df의 스케치를 필터 조건에 맞는 셀만 병합하여 고유 개수를 추정"""
+    cube = cached_derived(df, ("hll_cube",), _build_hll_cube)
+    selected = np.flatnonzero(_hll_cell_mask(cube["cells"], filters or {}))
+
+    counts = {}
+    for dim, sketch in cube["sketches"].items():
+        starts = sketch["offsets"][selected]
+        lengths = sketch["offsets"][selected + 1] - starts
+        # 선택된 셀들의 연속 구간을 하나의 위치 배열로 펼침
+        entry_positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        entry_positions += np.arange(len(entry_positions))
+        registers = np.zeros(HLL_REGISTERS, dtype=np.uint8)
+        np.maximum.at(
+            registers,
+            sketch["registers"][entry_positions],
+            sketch["ranks"][entry_positions],
+        )
+        counts[dim] = _hll_estimate(registers)
+    return counts
+
+
+# ================= 일별 누적합 (조회 기간 합계) =================
+# (필터 컬럼 값 조합 셀, 일자)별 합계를 셀·일자 순으로 정렬하여 누적합으로 저장
+# 조회 기간 합계 = 선택된 셀마다 누적합 두 값의 차이 (행 수와 무관)
+# (셀, 일자)별 합계는 기간 파티션(월)별로 만들어 보관하므로, 행이 추가된 새 버전은
+# 내용 해시가 바뀐 파티션(보통 진행 중인 이번 달)만 다시 집계한다.
+DAILY_PREFIX_MEASURES = {"amount": "구매확정금액(원)", "volume": "구매확정물량"}
+
+
+def _cell_ids(frame, cell_columns):
+    """필터 컬럼 값 조합 번호 (처음 나온 순서, 결측도 하나의 값)"""
+    if not cell_columns:
+        return np.zeros(len(frame), dtype=np.int64)
+    ids = frame.groupby(cell_columns, dropna=False, sort=False).ngroup()
+    return ids.to_numpy().astype(np.int64)
+
+
+def _partition_cell_ids(df, rows, cell_columns):
+    """rows의 셀 번호 (0부터, 파티션 안에서만 유효) - 필터용 컬럼 코드를 자릿수로 결합
+
+    코드 조합이 int64를 넘을 수 있으면 값으로 묶는다.
+    """
+    columns = [_category_codes(df, column) for column in cell_columns]
+    radix = [len(uniques) + 1 for _, uniques in columns]
+    if np.prod(np.asarray(radix, dtype=np.float64)) >= 2**62:
+        return _cell_ids(df.take(rows)[cell_columns], cell_columns)
+    combined = np.zeros(len(rows), dtype=np.int64)
+    for (codes, _), size in zip(columns, radix):
+        # 결측(-1)은 0, 값은 1부터
+        combined = combined * size + (codes[rows] + 1)
+    return np.unique(combined, return_inverse=True)[1].reshape(-1)
+
+
+def _partition_daily_totals(df, rows, cell_columns):
+    """파티션 하나의 (셀, 일자)별 금액/물량/건수와 첫/마지막 확정일시
+
+    셀 번호는 파티션 안의 번호이며 "cells"가 번호별 필터 컬럼 값이다.
+    """
+    dates = df["확정일자"].to_numpy()[rows]
+    day = dates.astype("datetime64[D]").astype(np.int64)
+    first_day = int(day.min()) if len(day) else 0
+    span = int(day.max()) - first_day + 1 if len(day) else 1
+    cell_ids = _partition_cell_ids(df, rows, cell_columns)
+    _, first_rows = np.unique(cell_ids, return_index=True)
+
+    entries = pd.DataFrame(
+        {
+            name: df[column].to_numpy()[rows]
+            for name, column in DAILY_PREFIX_MEASURES.items()
+            if column in df.columns
+        }
+    )
+    entries["ts"] = dates
+    grouped = entries.groupby(cell_ids * span + (day - first_day), sort=True)
+    sums = grouped.sum(numeric_only=True)
+    keys = sums.index.to_numpy()
+    totals = {name: sums[name].to_numpy() for name in sums.columns}
+    totals["count"] = grouped.size().to_numpy()
+    return {
+        "rows": len(rows),
+        "cells": df.take(rows[first_rows])[cell_columns].reset_index(drop=True),
+        "cell": keys // span,
+        "day": keys % span + first_day,
+        "totals": totals,
+        "first_ts": grouped["ts"].min().to_numpy(),
+        "last_ts": grouped["ts"].max().to_numpy(),
+    }
+
+
+def _partition_row_hashes(df, cell_columns):
+    """누적합에 쓰는 컬럼(확정일시, 측정값, 셀 컬럼)의 행별 해시 - 파티션 내용 비교용
+
+    행 수만 비교하면 같은 행 수로 다시 쓴 달의 이전 집계를 쓰게 되므로 내용으로 비교한다.
+    """
+    columns = ["확정일자"] + cell_columns
+    columns += [col for col in DAILY_PREFIX_MEASURES.values() if col in df.columns]
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def _build_daily_prefix(df, previous=None):
+    """셀별 일자 구간의 누적 금액/물량/건수와 구간별 첫/마지막 확정일시
+
+    previous: 같은 원본에 행이 추가되기 전 버전의 누적합 - 행 수와 내용 해시가 같은
+    파티션(마감된 달)은 그 집계를 그대로 쓴다.
+    """
+    cell_columns = [column for _, column in FILTER_COLUMNS if column in df.columns]
+    reusable = {} if previous is None else previous["partitions"]
+    partitions = get_month_partitions(df)
+    row_hashes = _partition_row_hashes(df, cell_columns)
+    parts = {}
+    for i, label in enumerate(partitions["labels"]):
+        rows = partition_rows(partitions, i)
+        digest = hashlib.sha1(row_hashes[rows].tobytes()).hexdigest()
+        part = reusable.get(label)
+        if part is None or part["rows"] != len(rows) or part.get("digest") != digest:
+            part = dict(_partition_daily_totals(df, rows, cell_columns), digest=digest)
+        parts[label] = part
+
+    # 빈 데이터셋도 같은 형태(빈 배열)의 결과가 되도록 빈 파티션 하나로 처리
+    chunks = list(parts.values()) or [
+        _partition_daily_totals(df, np.empty(0, dtype=np.int64), cell_columns)
+    ]
+    # 파티션별 셀 번호 → 전체 셀 번호 (파티션 순서로 처음 나온 순서)
+    all_cells = pd.concat([part["cells"] for part in chunks], ignore_index=True)
+    global_ids = _cell_ids(all_cells, cell_columns)
+    _, first_rows = np.unique(global_ids, return_index=True)
+    cell_starts = np.cumsum([0] + [len(part["cells"]) for part in chunks])
+    cell = np.concatenate(
+        [global_ids[start + part["cell"]] for start, part in zip(cell_starts, chunks)]
+    )
+    day = np.concatenate([part["day"] for part in chunks])
+    first_day = int(day.min()) if len(day) else 0
+    # 마지막 날 다음 날까지 표현 (구간 끝 = 종료일 다음 날)
+    span = int(day.max()) - first_day + 2 if len(day) else 1
+    keys = cell * span + (day - first_day)
+    # 한 날짜는 한 파티션에만 있으므로 (셀, 일자) 키는 겹치지 않음 - 정렬만 하면 됨
+    order = np.argsort(keys, kind="stable")
+
+    def gather(values):
+        return np.concatenate(values)[order]
+
+    totals = {
+        name: gather([part["totals"][name] for part in chunks])
+        for name in chunks[0]["totals"]
+    }
+    # 앞에 0을 두어 구간 [lo, hi)의 합 = cumulative[hi] - cumulative[lo]
+    cumulative = {
+        name: np.concatenate([np.zeros(1, dtype=values.dtype), np.cumsum(values)])
+        for name, values in totals.items()
+    }
+    return {
+        "cells": all_cells.iloc[first_rows].reset_index(drop=True),
+        "keys": keys[order],
+        "first_day": first_day,
+        "span": span,
+        "cumulative": cumulative,
+        "first_ts": gather([part["first_ts"] for part in chunks]),
+        "last_ts": gather([part["last_ts"] for part in chunks]),
+        "partitions": parts,
+    }
+
+
+def get_daily_prefix(df):
+    """데이터셋별 일별 누적합 (한 번 생성하여 캐시)"""
+    return cached_derived(df, ("daily_prefix",), _build_daily_prefix)
+
+
+def range_totals(df, filters, date_range=None):
+    """데이터셋 df 중 조건(filter_state의 dict)에 맞는 행의 합계 - 셀별 누적합 차이
+
+    date_range를 주면 filters의 조회 기간 대신 사용한다.
+    반환: {"amount", "volume", "count", "min_date", "max_date", "item_amounts"}
+    (min/max_date는 해당 행의 첫/마지막 확정일시, 행이 없으면 None)
+    """
+    prefix = get_daily_prefix(df)
+    span = prefix["span"]
+    date_range = filters.get("date_range", ()) if date_range is None else date_range
+    start, end = 0, span - 1
+    if len(date_range) == 2:
+        start_day, end_day = (
+            int(np.datetime64(d, "D").astype(np.int64)) - prefix["first_day"]
+            for d in date_range
+        )
+        start, end = (
+            int(np.clip(offset, 0, span - 1)) for offset in (start_day, end_day + 1)
+        )
+
+    selected = np.flatnonzero(filter_cell_mask(prefix["cells"], filters))
+    keys = prefix["keys"]
+    lo = np.searchsorted(keys, selected * span + start)
+    hi = np.searchsorted(keys, selected * span + max(end, start))
+    totals = {
+        name: (cumulative[hi] - cumulative[lo]).sum()
+        for name, cumulative in prefix["cumulative"].items()
+    }
+    present = hi > lo
+    totals["count"] = int(totals["count"])
+    totals["min_date"] = totals["max_date"] = None
+    totals["item_amounts"] = pd.Series(dtype=float)
+    if present.any():
+        totals["min_date"] = pd.Timestamp(prefix["first_ts"][lo[present]].min())
+        totals["max_date"] = pd.Timestamp(prefix["last_ts"][hi[present] - 1].max())
+        if "품목" in prefix["cells"].columns and "amount" in prefix["cumulative"]:
+            amount = prefix["cumulative"]["amount"]
+            totals["item_amounts"] = (
+                pd.Series(
+                    (amount[hi] - amount[lo])[present],
+                    index=prefix["cells"]["품목"].to_numpy()[selected[present]],
+                )
+                .groupby(level=0)
+                .sum()
+            )
+    return totals
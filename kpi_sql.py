@@ -0,0 +1,466 @@
+"""SQL 조회 백엔드 공통 - 전처리된 데이터셋(trades)에 필터/집계/드릴다운 쿼리
+
+DuckDB(Parquet, kpi_duckdb.py)와 SQLite 웨어하우스(kpi_warehouse.py)가 같은 SQL을 사용하며,
+결과는 kpi_engine의 pandas 경로와 같은 형태다. 어느 백엔드를 쓸지는 KPI_BACKEND로 정한다.
+"""
+
+import os
+
+import pandas as pd
+
+from kpi_engine import (
+    DETAIL_COLUMNS,
+    DIMENSION_HIERARCHIES,
+    FILTER_COLUMNS,
+    KPI_DISTINCT_COLUMNS,
+    PERIOD_COLUMNS,
+    DataLoadError,
+    add_date_columns,
+    aggregate_flow,
+    build_dimension_index,
+    build_flow_tables,
+    dataset_version,
+    default_filter_args,
+    drilldown_positions,
+    filter_data,
+    filter_state,
+    get_drilldown_index,
+    get_sorted_positions,
+    load_csv_file,
+    note_frame_copy,
+    profiled,
+    rank_groups,
+    selection_values,
+)
+
+# 조회 백엔드: pandas(기본, 메모리 DataFrame), duckdb(Parquet), sqlite(웨어하우스 파일)
+BACKEND_ENV = "KPI_BACKEND"
+# 사이드바 데이터 소스 이름
+BACKEND_SOURCE_LABELS = {
+    "duckdb": "Parquet (DuckDB)",
+    "sqlite": "SQLite 웨어하우스",
+}
+
+
+def configured_backend():
+    """설정된 조회 백엔드 이름 ("pandas" 기본)"""
+    return os.environ.get(BACKEND_ENV, "pandas").strip().lower()
+
+
+def sql_backend_label():
+    """SQL 백엔드가 설정되어 있으면 데이터 소스 이름, 아니면 None"""
+    return BACKEND_SOURCE_LABELS.get(configured_backend())
+
+
+def get_configured_backend():
+    """KPI_BACKEND에 해당하는 백엔드 (경로는 각 백엔드의 환경 변수)"""
+    backend = configured_backend()
+    if backend == "duckdb":
+        from kpi_duckdb import get_backend
+
+        return get_backend()
+    if backend == "sqlite":
+        from kpi_warehouse import get_warehouse
+
+        return get_warehouse()
+    raise DataLoadError(f"지원하지 않는 조회 백엔드입니다: {backend}")
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLBackend:
+    """trades 테이블(뷰)에 대한 쿼리 - 하위 클래스는 실행(_fetch)과 방언 차이만 구현
+
+    row_order: 원본 행 순서 컬럼 (pandas 경로와 같은 순서로 결과를 돌려주기 위함)
+    """
+
+    row_order = "rowid"
+
+    def __init__(self, dataset_id, column_types):
+        self.dataset_id = dataset_id
+        self.column_types = column_types
+        self.columns = list(column_types)
+        self._dimension_index = None
+
+    def _fetch(self, sql, params=None):
+        """쿼리 결과 DataFrame (컬럼 dtype은 pandas 경로와 같게 복원)"""
+        raise NotImplementedError
+
+    def _date_param(self, timestamp):
+        return timestamp.to_pydatetime()
+
+    def _sum_expr(self, column):
+        """pandas 합계와 같은 타입의 합계 식"""
+        raise NotImplementedError
+
+    def _aggregate_source(self, group_col):
+        """기간 × 그룹 합계를 읽을 테이블 (집계 테이블이 있으면 하위 클래스가 선택)"""
+        return "trades"
+
+    # ---------- 필터 ----------
+    def where_clause(self, date_range, exclude_rice, **selections):
+        """filter_positions와 같은 조건의 (WHERE 절, 파라미터)"""
+        clauses, params = [], []
+        if len(date_range) == 2:
+            start_date, end_date = date_range
+            clauses.append('"확정일자" >= ? AND "확정일자" < ?')
+            params += [
+                self._date_param(pd.Timestamp(start_date)),
+                self._date_param(pd.Timestamp(end_date) + pd.Timedelta(days=1)),
+            ]
+        if exclude_rice:
+            # pandas의 ~isin 과 같이 품목 결측 행은 유지
+            clauses.append('("품목" IS NULL OR "품목" NOT IN (\'벼\', \'찰벼\'))')
+        for arg, column in FILTER_COLUMNS:
+            values = selection_values(selections.get(arg, "전체"))
+            if values is None:
+                continue
+            # 다중 선택은 IN - pandas 경로와 같이 결측 행은 어느 값과도 일치하지 않음
+            if len(values) == 1:
+                clauses.append(f"{quote_identifier(column)} = ?")
+            else:
+                placeholders = ", ".join("?" for _ in values)
+                clauses.append(f"{quote_identifier(column)} IN ({placeholders})")
+            params += list(values)
+        return " AND ".join(clauses) or "TRUE", params
+
+    def _filter_where(self, filter_args):
+        (
+            date_range,
+            구분,
+            exclude_rice,
+            부류,
+            품목,
+            seller_type,
+            seller_dtl_type,
+            buyer_type,
+            trade_type,
+        ) = filter_args
+        return self.where_clause(
+            date_range,
+            exclude_rice,
+            구분=구분,
+            부류=부류,
+            품목=품목,
+            seller_type=seller_type,
+            seller_dtl_type=seller_dtl_type,
+            buyer_type=buyer_type,
+            trade_type=trade_type,
+        )
+
+    def filter_sql(self, filter_args, columns=None):
+        """조건에 맞는 행을 원래 순서로 읽는 (SQL, 파라미터)"""
+        where, params = self._filter_where(filter_args)
+        select = ", ".join(quote_identifier(col) for col in (columns or self.columns))
+        return (
+            f"SELECT {select} FROM trades WHERE {where} ORDER BY {self.row_order}",
+            params,
+        )
+
+    @profiled("sql.filter_data")
+    def filter_data(self, *filter_args):
+        """filter_data와 같은 조회 결과 프레임 (조건에 맞는 행만 메모리에 올림)"""
+        frame = self._fetch(*self.filter_sql(filter_args))
+        note_frame_copy(len(frame))
+        filter_key, filters = filter_state(*filter_args)
+        frame.attrs["dataset_version"] = self.dataset_id
+        frame.attrs["filter_key"] = filter_key
+        frame.attrs["filters"] = filters
+        return frame
+
+    # ---------- 사이드바 / 전체 KPI ----------
+    def date_bounds(self):
+        row = self._fetch(
+            'SELECT min("확정일자") AS "확정일자_min", max("확정일자") AS "확정일자_max" '
+            "FROM trades"
+        ).iloc[0]
+        return (
+            pd.Timestamp(row["확정일자_min"]).date(),
+            pd.Timestamp(row["확정일자_max"]).date(),
+        )
+
+    def dimension_index(self):
+        """사이드바 선택지 사전 (get_dimension_index와 같은 내용, 백엔드당 한 번 조회)"""
+        if self._dimension_index is None:
+            values = {
+                column: self.distinct_values(column)
+                for _, column in FILTER_COLUMNS
+                if column in self.column_types
+            }
+            hierarchy_rows = []
+            for columns in DIMENSION_HIERARCHIES:
+                if not all(col in self.column_types for col in columns):
+                    continue
+                select = ", ".join(quote_identifier(col) for col in columns)
+                hierarchy_rows.append(
+                    self._fetch(
+                        f"SELECT {select} FROM trades GROUP BY {select} "
+                        f"ORDER BY min({self.row_order})"
+                    )
+                )
+            self._dimension_index = build_dimension_index(values, hierarchy_rows)
+        return self._dimension_index
+
+    def distinct_values(self, column, sort=False):
+        """결측 제외 고유값 - 기본은 처음 나온 순서 (Series.unique와 같은 순서)"""
+        col = quote_identifier(column)
+        order = col if sort else f"min({self.row_order})"
+        frame = self._fetch(
+            f"SELECT {col} FROM trades WHERE {col} IS NOT NULL "
+            f"GROUP BY {col} ORDER BY {order}"
+        )
+        return frame[column].tolist()
+
+    def overall_kpis(self):
+        """compute_overall_kpis와 같은 형태의 전체 누계 KPI"""
+        distinct_columns = [col for col in KPI_DISTINCT_COLUMNS if col in self.columns]
+        distinct_sql = "".join(
+            f", count(DISTINCT {quote_identifier(col)}) AS {quote_identifier(col)}"
+            for col in distinct_columns
+        )
+        row = self._fetch(
+            'SELECT sum("구매확정금액(원)") AS total_amount, count(*) AS total_orders'
+            f"{distinct_sql} FROM trades"
+        ).iloc[0]
+        return {
+            "total_amount": float(row["total_amount"] if pd.notna(row["total_amount"]) else 0),
+            "total_orders": int(row["total_orders"]),
+            "distinct": {col: int(row[col]) for col in distinct_columns},
+        }
+
+    # ---------- 거래 흐름 ----------
+    def aggregate_flow(self, filter_args, 기준선택, group_col):
+        """aggregate_flow와 같은 기간 × 그룹 합계 (키 정렬, 결측 키 제외)"""
+        where, params = self._filter_where(filter_args)
+        period, group = quote_identifier(기준선택), quote_identifier(group_col)
+        return self._fetch(
+            f"SELECT {period}, {group}, "
+            f'{self._sum_expr("구매확정금액(원)")} AS "구매확정금액(원)", '
+            f'{self._sum_expr("구매확정물량")} AS "구매확정물량" '
+            f"FROM {self._aggregate_source(group_col)} "
+            f"WHERE {where} AND {period} IS NOT NULL AND {group} IS NOT NULL "
+            f"GROUP BY {period}, {group} ORDER BY {period}, {group}",
+            params,
+        )
+
+    def period_count(self, filter_args, 기준선택):
+        where, params = self._filter_where(filter_args)
+        frame = self._fetch(
+            f"SELECT count(DISTINCT {quote_identifier(기준선택)}) AS n "
+            f"FROM {self._aggregate_source(기준선택)} WHERE {where}",
+            params,
+        )
+        return int(frame["n"].iloc[0])
+
+    def compute_flow_tables(
+        self,
+        filter_args,
+        기준선택,
+        group_col,
+        col_order=None,
+        show_row_total=True,
+        show_col_total=True,
+    ):
+        """compute_flow_tables와 같은 표 (집계만 SQL, 표 구성은 공통 코드)"""
+        if 기준선택 not in self.columns:
+            기준선택 = "year_month"
+        return build_flow_tables(
+            self.aggregate_flow(filter_args, 기준선택, group_col),
+            기준선택,
+            group_col,
+            col_order,
+            show_row_total,
+            show_col_total,
+            has_change=self.period_count(filter_args, 기준선택) >= 2,
+        )
+
+    def rank_groups(self, filter_args, group_col, top_n=None):
+        """rank_groups와 같은 거래금액 내림차순 그룹 목록"""
+        where, params = self._filter_where(filter_args)
+        group = quote_identifier(group_col)
+        limit = "" if top_n is None else f" LIMIT {int(top_n)}"
+        frame = self._fetch(
+            f"SELECT {group}, {self._sum_expr('구매확정금액(원)')} AS total "
+            f"FROM {self._aggregate_source(group_col)} "
+            f"WHERE {where} AND {group} IS NOT NULL "
+            f"GROUP BY {group} ORDER BY total DESC, {group}{limit}",
+            params,
+        )
+        return frame[group_col].tolist()
+
+    # ---------- 드릴다운 ----------
+    def drilldown_sql(
+        self,
+        filter_args,
+        기준선택,
+        selected_period,
+        group_col,
+        selected_group=None,
+        groups=None,
+        sort_col="확정일자",
+        ascending=True,
+        limit=None,
+        offset=0,
+        columns=None,
+    ):
+        """선택 셀의 행을 정렬 후 페이지 구간만 읽는 (SQL, 파라미터)
+
+        정렬 값이 같으면 원래 행 순서를 유지한다 (get_sorted_positions의 안정 정렬과 동일).
+        groups: 상위 N 섹션처럼 그룹이 제한된 표에서 기간 전체를 선택할 때의 그룹 목록
+        """
+        where, params = self._filter_where(filter_args)
+        clauses = [where, f"{quote_identifier(기준선택)} = ?"]
+        params = params + [selected_period]
+        group = quote_identifier(group_col)
+        if selected_group is not None:
+            clauses.append(f"{group} = ?")
+            params.append(selected_group)
+        elif groups is not None:
+            clauses.append(f"{group} IN ({', '.join('?' for _ in groups) or 'NULL'})")
+            params += list(groups)
+        else:
+            clauses.append(f"{group} IS NOT NULL")
+        columns = columns or [col for col in DETAIL_COLUMNS if col in self.columns]
+        select = ", ".join(quote_identifier(col) for col in columns)
+        direction = "ASC" if ascending else "DESC"
+        page = "" if limit is None else f" LIMIT {int(limit)} OFFSET {int(offset)}"
+        return (
+            f"SELECT {select} FROM trades WHERE {' AND '.join(clauses)} "
+            f"ORDER BY {quote_identifier(sort_col)} {direction} NULLS LAST, "
+            f"{self.row_order}{page}",
+            params,
+        )
+
+    def drilldown(self, *args, **kwargs):
+        """선택 셀의 정렬된 페이지 프레임 (인자는 drilldown_sql과 같음)"""
+        return self._fetch(*self.drilldown_sql(*args, **kwargs))
+
+
+# ================= pandas 경로와 결과 비교 =================
+def load_processed(path):
+    """비교 기준이 되는 전처리 데이터셋 (Parquet은 저장된 결과, CSV는 다시 전처리)"""
+    if path.lower().endswith(".parquet"):
+        df = pd.read_parquet(path)
+        df.attrs["dataset_version"] = dataset_version(df)
+        return df
+    return add_date_columns(load_csv_file(path))
+
+
+def _parity_filter_cases(df):
+    """기본 조건, 최근 1년 청과(벼/찰벼 제외), 첫 판매자 구분, 품목 다중 선택"""
+    full = default_filter_args(df)
+    end = df["확정일자"].max()
+    recent = (
+        ((end - pd.Timedelta(days=365)).date(), end.date()),
+        "청과",
+        True,
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+    )
+    seller_type = df["판매자구분"].dropna().iloc[0]
+    seller = full[:5] + (seller_type,) + full[6:]
+    # 다중 선택: 처음 나온 품목 3개
+    items = tuple(df["품목"].dropna().unique()[:3])
+    multi = full[:4] + (items,) + full[5:]
+    return {
+        "전체": full,
+        "최근 1년 청과": recent,
+        f"판매자구분={seller_type}": seller,
+        f"품목 {len(items)}개": multi,
+    }
+
+
+def _assert_same(name, expected, actual, failures):
+    try:
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(
+                expected.reset_index(drop=True), actual.reset_index(drop=True)
+            )
+        elif expected is None or actual is None:
+            assert expected is None and actual is None
+        else:
+            assert list(expected) == list(actual), (expected[:5], actual[:5])
+    except AssertionError as e:
+        failures.append((name, str(e).splitlines()[0] if str(e) else "불일치"))
+
+
+def check_parity(df, backend, group_cols=("구분", "품목", "판매자세부구분", "판매자")):
+    """같은 데이터셋에 대해 pandas 경로와 SQL 백엔드의 결과 비교 → (비교 수, [(항목, 오류)])"""
+    failures = []
+    checked = 0
+    for label, filter_args in _parity_filter_cases(df).items():
+        expected = filter_data(df, *filter_args)
+        actual = backend.filter_data(*filter_args)
+        _assert_same(f"[{label}] filter_data", expected, actual, failures)
+        checked += 1
+        if expected.empty:
+            continue
+
+        for 기준선택 in PERIOD_COLUMNS:
+            for group_col in group_cols:
+                tables = backend.compute_flow_tables(filter_args, 기준선택, group_col)
+                reference = build_flow_tables(
+                    aggregate_flow(expected, 기준선택, group_col),
+                    기준선택,
+                    group_col,
+                    has_change=expected[기준선택].nunique() >= 2,
+                )
+                for key in ("flow", "pivot_amount_with_total", "change_amount"):
+                    _assert_same(
+                        f"[{label}] {기준선택}×{group_col} {key}",
+                        reference[key],
+                        tables[key],
+                        failures,
+                    )
+                    checked += 1
+
+        for group_col in group_cols:
+            _assert_same(
+                f"[{label}] rank_groups {group_col}",
+                rank_groups(expected, group_col, 20),
+                backend.rank_groups(filter_args, group_col, 20),
+                failures,
+            )
+            checked += 1
+
+        # 드릴다운: 가장 최근 기간 × 최대 그룹, 금액 내림차순 첫 100행
+        기준선택, group_col = "year_month", "품목"
+        period = expected[기준선택].max()
+        group = rank_groups(expected, group_col, 1)[0]
+        positions = drilldown_positions(
+            get_drilldown_index(expected, 기준선택, group_col), period, group
+        )
+        selection = (기준선택, period, group_col, group)
+        ordered = get_sorted_positions(
+            expected, positions, "구매확정금액(원)", False, selection
+        )
+        columns = [col for col in DETAIL_COLUMNS if col in expected.columns]
+        reference = expected.iloc[ordered[:100], expected.columns.get_indexer(columns)]
+        page = backend.drilldown(
+            filter_args,
+            기준선택,
+            period,
+            group_col,
+            group,
+            sort_col="구매확정금액(원)",
+            ascending=False,
+            limit=100,
+        )
+        _assert_same(f"[{label}] drilldown", reference, page, failures)
+        checked += 1
+    return checked, failures
+
+
+def report_parity(df, backend):
+    """비교 결과 출력 후 종료 코드 (불일치 있으면 1)"""
+    checked, failures = check_parity(df, backend)
+    for name, error in failures:
+        print(f"불일치 {name}: {error}")
+    print(f"비교 {checked}건, 불일치 {len(failures)}건")
+    return 1 if failures else 0
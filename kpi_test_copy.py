@@ -1,252 +1,212 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import sqlite3
-import io
-
-st.set_page_config(page_title="거래 대시보드", layout="wide")
-
-
-# 데이터 로드 및 전처리 함수 (기본 CSV 파일)
-@st.cache_data
+import os
+from concurrent.futures import wait
+from kpi_engine import (
+    DEFAULT_CSV_PATH,
+    DEFAULT_TOP_N,
+    DETAIL_COLUMNS,
+    DETAIL_SORT_COLUMNS,
+    EXPORT_FORMATS,
+    FLOW_SECTIONS,
+    HLL_ERROR_PCT,
+    MOVER_DIMENSIONS,
+    TREND_YTD_LABEL,
+    DataLoadError,
+    ExportError,
+    acquire_dataset,
+    compute_dashboard_sections,
+    compute_diversification_tables,
+    compute_flow_tables,
+    compute_overall_kpis,
+    compute_period_kpis,
+    compute_preview,
+    csv_watch_error,
+    dataset_registry_stats,
+    dimension_options,
+    diversification_group_column,
+    drilldown_frame,
+    drilldown_positions,
+    export_chunks_to_file,
+    export_max_bytes,
+    file_dataset_id,
+    filter_data,
+    finish_profile_run,
+    frame_key,
+    get_dataset,
+    get_dimension_index,
+    get_drilldown_index,
+    get_sorted_positions,
+    iter_frame_chunks,
+    iter_position_chunks,
+    load_csv_snapshot,
+    load_uploaded_file,
+    materialize_detail_page,
+    new_export_path,
+    normalize_selection,
+    preview_min_rows,
+    profile_env_enabled,
+    profile_log_path,
+    profile_stage,
+    profiled,
+    start_db_load,
+    start_exact_view,
+    start_export_cleanup,
+    start_profile_run,
+    summarize_counterparties,
+    upload_dataset_id,
+    watch_csv,
+)
+from kpi_sql import SQLBackend, get_configured_backend, sql_backend_label
+
+# 미리보기 모드에서 정확한 결과를 기다리는 시간 (이 안에 끝나면 미리보기 없이 바로 표시)
+EXACT_VIEW_WAIT_S = 0.3
+
+
+# 데이터 로드 및 전처리 함수 (기본 CSV 파일) - 프로세스 공유 데이터셋 임대 반환
+@profiled("load_default_data")
 def load_default_data():
-    encodings = ["cp949", "utf-8", "euc-kr", "utf-8-sig", "latin1"]
-    df = None
-
-    for encoding in encodings:
-        try:
-            df = pd.read_csv("거래데이터_sample.csv", encoding=encoding)
-            break
-        except UnicodeDecodeError:
-            continue
-        except FileNotFoundError:
-            st.error("거래데이터_sample.csv 파일을 찾을 수 없습니다.")
-            return pd.DataFrame()  # 빈 데이터프레임 반환
-        except Exception as e:
-            continue
-
-    if df is None:
-        st.error("기본 CSV 파일을 읽을 수 없습니다. 파일 인코딩을 확인해주세요.")
-        return pd.DataFrame()  # 빈 데이터프레임 반환
-
-    return process_data(df)
+    try:
+        lease = acquire_dataset(
+            file_dataset_id(DEFAULT_CSV_PATH),
+            lambda: load_csv_snapshot(DEFAULT_CSV_PATH),
+            pin="default",
+        )
+        # 기본 CSV에 행이 추가되면 백그라운드에서 추가분만 병합
+        watch_csv(DEFAULT_CSV_PATH, pin="default")
+        watch_error = csv_watch_error(DEFAULT_CSV_PATH)
+        if watch_error is not None:
+            st.sidebar.warning(
+                f"기본 CSV 자동 갱신 실패 ({watch_error['at']}, "
+                f"연속 {watch_error['failures']}회): {watch_error['error']}\n\n"
+                "마지막으로 적재한 데이터를 표시합니다."
+            )
+        return lease
+    except DataLoadError as e:
+        st.error(str(e))
+        return None
 
 
-# 업로드된 파일 처리 함수
+# 업로드된 파일 처리 함수 - 같은 내용의 파일은 세션이 달라도 한 번만 읽음
+@profiled("load_uploaded_data")
 def load_uploaded_data(uploaded_file):
     if uploaded_file is not None:
-        try:
-            if uploaded_file.name.endswith(".csv"):
-                # CSV 파일 처리 - 다양한 인코딩 시도
-                encodings = ["cp949", "utf-8", "euc-kr", "utf-8-sig", "latin1"]
-                df = None
-
-                for encoding in encodings:
-                    try:
-                        # 파일 포인터를 처음으로 되돌림
-                        uploaded_file.seek(0)
-                        df = pd.read_csv(uploaded_file, encoding=encoding)
-                        st.sidebar.success(
-                            f"✅ 파일이 {encoding} 인코딩으로 성공적으로 읽혔습니다."
-                        )
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                    except Exception as e:
-                        continue
-
-                if df is None:
-                    st.error(
-                        "지원하는 인코딩으로 파일을 읽을 수 없습니다. 파일 인코딩을 확인해주세요."
-                    )
-                    return None
+        # 같은 업로드에 대해 재실행마다 내용 해시를 다시 계산하지 않음
+        current = st.session_state.get("dataset_lease")
+        if (
+            current is not None
+            and st.session_state.get("uploaded_file_id") == uploaded_file.file_id
+            and current.dataset_id.startswith("upload:")
+        ):
+            return current
 
-            elif uploaded_file.name.endswith((".xlsx", ".xls")):
-                # Excel 파일 처리
-                df = pd.read_excel(uploaded_file)
-            else:
-                st.error(
-                    "지원하지 않는 파일 형식입니다. CSV 또는 Excel 파일을 업로드해주세요."
+        def build():
+            df, encoding = load_uploaded_file(uploaded_file, uploaded_file.name)
+            if encoding is not None:
+                st.sidebar.success(
+                    f"✅ 파일이 {encoding} 인코딩으로 성공적으로 읽혔습니다."
                 )
-                return None
-            return process_data(df)
+            return df
+
+        try:
+            lease = acquire_dataset(
+                upload_dataset_id(uploaded_file.getvalue(), uploaded_file.name),
+                build,
+            )
+            st.session_state.uploaded_file_id = uploaded_file.file_id
+            return lease
+        except DataLoadError as e:
+            st.error(str(e))
+            return None
         except Exception as e:
             st.error(f"파일 로드 중 오류가 발생했습니다: {str(e)}")
             return None
     return None
 
 
-# DB 연결 및 데이터 로드 함수
-def load_db_data(db_type, connection_params, query):
-    try:
-        if db_type == "SQLite":
-            conn = sqlite3.connect(connection_params["db_path"])
-        elif db_type == "MySQL":
-            try:
-                import mysql.connector
-
-                conn = mysql.connector.connect(**connection_params)
-            except ImportError:
-                st.error(
-                    "MySQL 연결을 위해 mysql-connector-python 패키지를 설치해주세요."
-                )
-                return None
-        elif db_type == "PostgreSQL":
-            try:
-                import psycopg2
+# DB 적재 진행 상황 - 조회는 백그라운드에서 실행되고 화면은 이전 데이터셋을 유지
+@st.fragment(run_every=0.5)
+def _db_load_progress():
+    job = st.session_state.get("db_load_job")
+    if job is None:
+        return
+    if job.finished:
+        # 전체 재실행에서 새 데이터셋으로 교체
+        st.rerun()
+    progress = job.progress()
+    stage = "조회 중" if progress["status"] == "running" else "전처리 중"
+    st.caption(
+        f"⏳ {stage}... {progress['rows']:,}행 ({progress['chunks']}개 청크), "
+        f"{progress['elapsed_s']:.0f}초"
+    )
+    if progress["status"] == "running" and st.button("⏹ 조회 취소", key="cancel_db_load"):
+        job.cancel()
+
+
+# 완료된 DB 적재 결과 반영 - 성공하면 세션의 데이터셋을 한 번에 교체
+def _apply_db_load_result(job):
+    progress = job.progress()
+    del st.session_state["db_load_job"]
+    if progress["status"] == "done":
+        st.session_state.dataset_lease = job.lease
+        st.sidebar.success("✅ 데이터베이스 연결 성공!")
+        st.sidebar.info(f"📊 데이터 행 수: {len(get_dataset(job.lease.dataset_id)):,}개")
+    elif progress["status"] == "cancelled":
+        st.sidebar.info("조회를 취소했습니다. 이전 데이터를 계속 표시합니다.")
+    else:
+        st.sidebar.error(f"❌ {progress['error']}")
 
-                conn = psycopg2.connect(**connection_params)
-            except ImportError:
-                st.error(
-                    "PostgreSQL 연결을 위해 psycopg2-binary 패키지를 설치해주세요."
-                )
-                return None
-        else:
-            st.error("지원하지 않는 데이터베이스 유형입니다.")
-            return None
 
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        return process_data(df)
-    except Exception as e:
-        st.error(f"데이터베이스 연결 중 오류가 발생했습니다: {str(e)}")
+# SQL 조회 백엔드 (KPI_BACKEND=duckdb/sqlite) - 데이터는 조회 조건에 맞는 행만 읽음
+def load_sql_backend():
+    try:
+        return get_configured_backend()
+    except DataLoadError as e:
+        st.error(str(e))
         return None
 
 
-# 공통 데이터 전처리 함수
-def process_data(df):
-    # 날짜 컬럼 처리
-    df["확정일자"] = pd.to_datetime(df["확정일자"], errors="coerce")
-    df["판매자가입일"] = pd.to_datetime(df["판매자가입일자"], errors="coerce")
-    df["구매자가입일"] = pd.to_datetime(df["구매자가입일자"], errors="coerce")
-    # 거래유형 보정
-    df["거래유형보정"] = df["거래유형"].map(
-        {
-            1: "1유형",
-            2: "3유형",
-            3: "2유형",
-            4: "4유형",
-            5: "4유형",
-            "": "2유형",
-            9: "2유형",
-            None: "2유형",
-        }
-    )
-
-    # 거래방식 보정
-    df["거래방식보정"] = df["거래방식"].map(
-        {
-            "정가거래": "정가거래",
-            "간편거래": "정가거래",
-            "입찰거래": "입찰거래",
-            "발주거래": "발주거래",
-            "기획전": "기획전",
-            "특화상품": "특화상품",
-        }
-    )
-
-    # 판매자세부구분
-    def 분류함수(row):
-        if (
-            row["구분"] == "청과"
-            and row["판매자구분"] == "위탁판매자"
-            and pd.notnull(row["판매자"])
-            and ("농협" in row["판매자"] or "농업협동" in row["판매자"])
-        ):
-            return "농협"
-        elif row["구분"] == "청과" and row["판매자구분"] == "위탁판매자":
-            return "도매법인"
-        elif row["구분"] == "청과" and row["판매자구분"] == "직접판매자":
-            return "직접판매자"
-        elif (
-            row["구분"] == "양곡"
-            and row["판매자구분"] == "위탁판매자"
-            and pd.notnull(row["판매자"])
-            and ("농협" in row["판매자"] or "농업협동" in row["판매자"])
-        ):
-            return "농협"
-        elif row["구분"] == "양곡" and row["판매자구분"] == "위탁판매자":
-            return "도매법인"
-        elif row["구분"] == "양곡" and row["판매자구분"] == "직접판매자":
-            return "직접판매자"
-        elif (
-            row["구분"] == "수산"
-            and row["판매자구분"] == "위탁판매자"
-            and pd.notnull(row["판매자"])
-            and ("수협" in row["판매자"] or "수업협동" in row["판매자"])
-        ):
-            return "수협"
-        elif row["구분"] == "수산" and row["판매자구분"] == "위탁판매자":
-            return "도매법인"
-        elif row["구분"] == "수산" and row["판매자구분"] == "매수판매자":
-            return "매수판매자"
-        elif row["구분"] == "수산" and row["판매자구분"] == "직접판매자":
-            return "직접판매자"
-
-        elif row["구분"] == "축산" and "돈육" in row["품목"]:
-            return "돼지고기"
-        elif row["구분"] == "축산" and "한우" in row["품목"]:
-            return "소고기"
-        elif row["구분"] == "축산" and "닭" in row["품목"]:
-            return "닭고기"
-        elif row["구분"] == "축산" and "조란" in row["품목"]:
-            return "계란"
-        elif row["구분"] == "축산" and "알" in row["품목"]:
-            return "축산가공"
-        else:
-            return row["판매자구분"]
-
-    df["판매자세부구분"] = df.apply(분류함수, axis=1)
-    # 수치형 컬럼 처리
-    numeric_columns = [
-        "주문수량",
-        "주문물량",
-        "주문단가(원)",
-        "주문금액(원)",
-        "구매확정수량",
-        "구매확정물량",
-        "구매확정단가(원)",
-        "구매확정금액(원)",
-    ]
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    # 결측값 처리
-    df = df.dropna(subset=["확정일자", "구매확정금액(원)"])
-    return df
+# 사이드바 선택지 사전 (데이터셋/백엔드별로 한 번 생성)
+def _dimension_index(source):
+    if isinstance(source, SQLBackend):
+        return source.dimension_index()
+    return get_dimension_index(source)
 
 
-# 날짜, 필터 컬럼 추가
-def add_date_columns(df):
-    df = df.copy()
-    df["year"] = df["확정일자"].dt.year
-    df["year_quarter"] = (
-        df["year"].astype(str) + "-Q" + df["확정일자"].dt.quarter.astype(str)
+# 다중 선택 필터 - 아무것도 고르지 않으면 "전체", 고른 값은 tuple (캐시 키로 사용)
+def _multiselect_filter(label, options):
+    return normalize_selection(
+        st.sidebar.multiselect(label, options, placeholder="전체")
     )
-    df["year_month"] = df["확정일자"].dt.strftime("%Y-%m")
-    df["year_week"] = df["확정일자"].dt.strftime(
-        "%Y-%V"
-    )  # ISO 주차 표기법 사용(%Y-%V): 월~일 기준 (1주는 월요일부터 시작)
-    return df
 
 
 # 사이드바 필터
-def create_sidebar_filters(df):
+def create_sidebar_filters(default_lease):
     st.sidebar.header("📊 데이터 소스 선택")
 
-    # 데이터 소스 모드 선택
+    # 데이터 소스 모드 선택 (SQL 백엔드가 설정되어 있으면 기본 소스로 사용)
+    data_sources = ["기본 CSV 파일", "파일 업로드", "데이터베이스 연결"]
+    backend_label = sql_backend_label()
+    if backend_label is not None:
+        data_sources.insert(0, backend_label)
     data_source_mode = st.sidebar.selectbox(
         "데이터 소스를 선택하세요:",
-        ["기본 CSV 파일", "파일 업로드", "데이터베이스 연결"],
+        data_sources,
         key="data_source_mode",
     )
 
     st.sidebar.markdown("---")
 
-    # 세션 상태에서 현재 사용 중인 데이터프레임 관리
-    if "current_df" not in st.session_state:
-        st.session_state.current_df = df
+    # 세션은 데이터셋 임대(id)만 보관하고 데이터는 프로세스 전체에서 공유
+    # 기본 데이터를 보던 세션은 기본 CSV가 갱신되면 새 데이터셋으로 교체
+    current = st.session_state.get("dataset_lease")
+    if current is None or (
+        default_lease is not None
+        and current.dataset_id == st.session_state.get("default_dataset_id")
+    ):
+        st.session_state.dataset_lease = default_lease
+    if default_lease is not None:
+        st.session_state.default_dataset_id = default_lease.dataset_id
 
     if data_source_mode == "파일 업로드":
         uploaded_file = st.sidebar.file_uploader(
@@ -257,13 +217,15 @@ def create_sidebar_filters(df):
 
         if uploaded_file is not None:
             # 업로드된 파일로 데이터 다시 로드
-            new_df = load_uploaded_data(uploaded_file)
-            if new_df is not None:
-                st.session_state.current_df = new_df
+            new_lease = load_uploaded_data(uploaded_file)
+            if new_lease is not None:
+                st.session_state.dataset_lease = new_lease
                 st.sidebar.success(
                     f"✅ {uploaded_file.name} 파일이 성공적으로 로드되었습니다!"
                 )
-                st.sidebar.info(f"📊 데이터 행 수: {len(new_df):,}개")
+                st.sidebar.info(
+                    f"📊 데이터 행 수: {len(get_dataset(new_lease.dataset_id)):,}개"
+                )
             else:
                 st.sidebar.error("❌ 파일 로드에 실패했습니다.")
         else:
@@ -327,76 +289,126 @@ def create_sidebar_filters(df):
 
         if st.sidebar.button("🔗 데이터베이스 연결", key="connect_db"):
             if all(connection_params.values()) and query.strip():
-                with st.sidebar.spinner("데이터베이스에 연결 중..."):
-                    new_df = load_db_data(db_type, connection_params, query)
-                    if new_df is not None:
-                        st.session_state.current_df = new_df
-                        st.sidebar.success("✅ 데이터베이스 연결 성공!")
-                        st.sidebar.info(f"📊 데이터 행 수: {len(new_df):,}개")
-                    else:
-                        st.sidebar.error("❌ 데이터베이스 연결에 실패했습니다.")
+                # 새 요청은 진행 중인 이전 조회를 대체
+                previous = st.session_state.get("db_load_job")
+                if previous is not None:
+                    previous.cancel()
+                st.session_state.db_load_job = start_db_load(
+                    db_type, connection_params, query
+                )
             else:
                 st.sidebar.error("❌ 모든 연결 정보를 입력해주세요.")
 
-    else:  # 기본 CSV 파일
-        if data_source_mode == "기본 CSV 파일" and "current_df" not in st.session_state:
-            st.session_state.current_df = df
-        st.sidebar.info(f"📊 기본 데이터 행 수: {len(st.session_state.current_df):,}개")
+        job = st.session_state.get("db_load_job")
+        if job is not None and job.finished:
+            _apply_db_load_result(job)
+        elif job is not None:
+            with st.sidebar:
+                _db_load_progress()
+
+    # 현재 사용 중인 데이터셋 (레지스트리의 공유 DataFrame, 읽기 전용)
+    # SQL 백엔드 소스(Parquet/웨어하우스)는 DataFrame 대신 백엔드를 사용하며 전체 행을 읽지 않음
+    if backend_label is not None and data_source_mode == backend_label:
+        df = load_sql_backend()
+    else:
+        lease = st.session_state.dataset_lease
+        df = get_dataset(lease.dataset_id) if lease is not None else None
+    if df is None:
+        st.warning("표시할 데이터가 없습니다. 파일을 업로드하거나 데이터베이스에 연결해주세요.")
+        st.stop()
 
-    # 현재 사용 중인 데이터프레임 사용
-    df = st.session_state.current_df
+    if data_source_mode == "기본 CSV 파일":
+        st.sidebar.info(f"📊 기본 데이터 행 수: {len(df):,}개")
 
     st.sidebar.header("🔍 필터 설정")
     # 기준선택 (add_date_columns에서 생성한 컬럼 포함)
     date_columns = ["year", "year_quarter", "year_month", "year_week"]
     기준선택 = st.sidebar.selectbox("기준선택", date_columns, key="기준선택")
     # 조회기간 - 데이터의 실제 확정일자 범위 내에서만 선택 가능
-    min_date = df["확정일자"].min().date()
-    max_date = df["확정일자"].max().date()
+    if isinstance(df, SQLBackend):
+        min_date, max_date = df.date_bounds()
+    else:
+        min_date = df["확정일자"].min().date()
+        max_date = df["확정일자"].max().date()
     date_range = st.sidebar.date_input(
         " 조회 기간",
         value=(min_date, max_date),
         min_value=min_date,
         max_value=max_date,
     )
-    # 구분
-    구분_options = ["전체"] + list(df["구분"].dropna().unique())
-    selected_구분 = st.sidebar.selectbox(" 구분", 구분_options)
+    # 구분 (이하 선택지는 상위 선택에서 존재하는 값만 표시)
+    dimensions = _dimension_index(df)
+    구분_options = dimension_options(dimensions, "구분")
+    selected_구분 = _multiselect_filter(" 구분", 구분_options)
     # 벼,찰벼 품목 제외
     exclude_rice = st.sidebar.checkbox("벼,찰벼 품목 제외", value=False)
     # 부류
-    부류_options = ["전체"] + list(df["부류"].dropna().unique())
-    selected_부류 = st.sidebar.selectbox(" 부류", 부류_options)
+    부류_options = dimension_options(dimensions, "부류", {"구분": selected_구분})
+    selected_부류 = _multiselect_filter(" 부류", 부류_options)
     # 품목
-    품목_options = ["전체"] + list(df["품목"].dropna().unique())
-    selected_품목 = st.sidebar.selectbox(" 품목", 품목_options)
+    품목_options = dimension_options(
+        dimensions,
+        "품목",
+        {"구분": selected_구분, "부류": selected_부류},
+        exclude_rice,
+    )
+    selected_품목 = _multiselect_filter(" 품목", 품목_options)
     # 판매자 구분
-    seller_type_options = ["전체"] + list(df["판매자구분"].dropna().unique())
-    selected_seller_type = st.sidebar.selectbox(" 판매자 구분", seller_type_options)
+    seller_type_options = dimension_options(dimensions, "판매자구분")
+    selected_seller_type = _multiselect_filter(" 판매자 구분", seller_type_options)
     # 판매자 세부구분
-    seller_dtl_type_options = ["전체"] + list(df["판매자세부구분"].dropna().unique())
-    selected_seller_dtl_type = st.sidebar.selectbox(
+    seller_dtl_type_options = dimension_options(
+        dimensions, "판매자세부구분", {"판매자구분": selected_seller_type}
+    )
+    selected_seller_dtl_type = _multiselect_filter(
         " 판매자 세부 구분", seller_dtl_type_options
     )
     # 구매자 구분
-    buyer_type_options = ["전체"] + list(df["구매자구분"].dropna().unique())
-    selected_buyer_type = st.sidebar.selectbox(" 구매자 구분", buyer_type_options)
+    buyer_type_options = dimension_options(dimensions, "구매자구분")
+    selected_buyer_type = _multiselect_filter(" 구매자 구분", buyer_type_options)
     # 거래유형 보정
-    trade_type_options = ["전체"] + list(df["거래유형보정"].dropna().unique())
-    selected_trade_type = st.sidebar.selectbox(" 거래유형 보정", trade_type_options)
+    trade_type_options = dimension_options(dimensions, "거래유형보정")
+    selected_trade_type = _multiselect_filter(" 거래유형 보정", trade_type_options)
     st.sidebar.markdown("---")
     all_products = st.sidebar.checkbox("품목 전체 보기", value=False)
     if all_products:
         top_n = None
     else:
         top_n = st.sidebar.number_input(
-            "품목별 거래흐름 상위 N개", min_value=1, max_value=100, value=20, step=1
+            "품목별 거래흐름 상위 N개",
+            min_value=1,
+            max_value=100,
+            value=DEFAULT_TOP_N,
+            step=1,
         )
 
     st.sidebar.markdown("---")
     st.sidebar.markdown("**표 표시 옵션**")
     show_row_total = st.sidebar.checkbox("행합계 표시", value=True)
     show_col_total = st.sidebar.checkbox("열합계 표시", value=True)
+    st.sidebar.checkbox(
+        "회원/품목 수 근사 집계(HyperLogLog)",
+        value=False,
+        key="approx_distinct",
+        help=f"고유 개수를 스케치 병합으로 계산합니다 (오차 약 ±{HLL_ERROR_PCT:.1f}%). "
+        "감사용 정확한 값은 해제하세요.",
+    )
+    preview_rows = preview_min_rows()
+    st.sidebar.checkbox(
+        "대용량 미리보기(표본 근사)",
+        value=False,
+        key="preview_mode",
+        disabled=isinstance(df, SQLBackend) or len(df) < preview_rows,
+        help=f"{preview_rows:,}행 이상 데이터셋에서 층화 표본 추정치(95% 신뢰구간)를 "
+        "먼저 표시하고, 정확한 결과가 준비되면 자동으로 교체합니다.",
+    )
+    st.sidebar.checkbox(
+        "성능 계측(디버그)",
+        value=profile_env_enabled(),
+        key="profile_enabled",
+        help="단계별 실행 시간, 행 수, 최대 메모리 할당을 표시하고 "
+        f"{profile_log_path()} 에 기록합니다.",
+    )
 
     return (
         df,  # 수정된 데이터프레임 반환
@@ -416,67 +428,131 @@ def create_sidebar_filters(df):
     )
 
 
-# 데이터 필터링
-def filter_data(
-    df,
-    date_range,
-    구분,
-    exclude_rice,
-    부류,
-    품목,
-    seller_type,
-    seller_dtl_type,
-    buyer_type,
-    trade_type,
-):
-    filtered_df = df.copy()
-    # 날짜 필터
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_df = filtered_df[
-            (filtered_df["확정일자"].dt.date >= start_date)
-            & (filtered_df["확정일자"].dt.date <= end_date)
-        ]
-    # 구분
-    if 구분 != "전체":
-        filtered_df = filtered_df[filtered_df["구분"] == 구분]
-    # 벼,찰벼 품목 제외
-    if exclude_rice:
-        filtered_df = filtered_df[~filtered_df["품목"].isin(["벼", "찰벼"])]
-    # 부류
-    if 부류 != "전체":
-        filtered_df = filtered_df[filtered_df["부류"] == 부류]
-    # 품목
-    if 품목 != "전체":
-        filtered_df = filtered_df[filtered_df["품목"] == 품목]
-    # 판매자 구분
-    if seller_type != "전체":
-        filtered_df = filtered_df[filtered_df["판매자구분"] == seller_type]
-    # 판매자 세부구분
-    if seller_dtl_type != "전체":
-        filtered_df = filtered_df[filtered_df["판매자세부구분"] == seller_dtl_type]
-    # 구매자 구분
-    if buyer_type != "전체":
-        filtered_df = filtered_df[filtered_df["구매자구분"] == buyer_type]
-    # 거래유형 보정
-    if trade_type != "전체":
-        filtered_df = filtered_df[filtered_df["거래유형보정"] == trade_type]
-    return filtered_df
+# 근사 집계 모드 (사이드바 토글)
+def _approx_distinct_enabled():
+    return st.session_state.get("approx_distinct", False)
+
+
+# 표본 미리보기 모드 (사이드바 토글, KPI_PREVIEW_MIN_ROWS 이상 데이터셋만)
+def _preview_enabled(df):
+    return (
+        st.session_state.get("preview_mode", False)
+        and not isinstance(df, SQLBackend)
+        and len(df) >= preview_min_rows()
+    )
+
+
+# 성능 계측 모드 (사이드바 토글, 기본값은 KPI_PROFILE 환경변수)
+def _profiling_enabled():
+    return st.session_state.get("profile_enabled", profile_env_enabled())
+
+
+# Plotly 그래프 표시 (계측 시 직렬화/전송 시간을 별도 구간으로 기록)
+def _plotly_chart(fig):
+    with profile_stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# 추세선 선택 (기본 없음) - 선은 집계 표와 함께 캐시되어 있어 켜고 꺼도 다시 계산하지 않음
+def _select_trend_lines(trends, key):
+    return st.multiselect("추세선", list(trends), placeholder="없음", key=key)
+
+
+# 그룹별 추세선 추가 - 이동평균은 같은 축의 점선, 연누계는 오른쪽 보조축
+def _add_trend_lines(fig, trends, selected):
+    if not selected:
+        return
+    # 그룹 색은 기존 막대/선과 동일하게
+    colors = {
+        trace.name: (
+            trace.line.color if trace.type == "scatter" else trace.marker.color
+        )
+        for trace in fig.data
+    }
+    dashes = ["dash", "dot", "longdash"]
+    for i, name in enumerate(selected):
+        on_secondary = name == TREND_YTD_LABEL
+        for group, line in trends[name].items():
+            fig.add_scatter(
+                x=line.index,
+                y=line.to_numpy(),
+                mode="lines",
+                name=f"{group} {name}",
+                legendgroup=str(group),
+                line=dict(
+                    color=colors.get(str(group)),
+                    width=2,
+                    dash="dashdot" if on_secondary else dashes[i % len(dashes)],
+                ),
+                yaxis="y2" if on_secondary else "y",
+            )
+    if TREND_YTD_LABEL in selected:
+        fig.update_layout(
+            yaxis2=dict(overlaying="y", side="right", title=TREND_YTD_LABEL)
+        )
+
+
+# 이번 실행의 단계별 계측 결과 (사이드바)
+def _render_profile_panel(record):
+    rows = [
+        {
+            "단계": "· " * stage["depth"] + stage["name"],
+            "시간(ms)": stage.get("wall_s", 0.0) * 1000,
+            "입력 행": stage["rows_in"],
+            "출력 행": stage["rows_out"],
+            "최대 할당(MB)": stage.get("peak_bytes", 0) / 1_048_576,
+        }
+        for stage in record["stages"]
+    ]
+    with st.sidebar.expander("⏱ 성능 계측 (이번 실행)", expanded=True):
+        st.caption(
+            f"총 {record['total_s'] * 1000:,.0f} ms · "
+            f"프레임 복사 {record['frame_copies']}회 ({record['copied_rows']:,}행) · "
+            f"로그: {profile_log_path()}"
+        )
+        if rows:
+            st.dataframe(
+                pd.DataFrame(rows).style.format(
+                    {
+                        "시간(ms)": "{:,.1f}",
+                        "입력 행": "{:,.0f}",
+                        "출력 행": "{:,.0f}",
+                        "최대 할당(MB)": "{:,.1f}",
+                    },
+                    na_rep="",
+                ),
+                hide_index=True,
+                use_container_width=True,
+            )
+        # 프로세스 공유 데이터셋 (참조 수 = 사용 중인 세션 수)
+        datasets = pd.DataFrame(dataset_registry_stats())
+        if not datasets.empty:
+            st.caption("공유 데이터셋")
+            st.dataframe(
+                datasets.style.format({"memory_mb": "{:,.1f}"}),
+                hide_index=True,
+                use_container_width=True,
+            )
 
 
 # KPI 표시 함수
+@profiled("display_kpi_section")
 def display_kpi_section(df, title="주요 KPI", period_text="출범 이후"):
     st.markdown(
         f"<h2 style='margin-bottom:0'>{title} <span style='font-size:16px;color:#888'>({period_text})</span></h2>",
         unsafe_allow_html=True,
     )
     col1, col2, col3, col4 = st.columns(4)
-    # KPI 계산
-    total_sales = df["구매확정금액(원)"].sum() / 1_000_000
-    total_orders = len(df)
-    unique_products = df["품목"].nunique()
-    unique_sellers = df["판매자"].nunique() if "판매자" in df.columns else 0
-    unique_buyers = df["구매자"].nunique() if "구매자" in df.columns else 0
+    # KPI 계산 (데이터셋 버전별 스냅샷 사용, SQL 백엔드는 백엔드 집계)
+    if isinstance(df, SQLBackend):
+        kpis = df.overall_kpis()
+    else:
+        kpis = compute_overall_kpis(df, approx=_approx_distinct_enabled())
+    total_sales = kpis["total_amount"] / 1_000_000
+    total_orders = kpis["total_orders"]
+    unique_products = kpis["distinct"].get("품목", 0)
+    unique_sellers = kpis["distinct"].get("판매자", 0)
+    unique_buyers = kpis["distinct"].get("구매자", 0)
     # 증감률 예시(전년대비, 실제 데이터에 맞게 수정 필요)
     #     <div style='font-size:15px;color:#ff6b6b'>▼{abs(sales_change)}% <span style='color:#eee'>vs. 2019</span></div>
     # sales_change = -2.8
@@ -528,55 +604,63 @@ def display_kpi_section(df, title="주요 KPI", period_text="출범 이후"):
         )
 
 
-def display_kpi_period_section(df, title="주요 KPI", period_text="조회 기간"):
+@profiled("display_kpi_period_section")
+def display_kpi_period_section(
+    df, title="주요 KPI", period_text="조회 기간", base_df=None, kpis=None
+):
     st.markdown(f"### {title} ({period_text})")
     col1, col2, col3, col4, col5, col6, col7, col8 = st.columns(8)
+    # 고유 개수 - 근사 모드에서는 전체 데이터의 스케치를 필터 조건으로 병합
+    # (미리보기는 compute_preview가 계산한 kpis를 그대로 사용)
+    if kpis is None:
+        kpis = compute_period_kpis(
+            df, base_df=base_df, approx=_approx_distinct_enabled()
+        )
+    approx_prefix = "≈" if kpis["approx"] else ""
+    approx_help = (
+        f"HyperLogLog 근사값 (오차 약 ±{HLL_ERROR_PCT:.1f}%)" if kpis["approx"] else None
+    )
+
     with col1:
-        total_sales = df["구매확정금액(원)"].sum() / 1_000_000
+        total_sales = kpis["total_amount"] / 1_000_000
         st.metric(" 총 매출액", f"{total_sales:,.0f}백만원")
     # 누적 거래금액, 일평균, 연말예상
-    if not df.empty:
-        min_date = df["확정일자"].min()
-        max_date = df["확정일자"].max()
-        days = (max_date - min_date).days + 1
-        total_amt = df["구매확정금액(원)"].sum()
-        daily_avg = total_amt / days if days > 0 else 0
-        # 올해 12월31일까지 남은 일수
-        year = max_date.year
-        from datetime import datetime
-
-        end_of_year = datetime(year, 12, 31)
-        days_left = (end_of_year - max_date).days
-        days_left = max(days_left, 0)  # 음수 방지
-        expected_amt = total_amt + (daily_avg * days_left)
+    if kpis["daily_avg"] is not None:
         with col2:
-            st.metric("일평균 거래금액", f"{daily_avg/1_000_000:,.0f}백만원")
+            st.metric("일평균 거래금액", f"{kpis['daily_avg']/1_000_000:,.0f}백만원")
         with col3:
             st.metric(
-                f"연말(12.31) 예상 거래액", f"{expected_amt/1_000_000:,.0f}백만원"
+                f"연말(12.31) 예상 거래액",
+                f"{kpis['expected_amount']/1_000_000:,.0f}백만원",
             )
 
     with col4:
-        total_orders = len(df)
-        st.metric(" 총 거래 건수", f"{total_orders:,}건")
+        st.metric(" 총 거래 건수", f"{kpis['total_orders']:,}건")
     with col5:
-        unique_products = df["품목"].nunique()
-        st.metric(" 거래 품목 수", f"{unique_products:,} 품목")
+        unique_products = kpis["distinct"].get("품목", 0)
+        st.metric(
+            " 거래 품목 수",
+            f"{approx_prefix}{unique_products:,} 품목",
+            help=approx_help,
+        )
     with col6:
         # 최고 매출 품목
-        if not df.empty:
-            top_product = df.groupby("품목")["구매확정금액(원)"].sum().idxmax()
-            st.metric(" 최고 매출 품목", top_product)
-        else:
-            st.metric(" 최고 매출 품목", "-")
+        st.metric(" 최고 매출 품목", kpis["top_product"] or "-")
     with col7:
-        unique_sellers = df["판매자"].nunique() if "판매자" in df.columns else 0
-        unique_buyers = df["구매자"].nunique() if "구매자" in df.columns else 0
-        st.metric("회원 수(판매/구매)", f"{unique_sellers:,}/{unique_buyers:,}")
+        unique_sellers = kpis["distinct"].get("판매자", 0)
+        unique_buyers = kpis["distinct"].get("구매자", 0)
+        st.metric(
+            "회원 수(판매/구매)",
+            f"{approx_prefix}{unique_sellers:,}/{unique_buyers:,}",
+            help=approx_help,
+        )
 
 
 # 거래 분석 섹션
-def display_item_analysis(df, top_n=None, show_row_total=True, show_col_total=True):
+@profiled("display_item_analysis")
+def display_item_analysis(
+    df, top_n=None, show_row_total=True, show_col_total=True, sections=None
+):
 
     st.markdown("## 📊 통계")
 
@@ -598,6 +682,11 @@ def display_item_analysis(df, top_n=None, show_row_total=True, show_col_total=Tr
     기준선택 = (
         st.session_state["기준선택"] if "기준선택" in st.session_state else "year_month"
     )
+    # 섹션 집계 (main에서 미리 동시 계산한 결과가 없으면 여기서 계산)
+    if sections is None:
+        sections = compute_dashboard_sections(
+            df, 기준선택, top_n, show_row_total, show_col_total
+        )
 
     # 탭 생성
     (
@@ -622,291 +711,111 @@ def display_item_analysis(df, top_n=None, show_row_total=True, show_col_total=Tr
     with tab_거래분석:
         # 1. 구분별 거래 흐름
         st.markdown("#### 구분별")
-        category_order = ["청과", "축산", "양곡", "수산"]
-        _display_flow_section(
-            df,
+        _render_flow_section(
+            sections["구분"],
             기준선택,
             "구분",
-            category_order,
+            show_row_total,
+            show_col_total,
             color_map={
                 "청과": "#2ca02c",
                 "축산": "#e377c2",
                 "양곡": "#ff7f0e",
                 "수산": "#1f77b4",
             },
-            show_row_total=show_row_total,
-            show_col_total=show_col_total,
         )
 
         # 2. 판매자구분별 거래 흐름
         st.markdown("#### 판매자 구분별")
-        seller_order = sorted(df["판매자구분"].dropna().unique())
-        _display_flow_section(
-            df,
-            기준선택,
-            "판매자구분",
-            seller_order,
-            show_row_total=show_row_total,
-            show_col_total=show_col_total,
+        _render_flow_section(
+            sections["판매자구분"], 기준선택, "판매자구분", show_row_total, show_col_total
         )
 
         # 3. 판매자세부구분별 거래 흐름
         st.markdown("#### 판매자 세부구분별")
-        seller_detail_order = sorted(df["판매자세부구분"].dropna().unique())
-        _display_flow_section(
-            df,
+        _render_flow_section(
+            sections["판매자세부구분"],
             기준선택,
             "판매자세부구분",
-            seller_detail_order,
-            show_row_total=show_row_total,
-            show_col_total=show_col_total,
+            show_row_total,
+            show_col_total,
         )
 
         # 4. 거래유형보정별 거래 흐름
         st.markdown("#### 거래유형보정별")
-        trade_type_order = sorted(df["거래유형보정"].dropna().unique())
-        _display_flow_section(
-            df,
+        _render_flow_section(
+            sections["거래유형보정"],
             기준선택,
             "거래유형보정",
-            trade_type_order,
-            show_row_total=show_row_total,
-            show_col_total=show_col_total,
+            show_row_total,
+            show_col_total,
         )
 
     # 품목분석 탭
     with tab_품목분석:
         # 5. 품목별 거래 흐름 (상위 N개)
         st.markdown("#### 품목별")
-        if top_n is None:
-            # 전체 품목을 거래금액 기준 내림차순으로 정렬
-            product_values = (
-                df.groupby("품목")["구매확정금액(원)"]
-                .sum()
-                .sort_values(ascending=False)
-                .index.tolist()
-            )
-            product_order = product_values
-            _display_flow_section(
-                df,
-                기준선택,
-                "품목",
-                product_order,
-                show_row_total=show_row_total,
-                show_col_total=show_col_total,
-            )
-        else:
-            try:
-                n = int(top_n)
-            except Exception:
-                n = 10
-            top_products = (
-                df.groupby("품목")["구매확정금액(원)"]
-                .sum()
-                .sort_values(ascending=False)
-                .head(n)
-                .index.tolist()
-            )
-            product_order = top_products
-            _display_flow_section(
-                df[df["품목"].isin(product_order)],
-                기준선택,
-                "품목",
-                product_order,
-                show_row_total=show_row_total,
-                show_col_total=show_col_total,
-            )
+        _render_flow_section(
+            sections["품목"], 기준선택, "품목", show_row_total, show_col_total
+        )
 
     # 회원분석 탭
     with tab_회원분석:
         # 6. 판매자별 거래 흐름 (상위 N개)
         st.markdown("#### 판매자별")
-        if top_n is None:
-            # 전체 판매자를 거래금액 기준 내림차순으로 정렬
-            seller_values = (
-                df.groupby("판매자")["구매확정금액(원)"]
-                .sum()
-                .sort_values(ascending=False)
-                .index.tolist()
-            )
-            seller_order = seller_values
-            _display_flow_section(
-                df,
-                기준선택,
-                "판매자",
-                seller_order,
-                show_row_total=show_row_total,
-                show_col_total=show_col_total,
-            )
-        else:
-            try:
-                n = int(top_n)
-            except Exception:
-                n = 10
-            top_sellers = (
-                df.groupby("판매자")["구매확정금액(원)"]
-                .sum()
-                .sort_values(ascending=False)
-                .head(n)
-                .index.tolist()
-            )
-            seller_order = top_sellers
-            _display_flow_section(
-                df[df["판매자"].isin(seller_order)],
-                기준선택,
-                "판매자",
-                seller_order,
-                show_row_total=show_row_total,
-                show_col_total=show_col_total,
-            )
+        _render_flow_section(
+            sections["판매자"], 기준선택, "판매자", show_row_total, show_col_total
+        )
 
         # 7. 구매자별 거래 흐름 (상위 N개)
         st.markdown("#### 구매자별")
-        if top_n is None:
-            # 전체 구매자를 거래금액 기준 내림차순으로 정렬
-            buyer_values = (
-                df.groupby("구매자")["구매확정금액(원)"]
-                .sum()
-                .sort_values(ascending=False)
-                .index.tolist()
-            )
-            buyer_order = buyer_values
-            _display_flow_section(
-                df,
-                기준선택,
-                "구매자",
-                buyer_order,
-                show_row_total=show_row_total,
-                show_col_total=show_col_total,
-            )
-        else:
-            try:
-                n = int(top_n)
-            except Exception:
-                n = 10
-            top_buyers = (
-                df.groupby("구매자")["구매확정금액(원)"]
-                .sum()
-                .sort_values(ascending=False)
-                .head(n)
-                .index.tolist()
-            )
-            buyer_order = top_buyers
-            _display_flow_section(
-                df[df["구매자"].isin(buyer_order)],
-                기준선택,
-                "구매자",
-                buyer_order,
-                show_row_total=show_row_total,
-                show_col_total=show_col_total,
-            )
+        _render_flow_section(
+            sections["구매자"], 기준선택, "구매자", show_row_total, show_col_total
+        )
 
     with tab_거래다양화분석:
 
         # 거래다양화를 위한 특별한 집계 함수 호출
-        _display_diversification_section(df, 기준선택)
+        _display_diversification_section(df, 기준선택, sections["diversification"])
+
+
+# 미리 계산된 흐름 섹션 표시
+def _render_flow_section(
+    section, 기준선택, group_col, show_row_total, show_col_total, color_map=None
+):
+    _display_flow_section(
+        section["df"],
+        기준선택,
+        group_col,
+        section["col_order"],
+        color_map=color_map,
+        show_row_total=show_row_total,
+        show_col_total=show_col_total,
+        tables=section["tables"],
+    )
 
 
 # 거래다양화 분석을 위한 함수
-def _display_diversification_section(df, 기준선택):
+@profiled("diversification")
+def _display_diversification_section(df, 기준선택, tables=None):
     """거래다양화 분석 - 거래방식별 거래건수를 포함한 집계"""
-
-    if 기준선택 not in df.columns:
-        기준선택 = "year_month"
+    # plotly.express는 그래프를 처음 그릴 때 import (시작 시간 단축)
+    import plotly.express as px
 
     # 거래방식 컬럼 확인
-    if "거래방식보정" in df.columns:
-        group_col = "거래방식보정"
-    elif "거래유형보정" in df.columns:
-        group_col = "거래유형보정"
-    elif "거래유형" in df.columns:
-        group_col = "거래유형"
-    else:
+    group_col = diversification_group_column(df)
+    if group_col is None:
         st.warning("거래방식 관련 컬럼을 찾을 수 없습니다.")
         return
 
-    # 구매확정금액, 구매확정물량, 거래건수 모두 집계
-    flow = (
-        df.groupby([기준선택, group_col])
-        .agg(
-            {
-                "구매확정금액(원)": "sum",
-                "구매확정물량": "sum",
-                "확정일자": "count",  # 거래건수
-            }
-        )
-        .reset_index()
-    )
-
-    # 컬럼명 변경 및 단위 변환
-    flow["구매확정금액(백만원)"] = flow["구매확정금액(원)"] / 1_000_000
-    flow["구매확정물량(톤)"] = flow["구매확정물량"] / 1_000
-    flow["거래건수"] = flow["확정일자"]
-
-    # year_week인 경우 시간순 정렬
-    if 기준선택 == "year_week":
-        flow = flow.sort_values(기준선택)
-
-    # 거래방식 순서 정렬 (거래금액 기준 내림차순)
-    group_totals = (
-        flow.groupby(group_col)["구매확정금액(백만원)"]
-        .sum()
-        .sort_values(ascending=False)
-    )
-    col_order = group_totals.index.tolist()
-
-    # 카테고리컬 데이터로 변환하여 순서 지정
-    flow[group_col] = pd.Categorical(
-        flow[group_col], categories=col_order, ordered=True
-    )
-
-    # 금액 피벗 테이블
-    pivot_amount = (
-        flow.pivot(index=기준선택, columns=group_col, values="구매확정금액(백만원)")
-        .fillna(0)
-        .astype(float)
-    )
-    pivot_amount = pivot_amount.reindex(columns=col_order)
-
-    # 물량 피벗 테이블
-    pivot_volume = (
-        flow.pivot(index=기준선택, columns=group_col, values="구매확정물량(톤)")
-        .fillna(0)
-        .astype(float)
-    )
-    pivot_volume = pivot_volume.reindex(columns=col_order)
-
-    # 거래건수 피벗 테이블
-    pivot_count = (
-        flow.pivot(index=기준선택, columns=group_col, values="거래건수")
-        .fillna(0)
-        .astype(int)
-    )
-    pivot_count = pivot_count.reindex(columns=col_order)
-
-    # 합계 행 추가
-    total_row_amount = pd.DataFrame(pivot_amount.sum(axis=0)).T
-    total_row_amount.index = ["합계"]
-
-    total_row_volume = pd.DataFrame(pivot_volume.sum(axis=0)).T
-    total_row_volume.index = ["합계"]
-
-    total_row_count = pd.DataFrame(pivot_count.sum(axis=0)).T
-    total_row_count.index = ["합계"]
-
-    # 합계 열 추가
-    pivot_amount["합계"] = pivot_amount.sum(axis=1)
-    pivot_volume["합계"] = pivot_volume.sum(axis=1)
-    pivot_count["합계"] = pivot_count.sum(axis=1)
-
-    total_row_amount["합계"] = total_row_amount.sum(axis=1)
-    total_row_volume["합계"] = total_row_volume.sum(axis=1)
-    total_row_count["합계"] = total_row_count.sum(axis=1)
-
-    # 최종 테이블 생성
-    pivot_amount_with_total = pd.concat([pivot_amount, total_row_amount])
-    pivot_volume_with_total = pd.concat([pivot_volume, total_row_volume])
-    pivot_count_with_total = pd.concat([pivot_count, total_row_count])
+    # 구매확정금액, 구매확정물량, 거래건수 집계 및 피벗 (미리 계산된 결과가 없을 때)
+    if tables is None:
+        tables = compute_diversification_tables(df, 기준선택, group_col)
+    기준선택 = tables["기준선택"]
+    flow = tables["flow"]
+    pivot_amount_with_total = tables["pivot_amount_with_total"]
+    pivot_volume_with_total = tables["pivot_volume_with_total"]
+    pivot_count_with_total = tables["pivot_count_with_total"]
 
     # 컬럼 레이아웃
     col_table1, col_table2, col_table3 = st.columns([1, 1, 1])
@@ -951,38 +860,8 @@ def _display_diversification_section(df, 기준선택):
         # 거래방식별 요약 통계
         st.markdown("**거래방식별 요약 통계**")
 
-        # 전체 기간 합계
-        summary_stats = (
-            flow.groupby(group_col)
-            .agg(
-                {
-                    "구매확정금액(백만원)": "sum",
-                    "구매확정물량(톤)": "sum",
-                    "거래건수": "sum",
-                }
-            )
-            .reset_index()
-        )
-
-        # 비중 계산
-        total_amount = summary_stats["구매확정금액(백만원)"].sum()
-        total_volume = summary_stats["구매확정물량(톤)"].sum()
-        total_count = summary_stats["거래건수"].sum()
-
-        summary_stats["금액비중(%)"] = (
-            summary_stats["구매확정금액(백만원)"] / total_amount * 100
-        ).round(1)
-        summary_stats["물량비중(%)"] = (
-            summary_stats["구매확정물량(톤)"] / total_volume * 100
-        ).round(1)
-        summary_stats["건수비중(%)"] = (
-            summary_stats["거래건수"] / total_count * 100
-        ).round(1)
-
-        # 정렬 (거래금액 기준 내림차순)
-        summary_stats = summary_stats.sort_values(
-            "구매확정금액(백만원)", ascending=False
-        )
+        # 전체 기간 합계 및 비중 (거래금액 기준 내림차순)
+        summary_stats = tables["summary_stats"]
 
         st.dataframe(
             summary_stats.style.format(
@@ -1003,6 +882,9 @@ def _display_diversification_section(df, 기준선택):
     with col_table3:
         # 그래프 표시
         st.markdown("**거래방식별 추이**")
+        trend_names = _select_trend_lines(
+            tables["trend_amount"], key="trend_trade_type"
+        )
 
         # 그래프 탭
         tab_amount_chart, tab_volume_chart, tab_count_chart = st.tabs(
@@ -1010,8 +892,6 @@ def _display_diversification_section(df, 기준선택):
         )
 
         with tab_amount_chart:
-            import plotly.express as px
-
             # X축 순서 설정
             if 기준선택 == "year_week":
                 x_order = sorted(flow[기준선택].unique())
@@ -1029,7 +909,8 @@ def _display_diversification_section(df, 기준선택):
                 category_orders=category_orders,
             )
             fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            _add_trend_lines(fig, tables["trend_amount"], trend_names)
+            _plotly_chart(fig)
 
         with tab_volume_chart:
             fig = px.line(
@@ -1042,7 +923,8 @@ def _display_diversification_section(df, 기준선택):
                 category_orders=category_orders,
             )
             fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            _add_trend_lines(fig, tables["trend_volume"], trend_names)
+            _plotly_chart(fig)
 
         with tab_count_chart:
             fig = px.line(
@@ -1055,7 +937,28 @@ def _display_diversification_section(df, 기준선택):
                 category_orders=category_orders,
             )
             fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            _add_trend_lines(fig, tables["trend_count"], trend_names)
+            _plotly_chart(fig)
+
+    # 표 내보내기
+    with st.expander("📥 표 내보내기", expanded=False):
+        export_tables = {
+            "금액(백만원)": pivot_amount_with_total,
+            "물량(톤)": pivot_volume_with_total,
+            "건수": pivot_count_with_total,
+        }
+        table_name = st.selectbox(
+            "내보낼 표", list(export_tables), key="export_table_trade_type"
+        )
+        _render_export_controls(
+            df,
+            lambda: iter_frame_chunks(
+                export_tables[table_name], index_label=기준선택
+            ),
+            file_stem=f"{기준선택}_{group_col}_{table_name}",
+            key="export_pivot_trade_type",
+            selection=(기준선택, group_col, table_name),
+        )
 
     # 선택된 셀에 대한 거래내역 표시
     _display_trade_type_transaction_details(
@@ -1136,7 +1039,48 @@ def _display_trade_type_transaction_details(
         )
 
 
+# 증감률 셀 색상 (양수 녹색, 음수 빨간색)
+def _highlight_pos_neg(val):
+    if pd.isna(val):
+        return "color: gray"
+    elif val > 0:
+        return "color: #2ca02c"  # 양수 값은 녹색
+    elif val < 0:
+        return "color: #d62728"  # 음수 값은 빨간색
+    else:
+        return ""
+
+
+# 증감률 표 표시
+def _render_change_table(change_pct, pivot_with_total, label):
+    if change_pct is None:
+        st.info("증감률 계산을 위해서는 2개 이상의 기간이 필요합니다.")
+        return
+    try:
+        styled = change_pct.style.format(lambda x: "-" if pd.isna(x) else f"{x:.1f}%")
+        styled = styled.applymap(_highlight_pos_neg)
+        st.dataframe(
+            styled,
+            use_container_width=True,
+            height=400,
+        )
+    except Exception as e:
+        st.warning(f"{label} 증감률 계산 중 오류가 발생했습니다: {str(e)}")
+        # 오류 발생 시 빈 데이터프레임 표시
+        empty_df = pd.DataFrame(
+            index=pivot_with_total.index,
+            columns=pivot_with_total.columns,
+        )
+        empty_df = empty_df.fillna("-")
+        st.dataframe(
+            empty_df.style.format("{}"),
+            use_container_width=True,
+            height=400,
+        )
+
+
 # 공통 거래흐름 표/비율/그래프 함수
+@profiled(lambda df, 기준선택, group_col, *args, **kwargs: f"flow[{group_col}]")
 def _display_flow_section(
     df,
     기준선택,
@@ -1145,83 +1089,24 @@ def _display_flow_section(
     color_map=None,
     show_row_total=True,
     show_col_total=True,
+    tables=None,
 ):
     # group_col: 피벗의 columns
     # col_order: 컬럼 순서
     # color_map: plotly color map
-    if 기준선택 not in df.columns:
-        기준선택 = "year_month"
-
-    # 구매확정금액과 구매확정물량 모두 집계
-    flow = (
-        df.groupby([기준선택, group_col])
-        .agg({"구매확정금액(원)": "sum", "구매확정물량": "sum"})
-        .reset_index()
-    )
+    # tables: 미리 계산된 compute_flow_tables 결과 (없으면 여기서 계산)
+    import plotly.express as px
 
-    flow["구매확정금액(백만원)"] = flow["구매확정금액(원)"] / 1_000_000
-    flow["구매확정물량(톤)"] = flow["구매확정물량"] / 1_000  # kg -> 톤 변환
-
-    # year_week인 경우 시간순 정렬을 위한 처리
-    if 기준선택 == "year_week":
-        # year_week 문자열을 기준으로 정렬 (YYYY-WW 형태)
-        flow = flow.sort_values(기준선택)
-
-    # 거래금액 기준으로 그룹 내림차순 정렬
-    if col_order is None or len(col_order) == 0:
-        # 입력된 col_order가 없는 경우 거래금액 합계로 내림차순 정렬
-        group_totals = (
-            flow.groupby(group_col)["구매확정금액(백만원)"]
-            .sum()
-            .sort_values(ascending=False)
+    if tables is None:
+        tables = compute_flow_tables(
+            df, 기준선택, group_col, col_order, show_row_total, show_col_total
         )
-        col_order = group_totals.index.tolist()
-
-    # 카테고리컬 데이터로 변환하여 순서 지정
-    flow[group_col] = pd.Categorical(
-        flow[group_col], categories=col_order, ordered=True
-    )
-
-    # 금액 피벗 테이블
-    pivot_amount = (
-        flow.pivot(index=기준선택, columns=group_col, values="구매확정금액(백만원)")
-        .fillna(0)
-        .astype(float)
-    )
-    # 내림차순 정렬된 col_order를 그대로 사용
-    pivot_amount = pivot_amount.reindex(columns=col_order)
-
-    # 물량 피벗 테이블
-    pivot_volume = (
-        flow.pivot(index=기준선택, columns=group_col, values="구매확정물량(톤)")
-        .fillna(0)
-        .astype(float)
-    )
-    # 금액 기준 정렬된 col_order와 동일하게 물량도 정렬
-    pivot_volume = pivot_volume.reindex(columns=col_order)
-
-    # 금액 합계 행(행 합계) 추가
-    total_row_amount = pd.DataFrame(pivot_amount.sum(axis=0)).T
-    total_row_amount.index = ["합계"]
-
-    # 물량 합계 행(행 합계) 추가
-    total_row_volume = pd.DataFrame(pivot_volume.sum(axis=0)).T
-    total_row_volume.index = ["합계"]
-
-    # group별 합계(열 합계) 추가
-    if show_col_total:
-        pivot_amount["합계"] = pivot_amount.sum(axis=1)
-        pivot_volume["합계"] = pivot_volume.sum(axis=1)
-        total_row_amount["합계"] = total_row_amount.sum(axis=1)
-        total_row_volume["합계"] = total_row_volume.sum(axis=1)
-
-    # 최종 테이블 생성
-    if show_row_total:
-        pivot_amount_with_total = pd.concat([pivot_amount, total_row_amount])
-        pivot_volume_with_total = pd.concat([pivot_volume, total_row_volume])
-    else:
-        pivot_amount_with_total = pivot_amount.copy()
-        pivot_volume_with_total = pivot_volume.copy()
+    기준선택 = tables["기준선택"]
+    flow = tables["flow"]
+    pivot_amount_with_total = tables["pivot_amount_with_total"]
+    pivot_volume_with_total = tables["pivot_volume_with_total"]
+    row_pct_amount = tables["row_pct_amount"]
+    row_pct_volume = tables["row_pct_volume"]
 
     # 컬럼 레이아웃
     col_table1, col_table2, col_table3, col_chart = st.columns([1.5, 1.5, 1.5, 1])
@@ -1268,19 +1153,7 @@ def _display_flow_section(
                 unsafe_allow_html=True,
             )
     with col_table2:
-        # 행 비율(%) 계산 (합계 컬럼 제외) - 금액 기준
-        pivot_for_pct = pivot_amount_with_total.copy()
-        if show_col_total and "합계" in pivot_for_pct.columns:
-            pivot_for_pct = pivot_for_pct.drop("합계", axis=1)
-
-        row_sum_amount = pivot_for_pct.sum(axis=1)
-        row_pct_amount = pivot_for_pct.div(row_sum_amount, axis=0) * 100
-
-        if show_col_total:
-            row_pct_amount["합계"] = 100.0
-        row_pct_amount = row_pct_amount.round(1)
-
-        # 탭으로 금액과 물량 비율 구분하여 표시
+        # 탭으로 금액과 물량 비율 구분하여 표시 (합계 컬럼 제외한 행 비율)
         tab_amount_pct, tab_volume_pct = st.tabs([" 금액 비율(%)", " 물량 비율(%)"])
 
         with tab_amount_pct:
@@ -1291,18 +1164,6 @@ def _display_flow_section(
             )
 
         with tab_volume_pct:
-            # 물량 비율 계산
-            pivot_vol_for_pct = pivot_volume_with_total.copy()
-            if show_col_total and "합계" in pivot_vol_for_pct.columns:
-                pivot_vol_for_pct = pivot_vol_for_pct.drop("합계", axis=1)
-
-            row_sum_volume = pivot_vol_for_pct.sum(axis=1)
-            row_pct_volume = pivot_vol_for_pct.div(row_sum_volume, axis=0) * 100
-
-            if show_col_total:
-                row_pct_volume["합계"] = 100.0
-            row_pct_volume = row_pct_volume.round(1)
-
             st.dataframe(
                 row_pct_volume.style.format("{:.1f}%"),
                 use_container_width=True,
@@ -1316,231 +1177,26 @@ def _display_flow_section(
 
         # 금액 증감률 탭
         with tab_amount_change:
-            try:
-                # 모든 기간에 대한 데이터 준비
-                all_periods = sorted(df[기준선택].unique())
-
-                if (
-                    len(all_periods) >= 2
-                ):  # 최소 2개 이상의 기간이 있어야 증감률 계산 가능
-                    # 원본 피벗 테이블에서 합계 컬럼 제외
-                    pivot_cols = (
-                        [col for col in pivot_amount.columns if col != "합계"]
-                        if show_col_total
-                        else list(pivot_amount.columns)
-                    )
-
-                    # 증감률 계산을 위한 빈 데이터프레임 생성
-                    change_pct_df = pd.DataFrame(
-                        index=pivot_amount.index, columns=pivot_cols
-                    )
-
-                    # 각 기간별 이전 기간과 비교하여 증감률 계산
-                    for i in range(1, len(pivot_amount.index)):
-                        current_idx = pivot_amount.index[i]
-                        prev_idx = pivot_amount.index[i - 1]
-
-                        # 증감률 계산 (0으로 나누는 오류 방지)
-                        for col in pivot_cols:
-                            current_val = pivot_amount.loc[current_idx, col]
-                            prev_val = pivot_amount.loc[prev_idx, col]
-
-                            if prev_val != 0:
-                                pct_change = (current_val - prev_val) / prev_val * 100
-                                change_pct_df.loc[current_idx, col] = pct_change
-                            else:
-                                # 이전 값이 0인 경우 현재 값이 0이면 0%, 아니면 100% 변화
-                                change_pct_df.loc[current_idx, col] = (
-                                    0.0 if current_val == 0 else 100.0
-                                )
-
-                    # 첫 번째 기간은 이전 기간이 없으므로 증감률을 계산할 수 없음
-                    change_pct_df.loc[pivot_amount.index[0]] = float("nan")
-
-                    # 합계 행(맨 아래 행) 제외 - 합계 행은 증감률 계산에서 제외
-                    if show_row_total and "합계" in change_pct_df.index:
-                        change_pct_df = change_pct_df.drop("합계")
-
-                    # 증감률 표시용 최종 데이터프레임 생성
-                    # 모든 원본 행과 동일한 형태를 유지하고 합계 열 추가
-                    final_change_pct = pd.DataFrame(
-                        index=pivot_amount.index, columns=pivot_amount.columns
-                    )
-
-                    # 계산된 증감률 데이터 복사
-                    for idx in change_pct_df.index:
-                        for col in change_pct_df.columns:
-                            final_change_pct.loc[idx, col] = change_pct_df.loc[idx, col]
-
-                    # 합계 열에는 행별 평균 증감률 설정 (NaN 제외)
-                    if show_col_total:
-                        for idx in final_change_pct.index:
-                            row_values = (
-                                change_pct_df.loc[idx].dropna()
-                                if idx in change_pct_df.index
-                                else pd.Series()
-                            )
-                            if not row_values.empty:
-                                final_change_pct.loc[idx, "합계"] = row_values.mean()
-                            else:
-                                final_change_pct.loc[idx, "합계"] = float("nan")
-
-                    # 스타일 적용 및 표시
-                    def highlight_pos_neg(val):
-                        if pd.isna(val):
-                            return "color: gray"
-                        elif val > 0:
-                            return "color: #2ca02c"  # 양수 값은 녹색
-                        elif val < 0:
-                            return "color: #d62728"  # 음수 값은 빨간색
-                        else:
-                            return ""
-
-                    # 스타일 적용
-                    styled = final_change_pct.style.format(
-                        lambda x: "-" if pd.isna(x) else f"{x:.1f}%"
-                    )
-                    styled = styled.applymap(highlight_pos_neg)
-
-                    st.dataframe(
-                        styled,
-                        use_container_width=True,
-                        height=400,
-                    )
-                else:
-                    st.info("증감률 계산을 위해서는 2개 이상의 기간이 필요합니다.")
-            except Exception as e:
-                st.warning(f"금액 증감률 계산 중 오류가 발생했습니다: {str(e)}")
-                # 오류 발생 시 빈 데이터프레임 표시
-                empty_df = pd.DataFrame(
-                    index=pivot_amount_with_total.index,
-                    columns=pivot_amount_with_total.columns,
-                )
-                empty_df = empty_df.fillna("-")
-                st.dataframe(
-                    empty_df.style.format("{}"),
-                    use_container_width=True,
-                    height=400,
-                )
+            _render_change_table(
+                tables["change_amount"], pivot_amount_with_total, "금액"
+            )
 
         # 물량 증감률 탭
         with tab_volume_change:
-            try:
-                # 모든 기간에 대한 데이터 준비
-                all_periods = sorted(df[기준선택].unique())
-
-                if (
-                    len(all_periods) >= 2
-                ):  # 최소 2개 이상의 기간이 있어야 증감률 계산 가능
-                    # 원본 피벗 테이블에서 합계 컬럼 제외
-                    pivot_cols = (
-                        [col for col in pivot_volume.columns if col != "합계"]
-                        if show_col_total
-                        else list(pivot_volume.columns)
-                    )
-
-                    # 증감률 계산을 위한 빈 데이터프레임 생성
-                    change_pct_df = pd.DataFrame(
-                        index=pivot_volume.index, columns=pivot_cols
-                    )
-
-                    # 각 기간별 이전 기간과 비교하여 증감률 계산
-                    for i in range(1, len(pivot_volume.index)):
-                        current_idx = pivot_volume.index[i]
-                        prev_idx = pivot_volume.index[i - 1]
-
-                        # 증감률 계산 (0으로 나누는 오류 방지)
-                        for col in pivot_cols:
-                            current_val = pivot_volume.loc[current_idx, col]
-                            prev_val = pivot_volume.loc[prev_idx, col]
-
-                            if prev_val != 0:
-                                pct_change = (current_val - prev_val) / prev_val * 100
-                                change_pct_df.loc[current_idx, col] = pct_change
-                            else:
-                                # 이전 값이 0인 경우 현재 값이 0이면 0%, 아니면 100% 변화
-                                change_pct_df.loc[current_idx, col] = (
-                                    0.0 if current_val == 0 else 100.0
-                                )
-
-                    # 첫 번째 기간은 이전 기간이 없으므로 증감률을 계산할 수 없음
-                    change_pct_df.loc[pivot_volume.index[0]] = float("nan")
-
-                    # 합계 행(맨 아래 행) 제외 - 합계 행은 증감률 계산에서 제외
-                    if show_row_total and "합계" in change_pct_df.index:
-                        change_pct_df = change_pct_df.drop("합계")
-
-                    # 증감률 표시용 최종 데이터프레임 생성
-                    # 모든 원본 행과 동일한 형태를 유지하고 합계 열 추가
-                    final_change_pct = pd.DataFrame(
-                        index=pivot_volume.index, columns=pivot_volume.columns
-                    )
-
-                    # 계산된 증감률 데이터 복사
-                    for idx in change_pct_df.index:
-                        for col in change_pct_df.columns:
-                            final_change_pct.loc[idx, col] = change_pct_df.loc[idx, col]
-
-                    # 합계 열에는 행별 평균 증감률 설정 (NaN 제외)
-                    if show_col_total:
-                        for idx in final_change_pct.index:
-                            row_values = (
-                                change_pct_df.loc[idx].dropna()
-                                if idx in change_pct_df.index
-                                else pd.Series()
-                            )
-                            if not row_values.empty:
-                                final_change_pct.loc[idx, "합계"] = row_values.mean()
-                            else:
-                                final_change_pct.loc[idx, "합계"] = float("nan")
-
-                    # 스타일 적용 및 표시
-                    def highlight_pos_neg(val):
-                        if pd.isna(val):
-                            return "color: gray"
-                        elif val > 0:
-                            return "color: #2ca02c"  # 양수 값은 녹색
-                        elif val < 0:
-                            return "color: #d62728"  # 음수 값은 빨간색
-                        else:
-                            return ""
-
-                    # 스타일 적용
-                    styled = final_change_pct.style.format(
-                        lambda x: "-" if pd.isna(x) else f"{x:.1f}%"
-                    )
-                    styled = styled.applymap(highlight_pos_neg)
-
-                    st.dataframe(
-                        styled,
-                        use_container_width=True,
-                        height=400,
-                    )
-                else:
-                    st.info("증감률 계산을 위해서는 2개 이상의 기간이 필요합니다.")
-            except Exception as e:
-                st.warning(f"물량 증감률 계산 중 오류가 발생했습니다: {str(e)}")
-                # 오류 발생 시 빈 데이터프레임 표시
-                empty_df = pd.DataFrame(
-                    index=pivot_volume_with_total.index,
-                    columns=pivot_volume_with_total.columns,
-                )
-                empty_df = empty_df.fillna("-")
-                st.dataframe(
-                    empty_df.style.format("{}"),
-                    use_container_width=True,
-                    height=400,
-                )
+            _render_change_table(
+                tables["change_volume"], pivot_volume_with_total, "물량"
+            )
 
     # 그래프 표시
     with col_chart:
+        trend_names = _select_trend_lines(
+            tables["trend_amount"], key=f"trend_{group_col}"
+        )
         tab_amount_chart, tab_volume_chart = st.tabs([" 금액 그래프", " 물량 그래프"])
 
         with tab_amount_chart:
-            # 그룹별 합계 데이터 생성
-            total_by_period = (
-                flow.groupby(기준선택)["구매확정금액(백만원)"].sum().reset_index()
-            )
+            # 그룹별 합계 데이터
+            total_by_period = tables["total_amount_by_period"]
 
             # X축 순서 설정 (year_week인 경우 시간순 정렬)
             if 기준선택 == "year_week":
@@ -1582,6 +1238,7 @@ def _display_flow_section(
                 marker=dict(size=8, color="red"),
                 yaxis="y",
             )
+            _add_trend_lines(fig_bar, tables["trend_amount"], trend_names)
 
             # 레이아웃 업데이트
             fig_bar.update_layout(
@@ -1602,13 +1259,11 @@ def _display_flow_section(
                 ),
             )
 
-            st.plotly_chart(fig_bar, use_container_width=True)
+            _plotly_chart(fig_bar)
 
         with tab_volume_chart:
-            # 그룹별 합계 데이터 생성
-            total_by_period = (
-                flow.groupby(기준선택)["구매확정물량(톤)"].sum().reset_index()
-            )
+            # 그룹별 합계 데이터
+            total_by_period = tables["total_volume_by_period"]
 
             # X축 순서 설정 (year_week인 경우 시간순 정렬)
             if 기준선택 == "year_week":
@@ -1650,6 +1305,7 @@ def _display_flow_section(
                 marker=dict(size=8, color="red"),
                 yaxis="y",
             )
+            _add_trend_lines(fig_bar, tables["trend_volume"], trend_names)
 
             # 레이아웃 업데이트
             fig_bar.update_layout(
@@ -1670,7 +1326,28 @@ def _display_flow_section(
                 ),
             )
 
-            st.plotly_chart(fig_bar, use_container_width=True)
+            _plotly_chart(fig_bar)
+
+    # 표 내보내기
+    with st.expander("📥 표 내보내기", expanded=False):
+        export_tables = {
+            "금액(백만원)": pivot_amount_with_total,
+            "물량(톤)": pivot_volume_with_total,
+            "금액 비율(%)": row_pct_amount,
+            "물량 비율(%)": row_pct_volume,
+        }
+        table_name = st.selectbox(
+            "내보낼 표", list(export_tables), key=f"export_table_{group_col}"
+        )
+        _render_export_controls(
+            df,
+            lambda: iter_frame_chunks(
+                export_tables[table_name], index_label=기준선택
+            ),
+            file_stem=f"{기준선택}_{group_col}_{table_name}",
+            key=f"export_pivot_{group_col}",
+            selection=(기준선택, group_col, table_name, show_row_total, show_col_total),
+        )
 
     # 선택된 셀에 대한 거래내역 표시
     _display_transaction_details(
@@ -1739,6 +1416,11 @@ def _display_transaction_details(
         )
 
 
+@profiled(
+    lambda df, 기준선택, group_col, selected_period, *args: (
+        f"drilldown[{group_col} {selected_period}]"
+    )
+)
 def _show_filtered_transactions_by_period(
     df, 기준선택, group_col, selected_period, table_type, pivot_amount_with_total
 ):
@@ -1759,8 +1441,13 @@ def _show_filtered_transactions_by_period(
         unsafe_allow_html=True,
     )
 
-    # 해당 기간의 데이터 필터링
-    period_data = df[df[기준선택] == selected_period]
+    # 해당 기간의 데이터 필터링 (인덱스에서 행 위치 조회)
+    index = get_drilldown_index(df, 기준선택, group_col)
+    # 그룹 목록/금액 계산에 필요한 두 컬럼만 추출
+    period_data = df.iloc[
+        drilldown_positions(index, selected_period),
+        df.columns.get_indexer([group_col, "구매확정금액(원)"]),
+    ]
 
     if len(period_data) == 0:
         st.info("해당 기간에 거래내역이 없습니다.")
@@ -1812,6 +1499,11 @@ def _show_filtered_transactions_by_period(
     )
 
 
+@profiled(
+    lambda df, 기준선택, group_col, selected_period, selected_group, *args: (
+        f"drilldown[{group_col} {selected_period} {selected_group}]"
+    )
+)
 def _show_filtered_transactions(
     df, 기준선택, group_col, selected_period, selected_group, table_type
 ):
@@ -1821,9 +1513,10 @@ def _show_filtered_transactions(
     st.markdown(f"**선택된 {group_col}:** {selected_group}")
     st.markdown("")
 
-    # 데이터 필터링
-    filtered_data = df[df[기준선택] == selected_period]
-    filtered_data = filtered_data[filtered_data[group_col] == selected_group]
+    # 데이터 필터링 (인덱스에서 행 위치 조회)
+    index = get_drilldown_index(df, 기준선택, group_col)
+    positions = drilldown_positions(index, selected_period, selected_group)
+    filtered_data = drilldown_frame(df, positions)
 
     if len(filtered_data) == 0:
         st.info("해당 조건에 맞는 거래내역이 없습니다.")
@@ -1859,42 +1552,8 @@ def _show_filtered_transactions(
 
     with tab_seller_summary:
         # 판매자별 요약 계산
-        seller_summary = (
-            filtered_data.groupby(["판매자", "판매자구분"])
-            .agg(
-                {
-                    "거래유형보정": lambda x: ", ".join(
-                        sorted(x.unique())
-                    ),  # 거래유형들을 합쳐서 표시
-                    "구매확정금액(원)": "sum",
-                    "구매확정물량": "sum",
-                    "확정일자": "count",  # 거래 건수
-                }
-            )
-            .reset_index()
-        )
-
-        # 컬럼명 변경
-        seller_summary.columns = [
-            "판매자",
-            "판매자구분",
-            "거래유형보정",
-            "구매확정금액(원)",
-            "구매확정물량",
-            "총거래건수",
-        ]
-
-        # 단위 변환
-        seller_summary["구매확정금액(백만원)"] = (
-            seller_summary["구매확정금액(원)"] / 1_000_000
-        ).round(2)
-        seller_summary["구매확정물량(톤)"] = (
-            seller_summary["구매확정물량"] / 1_000
-        ).round(2)
-
-        # 거래금액 기준 내림차순 정렬
-        seller_summary = seller_summary.sort_values(
-            "구매확정금액(백만원)", ascending=False
+        seller_summary = summarize_counterparties(
+            filtered_data, ["판매자", "판매자구분"]
         )
 
         # 표시할 컬럼 선택
@@ -1933,42 +1592,8 @@ def _show_filtered_transactions(
 
     with tab_buyer_summary:
         # 구매자별 요약 계산
-        buyer_summary = (
-            filtered_data.groupby(["구매자", "구매자구분"])
-            .agg(
-                {
-                    "거래유형보정": lambda x: ", ".join(
-                        sorted(x.unique())
-                    ),  # 거래유형들을 합쳐서 표시
-                    "구매확정금액(원)": "sum",
-                    "구매확정물량": "sum",
-                    "확정일자": "count",  # 거래 건수
-                }
-            )
-            .reset_index()
-        )
-
-        # 컬럼명 변경
-        buyer_summary.columns = [
-            "구매자",
-            "구매자구분",
-            "거래유형보정",
-            "구매확정금액(원)",
-            "구매확정물량",
-            "총거래건수",
-        ]
-
-        # 단위 변환
-        buyer_summary["구매확정금액(백만원)"] = (
-            buyer_summary["구매확정금액(원)"] / 1_000_000
-        ).round(2)
-        buyer_summary["구매확정물량(톤)"] = (
-            buyer_summary["구매확정물량"] / 1_000
-        ).round(2)
-
-        # 거래금액 기준 내림차순 정렬
-        buyer_summary = buyer_summary.sort_values(
-            "구매확정금액(백만원)", ascending=False
+        buyer_summary = summarize_counterparties(
+            filtered_data, ["구매자", "구매자구분"]
         )
 
         # 표시할 컬럼 선택
@@ -2007,44 +1632,8 @@ def _show_filtered_transactions(
 
     with tab_seller_buyer_summary:
         # 판매자/구매자별 요약 계산
-        seller_buyer_summary = (
-            filtered_data.groupby(["판매자", "구매자", "판매자구분", "구매자구분"])
-            .agg(
-                {
-                    "거래유형보정": lambda x: ", ".join(
-                        sorted(x.unique())
-                    ),  # 거래유형들을 합쳐서 표시
-                    "구매확정금액(원)": "sum",
-                    "구매확정물량": "sum",
-                    "확정일자": "count",  # 거래 건수
-                }
-            )
-            .reset_index()
-        )
-
-        # 컬럼명 변경
-        seller_buyer_summary.columns = [
-            "판매자",
-            "구매자",
-            "판매자구분",
-            "구매자구분",
-            "거래유형보정",
-            "구매확정금액(원)",
-            "구매확정물량",
-            "총거래건수",
-        ]
-
-        # 단위 변환
-        seller_buyer_summary["구매확정금액(백만원)"] = (
-            seller_buyer_summary["구매확정금액(원)"] / 1_000_000
-        ).round(2)
-        seller_buyer_summary["구매확정물량(톤)"] = (
-            seller_buyer_summary["구매확정물량"] / 1_000
-        ).round(2)
-
-        # 거래금액 기준 내림차순 정렬
-        seller_buyer_summary = seller_buyer_summary.sort_values(
-            "구매확정금액(백만원)", ascending=False
+        seller_buyer_summary = summarize_counterparties(
+            filtered_data, ["판매자", "구매자", "판매자구분", "구매자구분"]
         )
 
         # 표시할 컬럼 선택
@@ -2098,48 +1687,53 @@ def _show_filtered_transactions(
     # 거래내역 테이블 표시
     st.markdown("세부 거래내역")
 
-    # 표시할 컬럼 선택
-    display_columns = [
-        "확정일자",
-        "구분",
-        "부류",
-        "품목",
-        "판매자",
-        "구매자",
-        "판매자구분",
-        "구매자구분",
-        "거래유형보정",
-        "구매확정물량",
-        "구매확정금액(원)",
-    ]
-
     # 존재하는 컬럼만 선택
-    available_columns = [col for col in display_columns if col in filtered_data.columns]
-    display_data = filtered_data[available_columns].copy()
-
-    # 금액과 물량 포맷팅
-    if "구매확정금액(원)" in display_data.columns:
-        display_data["구매확정금액(백만원)"] = (
-            display_data["구매확정금액(원)"] / 1_000_000
-        ).round(0)
-    if "구매확정물량" in display_data.columns:
-        display_data["구매확정물량(톤)"] = (display_data["구매확정물량"] / 1_000).round(
-            0
+    available_columns = [col for col in DETAIL_COLUMNS if col in filtered_data.columns]
+
+    # 정렬 기준 선택 (기본: 최신 거래부터)
+    sort_options = [
+        col for col in DETAIL_SORT_COLUMNS if col in filtered_data.columns
+    ]
+    col_sort, col_order, col_page_size = st.columns(3)
+    with col_sort:
+        sort_col = (
+            st.selectbox(
+                "정렬 기준",
+                sort_options,
+                key=f"sort_{기준선택}_{group_col}_{selected_period}_{selected_group}",
+            )
+            if sort_options
+            else None
+        )
+    with col_order:
+        sort_direction = st.selectbox(
+            "정렬 방향",
+            ["내림차순", "오름차순"],
+            key=f"sort_dir_{기준선택}_{group_col}_{selected_period}_{selected_group}",
         )
 
-    # 정렬 (최신 거래부터)
-    if "확정일자" in display_data.columns:
-        display_data = display_data.sort_values("확정일자", ascending=False)
+    # 정렬 순서(행 위치)는 선택 조건별로 캐시 - 페이지 변경 시 재정렬하지 않음
+    if sort_col is not None:
+        sorted_positions = get_sorted_positions(
+            df,
+            positions,
+            sort_col,
+            sort_direction == "오름차순",
+            (기준선택, group_col, selected_period, selected_group),
+        )
+    else:
+        sorted_positions = positions
 
     # 페이징 처리
-    items_per_page = st.selectbox(
-        "페이지당 표시 건수",
-        [10, 25, 50, 100],
-        index=1,
-        key=f"pagination_{기준선택}_{group_col}_{selected_period}_{selected_group}",
-    )
+    with col_page_size:
+        items_per_page = st.selectbox(
+            "페이지당 표시 건수",
+            [10, 25, 50, 100],
+            index=1,
+            key=f"pagination_{기준선택}_{group_col}_{selected_period}_{selected_group}",
+        )
 
-    total_items = len(display_data)
+    total_items = len(sorted_positions)
     total_pages = (total_items - 1) // items_per_page + 1 if total_items > 0 else 1
 
     if total_pages > 1:
@@ -2150,34 +1744,221 @@ def _show_filtered_transactions(
         )
         start_idx = (page - 1) * items_per_page
         end_idx = min(start_idx + items_per_page, total_items)
-        paginated_data = display_data.iloc[start_idx:end_idx]
         st.caption(f"전체 {total_items}건 중 {start_idx + 1}-{end_idx}건 표시")
     else:
-        paginated_data = display_data
+        start_idx, end_idx = 0, total_items
         st.caption(f"전체 {total_items}건 표시")
 
+    # 요청된 페이지의 행만 생성
+    paginated_data = materialize_detail_page(
+        df, sorted_positions[start_idx:end_idx], available_columns
+    )
+
     # 테이블 표시
     st.dataframe(paginated_data, use_container_width=True, height=400, hide_index=True)
 
-    # 데이터 다운로드 기능
-    # if len(display_data) > 0:
-    #     csv = display_data.to_csv(index=False, encoding="utf-8-sig")
-    #     st.download_button(
-    #         label="📥 거래내역 CSV 다운로드",
-    #         data=csv,
-    #         file_name=f"거래내역_{selected_period}_{selected_group}_{table_type}.csv",
-    #         mime="text/csv",
-    #         key=f"download_{기준선택}_{group_col}_{selected_period}_{selected_group}_{table_type}",
-    #     )
+    # 데이터 다운로드 기능 (요청 시에만 청크 단위로 생성)
+    _render_export_controls(
+        df,
+        lambda: (
+            materialize_detail_page(df, chunk_positions, available_columns)
+            for chunk_positions in iter_position_chunks(sorted_positions)
+        ),
+        file_stem=f"거래내역_{selected_period}_{selected_group}_{table_type}",
+        key=f"export_{기준선택}_{group_col}_{selected_period}_{selected_group}_{table_type}",
+        selection=(기준선택, group_col, selected_period, selected_group, sort_col),
+        schema_frame=df,
+    )
+
+
+# ================= 데이터 내보내기 =================
+def _render_export_controls(
+    df, make_chunks, file_stem, key, selection=(), schema_frame=None
+):
+    """형식 선택 + 파일 생성 버튼 - 버튼을 누를 때만 파일을 생성
+
+    schema_frame: 청크를 잘라내는 전체 프레임 (Parquet 컬럼 타입을 전체 행에서 정함)
+    """
+    col_format, col_build, col_download = st.columns([1, 1, 2])
+    with col_format:
+        export_format = st.selectbox(
+            "내보내기 형식", list(EXPORT_FORMATS), key=f"{key}_format"
+        )
+    suffix, mime = EXPORT_FORMATS[export_format]
+
+    # 같은 데이터·형식으로 생성된 파일만 다운로드 대상으로 사용
+    source_key = (frame_key(df), tuple(selection), export_format)
+    state_key = f"{key}_file"
+
+    # 다운로드 버튼은 재실행마다 파일 전체를 메모리로 읽으므로 크기 상한을 둠
+    max_bytes = export_max_bytes()
+    limit_help = (
+        f"{max_bytes / 1024 / 1024:g}MB까지 내보낼 수 있습니다."
+        if max_bytes is not None
+        else None
+    )
+
+    with col_build:
+        if st.button("📦 파일 생성", key=f"{key}_build", help=limit_help):
+            previous = st.session_state.pop(state_key, None)
+            if previous and os.path.exists(previous[1]):
+                os.remove(previous[1])
+            path = new_export_path(suffix)
+            try:
+                with st.spinner("파일 생성 중..."):
+                    export_chunks_to_file(
+                        make_chunks(),
+                        export_format,
+                        path,
+                        max_bytes=max_bytes,
+                        schema_frame=schema_frame,
+                    )
+                st.session_state[state_key] = (source_key, path)
+            except ExportError as e:
+                st.error(str(e))
+
+    generated = st.session_state.get(state_key)
+    with col_download:
+        if generated and generated[0] == source_key and os.path.exists(generated[1]):
+            with open(generated[1], "rb") as fileobj:
+                st.download_button(
+                    label=f"📥 {export_format} 다운로드",
+                    data=fileobj,
+                    file_name=f"{file_stem}{suffix}",
+                    mime=mime,
+                    key=f"{key}_download",
+                    on_click="ignore",
+                )
 
 
 # 메인 실행
 def main():
+    st.set_page_config(page_title="거래 대시보드", layout="wide")
+    # 내보내기 임시 파일 정리 (프로세스에서 한 번 시작)
+    start_export_cleanup()
+    if not _profiling_enabled():
+        _render_dashboard()
+        return
+
+    # 계측 모드: 실행 전체를 기록하고 끝나면 사이드바에 단계별 결과 표시
+    run = start_profile_run()
+    completed = False
+    try:
+        _render_dashboard()
+        completed = True
+    finally:
+        record = finish_profile_run(run, completed=completed)
+    _render_profile_panel(record)
+
+
+# 정확한 결과 계산 완료 확인 - 완료되면 전체 재실행으로 미리보기를 교체
+@st.fragment(run_every=0.5)
+def _exact_view_progress():
+    job = st.session_state.get("exact_view_job")
+    if job is not None and job[1].done():
+        st.rerun()
+
+
+# 추정값 ± 95% 신뢰구간 반폭 표
+def _estimate_table(pivot, ci):
+    return pd.DataFrame(
+        {
+            col: [
+                f"{value:,.0f} ±{width:,.0f}"
+                for value, width in zip(pivot[col], ci[col])
+            ]
+            for col in pivot.columns
+        },
+        index=pivot.index,
+    )
+
+
+def _render_preview(df, filter_args, top_n, show_row_total, show_col_total):
+    """정확한 결과가 아직 없으면 표본 미리보기를 그리고 True, 준비되었으면 False
+
+    정확한 결과는 화면과 같은 인자로 백그라운드에서 캐시에 만들어지므로,
+    준비된 뒤의 재실행은 기존 경로가 캐시에서 바로 그린다.
+    """
+    기준선택 = st.session_state.get("기준선택", "year_month")
+    mover_dim = st.session_state.get("mover_dimension", MOVER_DIMENSIONS[0])
+    approx = _approx_distinct_enabled()
+    job_key = (
+        frame_key(df),
+        filter_args,
+        기준선택,
+        top_n,
+        show_row_total,
+        show_col_total,
+        mover_dim,
+        approx,
+    )
+    job = st.session_state.get("exact_view_job")
+    if job is None or job[0] != job_key:
+        if job is not None:
+            # 조건이 바뀐 이전 작업은 시작 전이면 취소 (실행 중이면 캐시만 채우고 끝남)
+            job[1].cancel()
+        future = start_exact_view(
+            df,
+            filter_args,
+            기준선택,
+            top_n,
+            show_row_total,
+            show_col_total,
+            mover_dim,
+            approx=approx,
+        )
+        job = st.session_state.exact_view_job = (job_key, future)
+    wait([job[1]], timeout=EXACT_VIEW_WAIT_S)
+    if job[1].done():
+        return False
+
+    with profile_stage("compute_preview"):
+        preview = compute_preview(
+            df, filter_args, 기준선택, top_n, show_row_total, show_col_total
+        )
+    st.info(
+        f"⏳ 표본 미리보기: 표본 {preview['sample_rows']:,}행 중 조건에 맞는 "
+        f"{preview['rows']:,}행으로 추정한 값입니다 (±는 95% 신뢰구간). "
+        "정확한 결과를 계산 중이며 준비되면 자동으로 교체됩니다."
+    )
+    _exact_view_progress()
+    display_kpi_period_section(df, "주요 KPI", "조회 기간", kpis=preview["kpis"])
+    if not preview["sections"]:
+        st.warning("선택한 조회기간 내 데이터가 없습니다. 다른 기간을 선택해주세요.")
+        return True
+
+    st.markdown("## 📊 통계 (표본 추정)")
+    for group_col, _, _ in FLOW_SECTIONS:
+        section = preview["sections"].get(group_col)
+        if section is None:
+            continue
+        tables = section["tables"]
+        st.markdown(f"#### {group_col}별")
+        col_amount, col_volume = st.columns(2)
+        with col_amount:
+            st.caption("구매확정금액(백만원)")
+            st.dataframe(
+                _estimate_table(
+                    tables["pivot_amount_with_total"], tables["ci_amount_with_total"]
+                ),
+                use_container_width=True,
+            )
+        with col_volume:
+            st.caption("구매확정물량(톤)")
+            st.dataframe(
+                _estimate_table(
+                    tables["pivot_volume_with_total"], tables["ci_volume_with_total"]
+                ),
+                use_container_width=True,
+            )
+    return True
+
+
+def _render_dashboard():
     st.title("🛒 거래 KPI 대시보드")
 
-    # 기본 데이터 로드
-    df = load_default_data()
-    df = add_date_columns(df)
+    # 기본 데이터 로드 (프로세스 공유 데이터셋, 날짜 컬럼 포함)
+    default_lease = load_default_data()
 
     # 사이드바 필터와 데이터 소스 선택
     (
@@ -2195,16 +1976,13 @@ def main():
         top_n,
         show_row_total,
         show_col_total,
-    ) = create_sidebar_filters(df)
+    ) = create_sidebar_filters(default_lease)
 
-    # 데이터가 변경된 경우 날짜 컬럼 다시 추가
-    df = add_date_columns(df)
     # 전체 누계 KPI
     display_kpi_section(df, "주요 KPI", "전체 누계")
     # display_kpi_2025_section(df["확정일자"].dt.year == 2025, "주요 KPI", "2025년")
     # 필터 적용
-    filtered_df = filter_data(
-        df,
+    filter_args = (
         date_range,
         selected_구분,
         exclude_rice,
@@ -2215,51 +1993,68 @@ def main():
         selected_buyer_type,
         selected_trade_type,
     )
+    if isinstance(df, SQLBackend):
+        # 조건을 SQL로 넘겨 해당 행만 읽음 (근사 집계용 전체 데이터 없음)
+        filtered_df = df.filter_data(*filter_args)
+        base_df = None
+    else:
+        # 미리보기 모드: 정확한 결과가 준비될 때까지 표본 추정치만 표시
+        if _preview_enabled(df) and _render_preview(
+            df, filter_args, top_n, show_row_total, show_col_total
+        ):
+            return
+        filtered_df = filter_data(df, *filter_args)
+        base_df = df
 
     # 선택된 기간 내 데이터가 없으면 메시지 표시
     if filtered_df.empty:
         st.warning("선택한 조회기간 내 데이터가 없습니다. 다른 기간을 선택해주세요.")
 
     # 조회기간 KPI
-    display_kpi_period_section(filtered_df, "주요 KPI", "조회 기간")
+    display_kpi_period_section(filtered_df, "주요 KPI", "조회 기간", base_df=base_df)
+
+    # 조회 데이터 내보내기
+    if not filtered_df.empty:
+        with st.expander("📥 조회 데이터 내보내기", expanded=False):
+            _render_export_controls(
+                filtered_df,
+                lambda: iter_frame_chunks(filtered_df),
+                file_stem="거래데이터_조회결과",
+                key="export_filtered",
+                schema_frame=filtered_df,
+            )
+
+    # 계산 단계: 요약과 통계 섹션의 독립 집계를 스레드 풀에서 동시에 수행
+    # (그리기는 아래에서 기존 순서대로)
+    기준선택 = (
+        st.session_state["기준선택"] if "기준선택" in st.session_state else "year_month"
+    )
+    with profile_stage("compute_sections", len(filtered_df)):
+        sections = compute_dashboard_sections(
+            filtered_df,
+            기준선택,
+            top_n,
+            show_row_total,
+            show_col_total,
+            mover_dim=(
+                st.session_state.get("mover_dimension", MOVER_DIMENSIONS[0])
+                if not filtered_df.empty
+                else None
+            ),
+            base_df=base_df,
+        )
 
     # ================= 인사이트(요약) 섹션 =================
     st.markdown("##  요약")
 
     if not filtered_df.empty:
-        기준선택 = (
-            st.session_state["기준선택"]
-            if "기준선택" in st.session_state
-            else "year_month"
-        )
-        year = filtered_df["확정일자"].dt.year.mode()[0]
-        year_df = filtered_df[filtered_df["확정일자"].dt.year == year]
-
-        # 1.1 총 매출액 및 연말 예상 매출액
-        total_amt = year_df["구매확정금액(원)"].sum()
-        min_date = year_df["확정일자"].min()
-        max_date = year_df["확정일자"].max()
-        days = (max_date - min_date).days + 1
-        daily_avg = total_amt / days if days > 0 else 0
-        from datetime import datetime
-
-        end_of_year = datetime(year, 12, 31)
-        days_left = (end_of_year - max_date).days
-        days_left = max(days_left, 0)
-        expected_amt = total_amt + (daily_avg * days_left)
-
-        # 2. 기준선택별 구분별 매출액 및 전기대비 증감률 (글 요약)
-        group_col = "구분"
-        pivot = (
-            year_df.groupby([기준선택, group_col])["구매확정금액(원)"]
-            .sum()
-            .unstack()
-            .fillna(0)
-        )
-        pct_df = pivot.pct_change().fillna(0) * 100
-        last_idx = pivot.index[-1]
-        last_row = pivot.loc[last_idx]
-        last_pct = pct_df.loc[last_idx]
+        # 1. 총 매출액 및 연말 예상 매출액, 2. 기준선택별 구분별 매출액 및 전기대비 증감률
+        summary = sections["summary"]
+        year = summary["year"]
+        total_amt = summary["total_amount"]
+        expected_amt = summary["expected_amount"]
+        last_row = summary["last_row"]
+        last_pct = summary["last_pct"]
 
         # 요약 텍스트 생성
         summary_text = f"{year}년 {기준선택}별 매출액은 총 {total_amt/1_000_000:,.0f}백만원, <br>연말까지 {expected_amt/1_000_000:,.0f}백만원 예상.<br>"
@@ -2274,114 +2069,48 @@ def main():
             )
 
         # 상위 거래품목/증가/감소 품목 Top10을 토글 형식으로 표시
-        with st.expander(" 품목별 거래 TOP 10", expanded=False):
-            # 3~4. 상위 거래품목/증가/감소 품목 Top10을 1행 3열로 배치
+        with st.expander(" 품목/회원별 거래 TOP 10", expanded=False):
+            mover_dim = st.selectbox(
+                "기준 항목", MOVER_DIMENSIONS, key="mover_dimension"
+            )
+            movers = summary["movers"]
+
+            # 3~4. 상위 거래/증가/감소 Top10을 1행 3열로 배치
             col_top, col_inc, col_dec = st.columns(3)
 
-            # 상위 거래 품목 Top 10
+            # 상위 거래 Top 10
             with col_top:
-                st.markdown(f"####  상위 거래 품목 Top 10")
-                top_items = (
-                    year_df.groupby("품목")["구매확정금액(원)"].sum().reset_index()
-                )
-                top_items = top_items.sort_values(
-                    "구매확정금액(원)", ascending=False
-                ).head(10)
-                top_items["구매확정금액(백만원)"] = (
-                    top_items["구매확정금액(원)"] / 1_000_000
-                ).round(0)
+                st.markdown(f"####  상위 거래 {mover_dim} Top 10")
                 st.dataframe(
-                    top_items[["품목", "구매확정금액(백만원)"]]
-                    .reset_index(drop=True)
-                    .style.format({"구매확정금액(백만원)": "{:,.0f}"})
-                )
-
-            # 증감 품목 Top 10 (증감금액, 증감률)
-            item_pivot = (
-                year_df.groupby([기준선택, "품목"])["구매확정금액(원)"]
-                .sum()
-                .reset_index()
-            )
-            기준값s = sorted(year_df[기준선택].unique())
-            if len(기준값s) >= 2:
-                prev, curr = 기준값s[-2], 기준값s[-1]
-                prev_items = item_pivot[item_pivot[기준선택] == prev].set_index("품목")
-                curr_items = item_pivot[item_pivot[기준선택] == curr].set_index("품목")
-                merged_items = (
-                    curr_items[["구매확정금액(원)"]]
-                    .join(
-                        prev_items[["구매확정금액(원)"]],
-                        lsuffix="_curr",
-                        rsuffix="_prev",
-                        how="outer",
+                    movers["top"][[mover_dim, "구매확정금액(백만원)"]].style.format(
+                        {"구매확정금액(백만원)": "{:,.0f}"}
                     )
-                    .fillna(0)
-                )
-                merged_items["증감금액(원)"] = (
-                    merged_items["구매확정금액(원)_curr"]
-                    - merged_items["구매확정금액(원)_prev"]
-                )
-                merged_items["증감률(%)"] = merged_items.apply(
-                    lambda row: (
-                        (row["증감금액(원)"] / row["구매확정금액(원)_prev"] * 100)
-                        if row["구매확정금액(원)_prev"] != 0
-                        else 0
-                    ),
-                    axis=1,
-                )
-                merged_items["증감금액(백만원)"] = (
-                    merged_items["증감금액(원)"] / 1_000_000
-                ).round(0)
-                merged_items["매출액(백만원)"] = (
-                    merged_items["구매확정금액(원)_curr"] / 1_000_000
-                ).round(0)
-                merged_items["증감률(%)"] = (
-                    merged_items["증감률(%)"]
-                    .replace([float("inf"), float("-inf")], 0)
-                    .round(1)
-                    .fillna(0)
-                )
-                merged_items = merged_items.reset_index().rename(
-                    columns={
-                        "품목": "품목",
-                        "매출액(백만원)": "매출액(백만원)",
-                        "증감금액(백만원)": "증감금액(백만원)",
-                        "증감률(%)": "증감률(%)",
-                    }
                 )
+
+            # 증감 Top 10 (증감금액, 증감률)
+            if movers["increase"] is not None:
+                display_cols = [
+                    mover_dim,
+                    "매출액(백만원)",
+                    "증감금액(백만원)",
+                    "증감률(%)",
+                ]
+                mover_format = {
+                    "매출액(백만원)": "{:,.0f}",
+                    "증감금액(백만원)": "{:,.0f}",
+                    "증감률(%)": "{:+.1f}",
+                }
                 # 증가 Top 10
                 with col_inc:
-                    st.markdown("**증가 품목 Top 10**")
-                    inc10 = merged_items.sort_values(
-                        "증감금액(원)", ascending=False
-                    ).head(10)
+                    st.markdown(f"**증가 {mover_dim} Top 10**")
                     st.dataframe(
-                        inc10[
-                            ["품목", "매출액(백만원)", "증감금액(백만원)", "증감률(%)"]
-                        ].style.format(
-                            {
-                                "매출액(백만원)": "{:,.0f}",
-                                "증감금액(백만원)": "{:,.0f}",
-                                "증감률(%)": "{:+.1f}",
-                            }
-                        )
+                        movers["increase"][display_cols].style.format(mover_format)
                     )
                 # 감소 Top 10
                 with col_dec:
-                    st.markdown("**감소 품목 Top 10**")
-                    dec10 = merged_items.sort_values(
-                        "증감금액(원)", ascending=True
-                    ).head(10)
+                    st.markdown(f"**감소 {mover_dim} Top 10**")
                     st.dataframe(
-                        dec10[
-                            ["품목", "매출액(백만원)", "증감금액(백만원)", "증감률(%)"]
-                        ].style.format(
-                            {
-                                "매출액(백만원)": "{:,.0f}",
-                                "증감금액(백만원)": "{:,.0f}",
-                                "증감률(%)": "{:+.1f}",
-                            }
-                        )
+                        movers["decrease"][display_cols].style.format(mover_format)
                     )
             else:
                 with col_inc:
@@ -2397,6 +2126,7 @@ def main():
         top_n=top_n,
         show_row_total=show_row_total,
         show_col_total=show_col_total,
+        sections=sections,
     )
 
 
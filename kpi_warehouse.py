@@ -0,0 +1,258 @@
+"""SQLite 웨어하우스 - 전처리 데이터셋과 일별 집계를 인덱스가 있는 단일 파일로 저장
+
+서버 없이 파일 하나로 배포하며, 대시보드는 KPI_BACKEND=sqlite, KPI_WAREHOUSE_PATH=<경로>로
+이 파일에 직접 조건을 넘겨 조회한다(필터 pushdown, 드릴다운은 인덱스 탐색).
+전체 KPI와 사이드바 선택지는 생성 시 계산해 두므로 시작할 때 전체 행을 읽지 않는다.
+
+사용 예:
+    python -m kpi_warehouse build 거래데이터.csv 거래데이터.sqlite
+    python -m kpi_warehouse parity 거래데이터.csv 거래데이터.sqlite
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from urllib.request import pathname2url
+
+import pandas as pd
+
+from kpi_engine import (
+    FILTER_COLUMNS,
+    PERIOD_COLUMNS,
+    DataLoadError,
+    compute_overall_kpis,
+    file_dataset_id,
+    iter_frame_chunks,
+)
+from kpi_sql import SQLBackend, load_processed, quote_identifier, report_parity
+
+WAREHOUSE_PATH_ENV = "KPI_WAREHOUSE_PATH"
+WAREHOUSE_CHUNK_ROWS = 50_000
+# 조회 조건/드릴다운에 쓰이는 컬럼 인덱스
+WAREHOUSE_INDEX_COLUMNS = ["확정일자", "품목", "판매자", "구매자"] + [
+    column for _, column in FILTER_COLUMNS if column != "품목"
+]
+# 일별 집계 테이블의 키 (일자 + 기간 컬럼 + 사이드바 필터 컬럼)
+DAILY_DIMENSIONS = PERIOD_COLUMNS + [column for _, column in FILTER_COLUMNS]
+DAILY_MEASURES = ["구매확정금액(원)", "구매확정물량"]
+# 타임스탬프는 문자열로 저장 (사전순 비교 = 시간순 비교)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_warehouses = {}
+_warehouses_lock = threading.Lock()
+
+
+def get_warehouse(path=None):
+    """웨어하우스 파일별 백엔드 (프로세스 공유, 파일이 바뀌면 새로 연결)"""
+    path = path or os.environ.get(WAREHOUSE_PATH_ENV)
+    if not path:
+        raise DataLoadError(f"{WAREHOUSE_PATH_ENV}에 웨어하우스 파일 경로를 지정해주세요.")
+    dataset_id = file_dataset_id(path)
+    with _warehouses_lock:
+        if dataset_id not in _warehouses:
+            _warehouses[dataset_id] = SQLiteBackend(path, dataset_id)
+        return _warehouses[dataset_id]
+
+
+# ================= 웨어하우스 생성 =================
+def _to_sql_values(chunk):
+    """타임스탬프 컬럼을 저장 형식 문자열로 (결측은 NULL)"""
+    converted = {
+        col: chunk[col].dt.strftime(TIMESTAMP_FORMAT)
+        for col in chunk.columns
+        if pd.api.types.is_datetime64_any_dtype(chunk[col])
+    }
+    return chunk.assign(**converted) if converted else chunk
+
+
+def _daily_totals(df):
+    """(일자, 기간, 필터 컬럼)별 금액/물량 합계 - 날짜 단위 필터와 흐름 집계에 그대로 사용"""
+    keys = [col for col in DAILY_DIMENSIONS if col in df.columns]
+    frame = df[keys + DAILY_MEASURES].assign(확정일자=df["확정일자"].dt.normalize())
+    return (
+        frame.groupby(["확정일자"] + keys, dropna=False, sort=False)[DAILY_MEASURES]
+        .sum()
+        .reset_index()
+    )
+
+
+def _build_meta(df):
+    """시작 시 바로 쓰는 값 (dtype, 전체 KPI, 기간, 사이드바 선택지)"""
+    kpis = compute_overall_kpis(df)
+    return {
+        "dataset_version": df.attrs.get("dataset_version"),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "overall_kpis": {
+            "total_amount": float(kpis["total_amount"]),
+            "total_orders": int(kpis["total_orders"]),
+            "distinct": {col: int(count) for col, count in kpis["distinct"].items()},
+        },
+        "date_bounds": [
+            df["확정일자"].min().date().isoformat(),
+            df["확정일자"].max().date().isoformat(),
+        ],
+        "options": {
+            column: df[column].dropna().unique().tolist()
+            for _, column in FILTER_COLUMNS
+            if column in df.columns
+        },
+    }
+
+
+def build_warehouse(df, path, chunk_rows=WAREHOUSE_CHUNK_ROWS):
+    """전처리 + 날짜 컬럼이 추가된 df를 SQLite 파일로 기록 (원래 행 순서 = rowid 순서)
+
+    임시 파일에 만든 뒤 교체하므로 실행 중인 대시보드는 이전 파일을 계속 읽을 수 있다.
+    """
+    temp_path = path + ".building"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    connection = sqlite3.connect(temp_path)
+    try:
+        # 한 번에 쓰는 파일이므로 저널/동기화 생략
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        for chunk in iter_frame_chunks(df, chunk_rows):
+            _to_sql_values(chunk).to_sql(
+                "trades", connection, if_exists="append", index=False
+            )
+        _to_sql_values(_daily_totals(df)).to_sql(
+            "daily_totals", connection, index=False, chunksize=chunk_rows
+        )
+
+        for i, column in enumerate(WAREHOUSE_INDEX_COLUMNS):
+            if column in df.columns:
+                connection.execute(
+                    f"CREATE INDEX idx_trades_{i} ON trades ({quote_identifier(column)})"
+                )
+        connection.execute('CREATE INDEX idx_daily_date ON daily_totals ("확정일자")')
+
+        connection.execute("CREATE TABLE warehouse_meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.executemany(
+            "INSERT INTO warehouse_meta VALUES (?, ?)",
+            [
+                (key, json.dumps(value, ensure_ascii=False))
+                for key, value in _build_meta(df).items()
+            ],
+        )
+        connection.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(temp_path, path)
+    return path
+
+
+# ================= 조회 =================
+class SQLiteBackend(SQLBackend):
+    """웨어하우스 파일(trades, daily_totals)에 대한 읽기 전용 쿼리"""
+
+    def __init__(self, path, dataset_id):
+        self.path = path
+        self._uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+        self._local = threading.local()
+        try:
+            rows = self._connection().execute("SELECT key, value FROM warehouse_meta")
+            self.meta = {key: json.loads(value) for key, value in rows}
+        except sqlite3.Error as e:
+            raise DataLoadError(f"웨어하우스 파일을 읽을 수 없습니다: {e}")
+        super().__init__(dataset_id, self.meta["dtypes"])
+        self._daily_columns = {
+            row[1]
+            for row in self._connection().execute("PRAGMA table_info(daily_totals)")
+        }
+
+    def _connection(self):
+        # sqlite3 연결은 스레드 간 공유하지 않음 (세션 스레드별 읽기 전용 연결)
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def _fetch(self, sql, params=None):
+        frame = pd.read_sql_query(sql, self._connection(), params=params or [])
+        # 저장 전 dtype 복원 (타임스탬프 문자열 → datetime64[ns], 정수 컬럼 등)
+        for col in frame.columns:
+            dtype = self.column_types.get(col)
+            if dtype is None or dtype == "object":
+                continue
+            if dtype.startswith("datetime64"):
+                frame[col] = pd.to_datetime(frame[col], format=TIMESTAMP_FORMAT)
+            elif frame[col].notna().all() or dtype.startswith("float"):
+                frame[col] = frame[col].astype(dtype)
+        return frame
+
+    def _date_param(self, timestamp):
+        return timestamp.strftime(TIMESTAMP_FORMAT)
+
+    def _sum_expr(self, column):
+        return f"coalesce(sum({quote_identifier(column)}), 0)"
+
+    def _aggregate_source(self, group_col):
+        """그룹 컬럼이 일별 집계 키이면 일별 집계 테이블 사용 (정수 합계만 - 실수는 합산 순서 차이)"""
+        integer_measures = all(
+            self.column_types.get(col, "").startswith("int") for col in DAILY_MEASURES
+        )
+        if integer_measures and group_col in self._daily_columns:
+            return "daily_totals"
+        return "trades"
+
+    def where_clause(self, date_range, exclude_rice, **selections):
+        # 전체 기간 조건은 생략 - 날짜 인덱스 대신 품목/판매자 등 선택도 높은 인덱스를 쓰도록
+        if len(date_range) == 2:
+            start, end = self.date_bounds()
+            if date_range[0] <= start and date_range[1] >= end:
+                date_range = ()
+        return super().where_clause(date_range, exclude_rice, **selections)
+
+    def date_bounds(self):
+        start, end = self.meta["date_bounds"]
+        return pd.Timestamp(start).date(), pd.Timestamp(end).date()
+
+    def distinct_values(self, column, sort=False):
+        options = self.meta["options"].get(column)
+        if options is None or sort:
+            return super().distinct_values(column, sort)
+        return list(options)
+
+    def overall_kpis(self):
+        kpis = self.meta["overall_kpis"]
+        return {
+            "total_amount": kpis["total_amount"],
+            "total_orders": kpis["total_orders"],
+            "distinct": dict(kpis["distinct"]),
+        }
+
+
+# ================= 명령행 =================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite 웨어하우스")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="전처리 데이터셋으로 웨어하우스 파일 생성")
+    build.add_argument("source", help="원본 CSV 또는 전처리된 Parquet 경로")
+    build.add_argument("output", help="SQLite 파일 경로")
+    parity = commands.add_parser("parity", help="pandas 경로와 결과 비교")
+    parity.add_argument("source", help="웨어하우스를 만든 원본 경로")
+    parity.add_argument("warehouse", help="SQLite 파일 경로")
+    args = parser.parse_args(argv)
+
+    try:
+        df = load_processed(args.source)
+        if args.command == "build":
+            build_warehouse(df, args.output)
+            print(f"{len(df):,}행 → {args.output}")
+            return 0
+        return report_parity(df, get_warehouse(args.warehouse))
+    except DataLoadError as e:
+        print(str(e))
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
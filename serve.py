@@ -0,0 +1,220 @@
+"""대시보드 실행 진입점 - 캐시를 예열한 뒤 같은 프로세스에서 Streamlit 서버를 시작
+
+데이터셋과 파생 구조 캐시는 프로세스 메모리에 있으므로, 예열은 서버와 같은 프로세스에서
+실행해야 첫 요청이 바로 캐시에서 응답된다. --warm-only는 예열만 실행하고 단계별 시간을
+출력하는 사전 점검용이다(데이터 적재 실패 시 종료 코드 1).
+
+사용 예:
+    python serve.py                                        # 예열 후 서버 시작 (컨테이너 시작 명령)
+    python serve.py --config warmup.json -- --server.port 8501
+    python serve.py --warm-only --report warmup_report.json
+
+설정 파일(--config 또는 KPI_WARMUP_CONFIG, 생략 가능):
+    {
+        "periods": ["year", "year_month"],
+        "db_queries": [
+            {"db_type": "SQLite", "connection_params": {"db_path": "거래.db"},
+             "query": "SELECT * FROM 거래데이터"}
+        ]
+    }
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from kpi_engine import (
+    DEFAULT_CSV_PATH,
+    DEFAULT_TOP_N,
+    WARMUP_PERIODS,
+    DataLoadError,
+    acquire_dataset,
+    default_filter_args,
+    file_dataset_id,
+    get_dataset,
+    load_csv_snapshot,
+    load_db,
+    query_dataset_id,
+    warm_up_dataset,
+    warm_up_view,
+    watch_csv,
+)
+from kpi_sql import get_configured_backend, sql_backend_label
+
+WARMUP_CONFIG_ENV = "KPI_WARMUP_CONFIG"
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kpi_test_copy.py")
+
+# 예열한 데이터셋 임대 (서버가 도는 동안 유지)
+_warm_leases = []
+
+
+def load_warmup_config(path=None):
+    """예열 설정 (파일이 없으면 기본값: 기본 데이터 소스, WARMUP_PERIODS)"""
+    path = path or os.environ.get(WARMUP_CONFIG_ENV)
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise DataLoadError(f"예열 설정 파일을 읽을 수 없습니다: {e}")
+
+
+def _warm_source(name, load, warm):
+    """데이터 소스 하나를 적재(load)하고 캐시를 예열(warm) - 실패는 결과에 기록"""
+    report = {"source": name}
+    started = time.perf_counter()
+    try:
+        target = load()
+        report["load_s"] = round(time.perf_counter() - started, 3)
+        report["stages"] = warm(target)
+    except DataLoadError as e:
+        report["error"] = str(e)
+    except Exception as e:
+        report["error"] = f"예열 중 오류가 발생했습니다: {e}"
+    report["total_s"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def warm_up(config=None, periods=None, top_n=DEFAULT_TOP_N):
+    """기본 데이터 소스와 설정된 DB 쿼리의 데이터셋, 집계, 인덱스를 미리 생성
+
+    데이터셋은 화면과 같은 id/고정 슬롯으로 등록되므로 첫 요청은 다시 읽지 않는다.
+    반환: {"sources": [소스별 결과], "total_s": 전체 경과 초}
+    """
+    config = config or {}
+    periods = periods or config.get("periods") or WARMUP_PERIODS
+    started = time.perf_counter()
+    sources = []
+
+    def warm_frame(lease):
+        _warm_leases.append(lease)
+        df = get_dataset(lease.dataset_id)
+        stages = warm_up_dataset(df, periods, top_n)
+        stages["rows"] = len(df)
+        return stages
+
+    backend_label = sql_backend_label()
+    if backend_label is not None:
+        # SQL 백엔드: 연결/메타데이터와 기본 조회 결과의 집계를 예열
+        def warm_backend(backend):
+            view = backend.filter_data(
+                *default_filter_args(None, backend.date_bounds())
+            )
+            stages = warm_up_view(view, None, periods, top_n)
+            stages["rows"] = len(view)
+            return stages
+
+        sources.append(
+            _warm_source(backend_label, get_configured_backend, warm_backend)
+        )
+    else:
+        sources.append(
+            _warm_source(
+                DEFAULT_CSV_PATH,
+                lambda: acquire_dataset(
+                    file_dataset_id(DEFAULT_CSV_PATH),
+                    lambda: load_csv_snapshot(DEFAULT_CSV_PATH),
+                    pin="default",
+                ),
+                warm_frame,
+            )
+        )
+        if "error" not in sources[-1]:
+            # 기본 CSV에 추가되는 행은 첫 요청 전에도 백그라운드에서 병합
+            watch_csv(DEFAULT_CSV_PATH, pin="default")
+
+    for entry in config.get("db_queries", []):
+        db_type = entry["db_type"]
+        connection_params = entry.get("connection_params", {})
+        query = entry["query"]
+        dataset_id = query_dataset_id(db_type, connection_params, query)
+        sources.append(
+            _warm_source(
+                f"{db_type}: {' '.join(query.split())[:60]}",
+                # 쿼리별 고정 슬롯 - 접속 전에도 데이터셋과 파생 구조가 제거되지 않음
+                lambda: acquire_dataset(
+                    dataset_id,
+                    lambda: load_db(db_type, connection_params, query),
+                    pin=f"warmup:{dataset_id}",
+                ),
+                warm_frame,
+            )
+        )
+
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "periods": list(periods),
+        "sources": sources,
+        "total_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def print_report(report):
+    periods = ", ".join(report["periods"])
+    print(f"캐시 예열 {report['total_s']:.2f}초 (기준선택: {periods})")
+    for source in report["sources"]:
+        if "error" in source:
+            print(f"  ✗ {source['source']}: {source['error']}")
+            continue
+        stages = dict(source["stages"])
+        rows = stages.pop("rows")
+        print(
+            f"  ✓ {source['source']}: {rows:,}행, 적재 {source['load_s']:.2f}초, "
+            f"전체 {source['total_s']:.2f}초"
+        )
+        for name, seconds in stages.items():
+            print(f"      {name:<28} {seconds * 1000:>10.1f} ms")
+
+
+def run_server(streamlit_args):
+    """같은 프로세스에서 Streamlit 서버 시작 (예열한 캐시를 그대로 사용)"""
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", APP_PATH] + streamlit_args
+    return stcli.main()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="캐시 예열 후 대시보드 실행",
+        epilog="-- 뒤의 인자는 streamlit run에 그대로 전달됩니다.",
+    )
+    parser.add_argument("--config", help=f"예열 설정 JSON (기본: ${WARMUP_CONFIG_ENV})")
+    parser.add_argument("--periods", help="쉼표 구분 기준선택 (설정 파일보다 우선)")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--warm-only", action="store_true", help="예열만 실행하고 종료")
+    parser.add_argument("--report", help="예열 결과 JSON 경로")
+    parser.add_argument("--no-warm", action="store_true", help="예열 없이 서버 시작")
+    args, streamlit_args = parser.parse_known_args(argv)
+    if streamlit_args[:1] == ["--"]:
+        streamlit_args = streamlit_args[1:]
+
+    report = None
+    if not args.no_warm:
+        try:
+            config = load_warmup_config(args.config)
+        except DataLoadError as e:
+            print(str(e))
+            return 2
+        periods = [p for p in (args.periods or "").split(",") if p.strip()]
+        report = warm_up(config, periods or None, args.top_n)
+        report["python"] = platform.python_version()
+        print_report(report)
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.warm_only:
+        failed = report is not None and any("error" in s for s in report["sources"])
+        return 1 if failed else 0
+    # 예열이 일부 실패해도 서버는 시작 (해당 소스는 첫 요청에서 다시 시도)
+    return run_server(streamlit_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
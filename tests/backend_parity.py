@@ -0,0 +1,124 @@
+"""SQL 백엔드(DuckDB, SQLite) 테스트 공통 - 픽스처 CSV와 pandas 경로 비교 함수"""
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate_data import write_dataset
+from conftest import make_raw
+from kpi_engine import (
+    DETAIL_COLUMNS,
+    DETAIL_SORT_COLUMNS,
+    PERIOD_COLUMNS,
+    add_date_columns,
+    compute_flow_tables,
+    drilldown_positions,
+    filter_data,
+    get_drilldown_index,
+    get_sorted_positions,
+    load_csv_file,
+    rank_groups,
+)
+from kpi_sql import _parity_filter_cases
+from test_filters import filter_args, random_combinations
+
+BACKEND_ROWS = 4_000
+FLOW_GROUPS = ["구분", "부류", "품목", "판매자세부구분", "구매자구분"]
+FLOW_KEYS = [
+    "flow",
+    "pivot_amount_with_total",
+    "pivot_volume_with_total",
+    "change_amount",
+    "change_volume",
+]
+
+
+def build_fixture_csv(directory):
+    """원본 형식(cp949) 픽스처 CSV를 쓰고, build 명령과 같은 전처리 결과와 함께 반환"""
+    path = str(directory / "거래데이터.csv")
+    write_dataset(make_raw(BACKEND_ROWS, seed=3, n_days=400), path)
+    return path, add_date_columns(load_csv_file(path))
+
+
+def parity_cases(df, n_random=8):
+    """(이름, filter_data 인자) - parity 명령의 조건과 무작위 조건"""
+    cases = list(_parity_filter_cases(df).items())
+    for i, combination in enumerate(random_combinations(df, n_random, seed=21)):
+        cases.append((f"무작위 {i}", filter_args(*combination)))
+    return cases
+
+
+def assert_same_frame(expected, actual):
+    pd.testing.assert_frame_equal(
+        expected.reset_index(drop=True), actual.reset_index(drop=True)
+    )
+
+
+def assert_filter_parity(df, backend, args):
+    expected = filter_data(df, *args)
+    assert_same_frame(expected, backend.filter_data(*args))
+    return expected
+
+
+def assert_flow_parity(expected, backend, args, group_cols=FLOW_GROUPS):
+    for 기준선택 in PERIOD_COLUMNS:
+        for group_col in group_cols:
+            reference = compute_flow_tables(expected, 기준선택, group_col)
+            tables = backend.compute_flow_tables(args, 기준선택, group_col)
+            for key in FLOW_KEYS:
+                if reference[key] is None:
+                    assert tables[key] is None, (기준선택, group_col, key)
+                else:
+                    assert_same_frame(reference[key], tables[key])
+
+
+def assert_rank_parity(expected, backend, args, group_cols=FLOW_GROUPS):
+    for group_col in group_cols:
+        for top_n in [None, 1, 5]:
+            assert backend.rank_groups(args, group_col, top_n) == rank_groups(
+                expected, group_col, top_n
+            ), (group_col, top_n)
+
+
+def assert_drilldown_parity(expected, backend, args, page_size=25):
+    """최근 기간과 첫 기간의 최대 그룹 셀: 정렬 기준/방향별 첫 페이지와 둘째 페이지"""
+    기준선택, group_col = "year_month", "품목"
+    columns = [col for col in DETAIL_COLUMNS if col in expected.columns]
+    index = get_drilldown_index(expected, 기준선택, group_col)
+    for period in [expected[기준선택].max(), expected[기준선택].min()]:
+        period_rows = expected.iloc[drilldown_positions(index, period)]
+        group = rank_groups(period_rows, group_col, 1)[0]
+        positions = drilldown_positions(index, period, group)
+        for sort_col in DETAIL_SORT_COLUMNS:
+            for ascending in [True, False]:
+                ordered = get_sorted_positions(
+                    expected,
+                    positions,
+                    sort_col,
+                    ascending,
+                    (기준선택, group_col, period, group),
+                )
+                for offset in [0, page_size]:
+                    page = ordered[offset : offset + page_size]
+                    reference = expected.iloc[
+                        page, expected.columns.get_indexer(columns)
+                    ]
+                    actual = backend.drilldown(
+                        args,
+                        기준선택,
+                        period,
+                        group_col,
+                        group,
+                        sort_col=sort_col,
+                        ascending=ascending,
+                        limit=page_size,
+                        offset=offset,
+                    )
+                    assert_same_frame(reference, actual)
+
+        # 기간 전체(그룹 결측 제외)는 같은 행 집합
+        actual = backend.drilldown(args, 기준선택, period, group_col)
+        assert len(actual) == len(drilldown_positions(index, period))
+        np.testing.assert_array_equal(
+            np.sort(actual["구매확정금액(원)"].to_numpy()),
+            np.sort(period_rows["구매확정금액(원)"].to_numpy()),
+        )
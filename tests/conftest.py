@@ -0,0 +1,51 @@
+"""테스트 공통 데이터 - seed 고정 합성 거래 데이터(benchmarks.generate_data)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generate_data import generate_transactions
+from kpi_engine import add_date_columns, process_data
+
+FIXTURE_ROWS = 12_000
+FIXTURE_SEED = 7
+
+
+def make_raw(n_rows=FIXTURE_ROWS, seed=FIXTURE_SEED, n_days=500):
+    """원본 CSV 형태의 거래 - 확정일자에 시각 포함, 일부 행은 결측
+
+    확정일자 결측 행은 전처리에서 제외되고, 부류/구매자구분/품목(축산 외) 결측은 남는다.
+    """
+    raw = generate_transactions(
+        n_rows, seed=seed, n_sellers=120, n_buyers=600, n_days=n_days
+    )
+    rng = np.random.default_rng(seed)
+    # 날짜 경계 비교를 확인하도록 절반의 행에 시각을 붙인다 (나머지는 00:00:00)
+    seconds = np.where(rng.random(n_rows) < 0.5, rng.integers(0, 86_400, n_rows), 0)
+    raw["확정일자"] = (
+        pd.to_datetime(raw["확정일자"]) + pd.to_timedelta(seconds, unit="s")
+    ).dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    raw = raw.astype({"부류": object, "구매자구분": object, "품목": object})
+    raw.loc[rng.random(n_rows) < 0.002, "확정일자"] = None
+    raw.loc[rng.random(n_rows) < 0.01, "부류"] = None
+    raw.loc[rng.random(n_rows) < 0.01, "구매자구분"] = None
+    # 축산 판매자세부구분은 품목명으로 정하므로 품목 결측은 다른 구분에만
+    no_item = (rng.random(n_rows) < 0.01) & (raw["구분"] != "축산").to_numpy()
+    raw.loc[no_item, "품목"] = None
+    return raw
+
+
+def make_dataset(raw):
+    """대시보드와 같은 전처리(process_data → add_date_columns)를 거친 데이터셋"""
+    return add_date_columns(process_data(raw.copy()))
+
+
+@pytest.fixture(scope="session")
+def raw_transactions():
+    return make_raw()
+
+
+@pytest.fixture(scope="session")
+def dataset(raw_transactions):
+    return make_dataset(raw_transactions)
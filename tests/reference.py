@@ -0,0 +1,183 @@
+"""기준 구현 - 최적화 이전 kpi_test_copy.py(d85a6cf)의 계산을 그대로 옮긴 비교 기준
+
+대시보드 함수 안에 있던 계산을 표시 코드 없이 함수로만 분리했다.
+다중 선택(list)은 당시에 없던 기능이므로 == 대신 isin으로 같은 의미를 확장한다.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+
+def _match(series, value):
+    # 다중 선택은 선택값 중 하나, 빈 선택은 전체
+    if isinstance(value, (list, tuple)):
+        return series.isin(value) if value else pd.Series(True, index=series.index)
+    return series == value
+
+
+def _selected(value):
+    return value != "전체" and not (isinstance(value, (list, tuple)) and not value)
+
+
+def filter_data(
+    df,
+    date_range,
+    구분,
+    exclude_rice,
+    부류,
+    품목,
+    seller_type,
+    seller_dtl_type,
+    buyer_type,
+    trade_type,
+):
+    filtered_df = df.copy()
+    # 날짜 필터
+    if len(date_range) == 2:
+        start_date, end_date = date_range
+        filtered_df = filtered_df[
+            (filtered_df["확정일자"].dt.date >= start_date)
+            & (filtered_df["확정일자"].dt.date <= end_date)
+        ]
+    # 구분
+    if _selected(구분):
+        filtered_df = filtered_df[_match(filtered_df["구분"], 구분)]
+    # 벼,찰벼 품목 제외
+    if exclude_rice:
+        filtered_df = filtered_df[~filtered_df["품목"].isin(["벼", "찰벼"])]
+    for value, column in [
+        (부류, "부류"),
+        (품목, "품목"),
+        (seller_type, "판매자구분"),
+        (seller_dtl_type, "판매자세부구분"),
+        (buyer_type, "구매자구분"),
+        (trade_type, "거래유형보정"),
+    ]:
+        if _selected(value):
+            filtered_df = filtered_df[_match(filtered_df[column], value)]
+    return filtered_df
+
+
+def period_kpis(df):
+    """display_kpi_period_section의 조회 기간 KPI"""
+    kpis = {
+        "total_amount": df["구매확정금액(원)"].sum(),
+        "total_orders": len(df),
+        "daily_avg": None,
+        "expected_amount": None,
+        "top_product": None,
+    }
+    if not df.empty:
+        min_date = df["확정일자"].min()
+        max_date = df["확정일자"].max()
+        days = (max_date - min_date).days + 1
+        total_amt = df["구매확정금액(원)"].sum()
+        daily_avg = total_amt / days if days > 0 else 0
+        # 올해 12월31일까지 남은 일수
+        end_of_year = datetime(max_date.year, 12, 31)
+        days_left = max((end_of_year - max_date).days, 0)
+        kpis["daily_avg"] = daily_avg
+        kpis["expected_amount"] = total_amt + (daily_avg * days_left)
+        kpis["top_product"] = df.groupby("품목")["구매확정금액(원)"].sum().idxmax()
+    kpis["distinct"] = {col: df[col].nunique() for col in ["품목", "판매자", "구매자"]}
+    return kpis
+
+
+def change_pct(pivot, show_col_total=True):
+    """_display_flow_section의 직전 기간 대비 증감률 표"""
+    pivot_cols = (
+        [col for col in pivot.columns if col != "합계"]
+        if show_col_total
+        else list(pivot.columns)
+    )
+    change_pct_df = pd.DataFrame(index=pivot.index, columns=pivot_cols)
+    for i in range(1, len(pivot.index)):
+        current_idx = pivot.index[i]
+        prev_idx = pivot.index[i - 1]
+        for col in pivot_cols:
+            current_val = pivot.loc[current_idx, col]
+            prev_val = pivot.loc[prev_idx, col]
+            if prev_val != 0:
+                change_pct_df.loc[current_idx, col] = (
+                    (current_val - prev_val) / prev_val * 100
+                )
+            else:
+                # 이전 값이 0인 경우 현재 값이 0이면 0%, 아니면 100% 변화
+                change_pct_df.loc[current_idx, col] = 0.0 if current_val == 0 else 100.0
+    change_pct_df.loc[pivot.index[0]] = float("nan")
+
+    final_change_pct = pd.DataFrame(index=pivot.index, columns=pivot.columns)
+    for idx in change_pct_df.index:
+        for col in change_pct_df.columns:
+            final_change_pct.loc[idx, col] = change_pct_df.loc[idx, col]
+    # 합계 열에는 행별 평균 증감률 설정 (NaN 제외)
+    if show_col_total:
+        for idx in final_change_pct.index:
+            row_values = change_pct_df.loc[idx].dropna()
+            if not row_values.empty:
+                final_change_pct.loc[idx, "합계"] = row_values.mean()
+            else:
+                final_change_pct.loc[idx, "합계"] = float("nan")
+    return final_change_pct.astype(float)
+
+
+def top_groups(df, group_col, top_n=10):
+    """display_item_analysis의 상위 N개 그룹 (거래금액 내림차순)"""
+    order = (
+        df.groupby(group_col)["구매확정금액(원)"]
+        .sum()
+        .sort_values(ascending=False)
+        .head(top_n)
+        .index.tolist()
+    )
+    return df[df[group_col].isin(order)], order
+
+
+def movers(df, 기준선택, dim):
+    """main()의 상위 거래/증가/감소 Top 10 계산 (품목 대신 dim)"""
+    top = df.groupby(dim)["구매확정금액(원)"].sum().reset_index()
+    top = top.sort_values("구매확정금액(원)", ascending=False).head(10)
+
+    item_pivot = df.groupby([기준선택, dim])["구매확정금액(원)"].sum().reset_index()
+    기준값s = sorted(df[기준선택].unique())
+    if len(기준값s) < 2:
+        return top, None
+    prev, curr = 기준값s[-2], 기준값s[-1]
+    prev_items = item_pivot[item_pivot[기준선택] == prev].set_index(dim)
+    curr_items = item_pivot[item_pivot[기준선택] == curr].set_index(dim)
+    merged = (
+        curr_items[["구매확정금액(원)"]]
+        .join(
+            prev_items[["구매확정금액(원)"]],
+            lsuffix="_curr",
+            rsuffix="_prev",
+            how="outer",
+        )
+        .fillna(0)
+    )
+    merged["증감금액(원)"] = (
+        merged["구매확정금액(원)_curr"] - merged["구매확정금액(원)_prev"]
+    )
+    merged["증감률(%)"] = merged.apply(
+        lambda row: (
+            (row["증감금액(원)"] / row["구매확정금액(원)_prev"] * 100)
+            if row["구매확정금액(원)_prev"] != 0
+            else 0
+        ),
+        axis=1,
+    )
+    merged["증감금액(백만원)"] = (merged["증감금액(원)"] / 1_000_000).round(0)
+    merged["매출액(백만원)"] = (merged["구매확정금액(원)_curr"] / 1_000_000).round(0)
+    merged["증감률(%)"] = (
+        merged["증감률(%)"].replace([float("inf"), float("-inf")], 0).round(1).fillna(0)
+    )
+    return top, merged.reset_index()
+
+
+def drilldown(df, 기준선택, group_col, selected_period, selected_group=None):
+    """_show_filtered_transactions_by_period / _show_filtered_transactions의 선택 행"""
+    period_data = df[df[기준선택] == selected_period]
+    if selected_group is None:
+        return period_data
+    return period_data[period_data[group_col] == selected_group]
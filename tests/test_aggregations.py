@@ -0,0 +1,407 @@
+"""전체 누계 KPI, 증감률, 추세선, 상위 N 그룹, 증감 상위 항목, 드릴다운 - 기준 구현과 비교"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import reference
+from benchmarks.generate_data import generate_transactions, write_dataset
+from conftest import make_dataset, make_raw
+from kpi_aggregations import _build_drilldown_index
+from kpi_engine import (
+    HLL_DIMENSIONS,
+    HLL_ERROR_PCT,
+    KPI_DISTINCT_COLUMNS,
+    MOVER_DIMENSIONS,
+    PERIOD_COLUMNS,
+    TREND_YTD_LABEL,
+    approx_distinct_counts,
+    build_kpi_snapshot,
+    compute_change_pct,
+    compute_movers,
+    compute_overall_kpis,
+    compute_period_kpis,
+    compute_trend_lines,
+    drilldown_positions,
+    filter_data,
+    full_period_index,
+    get_kpi_snapshot,
+    get_sorted_positions,
+    load_csv_snapshot,
+    peek_derived,
+    rank_groups,
+    select_top_groups,
+    update_kpi_snapshot,
+)
+
+
+def year_frame(df, year):
+    """대시보드 요약 섹션처럼 한 해의 조회 결과"""
+    return filter_data(
+        df,
+        (pd.Timestamp(year, 1, 1).date(), pd.Timestamp(year, 12, 31).date()),
+        "전체",
+        False,
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+        "전체",
+    )
+
+
+# ================= 전체 누계 KPI =================
+def assert_snapshot_equal(result, expected):
+    assert result["total_amount"] == pytest.approx(expected["total_amount"], rel=1e-12)
+    assert result["total_orders"] == expected["total_orders"]
+    assert result["distinct"] == expected["distinct"]
+
+
+def exact_snapshot(df):
+    """전체 행을 다시 읽어 계산한 기대값"""
+    return {
+        "total_amount": df["구매확정금액(원)"].sum(),
+        "total_orders": len(df),
+        "distinct": {col: set(df[col].dropna()) for col in KPI_DISTINCT_COLUMNS},
+    }
+
+
+def test_overall_kpis_match_full_scan(dataset):
+    kpis = compute_overall_kpis(dataset)
+    assert kpis["total_amount"] == pytest.approx(dataset["구매확정금액(원)"].sum())
+    assert kpis["total_orders"] == len(dataset)
+    assert kpis["distinct"] == {
+        col: dataset[col].nunique() for col in KPI_DISTINCT_COLUMNS
+    }
+    # 같은 버전은 스냅샷을 한 번만 만듦
+    assert get_kpi_snapshot(dataset) is get_kpi_snapshot(dataset)
+
+
+def test_kpi_snapshot_update_matches_rebuild(dataset):
+    """앞 70% 스냅샷에 나머지 행을 반영한 결과 = 전체로 만든 스냅샷"""
+    cut = int(len(dataset) * 0.7)
+    head = build_kpi_snapshot(dataset.iloc[:cut])
+    updated = update_kpi_snapshot(head, dataset.iloc[cut:])
+    assert_snapshot_equal(updated, exact_snapshot(dataset))
+    # 기존 스냅샷은 그대로
+    assert_snapshot_equal(head, exact_snapshot(dataset.iloc[:cut]))
+
+
+@pytest.fixture
+def kpi_csv(tmp_path, monkeypatch):
+    """(CSV 경로, 덧붙일 행) - 기존 행만 쓴 파일, 스냅샷은 tmp_path 아래에 기록"""
+    monkeypatch.setenv("KPI_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    raw = make_raw(1_500, seed=31, n_days=120)
+    raw = raw.sort_values("확정일자", kind="stable").reset_index(drop=True)
+    path = str(tmp_path / "거래데이터.csv")
+    write_dataset(raw.iloc[:1_200], path)
+    return path, raw.iloc[1_200:]
+
+
+def test_kpi_snapshot_survives_reload_and_follows_appends(kpi_csv):
+    path, tail = kpi_csv
+    df = load_csv_snapshot(path)
+    snapshot = get_kpi_snapshot(df)
+    assert_snapshot_equal(snapshot, exact_snapshot(df))
+
+    # 스냅샷 파일에서 다시 읽어도 같은 버전이며 KPI도 같음
+    reloaded = load_csv_snapshot(path)
+    pd.testing.assert_frame_equal(reloaded, df)
+    assert reloaded.attrs["dataset_version"] == df.attrs["dataset_version"]
+    assert_snapshot_equal(get_kpi_snapshot(reloaded), snapshot)
+
+    # 행을 덧붙이면 새 버전에 추가분만 반영한 스냅샷이 미리 등록됨
+    with open(path, "a", encoding="cp949", newline="") as f:
+        tail.to_csv(f, index=False, header=False)
+    merged = load_csv_snapshot(path)
+    assert merged.attrs["dataset_version"] != df.attrs["dataset_version"]
+    incremental = peek_derived(merged, ("kpi_snapshot",))
+    assert incremental is not None
+    assert_snapshot_equal(incremental, exact_snapshot(merged))
+    assert incremental["total_orders"] > snapshot["total_orders"]
+
+
+def test_kpi_snapshot_invalidated_when_file_is_rewritten(kpi_csv):
+    path, _ = kpi_csv
+    df = load_csv_snapshot(path)
+    snapshot = get_kpi_snapshot(df)
+
+    rewritten = pd.read_csv(path, encoding="cp949")
+    rewritten["구매확정금액(원)"] = rewritten["구매확정금액(원)"] * 2
+    write_dataset(rewritten, path)
+    changed = load_csv_snapshot(path)
+    assert changed.attrs["dataset_version"] != df.attrs["dataset_version"]
+    result = get_kpi_snapshot(changed)
+    assert_snapshot_equal(result, exact_snapshot(changed))
+    assert result["total_amount"] == pytest.approx(2 * snapshot["total_amount"])
+
+
+# ================= 근사 고유 개수 (HyperLogLog) =================
+# 고정 seed에서 상대 오차가 표준 오차(HLL_ERROR_PCT)의 3배 안
+HLL_TOLERANCE_PCT = 3 * HLL_ERROR_PCT
+
+
+@pytest.fixture(scope="module")
+def high_cardinality():
+    """판매자/구매자 고유값이 레지스터 수(4096)보다 많은 데이터셋 (선형 계수 구간 밖)"""
+    raw = generate_transactions(
+        60_000, seed=37, n_sellers=5_000, n_buyers=40_000, n_days=200
+    )
+    return make_dataset(raw)
+
+
+def assert_within_error_bound(approx, exact):
+    for col, count in exact.items():
+        error_pct = abs(approx[col] - count) / max(count, 1) * 100
+        assert error_pct <= HLL_TOLERANCE_PCT, (col, approx[col], count)
+
+
+def test_hll_distinct_counts_within_error_bound(high_cardinality):
+    exact = {col: high_cardinality[col].nunique() for col in HLL_DIMENSIONS}
+    assert exact["구매자"] > 4_096
+    assert_within_error_bound(approx_distinct_counts(high_cardinality), exact)
+    # 정확 모드는 그대로 nunique
+    assert compute_overall_kpis(high_cardinality)["distinct"] == exact
+    approx = compute_overall_kpis(high_cardinality, approx=True)["distinct"]
+    assert_within_error_bound(approx, exact)
+
+
+@pytest.mark.parametrize(
+    "구분, 판매자구분, months",
+    [("전체", "전체", 1), ("청과", "전체", 3), ("전체", "위탁판매자", 6)],
+)
+def test_approx_period_kpis_within_error_bound(
+    high_cardinality, 구분, 판매자구분, months
+):
+    """조회 조건의 셀 스케치를 병합한 추정치 vs 조회 결과의 nunique"""
+    start = high_cardinality["확정일자"].min()
+    date_range = (start.date(), (start + pd.DateOffset(months=months)).date())
+    args = [date_range, 구분, False, "전체", "전체", 판매자구분, "전체"]
+    view = filter_data(high_cardinality, *args, "전체", "전체")
+    assert not view.empty
+
+    approx = compute_period_kpis(view, high_cardinality, approx=True)
+    exact = compute_period_kpis(view)
+    assert approx["approx"] and not exact["approx"]
+    assert exact["distinct"] == {col: view[col].nunique() for col in HLL_DIMENSIONS}
+    assert_within_error_bound(approx["distinct"], exact["distinct"])
+
+
+# ================= 증감률 =================
+def random_pivot(rng, n_periods=12, n_groups=6):
+    """0이 섞인 기간 × 그룹 피벗 (이전/현재 값이 0인 경우 포함)"""
+    values = rng.integers(0, 50, size=(n_periods, n_groups)).astype(float)
+    values[rng.random(values.shape) < 0.3] = 0.0
+    return pd.DataFrame(
+        values,
+        index=[f"2024-{month:02d}" for month in range(1, n_periods + 1)],
+        columns=[f"그룹{i}" for i in range(n_groups)],
+    )
+
+
+@pytest.mark.parametrize("show_col_total", [True, False])
+def test_change_pct_matches_reference(show_col_total):
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        pivot = random_pivot(rng)
+        if show_col_total:
+            pivot["합계"] = pivot.sum(axis=1)
+        pd.testing.assert_frame_equal(
+            compute_change_pct(pivot, show_col_total),
+            reference.change_pct(pivot, show_col_total),
+        )
+
+
+def test_change_pct_of_flow_pivot(dataset):
+    pivot = dataset.pivot_table(
+        index="year_month",
+        columns="부류",
+        values="구매확정금액(원)",
+        aggfunc="sum",
+        fill_value=0,
+    ).astype(float)
+    pivot["합계"] = pivot.sum(axis=1)
+    pd.testing.assert_frame_equal(
+        compute_change_pct(pivot), reference.change_pct(pivot)
+    )
+
+
+def test_change_pct_single_period():
+    pivot = pd.DataFrame({"A": [3.0], "합계": [3.0]}, index=["2024"])
+    change = compute_change_pct(pivot)
+    assert change.isna().all().all()
+
+
+# ================= 추세선 =================
+def test_full_period_index_fills_gaps():
+    months = full_period_index(pd.Index(["2023-11", "2024-02"]), "year_month")
+    assert list(months) == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    quarters = full_period_index(pd.Index(["2023-Q4", "2024-Q2"]), "year_quarter")
+    assert list(quarters) == ["2023-Q4", "2024-Q1", "2024-Q2"]
+    weeks = full_period_index(pd.Index(["2024-01", "2024-04"]), "year_week")
+    assert list(weeks) == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    years = full_period_index(pd.Index([2021, 2023]), "year")
+    assert list(years) == [2021, 2022, 2023]
+
+
+def test_trend_lines_count_missing_periods_as_zero():
+    """거래가 없는 기간(2024-03)은 0으로 보고 달력 기간 기준으로 평균/누계를 낸다"""
+    pivot = pd.DataFrame(
+        {"A": [10.0, 20.0, 30.0, 40.0, 50.0], "합계": [10.0, 20.0, 30.0, 40.0, 50.0]},
+        index=pd.Index(["2023-12", "2024-01", "2024-02", "2024-04", "2024-05"]),
+    )
+    lines = compute_trend_lines(pivot, "year_month", windows=[2])
+    assert list(lines) == ["2개월 이동평균", TREND_YTD_LABEL]
+    # 2개월 평균: 2024-04는 (0 + 40) / 2, 2024-05는 (40 + 50) / 2
+    np.testing.assert_allclose(
+        lines["2개월 이동평균"]["A"].to_numpy(),
+        [np.nan, 15.0, 25.0, 20.0, 45.0],
+    )
+    # 연누계는 2024-01에서 다시 시작
+    np.testing.assert_allclose(
+        lines[TREND_YTD_LABEL]["A"].to_numpy(), [10.0, 20.0, 50.0, 90.0, 140.0]
+    )
+    assert list(lines[TREND_YTD_LABEL].index) == list(pivot.index)
+    assert list(lines[TREND_YTD_LABEL].columns) == ["A"]
+
+
+def test_trend_lines_week_gap_across_year():
+    """2023-52 다음 주가 2024-01 (2023년은 52주), 2024-02는 거래 없음"""
+    pivot = pd.DataFrame(
+        {"A": [4.0, 8.0, 6.0]}, index=pd.Index(["2023-52", "2024-01", "2024-03"])
+    )
+    lines = compute_trend_lines(pivot, "year_week", windows=[3])
+    np.testing.assert_allclose(
+        lines["3주 이동평균"]["A"].to_numpy(), [np.nan, np.nan, (8.0 + 0 + 6.0) / 3]
+    )
+    np.testing.assert_allclose(lines[TREND_YTD_LABEL]["A"].to_numpy(), [4.0, 8.0, 14.0])
+
+
+def test_trend_lines_of_dataset_pivot(dataset):
+    """데이터셋 피벗의 이동평균은 달력 기간으로 채운 rolling 평균과 같다"""
+    pivot = dataset.pivot_table(
+        index="year_week", columns="구분", values="구매확정물량", aggfunc="sum"
+    ).fillna(0)
+    pivot = pivot.iloc[::3]  # 일부 주를 빼서 빈 기간을 만듦
+    lines = compute_trend_lines(pivot, "year_week", windows=[4])
+    calendar = pivot.reindex(full_period_index(pivot.index, "year_week"), fill_value=0)
+    expected = calendar.rolling(4).mean().reindex(pivot.index)
+    pd.testing.assert_frame_equal(lines["4주 이동평균"], expected, check_names=False)
+
+
+# ================= 상위 N 그룹 =================
+@pytest.mark.parametrize("group_col", ["품목", "판매자", "부류", "구매자구분"])
+@pytest.mark.parametrize("top_n", [1, 5, "7", 1000])
+def test_select_top_groups_matches_reference(dataset, group_col, top_n):
+    expected_df, expected_order = reference.top_groups(dataset, group_col, int(top_n))
+    top_df, order = select_top_groups(dataset, group_col, top_n)
+    assert order == expected_order
+    np.testing.assert_array_equal(top_df.index, expected_df.index)
+    assert rank_groups(dataset, group_col, int(top_n)) == expected_order
+
+
+def test_select_top_groups_without_limit(dataset):
+    top_df, order = select_top_groups(dataset, "품목")
+    assert top_df is dataset
+    assert order == reference.top_groups(dataset, "품목", None)[1]
+
+
+def test_select_top_groups_invalid_top_n_uses_10(dataset):
+    _, order = select_top_groups(dataset, "품목", "상위")
+    assert order == reference.top_groups(dataset, "품목", 10)[1]
+
+
+# ================= 증감 상위 항목 =================
+def assert_ranked_like(result, expected, key, ascending):
+    """동률 순서와 무관하게 같은 순위 값과 같은 항목별 수치인지 확인"""
+    ranked = expected.sort_values(key, ascending=ascending)
+    k = len(result)
+    np.testing.assert_allclose(result[key], ranked[key].head(k))
+    # 경계 동률이 없으면 항목 집합도 같아야 한다
+    if k == len(ranked) or ranked[key].iloc[k - 1] != ranked[key].iloc[k]:
+        assert set(result.iloc[:, 0]) == set(ranked.iloc[:k, 0])
+
+
+@pytest.mark.parametrize("기준선택", PERIOD_COLUMNS)
+@pytest.mark.parametrize("dim", MOVER_DIMENSIONS)
+def test_movers_match_reference(dataset, 기준선택, dim):
+    year_df = year_frame(dataset, 2024)
+    expected_top, expected_merged = reference.movers(year_df, 기준선택, dim)
+    movers = compute_movers(year_df, 기준선택, dim)
+
+    assert_ranked_like(movers["top"], expected_top, "구매확정금액(원)", False)
+    if expected_merged is None:
+        assert movers["increase"] is None
+        return
+    periods = sorted(year_df[기준선택].unique())
+    assert movers["periods"] == (periods[-2], periods[-1])
+
+    merged = expected_merged.set_index(dim)
+    for key, ascending in [("increase", False), ("decrease", True)]:
+        result = movers[key]
+        assert len(result) == min(10, len(merged))
+        assert_ranked_like(result, expected_merged, "증감금액(원)", ascending)
+        # 항목별 금액/증감률은 기준 구현의 outer join 결과와 같다
+        rows = merged.loc[result[dim]]
+        for column in [
+            "구매확정금액(원)_curr",
+            "구매확정금액(원)_prev",
+            "증감금액(원)",
+            "증감률(%)",
+            "증감금액(백만원)",
+            "매출액(백만원)",
+        ]:
+            np.testing.assert_allclose(result[column], rows[column], err_msg=column)
+
+
+# ================= 드릴다운 =================
+@pytest.mark.parametrize("기준선택", ["year_month", "year_week"])
+@pytest.mark.parametrize("group_col", ["품목", "부류", "판매자세부구분"])
+def test_drilldown_matches_reference(dataset, 기준선택, group_col):
+    index = _build_drilldown_index(dataset, 기준선택, group_col)
+    for period in dataset[기준선택].unique():
+        expected = reference.drilldown(dataset, 기준선택, group_col, period)
+        # 기간 전체는 그룹 순으로 모이므로 행 집합을 비교 (그룹 결측 행은 제외)
+        positions = drilldown_positions(index, period)
+        expected_rows = dataset.index.get_indexer(
+            expected.index[expected[group_col].notna()]
+        )
+        np.testing.assert_array_equal(np.sort(positions), expected_rows)
+
+        # 셀 단위는 기간별 앞쪽 그룹 몇 개만 (주 × 품목 전체는 너무 많음)
+        for group in expected[group_col].dropna().unique()[:5]:
+            cell = reference.drilldown(dataset, 기준선택, group_col, period, group)
+            np.testing.assert_array_equal(
+                drilldown_positions(index, period, group),
+                dataset.index.get_indexer(cell.index),
+            )
+
+
+def test_drilldown_unknown_cell_is_empty(dataset):
+    index = _build_drilldown_index(dataset, "year_month", "품목")
+    assert len(drilldown_positions(index, "1999-01")) == 0
+    assert len(drilldown_positions(index, "2024-01", "없는 품목")) == 0
+
+
+@pytest.mark.parametrize("sort_col", ["확정일자", "구매확정금액(원)", "구매확정물량"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sorted_positions_match_reference(dataset, sort_col, ascending):
+    """정렬 값 순서는 기준 구현(sort_values)과 같고, 동률은 원래 행 순서 유지"""
+    index = _build_drilldown_index(dataset, "year_month", "구분")
+    positions = drilldown_positions(index, "2024-03", "청과")
+    cell = reference.drilldown(dataset, "year_month", "구분", "2024-03", "청과")
+    expected = cell.sort_values(sort_col, ascending=ascending)
+
+    selection = ("test", "year_month", "구분", "2024-03", "청과")
+    sorted_positions = get_sorted_positions(
+        dataset, positions, sort_col, ascending, selection
+    )
+    np.testing.assert_array_equal(
+        dataset[sort_col].iloc[sorted_positions].to_numpy(),
+        expected[sort_col].to_numpy(),
+    )
+    stable = cell.sort_values(sort_col, ascending=ascending, kind="stable")
+    np.testing.assert_array_equal(
+        sorted_positions, dataset.index.get_indexer(stable.index)
+    )
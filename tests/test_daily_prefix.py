@@ -0,0 +1,230 @@
+"""일별 누적합(range_totals) - 조건에 맞는 행을 직접 집계한 결과와 비교"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generate_data import write_dataset
+from conftest import make_dataset
+from kpi_cache import _DERIVED_STORE_MAX_ENTRIES, peek_derived
+from kpi_engine import (
+    filter_data,
+    filter_positions,
+    filter_state,
+    get_daily_prefix,
+    get_month_partitions,
+    range_totals,
+)
+from kpi_ingest import _load_csv_full, append_csv_tail
+from kpi_sketches import _build_daily_prefix
+
+N_RANGES = 200
+
+
+def scan_totals(df, filters):
+    """행 스캔 기준: filter_positions로 고른 행의 합계, 첫/마지막 확정일시, 품목별 금액"""
+    selections = {
+        "구분": filters["구분"],
+        "부류": filters["부류"],
+        "품목": filters["품목"],
+        "seller_type": filters["판매자구분"],
+        "seller_dtl_type": filters["판매자세부구분"],
+        "buyer_type": filters["구매자구분"],
+        "trade_type": filters["거래유형보정"],
+    }
+    rows = df.iloc[
+        filter_positions(
+            df, filters["date_range"], filters["exclude_rice"], **selections
+        )
+    ]
+    return {
+        "amount": rows["구매확정금액(원)"].sum(),
+        "volume": rows["구매확정물량"].sum(),
+        "count": len(rows),
+        "min_date": rows["확정일자"].min() if len(rows) else None,
+        "max_date": rows["확정일자"].max() if len(rows) else None,
+        "item_amounts": rows.groupby("품목")["구매확정금액(원)"].sum(),
+    }
+
+
+def assert_totals_equal(result, expected):
+    for key in ["amount", "volume", "count", "min_date", "max_date"]:
+        assert result[key] == expected[key], key
+    pd.testing.assert_series_equal(
+        result["item_amounts"],
+        expected["item_amounts"],
+        check_names=False,
+        check_index_type=False,
+        check_dtype=False,
+    )
+
+
+def random_filters(rng, df):
+    """무작위 조회 기간(데이터 범위 밖 포함)과 구분 선택, 가끔 부류/벼 제외"""
+    first = df["확정일자"].min().normalize()
+    days = (df["확정일자"].max().normalize() - first).days
+    start = first + pd.Timedelta(days=int(rng.integers(-10, days + 10)))
+    end = start + pd.Timedelta(days=int(rng.integers(0, 200)))
+    date_range = () if rng.random() < 0.1 else (start.date(), end.date())
+
+    kinds = df["구분"].dropna().unique()
+    draw = rng.random()
+    if draw < 0.3:
+        구분 = "전체"
+    elif draw < 0.6:
+        구분 = str(rng.choice(kinds))
+    else:
+        구분 = list(rng.choice(kinds, size=int(rng.integers(1, 4)), replace=False))
+    부류 = "전체"
+    if rng.random() < 0.2:
+        부류 = str(rng.choice(df["부류"].dropna().unique()))
+    exclude_rice = bool(rng.random() < 0.3)
+    _, filters = filter_state(
+        date_range, 구분, exclude_rice, 부류, "전체", "전체", "전체", "전체", "전체"
+    )
+    return filters
+
+
+def test_range_totals_match_row_scan(dataset):
+    rng = np.random.default_rng(5)
+    for _ in range(N_RANGES):
+        filters = random_filters(rng, dataset)
+        assert_totals_equal(
+            range_totals(dataset, filters), scan_totals(dataset, filters)
+        )
+
+
+def test_range_totals_date_range_override(dataset):
+    """date_range 인자는 filters의 조회 기간 대신 사용된다"""
+    _, filters = filter_state((), "청과", False, *["전체"] * 6)
+    window = (pd.Timestamp(2023, 11, 20).date(), pd.Timestamp(2024, 2, 10).date())
+    _, windowed = filter_state(window, "청과", False, *["전체"] * 6)
+    assert_totals_equal(
+        range_totals(dataset, filters, window), scan_totals(dataset, windowed)
+    )
+
+
+def test_range_totals_outside_data_is_empty(dataset):
+    window = (pd.Timestamp(2030, 1, 1).date(), pd.Timestamp(2030, 12, 31).date())
+    _, filters = filter_state(window, "전체", False, *["전체"] * 6)
+    totals = range_totals(dataset, filters)
+    assert totals["count"] == 0
+    assert totals["amount"] == 0
+    assert totals["min_date"] is None
+    assert totals["item_amounts"].empty
+
+
+def test_dataset_structures_survive_many_filter_changes(dataset):
+    """필터별 캐시 항목이 LRU 한도를 넘게 쌓여도 누적합/기간 파티션은 다시 만들지 않는다"""
+    prefix = get_daily_prefix(dataset)
+    partitions = get_month_partitions(dataset)
+    codes = peek_derived(dataset, ("category_codes",))
+    assert codes is not None
+
+    rng = np.random.default_rng(3)
+    for _ in range(_DERIVED_STORE_MAX_ENTRIES + 10):
+        # filter_state의 조건 dict는 filter_data 인자 순서와 같다
+        filter_data(dataset, *random_filters(rng, dataset).values())
+    assert get_daily_prefix(dataset) is prefix
+    assert get_month_partitions(dataset) is partitions
+    assert peek_derived(dataset, ("category_codes",)) is codes
+
+
+# ================= 행 추가 후 누적합 재사용 =================
+def split_by_date(raw, fraction=0.8):
+    """확정일자 순으로 정렬하여 앞부분(기존 파일)과 뒷부분(추가 행)으로 나눔"""
+    ordered = raw.sort_values("확정일자", kind="stable").reset_index(drop=True)
+    cut = int(len(ordered) * fraction)
+    return ordered.iloc[:cut], ordered.iloc[cut:]
+
+
+def assert_prefix_equal(result, expected):
+    pd.testing.assert_frame_equal(result["cells"], expected["cells"])
+    for key in ["keys", "first_ts", "last_ts"]:
+        np.testing.assert_array_equal(result[key], expected[key])
+    assert result["first_day"] == expected["first_day"]
+    assert result["span"] == expected["span"]
+    assert result["cumulative"].keys() == expected["cumulative"].keys()
+    for name, values in expected["cumulative"].items():
+        np.testing.assert_array_equal(result["cumulative"][name], values)
+
+
+def test_prefix_reuses_sealed_months(raw_transactions):
+    """이전 누적합의 행 수가 같은 월은 그대로 쓰고, 결과는 새로 만든 누적합과 같다"""
+    head, tail = split_by_date(raw_transactions)
+    base = make_dataset(head)
+    full = make_dataset(pd.concat([head, tail]))
+    previous = _build_daily_prefix(base)
+    updated = _build_daily_prefix(full, previous)
+
+    last_base_month = base["year_month"].max()
+    for label, part in updated["partitions"].items():
+        if label < last_base_month:
+            assert part is previous["partitions"][label]
+        else:
+            assert part is not previous["partitions"].get(label)
+    assert_prefix_equal(updated, _build_daily_prefix(full))
+
+
+def test_prefix_recomputes_rewritten_month_with_same_row_count(raw_transactions):
+    """행 수는 같고 내용이 바뀐 달은 이전 집계를 쓰지 않는다"""
+    base = make_dataset(raw_transactions)
+    previous = _build_daily_prefix(base)
+    month = sorted(previous["partitions"])[1]
+
+    rewritten = raw_transactions.copy()
+    in_month = pd.to_datetime(rewritten["확정일자"]).dt.strftime("%Y-%m") == month
+    rewritten.loc[in_month, "구매확정물량"] = (
+        rewritten.loc[in_month, "구매확정물량"] + 7
+    )
+    changed = make_dataset(rewritten)
+    updated = _build_daily_prefix(changed, previous)
+
+    assert updated["partitions"][month]["rows"] == previous["partitions"][month]["rows"]
+    assert updated["partitions"][month] is not previous["partitions"][month]
+    for label, part in updated["partitions"].items():
+        if label != month:
+            assert part is previous["partitions"][label]
+    assert_prefix_equal(updated, _build_daily_prefix(changed))
+
+
+@pytest.fixture
+def appended_csv(tmp_path, raw_transactions):
+    """기존 CSV를 적재한 데이터셋(누적합 생성됨)과 행을 덧붙인 파일 경로"""
+    head, tail = split_by_date(raw_transactions)
+    path = str(tmp_path / "거래데이터.csv")
+    write_dataset(head, path)
+    base = _load_csv_full(path)
+    get_daily_prefix(base)
+    # 병합 전에 조회 조건이 여러 번 바뀌어도 이전 누적합은 캐시에 남아 있어야 한다
+    rng = np.random.default_rng(4)
+    for _ in range(_DERIVED_STORE_MAX_ENTRIES + 10):
+        filter_data(base, *random_filters(rng, base).values())
+    with open(path, "a", encoding="cp949", newline="") as f:
+        tail.to_csv(f, index=False, header=False)
+    return base, path
+
+
+def test_appended_csv_prefix_matches_fresh_load(appended_csv):
+    base, path = appended_csv
+    merged = append_csv_tail(base, path)
+    assert merged is not None and len(merged) > len(base)
+
+    # 병합 시 이전 누적합에서 갱신한 결과가 새 버전에 등록되어 있어야 한다
+    prefix = peek_derived(merged, ("daily_prefix",))
+    assert prefix is not None
+    previous = peek_derived(base, ("daily_prefix",))
+    sealed = [
+        label for label in previous["partitions"] if label < base["year_month"].max()
+    ]
+    assert sealed
+    for label in sealed:
+        assert prefix["partitions"][label] is previous["partitions"][label]
+
+    fresh = _load_csv_full(path)
+    assert_prefix_equal(prefix, _build_daily_prefix(fresh))
+
+    rng = np.random.default_rng(9)
+    for _ in range(50):
+        filters = random_filters(rng, merged)
+        assert_totals_equal(range_totals(merged, filters), scan_totals(fresh, filters))
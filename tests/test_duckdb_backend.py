@@ -0,0 +1,74 @@
+"""DuckDB 백엔드 - 픽스처 CSV로 만든 Parquet 조회 결과가 pandas 경로와 같은지 비교"""
+
+import pytest
+
+from backend_parity import (
+    assert_drilldown_parity,
+    assert_filter_parity,
+    assert_flow_parity,
+    assert_rank_parity,
+    build_fixture_csv,
+    parity_cases,
+)
+from kpi_duckdb import DuckDBBackend, main
+from kpi_sql import check_parity
+
+# duckdb(선택 의존성)와 Parquet 기록용 pyarrow가 없으면 건너뜀
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="module")
+def duckdb_dataset(tmp_path_factory):
+    """(pandas 데이터셋, Parquet 백엔드) - build 명령으로 row group 여러 개의 Parquet 생성"""
+    directory = tmp_path_factory.mktemp("duckdb")
+    csv_path, df = build_fixture_csv(directory)
+    path = str(directory / "거래데이터.parquet")
+    assert main(["build", csv_path, path, "--row-group-rows", "1000"]) == 0
+    return df, DuckDBBackend(path, "test-duckdb")
+
+
+@pytest.fixture(scope="module")
+def filter_cases(duckdb_dataset):
+    df, _ = duckdb_dataset
+    return parity_cases(df)
+
+
+def test_parity_command_has_no_failures(duckdb_dataset):
+    df, backend = duckdb_dataset
+    checked, failures = check_parity(df, backend)
+    assert checked > 0
+    assert failures == []
+
+
+def test_filter_matches_pandas(duckdb_dataset, filter_cases):
+    df, backend = duckdb_dataset
+    for _, args in filter_cases:
+        assert_filter_parity(df, backend, args)
+
+
+def test_flow_and_top_n_match_pandas(duckdb_dataset, filter_cases):
+    df, backend = duckdb_dataset
+    for _, args in filter_cases:
+        expected = assert_filter_parity(df, backend, args)
+        if expected.empty:
+            continue
+        assert_flow_parity(expected, backend, args)
+        assert_rank_parity(expected, backend, args)
+
+
+def test_drilldown_matches_pandas(duckdb_dataset, filter_cases):
+    df, backend = duckdb_dataset
+    for _, args in filter_cases:
+        expected = assert_filter_parity(df, backend, args)
+        if not expected.empty:
+            assert_drilldown_parity(expected, backend, args)
+
+
+def test_filter_arrow_reads_selected_columns(duckdb_dataset, filter_cases):
+    df, backend = duckdb_dataset
+    _, args = filter_cases[1]
+    columns = ["확정일자", "품목", "구매확정금액(원)"]
+    table = backend.filter_arrow(args, columns)
+    assert table.column_names == columns
+    assert table.num_rows == len(assert_filter_parity(df, backend, args))
@@ -0,0 +1,152 @@
+"""데이터 내보내기 - 청크 기록 왕복 비교, Excel 시트 분할, 크기 상한, 보관 시간 정리"""
+
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi_engine import (
+    ExportError,
+    export_chunks_to_file,
+    iter_frame_chunks,
+    iter_position_chunks,
+    materialize_detail_page,
+    new_export_path,
+    prune_export_dir,
+)
+from kpi_export import _write_xlsx_chunks
+
+CHUNK_ROWS = 250
+COLUMNS = [
+    "확정일자",
+    "구분",
+    "부류",
+    "품목",
+    "판매자",
+    "구매확정금액(원)",
+    "구매확정물량",
+]
+
+
+@pytest.fixture(scope="module")
+def export_frame(dataset):
+    """첫 청크에서 부류가 모두 결측인 프레임 (전체에는 값이 있음)"""
+    frame = dataset[COLUMNS].iloc[:1_000].reset_index(drop=True)
+    frame.loc[: CHUNK_ROWS - 1, "부류"] = None
+    assert frame["부류"].notna().any()
+    return frame
+
+
+def read_back(path, export_format):
+    if export_format == "CSV":
+        return pd.read_csv(path, encoding="utf-8-sig", parse_dates=["확정일자"])
+    if export_format == "Parquet":
+        return pd.read_parquet(path)
+    return pd.read_excel(path, sheet_name="data")
+
+
+@pytest.mark.parametrize("export_format", ["CSV", "Parquet", "Excel"])
+def test_chunked_export_round_trip(tmp_path, export_frame, export_format):
+    path = str(tmp_path / f"export.{export_format.lower()}")
+    export_chunks_to_file(
+        iter_frame_chunks(export_frame, CHUNK_ROWS),
+        export_format,
+        path,
+        schema_frame=export_frame,
+    )
+    result = read_back(path, export_format)
+    expected = export_frame
+    if export_format != "Parquet":
+        # CSV/Excel은 결측 문자열을 NaN으로, 시각은 초 단위로 읽음
+        expected = export_frame.astype({"부류": object}).where(
+            export_frame.notna(), np.nan
+        )
+        result["확정일자"] = pd.to_datetime(result["확정일자"])
+    pd.testing.assert_frame_equal(
+        result, expected, check_dtype=export_format == "Parquet"
+    )
+
+
+def test_parquet_schema_comes_from_whole_frame(tmp_path, export_frame):
+    """첫 청크만으로 스키마를 정하면 부류가 null 타입이 되어 다음 청크를 기록할 수 없다"""
+    path = str(tmp_path / "detail.parquet")
+    positions = np.arange(len(export_frame))
+    export_chunks_to_file(
+        (
+            materialize_detail_page(export_frame, chunk, COLUMNS)
+            for chunk in iter_position_chunks(positions, CHUNK_ROWS)
+        ),
+        "Parquet",
+        path,
+        schema_frame=export_frame,
+    )
+    result = pd.read_parquet(path)
+    assert len(result) == len(export_frame)
+    assert result["부류"].notna().sum() == export_frame["부류"].notna().sum()
+    # 청크에서 계산한 파생 컬럼도 기록
+    assert "구매확정금액(백만원)" in result.columns
+
+
+def test_xlsx_rows_continue_on_next_sheet():
+    frame = pd.DataFrame({"a": range(10), "b": [f"v{i}" for i in range(10)]})
+    buffer = io.BytesIO()
+    # 시트당 머리글 포함 4행 → 3행씩 4개 시트
+    _write_xlsx_chunks(iter_frame_chunks(frame, 4), buffer, max_rows=4)
+    buffer.seek(0)
+    sheets = pd.read_excel(buffer, sheet_name=None)
+    assert list(sheets) == ["data", "data_2", "data_3", "data_4"]
+    assert [len(sheet) for sheet in sheets.values()] == [3, 3, 3, 1]
+    pd.testing.assert_frame_equal(pd.concat(sheets.values(), ignore_index=True), frame)
+
+
+def test_empty_export_writes_header_only(tmp_path, export_frame):
+    path = str(tmp_path / "empty.xlsx")
+    export_chunks_to_file(iter_frame_chunks(export_frame.iloc[:0]), "Excel", path)
+    result = pd.read_excel(path, sheet_name=None)
+    assert list(result) == ["data"]
+    assert list(result["data"].columns) == COLUMNS
+    assert result["data"].empty
+
+
+@pytest.mark.parametrize("export_format", ["CSV", "Parquet", "Excel"])
+def test_size_cap_removes_partial_file(tmp_path, export_frame, export_format):
+    path = str(tmp_path / f"capped.{export_format.lower()}")
+    with pytest.raises(ExportError):
+        export_chunks_to_file(
+            iter_frame_chunks(export_frame, CHUNK_ROWS),
+            export_format,
+            path,
+            max_bytes=1_000,
+            schema_frame=export_frame,
+        )
+    assert not os.path.exists(path)
+    # 상한 안이면 그대로 생성
+    export_chunks_to_file(
+        iter_frame_chunks(export_frame, CHUNK_ROWS),
+        export_format,
+        path,
+        max_bytes=50_000_000,
+        schema_frame=export_frame,
+    )
+    assert os.path.getsize(path) > 1_000
+
+
+def test_expired_exports_are_pruned(tmp_path):
+    directory = str(tmp_path)
+    old_path = new_export_path(".csv", directory)
+    recent_path = new_export_path(".csv", directory)
+    stale = time.time() - 7_200
+    os.utime(old_path, (stale, stale))
+
+    assert prune_export_dir(directory, ttl=3_600) == 1
+    assert not os.path.exists(old_path)
+    assert os.path.exists(recent_path)
+
+    # 새 파일을 만들 때도 기본 보관 시간이 지난 파일을 정리
+    os.utime(recent_path, (stale, stale))
+    newest = new_export_path(".parquet", directory)
+    assert not os.path.exists(recent_path)
+    assert os.listdir(directory) == [os.path.basename(newest)]
@@ -0,0 +1,255 @@
+"""조회 조건 필터, 조회 기간 KPI, 사이드바 선택지 - 기준 구현(tests/reference.py)과 비교"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import reference
+from kpi_engine import (
+    FILTER_COLUMNS,
+    RICE_ITEMS,
+    category_mask,
+    compute_period_kpis,
+    dataset_version,
+    dimension_options,
+    filter_data,
+    filter_positions,
+    get_dimension_index,
+)
+from conftest import make_dataset
+
+N_COMBINATIONS = 300
+SELECTION_ARGS = [arg for arg, _ in FILTER_COLUMNS]
+
+
+def random_selection(rng, values, own):
+    """전체 / 값 하나 / 여러 값(list) / 빈 list 중 하나 - 값은 주로 anchor 행의 값(own)"""
+    draw = rng.random()
+    if draw < 0.45:
+        return "전체"
+    if draw < 0.7:
+        return own if pd.notna(own) else "전체"
+    if draw < 0.95:
+        picked = list(rng.choice(values, size=min(len(values), 3), replace=False))
+        if pd.notna(own) and rng.random() < 0.7:
+            picked = [own] + [value for value in picked if value != own]
+        return picked[: rng.integers(1, 4)]
+    return []
+
+
+def random_date_range(rng, df, anchor):
+    """조회 기간 - 없음, 하루, anchor 행 주변, 데이터 범위 밖까지"""
+    draw = rng.random()
+    if draw < 0.1:
+        return ()
+    day = df["확정일자"].iloc[anchor].normalize()
+    if draw < 0.25:
+        start = end = day
+    elif draw < 0.85:
+        start = day - pd.Timedelta(days=int(rng.integers(0, 120)))
+        end = day + pd.Timedelta(days=int(rng.integers(0, 120)))
+    else:
+        start = df["확정일자"].min().normalize() - pd.Timedelta(days=3)
+        end = df["확정일자"].max().normalize() + pd.Timedelta(days=3)
+    return (start.date(), end.date())
+
+
+def random_combinations(df, n=N_COMBINATIONS, seed=0):
+    rng = np.random.default_rng(seed)
+    values = {column: df[column].dropna().unique() for _, column in FILTER_COLUMNS}
+    for _ in range(n):
+        anchor = int(rng.integers(len(df)))
+        selections = {
+            arg: random_selection(rng, values[column], df[column].iloc[anchor])
+            for arg, column in FILTER_COLUMNS
+        }
+        yield random_date_range(rng, df, anchor), bool(rng.random() < 0.3), selections
+
+
+def filter_args(date_range, exclude_rice, selections):
+    return (date_range, selections["구분"], exclude_rice) + tuple(
+        selections[arg] for arg in SELECTION_ARGS[1:]
+    )
+
+
+def assert_kpis_equal(result, expected):
+    assert result["total_orders"] == expected["total_orders"]
+    assert result["total_amount"] == expected["total_amount"]
+    assert result["top_product"] == expected["top_product"]
+    for key in ["daily_avg", "expected_amount"]:
+        if expected[key] is None:
+            assert result[key] is None
+        else:
+            assert result[key] == pytest.approx(expected[key], rel=1e-9)
+    assert result["distinct"] == expected["distinct"]
+
+
+def test_random_combinations_match_reference(dataset):
+    """300개 무작위 조건: 필터 행과 조회 기간 KPI가 기준 구현과 같아야 한다"""
+    # 버전이 없는 프레임은 기간 파티션 없이 전체 행을 비교하는 경로
+    unversioned = dataset.copy(deep=False)
+    unversioned.attrs = {}
+    non_empty = 0
+    for date_range, exclude_rice, selections in random_combinations(dataset):
+        args = filter_args(date_range, exclude_rice, selections)
+        expected = reference.filter_data(unversioned, *args)
+        expected_positions = dataset.index.get_indexer(expected.index)
+
+        result = filter_data(dataset, *args)
+        pd.testing.assert_frame_equal(result, expected)
+        for frame in [dataset, unversioned]:
+            positions = filter_positions(frame, date_range, exclude_rice, **selections)
+            np.testing.assert_array_equal(positions, expected_positions)
+
+        expected_kpis = reference.period_kpis(expected)
+        # 데이터셋의 일별 누적합 경로와 조회 결과 행을 직접 집계하는 경로
+        assert_kpis_equal(compute_period_kpis(result, base_df=dataset), expected_kpis)
+        assert_kpis_equal(compute_period_kpis(result), expected_kpis)
+        non_empty += not expected.empty
+    # 조건이 대부분 빈 결과이면 비교가 의미 없으므로 확인
+    assert non_empty >= N_COMBINATIONS // 3
+
+
+def test_repeated_filter_returns_same_rows(dataset):
+    """같은 조건의 재실행은 캐시된 결과 - 다중 선택 순서가 같으면 같은 행"""
+    args = ((), ["청과", "수산"], False) + ("전체",) * 6
+    first = filter_data(dataset, *args)
+    second = filter_data(dataset, *args)
+    assert first is second
+    assert set(first["구분"].unique()) == {"청과", "수산"}
+
+
+def test_datasets_differing_in_non_key_column_do_not_share_cache(raw_transactions):
+    """구매확정물량만 다른 두 데이터셋은 버전이 다르고 필터 캐시를 공유하지 않는다"""
+    first = make_dataset(raw_transactions)
+    scaled = raw_transactions.copy()
+    scaled["구매확정물량"] = scaled["구매확정물량"] * 10
+    second = make_dataset(scaled)
+    assert first.attrs["dataset_version"] != second.attrs["dataset_version"]
+
+    args = ((), "전체", False) + ("전체",) * 6
+    first_rows = filter_data(first, *args)
+    second_rows = filter_data(second, *args)
+    assert first_rows is not second_rows
+    assert second_rows["구매확정물량"].sum() == second["구매확정물량"].sum()
+    assert second_rows["구매확정물량"].sum() == 10 * first_rows["구매확정물량"].sum()
+
+
+def test_dataset_version_covers_every_column(dataset):
+    """어느 컬럼 값이 하나만 달라도 다른 버전, 같은 내용은 같은 버전"""
+    assert dataset_version(dataset.copy()) == dataset_version(dataset)
+    for column in ["구분", "구매확정물량", "판매자세부구분"]:
+        changed = dataset.copy()
+        changed[column] = changed[column].iloc[::-1].to_numpy()
+        assert dataset_version(changed) != dataset_version(dataset), column
+
+
+@pytest.mark.parametrize("column", ["구분", "부류", "품목", "구매자구분"])
+def test_category_mask_matches_isin(dataset, column):
+    rng = np.random.default_rng(1)
+    values = list(dataset[column].dropna().unique())
+    rows = np.sort(rng.choice(len(dataset), size=500, replace=False))
+    for size in [0, 1, 2, 5]:
+        selected = list(rng.choice(values, size=min(size, len(values)), replace=False))
+        # 데이터에 없는 값은 무시된다
+        selected.append("없는 값")
+        expected = dataset[column].isin(selected).to_numpy()
+        np.testing.assert_array_equal(
+            category_mask(dataset, column, selected), expected
+        )
+        np.testing.assert_array_equal(
+            category_mask(dataset, column, selected, rows), expected[rows]
+        )
+
+
+def test_category_mask_never_selects_missing(dataset):
+    missing = dataset["부류"].isna().to_numpy()
+    assert missing.any()
+    mask = category_mask(dataset, "부류", list(dataset["부류"].dropna().unique()))
+    np.testing.assert_array_equal(mask, ~missing)
+
+
+def test_exclude_rice_keeps_missing_items(dataset):
+    """벼,찰벼 제외는 품목 결측 행을 남긴다 (기준 구현의 ~isin과 동일)"""
+    positions = filter_positions(dataset, (), True)
+    items = dataset["품목"].iloc[positions]
+    assert not items.isin(["벼", "찰벼"]).any()
+    assert items.isna().sum() == dataset["품목"].isna().sum()
+    rice = dataset["품목"].isin(["벼", "찰벼"]).sum()
+    assert rice > 0
+    assert len(positions) == len(dataset) - rice
+
+
+def test_date_range_includes_whole_end_day(dataset):
+    """종료일의 23:59:59 거래까지 포함하고 다음날 00:00은 제외"""
+    dates = dataset["확정일자"]
+    day = dates[dates.dt.hour > 0].iloc[0].normalize()
+    positions = filter_positions(dataset, (day.date(), day.date()), False)
+    selected = dates.iloc[positions]
+    assert len(selected) == (dates.dt.normalize() == day).sum()
+    assert (selected.dt.normalize() == day).all()
+
+
+def test_empty_selection_means_all(dataset):
+    everything = filter_positions(dataset, (), False)
+    np.testing.assert_array_equal(
+        filter_positions(dataset, (), False, 구분=[], 품목=[]), everything
+    )
+    assert len(everything) == len(dataset)
+
+
+# ================= 사이드바 선택지 =================
+def expected_options(df, column, selections):
+    """상위 선택에 맞는 행의 column 값 - 데이터셋에서 처음 나온 순서"""
+    mask = pd.Series(True, index=df.index)
+    for col, value in selections.items():
+        mask &= df[col].isin(value if isinstance(value, list) else [value])
+    present = set(df.loc[mask, column].dropna())
+    return [value for value in df[column].dropna().unique() if value in present]
+
+
+@pytest.mark.parametrize(
+    "column, selections",
+    [
+        ("부류", {"구분": "수산"}),
+        ("품목", {"구분": "수산"}),
+        ("품목", {"구분": ["청과", "축산"]}),
+        ("품목", {"구분": "청과", "부류": "과일"}),
+        # 구분은 전체, 부류만 선택
+        ("품목", {"부류": ["과일", "선어"]}),
+        ("판매자세부구분", {"판매자구분": "위탁판매자"}),
+    ],
+)
+def test_dimension_options_follow_parent_selection(dataset, column, selections):
+    index = get_dimension_index(dataset)
+    expected = expected_options(dataset, column, selections)
+    assert 0 < len(expected) < dataset[column].nunique()
+    assert dimension_options(index, column, selections) == expected
+
+
+def test_dimension_options_without_parent_selection(dataset):
+    index = get_dimension_index(dataset)
+    assert get_dimension_index(dataset) is index
+    for _, column in FILTER_COLUMNS:
+        expected = list(dataset[column].dropna().unique())
+        assert dimension_options(index, column) == expected
+        # 상위 컬럼이 없는 컬럼은 다른 선택과 무관
+        assert dimension_options(index, column, {"구분": "전체"}) == expected
+    assert dimension_options(index, "구매자구분", {"구분": "수산"}) == list(
+        dataset["구매자구분"].dropna().unique()
+    )
+
+
+def test_dimension_options_edge_cases(dataset):
+    index = get_dimension_index(dataset)
+    # 없는 상위 값은 빈 목록, 빈 다중 선택은 전체
+    assert dimension_options(index, "품목", {"구분": "없는 구분"}) == []
+    assert dimension_options(index, "품목", {"구분": []}) == list(
+        dataset["품목"].dropna().unique()
+    )
+    items = dimension_options(index, "품목", {"구분": "양곡"}, exclude_rice=True)
+    assert items == [
+        value
+        for value in expected_options(dataset, "품목", {"구분": "양곡"})
+        if value not in RICE_ITEMS
+    ]
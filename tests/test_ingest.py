@@ -0,0 +1,232 @@
+"""데이터 적재 - 추가만 되는 CSV의 증분 병합과 전체 재적재 판단, DB 비동기 적재"""
+
+import hashlib
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+
+import kpi_ingest
+from benchmarks.generate_data import write_dataset
+from conftest import make_raw
+from kpi_engine import (
+    DbLoadJob,
+    add_date_columns,
+    append_csv_tail,
+    get_dataset,
+    load_csv_snapshot,
+    process_data,
+    query_dataset_id,
+    start_db_load,
+)
+from kpi_ingest import _load_csv_full
+
+INGEST_ROWS = 2_000
+
+
+@pytest.fixture(scope="module")
+def ingest_raw():
+    """확정일자 순 원본 - 앞 80%는 기존 파일, 나머지는 덧붙일 행"""
+    raw = make_raw(INGEST_ROWS, seed=23, n_days=150)
+    return raw.sort_values("확정일자", kind="stable").reset_index(drop=True)
+
+
+@pytest.fixture
+def csv_path(tmp_path, ingest_raw, monkeypatch):
+    """기존 행만 쓴 CSV 경로 (스냅샷은 tmp_path 아래에 기록)"""
+    monkeypatch.setenv("KPI_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    path = str(tmp_path / "거래데이터.csv")
+    write_dataset(ingest_raw.iloc[: int(INGEST_ROWS * 0.8)], path)
+    return path
+
+
+def file_version(path):
+    """파일 바이트 체크섬 기반 버전 (_ingest_version과 같은 규칙)"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+def append_rows(path, rows):
+    with open(path, "a", encoding="cp949", newline="") as f:
+        rows.to_csv(f, index=False, header=False)
+
+
+def assert_same_dataset(result, expected):
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.attrs["dataset_version"] == expected.attrs["dataset_version"]
+
+
+def test_appended_tail_matches_full_reload(csv_path, ingest_raw):
+    base = _load_csv_full(csv_path)
+    assert base.attrs["dataset_version"] == file_version(csv_path)
+    append_rows(csv_path, ingest_raw.iloc[int(INGEST_ROWS * 0.8) :])
+
+    merged = append_csv_tail(base, csv_path)
+    assert merged is not None and len(merged) > len(base)
+    fresh = _load_csv_full(csv_path)
+    assert_same_dataset(merged, fresh)
+    assert merged.attrs["dataset_version"] == file_version(csv_path)
+    assert merged.attrs["ingest"] == fresh.attrs["ingest"]
+
+
+def test_appending_in_steps_matches_full_reload(csv_path, ingest_raw):
+    """두 번에 나누어 덧붙여도 한 번에 읽은 결과와 같다"""
+    base = _load_csv_full(csv_path)
+    tail = ingest_raw.iloc[int(INGEST_ROWS * 0.8) :]
+    append_rows(csv_path, tail.iloc[:100])
+    first = append_csv_tail(base, csv_path)
+    append_rows(csv_path, tail.iloc[100:])
+    second = append_csv_tail(first, csv_path)
+    assert_same_dataset(second, _load_csv_full(csv_path))
+
+
+def test_unchanged_file_keeps_rows_and_version(csv_path):
+    base = _load_csv_full(csv_path)
+    merged = append_csv_tail(base, csv_path)
+    assert_same_dataset(merged, base)
+
+
+def test_rewritten_prefix_needs_full_reload(csv_path, ingest_raw):
+    """앞부분이 바뀐 파일(같은 크기)은 병합하지 않고, 스냅샷 적재는 전체를 다시 처리"""
+    base = load_csv_snapshot(csv_path)
+    rewritten = ingest_raw.iloc[: int(INGEST_ROWS * 0.8)].copy()
+    # 금액 자릿수를 유지하여 파일 크기가 같도록 첫 행 금액의 마지막 숫자만 바꿈
+    amount = int(rewritten.loc[0, "구매확정금액(원)"])
+    rewritten.loc[0, "구매확정금액(원)"] = amount - amount % 10 + (amount + 1) % 10
+    write_dataset(rewritten, csv_path)
+    append_rows(csv_path, ingest_raw.iloc[int(INGEST_ROWS * 0.8) :])
+
+    assert append_csv_tail(base, csv_path) is None
+    reloaded = load_csv_snapshot(csv_path)
+    assert_same_dataset(reloaded, _load_csv_full(csv_path))
+    assert reloaded.attrs["dataset_version"] == file_version(csv_path)
+    assert reloaded.attrs["dataset_version"] != base.attrs["dataset_version"]
+
+
+def test_truncated_file_needs_full_reload(csv_path):
+    base = load_csv_snapshot(csv_path)
+    with open(csv_path, "rb") as f:
+        data = f.read()
+    # 마지막 몇 행을 잘라냄 (줄 경계에서)
+    cut = data.rstrip(b"\n").rsplit(b"\n", 5)[0] + b"\n"
+    with open(csv_path, "wb") as f:
+        f.write(cut)
+
+    assert append_csv_tail(base, csv_path) is None
+    reloaded = load_csv_snapshot(csv_path)
+    assert len(reloaded) < len(base)
+    assert_same_dataset(reloaded, _load_csv_full(csv_path))
+    assert reloaded.attrs["dataset_version"] == file_version(csv_path)
+
+
+def test_snapshot_load_merges_appended_rows(csv_path, ingest_raw, monkeypatch):
+    """직전 데이터셋이 있으면 스냅샷 적재가 추가된 행만 병합한다 (전체 처리 없음)"""
+    base = load_csv_snapshot(csv_path)
+    append_rows(csv_path, ingest_raw.iloc[int(INGEST_ROWS * 0.8) :])
+
+    def full_reload(path):
+        raise AssertionError("전체 처리 경로를 사용함")
+
+    monkeypatch.setattr(kpi_ingest, "_load_csv_full", full_reload)
+    merged = load_csv_snapshot(csv_path)
+    assert merged.attrs["ingest"]["raw_rows"] > base.attrs["ingest"]["raw_rows"]
+    # (이 모듈의 _load_csv_full은 바꾸기 전 함수)
+    assert_same_dataset(merged, _load_csv_full(csv_path))
+
+
+# ================= DB 비동기 적재 =================
+DB_ROWS = 1_200
+
+
+@pytest.fixture(scope="module")
+def sqlite_source(tmp_path_factory):
+    """거래 테이블이 있는 SQLite 파일 (connect_db는 경로로 연결)"""
+    path = str(tmp_path_factory.mktemp("db") / "거래.sqlite")
+    raw = make_raw(DB_ROWS, seed=29, n_days=120)
+    with sqlite3.connect(path) as conn:
+        raw.to_sql("trades", conn, index=False)
+    return {"db_path": path}
+
+
+def wait_finished(job, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, job.progress()
+        time.sleep(0.02)
+    return job.progress()
+
+
+def test_db_load_reports_chunk_progress(sqlite_source, monkeypatch):
+    monkeypatch.setattr(kpi_ingest, "DB_FETCH_CHUNK_ROWS", 500)
+    query = "SELECT * FROM trades"
+    job = start_db_load("SQLite", sqlite_source, query)
+    progress = wait_finished(job)
+    assert progress["status"] == "done", progress["error"]
+    assert progress["rows"] == DB_ROWS
+    assert progress["chunks"] == 3
+
+    with sqlite3.connect(sqlite_source["db_path"]) as conn:
+        expected = add_date_columns(process_data(pd.read_sql_query(query, conn)))
+    result = get_dataset(job.lease.dataset_id)
+    pd.testing.assert_frame_equal(result, expected)
+    assert job.dataset_id == query_dataset_id("SQLite", sqlite_source, query)
+    job.lease.release()
+
+
+def test_db_load_cancel_between_chunks(sqlite_source, monkeypatch):
+    """첫 청크를 받은 뒤 취소하면 나머지를 받지 않고 데이터셋을 등록하지 않는다"""
+    monkeypatch.setattr(kpi_ingest, "DB_FETCH_CHUNK_ROWS", 100)
+    job = DbLoadJob("SQLite", sqlite_source, "SELECT * FROM trades WHERE 1 = 1")
+    chunks = kpi_ingest._query_chunks
+
+    def cancel_after_first(*args):
+        for i, chunk in enumerate(chunks(*args)):
+            if i == 1:
+                assert job.cancel()
+            yield chunk
+
+    monkeypatch.setattr(kpi_ingest, "_query_chunks", cancel_after_first)
+    job.run()
+    progress = job.progress()
+    assert progress["status"] == "cancelled"
+    assert progress["rows"] == 100
+    assert job.lease is None
+    assert get_dataset(job.dataset_id) is None
+    # 완료된 작업은 다시 취소할 수 없음
+    assert not job.cancel()
+
+
+def test_db_load_cancel_interrupts_running_query(sqlite_source):
+    """실행 중인 쿼리는 서버(SQLite interrupt)에서 중단되어 cancelled로 끝난다"""
+    slow_query = (
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+        "WHERE i < 20000000) SELECT t.* FROM trades t "
+        "JOIN (SELECT sum(i) AS s FROM n) ON 1 = 1"
+    )
+    job = start_db_load("SQLite", sqlite_source, slow_query)
+    deadline = time.monotonic() + 10
+    while job._conn is None and not job.finished:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    time.sleep(0.1)
+    started = time.monotonic()
+    job.cancel()
+    progress = wait_finished(job)
+    assert progress["status"] == "cancelled"
+    assert time.monotonic() - started < 5
+    assert job.lease is None
+
+
+def test_db_load_error_is_reported(sqlite_source):
+    job = start_db_load("SQLite", sqlite_source, "SELECT * FROM missing_table")
+    progress = wait_finished(job)
+    assert progress["status"] == "failed"
+    assert "missing_table" in progress["error"]
+    assert job.lease is None
+
+    # 행을 반환하지 않는 문장
+    job = DbLoadJob("SQLite", sqlite_source, "CREATE TEMP TABLE t (a INTEGER)")
+    job.run()
+    assert job.progress()["status"] == "failed"
+    assert "SELECT" in job.progress()["error"]
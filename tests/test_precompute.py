@@ -0,0 +1,81 @@
+"""적재 시 사전 계산 - 자식 프로세스에서 만든 파생 구조가 현재 프로세스에서 만든 결과와 같은지"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import kpi_precompute
+from conftest import make_dataset, make_raw
+from kpi_engine import (
+    WARMUP_PERIODS,
+    default_filter_args,
+    filter_data,
+    peek_derived,
+    precompute_dataset,
+    precompute_tasks,
+    range_totals,
+)
+from kpi_filters import filter_state
+from kpi_precompute import _build_precomputed
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def fresh_dataset(monkeypatch):
+    """캐시에 없는 새 데이터셋 (행 수 하한을 낮춰 작은 데이터로 사전 계산)"""
+    monkeypatch.setattr(kpi_precompute, "PRECOMPUTE_MIN_ROWS", 0)
+    return make_dataset(make_raw(3_000, seed=17, n_days=300))
+
+
+def assert_same_structure(actual, expected, name):
+    kind = name[0]
+    if kind == "group_totals":
+        pd.testing.assert_series_equal(actual, expected)
+    elif kind == "drilldown_index":
+        assert actual["period_codes"] == expected["period_codes"]
+        assert actual["group_codes"] == expected["group_codes"]
+        assert actual["n_groups"] == expected["n_groups"]
+        np.testing.assert_array_equal(actual["order"], expected["order"])
+        np.testing.assert_array_equal(actual["offsets"], expected["offsets"])
+    elif kind == "daily_prefix":
+        np.testing.assert_array_equal(actual["keys"], expected["keys"])
+        for measure, values in expected["cumulative"].items():
+            np.testing.assert_array_equal(actual["cumulative"][measure], values)
+        assert len(actual["cells"]) == len(expected["cells"])
+    else:
+        assert actual == expected
+
+
+def test_precomputed_structures_match_in_process_build(fresh_dataset):
+    df = fresh_dataset
+    result = precompute_dataset(df, processes=2)
+    assert result is not None
+    assert result["failed"] == 0
+    assert result["tasks"] == len(precompute_tasks())
+
+    frames = {"base": df, "view": filter_data(df, *default_filter_args(df))}
+    for target, name in precompute_tasks():
+        actual = peek_derived(frames[target], name)
+        assert actual is not None, name
+        assert_same_structure(actual, _build_precomputed(frames[target], name), name)
+
+    # 자식 프로세스에서 만든 누적합으로 조회 기간 합계
+    _, filters = filter_state((), "청과", False, *["전체"] * 6)
+    totals = range_totals(df, filters)
+    rows = df[df["구분"] == "청과"]
+    assert totals["count"] == len(rows)
+    assert totals["amount"] == rows["구매확정금액(원)"].sum()
+
+
+def test_drilldown_index_is_precomputed_for_every_warmup_period():
+    drilldown = [name for _, name in precompute_tasks() if name[0] == "drilldown_index"]
+    assert {name[1] for name in drilldown} == set(WARMUP_PERIODS)
+
+
+def test_precompute_is_skipped_for_single_process(monkeypatch):
+    monkeypatch.setattr(kpi_precompute, "PRECOMPUTE_MIN_ROWS", 0)
+    # 다른 테스트의 데이터셋과 버전이 겹치지 않도록 seed를 달리함
+    df = make_dataset(make_raw(3_000, seed=19, n_days=300))
+    assert precompute_dataset(df, processes=1) is None
+    assert peek_derived(df, ("kpi_snapshot",)) is None
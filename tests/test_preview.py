@@ -0,0 +1,158 @@
+"""표본 미리보기 - 층화 표본 추정과 95% 신뢰구간을 정확한 집계와 비교"""
+
+import numpy as np
+import pytest
+
+import kpi_preview
+from conftest import make_dataset
+from kpi_engine import (
+    compute_dashboard_sections,
+    compute_preview,
+    default_filter_args,
+    filter_data,
+    get_stratified_sample,
+)
+from kpi_preview import SAMPLE_MIN_PER_STRATUM, estimate_totals, stratum_sums
+
+MEASURES = ["구매확정금액(원)", "구매확정물량"]
+
+
+def preview_and_exact(df, filter_args, 기준선택="year_month"):
+    """(표본 미리보기, 같은 조건의 정확한 섹션 집계) - 상위 N 섹션도 모든 그룹 사용"""
+    preview = compute_preview(df, filter_args, 기준선택, None, True, True)
+    view = filter_data(df, *filter_args)
+    exact = compute_dashboard_sections(view, 기준선택, None, True, True)
+    return preview, exact
+
+
+def section_tables(preview, exact, name):
+    """섹션별 (추정 표, 신뢰구간 반폭 표, 같은 모양의 정확한 표)"""
+    for group_col, section in preview["sections"].items():
+        tables = section["tables"]
+        estimate = tables[f"pivot_{name}_with_total"]
+        truth = exact[group_col]["tables"][f"pivot_{name}_with_total"].reindex(
+            index=estimate.index, columns=estimate.columns, fill_value=0.0
+        )
+        yield group_col, estimate, tables[f"ci_{name}_with_total"], truth
+
+
+def test_sample_is_seeded_and_stratified(dataset):
+    sample = get_stratified_sample(dataset)
+    population, sizes = sample["population"], sample["sizes"]
+    assert population.sum() == len(dataset)
+    assert (sizes <= population).all()
+    assert (sizes >= np.minimum(population, SAMPLE_MIN_PER_STRATUM)).all()
+    frame = sample["frame"]
+    np.testing.assert_array_equal(np.bincount(frame["표본층"]), sizes)
+    # 같은 데이터는 같은 표본 (seed 고정)
+    fresh = dataset.copy(deep=False)
+    fresh.attrs = dict(dataset.attrs, dataset_version="sample-test")
+    np.testing.assert_array_equal(
+        get_stratified_sample(fresh)["frame"].index, frame.index
+    )
+
+
+def test_ci_covers_exact_totals_across_samples(dataset, monkeypatch):
+    """기본 표본 설정(비율, 층별 최소 수)으로 seed만 바꾼 표본 100개에서 정확한 전체 합계와
+    월별 합계가 95% 신뢰구간 안에 드는 비율
+
+    표본 하나는 5% 확률로 구간을 벗어날 수 있으므로 포함 비율을 확인한다. 금액은
+    분포가 치우쳐 층별 50행 표본에서 명목 95%보다 조금 낮게 나온다.
+    """
+    keys = ["year_month"]
+    exact_total = dataset[MEASURES].sum()
+    exact_by_month = dataset.groupby(keys)[MEASURES].sum()
+    total_inside = np.zeros(len(MEASURES))
+    month_inside = np.zeros(len(MEASURES))
+    n_samples = 100
+    for seed in range(n_samples):
+        monkeypatch.setattr(kpi_preview, "SAMPLE_SEED", seed)
+        sample = kpi_preview._build_stratified_sample(dataset)
+        population, sizes = sample["population"], sample["sizes"]
+        sums = stratum_sums(sample["frame"], keys, MEASURES)
+
+        estimate, ci = estimate_totals(sums, [], population, sizes)
+        total_inside += (
+            (estimate.iloc[0] - exact_total).abs() <= ci.iloc[0]
+        ).to_numpy()
+        estimate, ci = estimate_totals(sums, keys, population, sizes)
+        error = (estimate - exact_by_month.reindex(estimate.index)).abs()
+        month_inside += (error <= ci).mean().to_numpy()
+    assert (total_inside / n_samples >= 0.9).all()
+    assert (month_inside / n_samples >= 0.85).all()
+
+
+@pytest.mark.parametrize("name", ["amount", "volume"])
+def test_default_preview_ci_covers_exact_tables(dataset, name):
+    """기본 조건(전체 기간, 전체)의 미리보기 표: 합계 칸의 구간은 전체 도메인 추정과 같고
+    표본이 있는 칸의 대부분이 정확한 값을 포함한다"""
+    preview, exact = preview_and_exact(dataset, default_filter_args(dataset))
+    sample = get_stratified_sample(dataset)
+    column = MEASURES[0] if name == "amount" else MEASURES[1]
+    scale = 1_000_000 if name == "amount" else 1_000
+    sums = stratum_sums(sample["frame"], [], MEASURES)
+    _, overall = estimate_totals(sums, [], sample["population"], sample["sizes"])
+
+    covered = counted = 0
+    for group_col, estimate, ci, truth in section_tables(preview, exact, name):
+        if group_col in ["구분", "판매자구분", "판매자세부구분"]:
+            # 모든 행이 그룹에 속하는 섹션은 합계 칸 = 전체 합계
+            assert ci.loc["합계", "합계"] == pytest.approx(
+                overall[column].iloc[0] / scale
+            )
+        sampled = ci.to_numpy() > 0
+        inside = (estimate - truth).abs().to_numpy() <= ci.to_numpy() + 1e-9
+        covered += inside[sampled].sum()
+        counted += sampled.sum()
+    assert counted > 0
+    assert covered / counted >= 0.8
+
+
+def test_preview_period_kpis_are_exact(dataset):
+    """미리보기 KPI 합계와 건수는 표본이 아니라 일별 누적합에서 정확히"""
+    filter_args = default_filter_args(dataset)
+    preview = compute_preview(dataset, filter_args, "year_month", 10, True, True)
+    view = filter_data(dataset, *filter_args)
+    assert preview["kpis"]["total_amount"] == view["구매확정금액(원)"].sum()
+    assert preview["kpis"]["total_orders"] == len(view)
+    assert preview["sample_rows"] == len(get_stratified_sample(dataset)["frame"])
+
+
+@pytest.fixture(scope="module")
+def thin_dataset(raw_transactions):
+    """수산 행을 10%만 남겨 수산의 월별 층이 최소 표본 수보다 작은(전수 추출) 데이터셋"""
+    rng = np.random.default_rng(11)
+    keep = (raw_transactions["구분"] != "수산").to_numpy() | (
+        rng.random(len(raw_transactions)) < 0.1
+    )
+    return make_dataset(raw_transactions[keep])
+
+
+def test_estimate_is_exact_for_fully_sampled_strata(thin_dataset):
+    sample = get_stratified_sample(thin_dataset)
+    population, sizes = sample["population"], sample["sizes"]
+    keys = ["구분", "year_month"]
+    sums = stratum_sums(sample["frame"], keys, MEASURES)
+    estimate, ci = estimate_totals(sums, keys, population, sizes)
+    exact = thin_dataset.groupby(keys)[MEASURES].sum().reindex(estimate.index)
+
+    # 층 = (구분, 월) 셀이므로 층별 전수 추출 여부를 셀에 대응
+    strata = sample["frame"].groupby(keys)["표본층"].first().reindex(estimate.index)
+    fully_sampled = (sizes == population)[strata.to_numpy()]
+    assert fully_sampled.any() and not fully_sampled.all()
+
+    np.testing.assert_allclose(estimate[fully_sampled], exact[fully_sampled])
+    assert (ci[fully_sampled].to_numpy() == 0).all()
+    assert (ci[~fully_sampled].to_numpy() > 0).all()
+
+
+def test_preview_is_exact_when_every_stratum_is_fully_sampled(thin_dataset):
+    """수산만 조회하면 모든 층이 전수 추출 - 추정 표는 정확한 표와 같고 구간 폭은 0"""
+    date_range, _, *rest = default_filter_args(thin_dataset)
+    filter_args = (date_range, "수산", *rest)
+    preview, exact = preview_and_exact(thin_dataset, filter_args)
+    assert preview["rows"] == len(filter_data(thin_dataset, *filter_args))
+    for name in ["amount", "volume"]:
+        for group_col, estimate, ci, truth in section_tables(preview, exact, name):
+            np.testing.assert_allclose(estimate, truth, err_msg=group_col)
+            assert (ci.to_numpy() == 0).all(), group_col
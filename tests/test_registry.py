@@ -0,0 +1,167 @@
+"""데이터셋 레지스트리 - 임대/고정 슬롯/제거 시 파생 구조 정리와 데이터셋 간 캐시 분리"""
+
+import gc
+
+import pytest
+
+from conftest import make_raw
+from kpi_engine import (
+    acquire_dataset,
+    dataset_registry_stats,
+    default_filter_args,
+    filter_data,
+    get_daily_prefix,
+    get_dataset,
+    peek_derived,
+    process_data,
+)
+
+REGISTRY_ROWS = 3_000
+
+
+@pytest.fixture(scope="module")
+def small_raw():
+    return make_raw(REGISTRY_ROWS, seed=13, n_days=200)
+
+
+@pytest.fixture
+def builder(small_raw):
+    """호출 횟수를 세는 builder (레지스트리가 prepare 단계를 수행)"""
+
+    def build():
+        build.calls += 1
+        return process_data(small_raw.copy())
+
+    build.calls = 0
+    return build
+
+
+def registry_entry(dataset_id):
+    for entry in dataset_registry_stats():
+        if entry["dataset_id"] == dataset_id:
+            return entry
+    return None
+
+
+def test_acquire_builds_once_and_counts_leases(builder):
+    first = acquire_dataset("test:shared", builder)
+    second = acquire_dataset("test:shared", builder)
+    assert builder.calls == 1
+    assert registry_entry("test:shared")["refs"] == 2
+    df = get_dataset("test:shared")
+    assert "year_month" in df.columns
+
+    first.release()
+    assert get_dataset("test:shared") is df
+    assert registry_entry("test:shared")["refs"] == 1
+    # release는 여러 번 호출해도 한 번만 반영
+    first.release()
+    assert registry_entry("test:shared")["refs"] == 1
+    second.release()
+    assert get_dataset("test:shared") is None
+
+
+def test_dropped_lease_releases_dataset(builder):
+    """세션이 임대 객체를 버리면(세션 종료) 참조가 사라져 데이터셋이 제거된다"""
+    lease = acquire_dataset("test:dropped", builder)
+    assert get_dataset("test:dropped") is not None
+    del lease
+    gc.collect()
+    assert get_dataset("test:dropped") is None
+
+
+def test_eviction_purges_derived_structures(builder):
+    lease = acquire_dataset("test:evict", builder)
+    df = get_dataset("test:evict")
+    get_daily_prefix(df)
+    view = filter_data(df, *default_filter_args(df))
+    assert peek_derived(df, ("daily_prefix",)) is not None
+
+    lease.release()
+    assert peek_derived(df, ("daily_prefix",)) is None
+    # 부분집합 프레임도 제거되어 같은 조건이면 새로 만든다
+    assert filter_data(df, *default_filter_args(df)) is not view
+
+
+def offset_builder(raw, offset):
+    """구매확정물량만 다른 데이터셋 (다른 테스트의 데이터셋과 버전이 겹치지 않도록)"""
+    changed = raw.copy()
+    changed["구매확정물량"] = changed["구매확정물량"] + offset
+    return lambda: process_data(changed.copy())
+
+
+def test_pinned_dataset_survives_release_until_replaced(small_raw):
+    acquire_dataset(
+        "test:pinned-a", offset_builder(small_raw, 1), pin="test-slot"
+    ).release()
+    df = get_dataset("test:pinned-a")
+    assert df is not None
+    assert registry_entry("test:pinned-a")["pinned"]
+    get_daily_prefix(df)
+
+    # 같은 슬롯에 다른 데이터셋을 고정하면 이전 데이터셋은 참조가 없으므로 제거
+    acquire_dataset(
+        "test:pinned-b", offset_builder(small_raw, 2), pin="test-slot"
+    ).release()
+    assert get_dataset("test:pinned-a") is None
+    assert peek_derived(df, ("daily_prefix",)) is None
+    assert registry_entry("test:pinned-b")["pinned"]
+
+
+def test_datasets_with_different_content_do_not_share_caches(small_raw):
+    """같은 행 수, 다른 측정값의 두 데이터셋: 조회 결과와 파생 구조가 섞이지 않는다"""
+    scaled = small_raw.copy()
+    scaled["구매확정물량"] = scaled["구매확정물량"] * 10
+    first = acquire_dataset("test:first", lambda: process_data(small_raw.copy()))
+    second = acquire_dataset("test:second", lambda: process_data(scaled))
+    a, b = get_dataset("test:first"), get_dataset("test:second")
+    assert len(a) == len(b)
+    assert a.attrs["dataset_version"] != b.attrs["dataset_version"]
+
+    args = default_filter_args(a)
+    rows_a, rows_b = filter_data(a, *args), filter_data(b, *args)
+    assert rows_b["구매확정물량"].sum() == 10 * rows_a["구매확정물량"].sum()
+    prefix_a, prefix_b = get_daily_prefix(a), get_daily_prefix(b)
+    assert prefix_a is not prefix_b
+
+    # 한 데이터셋을 제거해도 다른 데이터셋의 파생 구조는 그대로
+    first.release()
+    assert peek_derived(a, ("daily_prefix",)) is None
+    assert peek_derived(b, ("daily_prefix",)) is prefix_b
+    assert filter_data(b, *args) is rows_b
+    second.release()
+
+
+def test_same_content_under_two_ids_shares_derived_structures(builder):
+    """같은 내용(같은 버전)을 다른 id로 올리면 파생 구조를 공유하고, 하나를 제거해도 유지"""
+    first = acquire_dataset("test:same-1", builder)
+    second = acquire_dataset("test:same-2", builder)
+    a, b = get_dataset("test:same-1"), get_dataset("test:same-2")
+    assert a is not b
+    assert a.attrs["dataset_version"] == b.attrs["dataset_version"]
+    prefix = get_daily_prefix(a)
+    assert get_daily_prefix(b) is prefix
+
+    first.release()
+    assert peek_derived(b, ("daily_prefix",)) is prefix
+    second.release()
+    assert peek_derived(b, ("daily_prefix",)) is None
+
+
+def test_refresh_with_changed_content_purges_old_version(builder, small_raw):
+    lease = acquire_dataset("test:refresh", builder)
+    old = get_dataset("test:refresh")
+    get_daily_prefix(old)
+
+    changed = small_raw.copy()
+    changed["구매확정물량"] = changed["구매확정물량"] * 2
+    refreshed = acquire_dataset(
+        "test:refresh", lambda: process_data(changed), refresh=True
+    )
+    new = get_dataset("test:refresh")
+    assert new is not old
+    assert peek_derived(old, ("daily_prefix",)) is None
+    assert registry_entry("test:refresh")["refs"] == 2
+    lease.release()
+    refreshed.release()
+    assert get_dataset("test:refresh") is None
@@ -0,0 +1,126 @@
+"""SQLite 웨어하우스 - tmp_path에 만든 웨어하우스 조회 결과가 pandas 경로와 같은지 비교"""
+
+import pandas as pd
+import pytest
+
+from backend_parity import (
+    FLOW_GROUPS,
+    assert_drilldown_parity,
+    assert_filter_parity,
+    assert_flow_parity,
+    assert_rank_parity,
+    build_fixture_csv,
+    parity_cases,
+)
+from kpi_engine import default_filter_args
+from kpi_sql import check_parity
+from kpi_warehouse import SQLiteBackend, build_warehouse, main
+
+
+@pytest.fixture(scope="module")
+def warehouse(tmp_path_factory):
+    """(pandas 데이터셋, 웨어하우스 백엔드) - build 명령으로 생성"""
+    directory = tmp_path_factory.mktemp("warehouse")
+    csv_path, df = build_fixture_csv(directory)
+    path = str(directory / "거래데이터.sqlite")
+    assert main(["build", csv_path, path]) == 0
+    return df, SQLiteBackend(path, "test-sqlite")
+
+
+@pytest.fixture(scope="module")
+def filter_cases(warehouse):
+    df, _ = warehouse
+    return parity_cases(df)
+
+
+def test_parity_command_has_no_failures(warehouse):
+    df, backend = warehouse
+    checked, failures = check_parity(df, backend)
+    assert checked > 0
+    assert failures == []
+
+
+def test_filter_flow_and_top_n_match_pandas(warehouse, filter_cases):
+    df, backend = warehouse
+    for _, args in filter_cases:
+        expected = assert_filter_parity(df, backend, args)
+        if expected.empty:
+            continue
+        assert_flow_parity(expected, backend, args, FLOW_GROUPS + ["판매자"])
+        assert_rank_parity(expected, backend, args, FLOW_GROUPS + ["판매자"])
+
+
+def test_drilldown_matches_pandas(warehouse, filter_cases):
+    df, backend = warehouse
+    for _, args in filter_cases:
+        expected = assert_filter_parity(df, backend, args)
+        if not expected.empty:
+            assert_drilldown_parity(expected, backend, args)
+
+
+# ================= 일별 집계 테이블 =================
+def test_flow_reads_daily_totals_for_filter_columns(warehouse):
+    """필터/기간 컬럼 그룹은 일별 집계 테이블, 판매자처럼 집계 키가 아닌 컬럼은 trades"""
+    _, backend = warehouse
+    for group_col in FLOW_GROUPS + ["year_month", "year_week"]:
+        assert backend._aggregate_source(group_col) == "daily_totals", group_col
+    assert backend._aggregate_source("판매자") == "trades"
+    assert backend._aggregate_source("구매자") == "trades"
+
+
+def test_daily_totals_match_rows(warehouse):
+    """일별 집계 테이블의 합계 = 행 합계 (결측 키 포함)"""
+    df, backend = warehouse
+    daily = backend._fetch("SELECT * FROM daily_totals")
+    assert len(daily) < len(df)
+    keys, measures = ["구분", "부류"], ["구매확정금액(원)", "구매확정물량"]
+    pd.testing.assert_frame_equal(
+        daily.groupby(keys, dropna=False)[measures].sum(),
+        df.groupby(keys, dropna=False)[measures].sum(),
+    )
+
+
+def test_float_measures_read_trades(tmp_path, warehouse):
+    """실수 측정값은 합산 순서에 따라 결과가 달라지므로 일별 집계를 쓰지 않는다"""
+    df, _ = warehouse
+    floats = df.astype({"구매확정물량": "float64"})
+    floats["구매확정물량"] = floats["구매확정물량"] / 3
+    # 원본과 다른 데이터셋 (조회 캐시가 섞이지 않도록 별도 버전)
+    floats.attrs["dataset_version"] = "test-float-measures"
+    path = build_warehouse(floats, str(tmp_path / "실수.sqlite"))
+    backend = SQLiteBackend(path, "test-sqlite-float")
+    assert backend._aggregate_source("구분") == "trades"
+
+    args = default_filter_args(floats)
+    expected = assert_filter_parity(floats, backend, args)
+    assert_flow_parity(expected, backend, args, ["구분", "품목"])
+
+
+# ================= 전체 기간 조건 생략 =================
+def test_full_date_range_is_dropped_from_where_clause(warehouse):
+    df, backend = warehouse
+    start, end = backend.date_bounds()
+    assert (start, end) == (df["확정일자"].min().date(), df["확정일자"].max().date())
+    assert backend.where_clause((start, end), False) == ("TRUE", [])
+    wider = (start - pd.Timedelta(days=30), end + pd.Timedelta(days=30))
+    assert backend.where_clause(wider, False, 구분="청과") == ('"구분" = ?', ["청과"])
+
+    # 하루라도 좁으면 날짜 조건 유지
+    for narrower in [
+        (start + pd.Timedelta(days=1), end),
+        (start, end - pd.Timedelta(days=1)),
+    ]:
+        where, params = backend.where_clause(narrower, False)
+        assert '"확정일자"' in where
+        assert len(params) == 2
+
+
+def test_full_range_results_match_pandas(warehouse):
+    """날짜 조건을 생략한 조회도 pandas의 전체 기간 조회와 같은 결과"""
+    df, backend = warehouse
+    start, end = backend.date_bounds()
+    for date_range in [(start, end), (start - pd.Timedelta(days=5), end)]:
+        args = (date_range,) + default_filter_args(df)[1:]
+        expected = assert_filter_parity(df, backend, args)
+        assert len(expected) == len(df)
+        assert_flow_parity(expected, backend, args, ["구분", "판매자세부구분"])